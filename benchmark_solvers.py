@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark MILP Solver Backends
+==============================
+
+This script runs the ride clustering and training-gap MILP models through
+every installed solver backend (CBC, HiGHS, CP-SAT) and reports time to
+optimal, gap over time and peak memory so the fastest solver can be picked
+per model type.
+
+Usage:
+    python3 benchmark_solvers.py [--solvers cbc highs cpsat] [--time-limit 300] [--gap 0.03]
+"""
+
+import argparse
+
+# Imported first: solver backends must load OR-Tools before pulp loads highspy
+from src.analysis.solver_benchmark import SolverBenchmark
+from src.analysis.solver_backends import available_backends
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MILP solver backends")
+    parser.add_argument('--solvers', nargs='+', default=None,
+                        help=f"Backends to compare (available: {', '.join(available_backends())})")
+    parser.add_argument('--time-limit', type=float, default=300, help="Per-run time limit in seconds")
+    parser.add_argument('--gap', type=float, default=0.03, help="Relative optimality gap")
+    args = parser.parse_args()
+
+    print("⏱️  MILP SOLVER BENCHMARK")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    benchmark = SolverBenchmark(optimizer, backends=args.solvers,
+                                time_limit=args.time_limit, gap_rel=args.gap)
+    results = benchmark.run()
+    benchmark.display_results(results)
+    benchmark.save_results(results)
+
+
+if __name__ == "__main__":
+    main()
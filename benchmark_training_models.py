@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark Training Models
+=========================
+
+This script compares the two-stage training analysis (ride clustering MILP,
+then gap costing) with the integrated model that prices training against
+current EngQual.csv holdings while assigning rides. It reports runtime and
+total training effort for each and saves the comparison to
+outputs/current/training_model_benchmark.json.
+
+Usage:
+    python3 benchmark_training_models.py
+"""
+
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+from src.analysis.standard_output_manager import StandardOutputManager
+from src.analysis.training_optimization_designer import TrainingOptimizationDesigner
+
+
+def main():
+    print("⏱️  TRAINING MODEL BENCHMARK")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    designer = TrainingOptimizationDesigner(optimizer)
+    current_matrices = designer.create_current_state_matrices(designer.load_current_qualification_state())
+
+    comparison = designer.compare_training_approaches(current_matrices)
+
+    output_path, = StandardOutputManager().save_side_files({"training_model_benchmark.json": comparison})
+    print(f"\n💾 Benchmark results saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
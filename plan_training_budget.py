@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Plan Training Under a Budget
+============================
+
+This script chooses which qualifications to train within a training-hours
+budget (overall and optionally per engineer), using PPM hours from the catalog
+as the default cost of each qualification. A JSON file of {qualification: hours}
+overrides individual costs. The plan is re-scored with real covered ride-days,
+and a budget curve shows the coverage bought at each budget level.
+
+Usage:
+    python3 plan_training_budget.py [--budget 40] [--per-engineer 8] [--costs costs.json] [--curve 10 20 40 80]
+"""
+
+import argparse
+import json
+
+from src.analysis.budget_training_planner import BudgetedTrainingPlanner
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+from src.analysis.problem_context import ProblemContext
+from src.analysis.training_optimization_designer import TrainingOptimizationDesigner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget-constrained training plan (knapsack over training hours)")
+    parser.add_argument('--budget', type=float, default=40, help="Overall training budget in hours")
+    parser.add_argument('--per-engineer', type=float, default=None, help="Training-hours cap per engineer")
+    parser.add_argument('--costs', default=None, help="JSON {qualification: hours} cost overrides")
+    parser.add_argument('--curve', type=float, nargs='*', default=None,
+                        help="Budget levels (hours) for the budget curve")
+    args = parser.parse_args()
+    if args.budget <= 0 or any(budget <= 0 for budget in args.curve or []):
+        parser.error("budgets must be positive")
+
+    print("💰 BUDGETED TRAINING PLAN")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    context = ProblemContext(optimizer)
+    designer = TrainingOptimizationDesigner(optimizer, context=context)
+    current_matrices = designer.load_current_qualification_state()
+    if not current_matrices:
+        print("❌ No current qualification state available")
+        return
+
+    training_costs = None
+    if args.costs:
+        with open(args.costs, 'r') as f:
+            training_costs = json.load(f)
+
+    budgets = args.curve or [args.budget * fraction for fraction in (0.25, 0.5, 0.75, 1.0)]
+    planner = BudgetedTrainingPlanner(optimizer, current_matrices, max(budgets + [args.budget]),
+                                      per_engineer_hours=args.per_engineer, training_costs=training_costs,
+                                      context=context)
+    print(f"   {len(planner.items)} trainee slots valued")
+
+    plan = planner.plan(args.budget)
+    planner.display_plan(plan)
+
+    curve = planner.budget_curve(budgets)
+    print("\n📈 BUDGET CURVE")
+    for point in curve:
+        print(f"   {point['budget_hours']:>7.1f}h → {point['trainings']:>3} trainings, "
+              f"+{point['ride_days_gained']} ride-days")
+
+    planner.save_results(plan, curve)
+
+
+if __name__ == "__main__":
+    main()
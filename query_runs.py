@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Query Optimization Run Index
+============================
+
+This script lists, filters and trends saved optimization runs from the SQLite
+run index (outputs/run_index.sqlite) that StandardOutputManager updates on
+every save.
+
+Usage:
+    python3 query_runs.py [--name milp_mathematical | --prefix milp] [--daily-below 100]
+                          [--since 2025-06-01] [--limit 20]
+    python3 query_runs.py --trend min_daily_coverage [--name milp_mathematical]
+    python3 query_runs.py --summary
+    python3 query_runs.py --reindex
+"""
+
+import argparse
+
+from src.analysis.run_index import TREND_COLUMNS
+from src.analysis.standard_output_manager import StandardOutputManager
+
+
+def _percent(value):
+    return f"{value:6.1f}%" if value is not None else "     - "
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the optimization run index")
+    parser.add_argument('--name', default=None, help="Exact optimization name")
+    parser.add_argument('--prefix', default=None, help="Optimization name prefix (e.g. milp)")
+    parser.add_argument('--daily-below', type=float, default=None, help="Some team's daily coverage below this %%")
+    parser.add_argument('--weekly-below', type=float, default=None, help="Some team's weekly coverage below this %%")
+    parser.add_argument('--monthly-below', type=float, default=None, help="Some team's monthly coverage below this %%")
+    parser.add_argument('--since', default=None, help="Only runs created at or after this ISO timestamp")
+    parser.add_argument('--limit', type=int, default=20, help="Maximum runs to list")
+    parser.add_argument('--trend', choices=TREND_COLUMNS, default=None, help="Show one column over time")
+    parser.add_argument('--summary', action='store_true', help="Per-optimization averages")
+    parser.add_argument('--reindex', action='store_true', help="Re-index the current and every archived run")
+    args = parser.parse_args()
+
+    manager = StandardOutputManager()
+    index = manager.run_index
+
+    if args.reindex:
+        manager.reindex_runs()
+
+    if args.summary:
+        print("📊 RUNS BY OPTIMIZATION")
+        print("=" * 60)
+        for row in index.summary_by_optimization():
+            print(f"   {row['optimization_name']:<28} {row['runs']:>4} runs, latest {row['latest'][:16]}, "
+                  f"min coverage D/W/M {_percent(row['avg_min_daily_coverage'])} "
+                  f"{_percent(row['avg_min_weekly_coverage'])} {_percent(row['avg_min_monthly_coverage'])}")
+        return
+
+    if args.trend:
+        print(f"📈 TREND: {args.trend}")
+        print("=" * 60)
+        for timestamp, optimization_name, value in index.trend(args.trend, optimization_name=args.name):
+            print(f"   {timestamp[:16]}  {optimization_name:<28} {value}")
+        return
+
+    below = {ppm_type: percent for ppm_type, percent in (
+        ('daily', args.daily_below), ('weekly', args.weekly_below), ('monthly', args.monthly_below)
+    ) if percent is not None}
+    runs = index.query(optimization_name=args.name, name_prefix=args.prefix, below=below,
+                       since=args.since, limit=args.limit)
+
+    print(f"🗂️  OPTIMIZATION RUNS ({len(runs)} shown)")
+    print("=" * 60)
+    for run in runs:
+        coverage = "  ".join(
+            f"T{team} {_percent(run[f'team_{team}_daily_coverage'])} {_percent(run[f'team_{team}_weekly_coverage'])} "
+            f"{_percent(run[f'team_{team}_monthly_coverage'])}"
+            for team in (1, 2)
+        )
+        runtime = f"{run['runtime_seconds']:.0f}s" if run['runtime_seconds'] is not None else "-"
+        print(f"   {run['created_timestamp'][:16]}  {run['optimization_name']:<28} {coverage}  "
+              f"{run['total_qualifications']} quals, {runtime}"
+              + (f", archived: {run['archive_directory']}" if run['archive_directory'] else ""))
+
+
+if __name__ == "__main__":
+    main()
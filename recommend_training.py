@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+"""
+Coverage Gain Training Plan
+===========================
+
+This script ranks training (engineer, qualification) pairs by the ride-days
+of rotation coverage each one actually adds to the current EngQual.csv
+state, using lazy-greedy evaluation. The ranked plan is saved to
+outputs/current/training_coverage_gain_plan.json.
+
+Usage:
+    python3 recommend_training.py [--steps 50] [--max-per-engineer 8] [--teams 1 2]
+"""
+
+import argparse
+
+from src.analysis.coverage_gain_recommender import CoverageGainTrainingRecommender
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+from src.analysis.problem_context import ProblemContext
+from src.analysis.training_optimization_designer import TrainingOptimizationDesigner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank training by covered ride-days gained")
+    parser.add_argument('--steps', type=int, default=50, help="Trainings in the plan per team")
+    parser.add_argument('--max-per-engineer', type=int, default=None,
+                        help="Cap on new qualifications per engineer")
+    parser.add_argument('--teams', type=int, nargs='+', default=[1, 2], help="Teams to plan")
+    args = parser.parse_args()
+
+    print("🎯 COVERAGE GAIN TRAINING PLAN")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    context = ProblemContext(optimizer)
+    designer = TrainingOptimizationDesigner(optimizer, context=context)
+    current_matrices = designer.load_current_qualification_state()
+    if not current_matrices:
+        print("❌ No current qualification state available")
+        return
+
+    recommender = CoverageGainTrainingRecommender(optimizer, max_steps=args.steps,
+                                                  max_per_engineer=args.max_per_engineer, context=context)
+    results = recommender.recommend_all(current_matrices, teams=tuple(args.teams))
+    recommender.display_results(results)
+    recommender.save_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Multi-Start Qualification Search
+================================
+
+This script runs a randomized qualification designer from several seeds in
+parallel, scores every result with the coverage validator and saves the best
+matrices to the standard output location. The seeds and scores of every start
+are saved to outputs/current/multi_start_results.json.
+
+Usage:
+    python3 run_multi_start.py [--designer ultimate] [--starts 8] [--workers 4]
+                               [--objective coverage qualifications balance]
+"""
+
+import argparse
+
+from src.analysis.coverage_validator import CoverageValidator
+from src.analysis.multi_start_search import DEFAULT_OBJECTIVE, DESIGNERS, OBJECTIVE_TERMS, MultiStartSearch
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+from src.analysis.problem_context import ProblemContext
+from src.analysis.standard_output_manager import StandardOutputManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Best-of-N seeds for a randomized qualification designer")
+    parser.add_argument('--designer', choices=sorted(DESIGNERS), default='ultimate', help="Designer to run")
+    parser.add_argument('--starts', type=int, default=8, help="Number of seeds to run")
+    parser.add_argument('--base-seed', type=int, default=42, help="First seed (seeds are consecutive)")
+    parser.add_argument('--seeds', type=int, nargs='+', default=None, help="Explicit seeds (overrides --starts)")
+    parser.add_argument('--objective', nargs='+', choices=sorted(OBJECTIVE_TERMS), default=list(DEFAULT_OBJECTIVE),
+                        help="Objective terms in priority order")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    print("🎲 MULTI-START QUALIFICATION SEARCH")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    context = ProblemContext(optimizer)
+    seeds = args.seeds or [args.base_seed + i for i in range(args.starts)]
+
+    search = MultiStartSearch(optimizer, designer=args.designer, context=context,
+                              objective=args.objective, workers=args.workers)
+    results = search.run(seeds)
+
+    best = results['best']
+    validation_results = CoverageValidator(optimizer, context=context).validate_assignment_coverage(best['matrices'])
+    StandardOutputManager().save_optimization_results(
+        qualification_matrices=best['matrices'],
+        optimization_name=f"{args.designer}_multi_start",
+        optimization_config={
+            "approach": f"{args.designer}_multi_start",
+            "seed": best['seed'],
+            "seeds": seeds,
+            "objective": args.objective,
+            "metrics": best['metrics']
+        },
+        validation_results=validation_results,
+        runtime_seconds=results['elapsed'],
+        extra_files={"multi_start_results.json": search.results_record(results)}
+    )
+
+
+if __name__ == "__main__":
+    main()
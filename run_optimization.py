@@ -8,7 +8,9 @@ This script provides multiple optimization approaches for qualification matrices
 with standardized output for easy validation and comparison.
 """
 
+import shutil
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -18,7 +20,9 @@ from src.analysis.coverage_optimized_designer import CoverageOptimizedDesigner
 from src.analysis.balanced_coverage_designer import BalancedCoverageDesigner
 from src.analysis.ultimate_coverage_designer import UltimateCoverageDesigner
 from src.analysis.milp_optimization_designer import MILPOptimizationDesigner
+from src.analysis.local_search_designer import LocalSearchDesigner
 from src.analysis.standard_output_manager import StandardOutputManager
+from src.analysis.problem_context import ProblemContext
 
 
 def run_classic_optimization(optimizer):
@@ -48,10 +52,10 @@ def run_classic_optimization(optimizer):
     }
 
 
-def run_maximum_optimization(optimizer):
+def run_maximum_optimization(optimizer, context=None):
     """Run maximum coverage-focused optimization"""
     print("\n🎯 RUNNING MAXIMUM COVERAGE OPTIMIZATION...")
-    designer = CoverageOptimizedDesigner(optimizer)
+    designer = CoverageOptimizedDesigner(optimizer, context=context)
     matrices = designer.create_optimized_qualification_matrices()
     validation_results = designer.validate_and_export_results(matrices)
     
@@ -71,10 +75,10 @@ def run_maximum_optimization(optimizer):
     }
 
 
-def run_balanced_optimization(optimizer):
+def run_balanced_optimization(optimizer, context=None):
     """Run balanced qualification distribution optimization"""
     print("\n⚖️  RUNNING BALANCED COVERAGE OPTIMIZATION...")
-    designer = BalancedCoverageDesigner(optimizer)
+    designer = BalancedCoverageDesigner(optimizer, context=context)
     matrices = designer.create_optimized_qualification_matrices()
     validation_results = designer.validate_and_export_results(matrices)
     
@@ -96,10 +100,10 @@ def run_balanced_optimization(optimizer):
     }
 
 
-def run_ultimate_optimization(optimizer):
+def run_ultimate_optimization(optimizer, context=None):
     """Run ULTIMATE 100% daily coverage optimization"""
     print("\n🔥 RUNNING ULTIMATE 100% COVERAGE OPTIMIZATION...")
-    designer = UltimateCoverageDesigner(optimizer)
+    designer = UltimateCoverageDesigner(optimizer, context=context)
     matrices = designer.create_optimized_qualification_matrices()
     validation_results = designer.validate_and_export_results(matrices)
     
@@ -121,14 +125,15 @@ def run_ultimate_optimization(optimizer):
     }
 
 
-def run_milp_optimization(optimizer):
+def run_milp_optimization(optimizer, context=None):
     """Run Mathematical (MILP) optimization with guaranteed coverage"""
     print("\n🔢 RUNNING MILP MATHEMATICAL OPTIMIZATION...")
-    designer = MILPOptimizationDesigner(optimizer)
+    designer = MILPOptimizationDesigner(optimizer, context=context)
     matrices = designer.create_optimized_qualification_matrices()
     validation_results, assignment_counts = designer.validate_and_export_results(matrices)
+    solver_telemetry = designer.get_solve_telemetry()
     
-    return matrices, validation_results, assignment_counts, {
+    return matrices, validation_results, assignment_counts, solver_telemetry, {
         "approach": "milp_mathematical",
         "features": [
             "mathematical_optimization",
@@ -147,14 +152,39 @@ def run_milp_optimization(optimizer):
     }
 
 
-def run_training_optimization(optimizer):
+def run_local_search_optimization(optimizer, context=None):
+    """Run simulated-annealing local search over ride assignments"""
+    print("\n🌡️  RUNNING LOCAL SEARCH OPTIMIZATION...")
+    designer = LocalSearchDesigner(optimizer, context=context)
+    matrices = designer.create_optimized_qualification_matrices()
+    validation_results = designer.validate_and_export_results(matrices)
+    
+    return matrices, validation_results, {
+        "approach": "local_search",
+        "features": [
+            "simulated_annealing",
+            "ride_move_and_swap_neighbourhood",
+            "qualification_add_drop_moves",
+            "incremental_coverage_scoring",
+            "type_abc_balance_preserved"
+        ],
+        "target_coverage": {
+            "daily_ppms": "maximize",
+            "weekly_ppms": "maximize",
+            "monthly_ppms": "maximize"
+        },
+        "search_stats": designer.get_search_stats()
+    }
+
+
+def run_training_optimization(optimizer, context=None, output_dir="outputs/current"):
     """Run Training Optimization based on current qualifications"""
     print("\n🎓 RUNNING TRAINING OPTIMIZATION ANALYSIS...")
     
     # Import the training optimizer
     from src.analysis.training_optimization_designer import TrainingOptimizationDesigner
     
-    designer = TrainingOptimizationDesigner(optimizer)
+    designer = TrainingOptimizationDesigner(optimizer, context=context)
     
     # Step 1: Load current qualifications from EngQual.csv
     current_matrices = designer.load_current_qualification_state()
@@ -169,8 +199,8 @@ def run_training_optimization(optimizer):
     detailed_report = designer.generate_detailed_training_report(training_recommendations, current_state_matrices)
     designer.display_detailed_training_report(detailed_report)
     
-    # Step 3.6: Export to CSV for easy analysis
-    csv_files = designer.export_detailed_report_to_csv(detailed_report)
+    # Step 3.6: Export to CSV (and Parquet when pyarrow is installed) for easy analysis
+    csv_files = designer.export_detailed_report_to_csv(detailed_report, output_dir=output_dir, parquet=True)
     
     # Step 4: Validate proposed training impact
     validation_results = designer.validate_training_impact(training_recommendations)
@@ -209,88 +239,88 @@ def main():
     print("4. BALANCED: Even qualification distribution")
     print("5. MILP: Mathematical optimization (guaranteed coverage + fairness)")
     print("6. TRAINING: Current state vs optimal training")
+    print("7. LOCAL SEARCH: Simulated annealing over ride assignments")
     print()
     
-    choice = input("Select optimization approach (1-6): ").strip()
+    choice = input("Select optimization approach (1-7): ").strip()
     
-    if choice not in ['1', '2', '3', '4', '5', '6']:
-        print("❌ Invalid choice. Please select 1, 2, 3, 4, 5, or 6.")
+    if choice not in ['1', '2', '3', '4', '5', '6', '7']:
+        print("❌ Invalid choice. Please select 1, 2, 3, 4, 5, 6, or 7.")
         sys.exit(1)
     
     print(f"\n🚀 STARTING OPTIMIZATION")
     print("=" * 60)
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
+    start_time = time.time()
+    
+    # This run's files are staged privately and swapped into outputs/current on save
+    output_manager = StandardOutputManager()
+    staging_dir = output_manager.create_staging_dir()
     try:
         # Step 1: Load and analyze PPM data
         print("📊 LOADING PPM DATA...")
         optimizer = PPMCapacityOptimizer()
         optimizer.generate_report()  # This loads and analyzes all data
         
+        # Engineers, rotas and shift statistics shared by every designer and validator
+        context = ProblemContext(optimizer)
+        
         # Step 2: Run selected optimization
         assignment_counts = None  # Initialize assignment_counts for all methods
+        solver_telemetry = None  # Only MILP approaches record solve telemetry
         
         if choice == '1':
             matrices, validation_results, config = run_classic_optimization(optimizer)
             optimization_name = "classic_balanced"
         elif choice == '2':
-            matrices, validation_results, config = run_maximum_optimization(optimizer)
+            matrices, validation_results, config = run_maximum_optimization(optimizer, context)
             optimization_name = "coverage_optimized"
         elif choice == '3':
-            matrices, validation_results, config = run_ultimate_optimization(optimizer)
+            matrices, validation_results, config = run_ultimate_optimization(optimizer, context)
             optimization_name = "ultimate_coverage"
         elif choice == '4':
-            matrices, validation_results, config = run_balanced_optimization(optimizer)
+            matrices, validation_results, config = run_balanced_optimization(optimizer, context)
             optimization_name = "balanced_coverage"
         elif choice == '5':
-            matrices, validation_results, assignment_counts, config = run_milp_optimization(optimizer)
+            matrices, validation_results, assignment_counts, solver_telemetry, config = run_milp_optimization(optimizer, context)
             optimization_name = "milp_mathematical"
         elif choice == '6':
-            current_matrices, current_state_matrices, training_recommendations, validation_results, detailed_report, csv_files, config = run_training_optimization(optimizer)
+            current_matrices, current_state_matrices, training_recommendations, validation_results, detailed_report, csv_files, config = run_training_optimization(optimizer, context, output_dir=staging_dir)
             optimization_name = "training_optimization"
             matrices = current_state_matrices  # Use current state matrices for saving
+        elif choice == '7':
+            matrices, validation_results, config = run_local_search_optimization(optimizer, context)
+            optimization_name = "local_search"
         
         # Step 3: Save to standardized location
         print("\n💾 SAVING TO STANDARD LOCATION...")
-        output_manager = StandardOutputManager()
+        
+        # Run-specific files are saved with the run, never written into current directly
+        extra_files = {}
+        
+        # Step 3.5: Save assignment counts if available (MILP optimization)
+        if assignment_counts is not None:
+            extra_files["engineer_assignment_counts.json"] = assignment_counts
+        
+        # Step 3.6: Save training recommendations if available (Training optimization)
+        if choice == '6':
+            extra_files["training_recommendations.json"] = training_recommendations
+            extra_files["current_qualification_state.json"] = current_matrices
+            extra_files["detailed_training_report.json"] = detailed_report
         
         output_manager.save_optimization_results(
             qualification_matrices=matrices,
             optimization_name=optimization_name,
             optimization_config=config,
-            validation_results=validation_results
+            validation_results=validation_results,
+            solver_telemetry=solver_telemetry,
+            runtime_seconds=round(time.time() - start_time, 2),
+            extra_files=extra_files,
+            staging_dir=staging_dir
         )
         
-        # Step 3.5: Save assignment counts if available (MILP optimization)
-        if assignment_counts is not None:
-            import json
-            assignment_counts_path = output_manager.current_dir / "engineer_assignment_counts.json"
-            print(f"   💾 Saving engineer assignment counts to: {assignment_counts_path}")
-            
-            with open(assignment_counts_path, 'w') as f:
-                json.dump(assignment_counts, f, indent=2)
-        
-        # Step 3.6: Save training recommendations if available (Training optimization)
-        if choice == '6' and 'training_recommendations' in locals():
-            import json
-            training_path = output_manager.current_dir / "training_recommendations.json"
-            current_state_path = output_manager.current_dir / "current_qualification_state.json"
-            print(f"   💾 Saving training recommendations to: {training_path}")
-            print(f"   💾 Saving current state analysis to: {current_state_path}")
-            
-            with open(training_path, 'w') as f:
-                json.dump(training_recommendations, f, indent=2)
-            
-            with open(current_state_path, 'w') as f:
-                json.dump(current_matrices, f, indent=2)
-            
-            # Save detailed training report
-            detailed_report_path = output_manager.current_dir / "detailed_training_report.json"
-            print(f"   💾 Saving detailed training report to: {detailed_report_path}")
-            
-            with open(detailed_report_path, 'w') as f:
-                json.dump(detailed_report, f, indent=2)
-            
+        if choice == '6':
             # Display summary of assignment counts
             print("\n📊 ENGINEER ASSIGNMENT COUNTS SUMMARY:")
             if assignment_counts:
@@ -423,6 +453,11 @@ def main():
                 print(f"   ✅ Training effectiveness achieved: coverage improvement")
             else:
                 print(f"   ⚠️  Training effectiveness not fully achieved")
+        elif choice == '7':
+            print(f"\n🌡️  Local search optimization completed!")
+            for team, stats in config['search_stats'].items():
+                print(f"   Team {team}: {stats['iterations']} moves ({stats['moves_per_second']}/s), "
+                      f"objective {stats['initial_objective']} -> {stats['best_objective']}")
         
         print(f"📁 Results saved to standard location: {output_manager.current_dir}")
         
@@ -445,6 +480,7 @@ def main():
         print(f"\n❌ ERROR during optimization: {e}")
         import traceback
         traceback.print_exc()
+        shutil.rmtree(staging_dir, ignore_errors=True)
         sys.exit(1)
 
 
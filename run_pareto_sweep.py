@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+Pareto Frontier Sweep
+=====================
+
+This script traces the trade-off curve between fairness (ride spread),
+rotation coverage and training effort with an epsilon-constraint sweep,
+solving warm-started chains of models in parallel. The frontier table is
+saved to outputs/current/pareto_frontier.csv.
+
+Usage:
+    python3 run_pareto_sweep.py [--coverage 1.0 0.98 0.95] [--fairness 0 1 2 3] [--workers 4]
+"""
+
+import argparse
+
+from src.analysis.pareto_frontier_sweep import ParetoFrontierSweep
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace the fairness / coverage / training effort frontier")
+    parser.add_argument('--coverage', type=float, nargs='+', default=None,
+                        help="Minimum share of rotation coverage rows met, one point per level")
+    parser.add_argument('--fairness', type=int, nargs='+', default=None,
+                        help="Maximum ride spread per engineer, one warm-started chain per level")
+    parser.add_argument('--teams', type=int, nargs='+', default=[1, 2], help="Teams to sweep")
+    parser.add_argument('--solver', default='cbc', help="MILP backend (cbc, highs, cpsat)")
+    parser.add_argument('--time-limit', type=float, default=60, help="Per-point time limit in seconds")
+    parser.add_argument('--gap', type=float, default=0.01, help="Relative optimality gap per point")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    print("📈 PARETO FRONTIER SWEEP")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    sweep = ParetoFrontierSweep(optimizer, coverage_levels=args.coverage, fairness_levels=args.fairness,
+                                solver=args.solver, time_limit=args.time_limit, gap_rel=args.gap,
+                                workers=args.workers)
+    results = sweep.run(teams=tuple(args.teams))
+    sweep.display_results(results)
+    sweep.save_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Simulate a Training Rollout
+===========================
+
+This script walks a training schedule forward month by month and reports
+the daily, weekly and monthly coverage curve for both teams. By default the
+schedule is the coverage gain training plan phased over 18 months; a JSON
+schedule (list of {team, engineer_code, qualification, month}) can be given
+instead. Random reorderings of the schedule are compared against it.
+
+Usage:
+    python3 simulate_training_rollout.py [--schedule schedule.json] [--steps 60] [--months 18] [--orderings 20]
+"""
+
+import argparse
+import json
+
+from src.analysis.coverage_gain_recommender import CoverageGainTrainingRecommender
+from src.analysis.ppm_capacity_optimizer import PPMCapacityOptimizer
+from src.analysis.problem_context import ProblemContext
+from src.analysis.training_optimization_designer import TrainingOptimizationDesigner
+from src.analysis.training_rollout_simulator import TrainingRolloutSimulator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Month-by-month training rollout coverage curve")
+    parser.add_argument('--schedule', default=None, help="JSON training schedule (default: coverage gain plan)")
+    parser.add_argument('--steps', type=int, default=60, help="Trainings per team in the default plan")
+    parser.add_argument('--months', type=int, default=18, help="Simulation horizon in months")
+    parser.add_argument('--orderings', type=int, default=20, help="Random reorderings to compare (0 to skip)")
+    args = parser.parse_args()
+    if args.months < 1:
+        parser.error("--months must be at least 1")
+
+    print("📈 TRAINING ROLLOUT SIMULATION")
+    print("=" * 60)
+
+    optimizer = PPMCapacityOptimizer()
+    context = ProblemContext(optimizer)
+    designer = TrainingOptimizationDesigner(optimizer, context=context)
+    current_matrices = designer.load_current_qualification_state()
+    if not current_matrices:
+        print("❌ No current qualification state available")
+        return
+
+    simulator = TrainingRolloutSimulator(optimizer, current_matrices, months=args.months, context=context)
+    if args.schedule:
+        with open(args.schedule, 'r') as f:
+            schedule = json.load(f)
+    else:
+        recommender = CoverageGainTrainingRecommender(optimizer, max_steps=args.steps, context=context)
+        schedule = simulator.schedule_from_plan(recommender.recommend_all(current_matrices))
+
+    result = simulator.simulate(schedule)
+    simulator.display_curve(result)
+
+    ranked = None
+    if args.orderings:
+        trainings = [(entry['team'], entry['engineer_code'], entry['qualification'])
+                     for entry in sorted(schedule, key=lambda entry: entry['month'])]
+        ranked = simulator.compare_orderings(trainings, orderings=args.orderings)
+        print(f"\n🔀 ORDERINGS COMPARED: {len(ranked)}")
+        for item in ranked[:5]:
+            print(f"   {item['ordering']:<12} mean ride-day coverage {item['mean_ride_day_coverage']:.1f}%")
+
+    simulator.save_results(result, ranked)
+
+
+if __name__ == "__main__":
+    main()
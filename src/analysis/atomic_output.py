@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+"""
+Atomic Output Helpers
+=====================
+
+File-level building blocks for concurrent-safe result writing: atomic file
+writes and an inter-process lock around the standard output directory.
+
+Key Features:
+- Atomic writes: data goes to a temp file in the target directory, is
+  flushed to disk, then renamed over the target, so readers see the old or
+  the new file, never a partial one; the file keeps the target's permissions
+  (or gets the umask default for a new file) rather than the temp file's 0600
+- RunLock: exclusive (writers) or shared (readers) lock on a lock file,
+  fcntl.flock where available, an exclusive lock file otherwise
+- Re-entrant within one process, so a writer holding the lock can call the
+  manager's own readers
+- Hard-link-or-copy helper used to carry files into a staging directory
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+
+def _read_umask():
+    """Process umask (read once at import: setting it to read it is not thread-safe)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def _target_mode(path):
+    """Permissions for the file written at path: the existing file's, else 0666 less the umask"""
+    try:
+        return path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write_bytes(path, data):
+    """Write data to path via a temp file and rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_name, _target_mode(path))
+        os.replace(temp_name, path)
+    except BaseException:
+        _unlink_quietly(temp_name)
+        raise
+    return path
+
+
+def atomic_write_text(path, text):
+    return atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def atomic_write_json(path, data, indent=2, default=None):
+    return atomic_write_text(path, json.dumps(data, indent=indent, default=default))
+
+
+def _unlink_quietly(path):
+    """Remove a leftover temp file, ignoring a file that is already gone"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def link_or_copy(source, target):
+    """Hard-link source to target (no data copied), copying when links are not supported"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return target
+
+
+class RunLock:
+    """Inter-process lock on a lock file, re-entrant within one process
+
+    Shared holders exclude exclusive holders only. Without fcntl every
+    acquisition is exclusive.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, lock_path, timeout=600):
+        self.lock_path = Path(lock_path)
+        self.timeout = timeout
+        self._depth = 0
+        self._fd = None
+        self._guard = threading.RLock()
+
+    def acquire(self, shared=False):
+        self._guard.acquire()
+        if self._depth > 0:
+            self._depth += 1
+            return self
+        try:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            if FCNTL_AVAILABLE:
+                self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            else:
+                self._fd = self._acquire_lock_file()
+        except BaseException:
+            self._guard.release()
+            raise
+        self._depth = 1
+        return self
+
+    def _acquire_lock_file(self):
+        deadline = time.time() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+                os.write(fd, str(os.getpid()).encode())
+                return fd
+            except FileExistsError:
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for output lock: {self.lock_path} "
+                                       f"(remove it if no run is in progress)")
+                time.sleep(self.POLL_INTERVAL)
+
+    def release(self):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                if FCNTL_AVAILABLE:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    os.close(self._fd)
+                else:
+                    os.close(self._fd)
+                    _unlink_quietly(self.lock_path)
+                self._fd = None
+        finally:
+            self._guard.release()
+
+    def __call__(self, shared=False):
+        return _HeldLock(self, shared)
+
+
+class _HeldLock:
+    def __init__(self, lock, shared):
+        self.lock = lock
+        self.shared = shared
+
+    def __enter__(self):
+        return self.lock.acquire(self.shared)
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+        return False
@@ -13,60 +13,131 @@ Key Features:
 - Maximum and minimum qualification limits per engineer
 - Proper coverage during shift windows
 - Role-based qualification filtering
-- Balanced workload assignment
+- Balanced workload assignment: min-heap of engineers keyed by current load
+  (qualification count, PPM hours), O(log E) per qualification, with
+  shift-pattern-aware tie-breaking
+- Optional LPT (longest processing time first) scheduling to minimize the
+  maximum PPM-hour load per engineer
 """
 
-import json
+import heapq
 import random
 import math
 from pathlib import Path
 from collections import defaultdict, Counter
 
 from .coverage_validator import CoverageValidator
+from .problem_context import ProblemContext
+
+
+class RoleLoadHeap:
+    """Min-heap of one role's engineers by current load, with lazy re-keying
+    
+    Two orderings share the same loads: daily qualifications go to the least
+    loaded engineer with the most early shifts, everything else to the least
+    loaded engineer with the fewest, keeping early-shift capacity free for
+    daily PPMs. Stale entries are skipped on pop instead of being removed.
+    """
+    
+    def __init__(self, engineer_assignments, engineer_ids, qualification_hours, strategy='heap'):
+        self.assignments = engineer_assignments
+        self.qualification_hours = qualification_hours
+        self.strategy = strategy
+        self.version = {}
+        self.hours = {}
+        self.heaps = {'early': [], 'late': []}
+        for engineer_id in engineer_ids:
+            self.version[engineer_id] = 0
+            self.hours[engineer_id] = sum(qualification_hours.get(qual, 0.0)
+                                          for qual in engineer_assignments[engineer_id]['qualifications'])
+            self._push(engineer_id)
+    
+    def load(self, engineer_id):
+        """(qualification count, PPM hours), hours first when minimizing the max hour load"""
+        count = len(self.assignments[engineer_id]['qualifications'])
+        hours = round(self.hours[engineer_id], 6)
+        return (hours, count) if self.strategy == 'lpt' else (count, hours)
+    
+    def _push(self, engineer_id):
+        assignment = self.assignments[engineer_id]
+        if len(assignment['qualifications']) >= assignment['max_qualifications']:
+            return  # Full engineers leave the heap for good
+        load = self.load(engineer_id)
+        version = self.version[engineer_id]
+        early_ratio = assignment['early_ratio']
+        heapq.heappush(self.heaps['early'], (load, -early_ratio, engineer_id, version))
+        heapq.heappush(self.heaps['late'], (load, early_ratio, engineer_id, version))
+    
+    def assign(self, qual, daily):
+        """Give qual to the least loaded eligible engineer; None when nobody can take it"""
+        heap = self.heaps['early' if daily else 'late']
+        skipped = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            engineer_id, version = entry[2], entry[3]
+            if version != self.version[engineer_id]:
+                continue
+            if qual in self.assignments[engineer_id]['qualifications']:
+                skipped.append(entry)
+                continue
+            chosen = engineer_id
+            break
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        
+        if chosen is not None:
+            self.assignments[chosen]['qualifications'].append(qual)
+            self.hours[chosen] += self.qualification_hours.get(qual, 0.0)
+            self.version[chosen] += 1
+            self._push(chosen)
+        return chosen
 
 
 class BalancedCoverageDesigner:
     """Balanced qualification assignment with even workload distribution"""
     
-    def __init__(self, optimizer_results):
-        """Initialize with PPM optimization results"""
+    BALANCE_STRATEGIES = ('heap', 'lpt')
+    
+    def __init__(self, optimizer_results, context=None, seed=None, balance_strategy='heap'):
+        """Initialize with PPM optimization results
+        
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            context: Optional shared ProblemContext (built here when not given)
+            seed: Optional random seed for the fairness shuffles (unseeded when None)
+            balance_strategy: 'heap' (even qualification counts) or 'lpt'
+                (minimize the maximum PPM-hour load per engineer)
+        """
+        if balance_strategy not in self.BALANCE_STRATEGIES:
+            raise ValueError(f"Unknown balance strategy '{balance_strategy}'. "
+                             f"Choose from: {', '.join(self.BALANCE_STRATEGIES)}")
         self.optimizer = optimizer_results
+        self.seed = seed
+        self.balance_strategy = balance_strategy
+        self._daily_qualification_cache = {}
+        self._qualification_hours_cache = {}
+        if seed is not None:
+            random.seed(seed)
+        self.context = context if context is not None else ProblemContext(optimizer_results)
         self.engineers = self._load_engineer_data()
         self.ppm_requirements = self._analyze_ppm_requirements()
         self.shift_analysis = self._analyze_shift_patterns()
-        self.coverage_validator = CoverageValidator()
+        self.coverage_validator = CoverageValidator(optimizer_results, context=self.context)
         
         print("⚖️  BALANCED COVERAGE DESIGNER INITIALIZED")
         print("   Focus: Even qualification distribution + adequate coverage")
     
     def _load_engineer_data(self):
-        """Load engineer data organized by team and role"""
-        engineers = {1: {'electrical': [], 'mechanical': []}, 
-                    2: {'electrical': [], 'mechanical': []}}
-        
-        # Load engineer data files
-        for team in [1, 2]:
-            for role in ['elec', 'mech']:
-                role_name = 'electrical' if role == 'elec' else 'mechanical'
-                file_path = f'data/processed/engineers/team{team}_{role}_engineers.json'
-                
-                try:
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                        engineers[team][role_name] = data.get('engineers', [])
-                except FileNotFoundError:
-                    print(f"   ⚠️  Engineer file not found: {file_path}")
-                    engineers[team][role_name] = []
-        
-        return engineers
+        """Engineer data organized by team and role (from the problem context)"""
+        return self.context.engineer_data()
     
     def _analyze_ppm_requirements(self):
         """Analyze PPM requirements for each team and ride"""
         requirements = {1: {}, 2: {}}
         
         for team in [1, 2]:
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            team_rides = self.context.team_rides[team]
             
             for ride_id in team_rides:
                 requirements[team][ride_id] = {
@@ -103,41 +174,38 @@ class BalancedCoverageDesigner:
             shift_analysis[team] = {'electrical': {}, 'mechanical': {}}
             
             for role in ['electrical', 'mechanical']:
-                rota_file = f'data/processed/parsed_rotas/parsed_team{team}_{"elec" if role == "electrical" else "mech"}_rota.json'
-                try:
-                    with open(rota_file, 'r') as f:
-                        rota_data = json.load(f)
-                    
-                    engineer_early_days = {}
-                    engineer_early_ratio = {}
-                    
-                    for week_key, week_data in rota_data.items():
-                        for engineer_id, shifts in week_data.items():
-                            if engineer_id not in engineer_early_days:
-                                engineer_early_days[engineer_id] = 0
-                            
-                            # Count early shifts Monday-Friday (critical for daily PPMs)
-                            early_count = 0
-                            total_weekdays = 0
-                            for day_idx in range(min(5, len(shifts))):  # Mon-Fri only
-                                total_weekdays += 1
-                                if shifts[day_idx] == 'E':
-                                    early_count += 1
-                                    engineer_early_days[engineer_id] += 1
-                            
-                            if total_weekdays > 0:
-                                engineer_early_ratio[engineer_id] = early_count / total_weekdays
-                    
-                    shift_analysis[team][role] = {
-                        'early_days': engineer_early_days,
-                        'early_ratio': engineer_early_ratio
-                    }
-                    
-                    print(f"   Team {team} {role}: Analyzed {len(engineer_early_days)} engineers")
-                    
-                except FileNotFoundError:
+                rota_data = self.context.rotas[team][role]
+                if rota_data is None:
                     print(f"   ⚠️  Rota file not found for Team {team} {role}")
                     shift_analysis[team][role] = {'early_days': {}, 'early_ratio': {}}
+                    continue
+                
+                engineer_early_days = {}
+                engineer_early_ratio = {}
+                
+                for week_key, week_data in rota_data.items():
+                    for engineer_id, shifts in week_data.items():
+                        if engineer_id not in engineer_early_days:
+                            engineer_early_days[engineer_id] = 0
+                        
+                        # Count early shifts Monday-Friday (critical for daily PPMs)
+                        early_count = 0
+                        total_weekdays = 0
+                        for day_idx in range(min(5, len(shifts))):  # Mon-Fri only
+                            total_weekdays += 1
+                            if shifts[day_idx] == 'E':
+                                early_count += 1
+                                engineer_early_days[engineer_id] += 1
+                        
+                        if total_weekdays > 0:
+                            engineer_early_ratio[engineer_id] = early_count / total_weekdays
+                
+                shift_analysis[team][role] = {
+                    'early_days': engineer_early_days,
+                    'early_ratio': engineer_early_ratio
+                }
+                
+                print(f"   Team {team} {role}: Analyzed {len(engineer_early_days)} engineers")
         
         return shift_analysis
     
@@ -328,22 +396,25 @@ class BalancedCoverageDesigner:
                         role = 'electrical' if ppm['maintenance_type'] == 'ELECTRICAL' else 'mechanical'
                         all_qualifications[role].append(ppm['qualification_code'])
         
+        daily_quals = self._daily_qualifications(team)
+        qualification_hours = self._qualification_hours(team)
+        
         # Create redundancy for critical qualifications but maintain balance
         for role in ['electrical', 'mechanical']:
-            unique_quals = list(set(all_qualifications[role]))
+            unique_quals = sorted(set(all_qualifications[role]))
             balanced_quals = []
             
             # Each qualification gets appropriate redundancy
             for qual in unique_quals:
                 # Daily qualifications get 2 copies, others get 1
-                if self._is_daily_qualification(qual, team):
+                if qual in daily_quals:
                     balanced_quals.extend([qual] * 2)  # Reduced from 3 for better balance
                 else:
                     balanced_quals.append(qual)
             
             all_qualifications[role] = balanced_quals
         
-        # Distribute to engineers by role
+        # Distribute to engineers by role, always to the least loaded engineer
         for role in ['electrical', 'mechanical']:
             role_engineers = [eng_id for eng_id, assignment in engineer_assignments.items() 
                             if assignment['role'] == role]
@@ -353,36 +424,22 @@ class BalancedCoverageDesigner:
             
             role_quals = all_qualifications[role].copy()
             random.shuffle(role_quals)  # Randomize for fairness
-            
-            # Round-robin distribution with balance enforcement
-            qual_index = 0
-            rounds = 0
-            max_rounds = 10  # Prevent infinite loops
-            
-            while qual_index < len(role_quals) and rounds < max_rounds:
-                # Sort engineers by current qualification count (maintains balance)
-                role_engineers.sort(key=lambda e: len(engineer_assignments[e]['qualifications']))
-                
-                for engineer_id in role_engineers:
-                    if qual_index >= len(role_quals):
-                        break
-                    
-                    assignment = engineer_assignments[engineer_id]
-                    qual = role_quals[qual_index]
-                    
-                    # Check if engineer can take this qualification
-                    if (len(assignment['qualifications']) < assignment['max_qualifications'] and
-                        qual not in assignment['qualifications']):
-                        
-                        assignment['qualifications'].append(qual)
-                        
-                        # Track if it's a daily qualification
-                        if self._is_daily_qualification(qual, team):
-                            assignment['daily_qualifications'].append(qual)
-                        
-                        qual_index += 1
-                
-                rounds += 1
+            if self.balance_strategy == 'lpt':
+                # Longest processing time first: biggest PPM-hour qualifications placed first
+                role_quals.sort(key=lambda qual: -qualification_hours.get(qual, 0.0))
+            
+            load_heap = RoleLoadHeap(engineer_assignments, role_engineers, qualification_hours,
+                                     strategy=self.balance_strategy)
+            unplaced = 0
+            for qual in role_quals:
+                engineer_id = load_heap.assign(qual, qual in daily_quals)
+                if engineer_id is None:
+                    unplaced += 1
+                elif qual in daily_quals:
+                    engineer_assignments[engineer_id]['daily_qualifications'].append(qual)
+            
+            if unplaced:
+                print(f"      ⚠️  {unplaced} {role} qualification copies left unplaced (engineers at max)")
         
         # Display distribution
         for role in ['electrical', 'mechanical']:
@@ -401,16 +458,30 @@ class BalancedCoverageDesigner:
     
     def _is_daily_qualification(self, qualification_code, team):
         """Check if a qualification is required for daily PPMs"""
-        team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                     if info.get('team_responsible') == team]
-        
-        for ride_id in team_rides:
-            if ride_id in self.optimizer.ppms_by_type['daily']:
-                ppm_data = self.optimizer.ppms_by_type['daily'][ride_id]
-                for ppm in ppm_data['ppms']:
-                    if ppm['qualification_code'] == qualification_code:
-                        return True
-        return False
+        return qualification_code in self._daily_qualifications(team)
+    
+    def _daily_qualifications(self, team):
+        """Qualification codes required by the team's daily PPMs (cached per team)"""
+        if team not in self._daily_qualification_cache:
+            daily_quals = set()
+            for ride_id in self.context.team_rides[team]:
+                ride_ppms = self.optimizer.ppms_by_type['daily'].get(ride_id)
+                for ppm in (ride_ppms['ppms'] if ride_ppms else []):
+                    daily_quals.add(ppm['qualification_code'])
+            self._daily_qualification_cache[team] = frozenset(daily_quals)
+        return self._daily_qualification_cache[team]
+    
+    def _qualification_hours(self, team):
+        """PPM hours behind each qualification across the team's rides (cached per team)"""
+        if team not in self._qualification_hours_cache:
+            hours = defaultdict(float)
+            for ride_id in self.context.team_rides[team]:
+                for ppm_type in ['daily', 'weekly', 'monthly']:
+                    ride_ppms = self.optimizer.ppms_by_type[ppm_type].get(ride_id)
+                    for ppm in (ride_ppms['ppms'] if ride_ppms else []):
+                        hours[ppm['qualification_code']] += ppm['duration_hours']
+            self._qualification_hours_cache[team] = dict(hours)
+        return self._qualification_hours_cache[team]
     
     def _ensure_shift_window_coverage(self, engineer_assignments, team):
         """Ensure adequate coverage during shift windows with balance in mind"""
@@ -551,7 +622,7 @@ class BalancedCoverageDesigner:
                 role_engineers.sort(key=lambda x: len(x[1]['qualifications']))
                 
                 # Distribute missing qualifications
-                missing_list = list(missing_quals)
+                missing_list = sorted(missing_quals)
                 random.shuffle(missing_list)  # Randomize order
                 
                 for qual in missing_list:
@@ -583,29 +654,34 @@ class BalancedCoverageDesigner:
         print(f"         Monthly: {monthly_coverage:.1f}%")
         
         # Final balance check
-        self._final_balance_check(engineer_assignments)
+        self._final_balance_check(engineer_assignments, team)
         
         return engineer_assignments
     
-    def _final_balance_check(self, engineer_assignments):
-        """Check final balance and adjust if needed"""
+    def _final_balance_check(self, engineer_assignments, team):
+        """Check final balance of qualification counts and PPM-hour loads"""
         print(f"      📊 Final Balance Check:")
         
+        qualification_hours = self._qualification_hours(team)
+        qual_counts = {'electrical': [], 'mechanical': []}
+        hour_loads = {'electrical': [], 'mechanical': []}
+        for assignment in engineer_assignments.values():
+            qual_counts[assignment['role']].append(len(assignment['qualifications']))
+            hour_loads[assignment['role']].append(
+                sum(qualification_hours.get(qual, 0.0) for qual in assignment['qualifications'])
+            )
+        
         for role in ['electrical', 'mechanical']:
-            role_engineers = [eng_id for eng_id, assignment in engineer_assignments.items() 
-                            if assignment['role'] == role]
-            
-            if not role_engineers:
+            if not qual_counts[role]:
                 continue
             
-            qual_counts = [len(engineer_assignments[eng]['qualifications']) for eng in role_engineers]
-            
-            min_quals = min(qual_counts)
-            max_quals = max(qual_counts)
-            avg_quals = sum(qual_counts) / len(qual_counts)
+            min_quals = min(qual_counts[role])
+            max_quals = max(qual_counts[role])
+            avg_quals = sum(qual_counts[role]) / len(qual_counts[role])
             balance_ratio = min_quals / max_quals if max_quals > 0 else 1
             
-            print(f"         {role.title()}: {min_quals}-{max_quals} qualifications (avg: {avg_quals:.1f}, balance: {balance_ratio:.2f})")
+            print(f"         {role.title()}: {min_quals}-{max_quals} qualifications (avg: {avg_quals:.1f}, balance: {balance_ratio:.2f}), "
+                  f"PPM hours {min(hour_loads[role]):.1f}-{max(hour_loads[role]):.1f}")
             
             # Good balance if ratio > 0.7 (minimum is at least 70% of maximum)
             if balance_ratio > 0.7:
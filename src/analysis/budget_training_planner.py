@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+
+"""
+Budgeted Training Planner
+=========================
+
+Chooses which qualifications to train under a training-hours budget, overall
+and per engineer, maximising the rotation coverage bought.
+
+Key Features:
+- Per-qualification training cost as input (default: PPM hours from the catalog)
+- Items are the 1st, 2nd, ... trainee for each missing qualification, valued
+  with ride-day shares of the gaps they close (additive, and diminishing
+  along each chain, so substitutes are not counted twice)
+- Exact 0/1 knapsack DP over the overall budget
+- Per-engineer hour caps handled heuristically around the DP (the caps are
+  not part of the knapsack): chosen items whose trainee is at their cap go
+  to the next engineer who could take them; items nobody can take within
+  the caps are excluded and the DP re-run, and any budget left over is
+  refilled with cap-feasible items. The uncapped DP value is reported as an
+  upper bound on what the caps allow
+- Tables built once for the largest budget; without caps any smaller budget
+  is answered by backtracking only (interactive budget sliders)
+- Each plan re-scored with real covered ride-days after applying it
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from .incremental_coverage import IncrementalCoverageModel
+from .problem_context import ProblemContext
+from .standard_output_manager import StandardOutputManager
+
+
+class BudgetedTrainingPlanner:
+    """Knapsack training plan: coverage value versus training hours"""
+
+    # Budget slots for the DP table; costs are rounded up to a slot so a plan never overspends
+    BUDGET_SLOTS = 2000
+
+    # Knapsack re-solves when per-engineer caps leave chosen items without a trainee
+    # (cap heuristic, see _plan_with_caps)
+    CAP_ROUNDS = 10
+
+    def __init__(self, optimizer_results, current_matrices, max_budget_hours, per_engineer_hours=None,
+                 training_costs=None, teams=(1, 2), context=None):
+        """Value every candidate training and build the DP table for max_budget_hours
+
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            current_matrices: Current-state {team: {engineer_code: profile}}
+            max_budget_hours: Largest overall budget that will be queried (positive)
+            per_engineer_hours: Optional training-hours cap per engineer
+            training_costs: Optional {qualification: hours}; missing entries use the catalog
+            teams: Teams to plan
+            context: Optional shared ProblemContext (rotas)
+        """
+        if max_budget_hours <= 0:
+            raise ValueError(f"Training budget must be positive, got {max_budget_hours} hours")
+        self.optimizer = optimizer_results
+        self.max_budget_hours = max_budget_hours
+        self.per_engineer_hours = per_engineer_hours
+        self.training_costs = self.default_training_costs()
+        self.training_costs.update(training_costs or {})
+        self.slot_hours = max_budget_hours / self.BUDGET_SLOTS
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+
+        self.models = {
+            team: IncrementalCoverageModel(optimizer_results, team, current_matrices[team], context=self.context)
+            for team in teams if team in current_matrices
+        }
+        self.engineer_names = {
+            team: {eng_code: profile.get('name', eng_code) for eng_code, profile in current_matrices[team].items()}
+            for team in self.models
+        }
+
+        self.items = self._qualification_chains()
+        self._build_table()
+
+    def default_training_costs(self):
+        """Training hours per qualification: total duration of the catalog PPMs that need it"""
+        costs = defaultdict(float)
+        for ppms_by_ride in self.optimizer.ppms_by_type.values():
+            for ppm_data in ppms_by_ride.values():
+                for ppm in ppm_data['ppms']:
+                    costs[ppm['qualification_code']] += ppm['duration_hours']
+        return dict(costs)
+
+    def _unit_shares(self, model, qual):
+        """Ride-day share per missing engineer for every unsatisfied unit of a qualification"""
+        shares = {}
+        for unit in model.units_by_qual.get(qual, ()):
+            if model._satisfied(unit):
+                continue
+            period = model.unit_period[unit]
+            deficit = model.unit_need[unit] - model.unit_count[unit]
+            days = model.RIDE_DAYS_PER_PERIOD[model.periods[period][0]]
+            shares[unit] = (days / (model.period_unsatisfied[period] * deficit), deficit)
+        return shares
+
+    def _qualification_chains(self):
+        """Knapsack items: the k-th trainee for each (team, qualification), greedily ordered
+
+        Each trainee is credited with the shares of the units they would join
+        that still have a missing engineer after the earlier trainees, so the
+        values along a chain never increase and the DP takes chains as prefixes.
+        Alternatives (used when a trainee is at their hour cap) are the later
+        trainees in the chain, then every other engineer who could join one of
+        the qualification's open units.
+        """
+        items = []
+        for team, model in self.models.items():
+            candidates = defaultdict(list)
+            for eng_code, qual in model.candidate_pairs():
+                candidates[qual].append(eng_code)
+
+            for qual, eng_codes in sorted(candidates.items()):
+                hours = self.training_costs.get(qual)
+                if hours is None:
+                    continue
+                shares = self._unit_shares(model, qual)
+                filled = defaultdict(int)
+                remaining = sorted(eng_codes)
+                ranked = []
+                while remaining:
+                    def value_of(eng_code):
+                        return sum(
+                            share for unit, (share, deficit) in shares.items()
+                            if filled[unit] < deficit and eng_code in model.unit_available[unit]
+                            and eng_code not in model.unit_holders[unit]
+                        )
+                    best = max(remaining, key=value_of)
+                    value = value_of(best)
+                    if value <= 1e-9:
+                        break
+                    for unit, (_, deficit) in shares.items():
+                        if filled[unit] < deficit and best in model.unit_available[unit] \
+                                and best not in model.unit_holders[unit]:
+                            filled[unit] += 1
+                    ranked.append((best, value))
+                    remaining.remove(best)
+
+                substitutes = [eng_code for eng_code in remaining if any(
+                    eng_code in model.unit_available[unit] and eng_code not in model.unit_holders[unit]
+                    for unit in shares
+                )]
+                slots = max(1, int(np.ceil(hours / self.slot_hours - 1e-9)))
+                for rank, (eng_code, value) in enumerate(ranked):
+                    items.append({
+                        'team': team, 'qualification': qual, 'rank': rank + 1, 'engineer_code': eng_code,
+                        'hours': hours, 'slots': slots, 'value': value,
+                        'alternatives': [code for code, _ in ranked[rank + 1:]] + substitutes
+                    })
+        return items
+
+    def _knapsack(self, values):
+        """0/1 knapsack over all chain items: (best, taken), best[s] = best value within s budget slots"""
+        budget = self.BUDGET_SLOTS
+        best = np.zeros(budget + 1)
+        taken = np.zeros((len(self.items), budget + 1), dtype=bool)
+        for index, (item, value) in enumerate(zip(self.items, values)):
+            slots = item['slots']
+            if slots > budget or value <= 1e-12:
+                continue
+            candidate = np.full(budget + 1, -np.inf)
+            candidate[slots:] = best[:budget + 1 - slots] + value
+            improved = candidate > best + 1e-12
+            taken[index] = improved
+            best = np.where(improved, candidate, best)
+        return best, taken
+
+    def _build_table(self):
+        """Knapsack table on the unpriced item values, shared by every budget"""
+        self.best, self.taken = self._knapsack([item['value'] for item in self.items])
+
+    def _budget_slots(self, budget_hours):
+        """Whole DP slots that fit in budget_hours"""
+        return min(max(int(budget_hours / self.slot_hours + 1e-9), 0), self.BUDGET_SLOTS)
+
+    def _backtrack(self, taken, budget_hours):
+        """Items chosen by a knapsack table within budget_hours"""
+        remaining = self._budget_slots(budget_hours)
+        chosen = []
+        for index in range(len(self.items) - 1, -1, -1):
+            if remaining > 0 and taken[index, remaining]:
+                chosen.append(self.items[index])
+                remaining -= self.items[index]['slots']
+        return chosen
+
+    def _free_trainee(self, item, trained, hours_used):
+        """First engineer in the item's chain not yet trained on it and with cap hours left"""
+        key = (item['team'], item['qualification'])
+        for eng_code in [item['engineer_code']] + item['alternatives']:
+            if eng_code in trained[key]:
+                continue
+            if self.per_engineer_hours is not None and \
+                    hours_used[(item['team'], eng_code)] + item['hours'] > self.per_engineer_hours + 1e-9:
+                continue
+            return eng_code
+        return None
+
+    def _assign_trainees(self, chosen, budget_hours=None):
+        """Give each chosen item an engineer, respecting per-engineer hour caps
+
+        Items are taken best value per hour first; an item whose ranked trainee
+        is at their cap goes to the next engineer in the chain, and is dropped
+        when none has hours left. With budget_hours, the budget still unspent
+        is refilled with unchosen items that have a trainee within the caps.
+        """
+        hours_used = defaultdict(float)
+        trained = defaultdict(set)
+        trainings = []
+        dropped = []
+        refilled = 0
+
+        def value_per_hour(item):
+            return (-item['value'] / max(item['hours'], 1e-9), item['rank'])
+
+        def assign(item, eng_code):
+            trained[(item['team'], item['qualification'])].add(eng_code)
+            hours_used[(item['team'], eng_code)] += item['hours']
+            trainings.append({
+                'team': item['team'],
+                'engineer_code': eng_code,
+                'engineer_name': self.engineer_names[item['team']].get(eng_code, eng_code),
+                'qualification': item['qualification'],
+                'training_hours': round(item['hours'], 2),
+                'expected_ride_days': round(item['value'], 3)
+            })
+
+        for item in sorted(chosen, key=value_per_hour):
+            eng_code = self._free_trainee(item, trained, hours_used)
+            if eng_code is None:
+                dropped.append(item)
+            else:
+                assign(item, eng_code)
+
+        if budget_hours is not None:
+            # Budget slots as in the DP, so a refilled plan stays within the uncapped bound
+            chosen_ids = {id(item) for item in chosen}
+            dropped_ids = {id(item) for item in dropped}
+            spent = sum(item['slots'] for item in chosen if id(item) not in dropped_ids)
+            budget_slots = self._budget_slots(budget_hours)
+            for item in sorted((item for item in self.items if id(item) not in chosen_ids), key=value_per_hour):
+                if spent + item['slots'] > budget_slots:
+                    continue
+                eng_code = self._free_trainee(item, trained, hours_used)
+                if eng_code is not None:
+                    assign(item, eng_code)
+                    spent += item['slots']
+                    refilled += 1
+        return trainings, dropped, refilled
+
+    def _plan_with_caps(self, budget_hours):
+        """Cap heuristic: knapsack re-solved until every chosen item has a cap-feasible trainee
+
+        The DP itself only sees the overall budget, so this is not an exact
+        solution of the capped problem. Items longer than the cap are left out
+        from the start. After each solve, the chosen items that no engineer in
+        their chain can take within the caps are excluded and the DP is re-run,
+        so the budget they held is re-optimized rather than lost; at most
+        CAP_ROUNDS solves are made and the best plan over the rounds is kept.
+        """
+        cap = self.per_engineer_hours
+        excluded = {index for index, item in enumerate(self.items) if item['hours'] > cap + 1e-9}
+        index_of = {id(item): index for index, item in enumerate(self.items)}
+        best = None
+        for round_number in range(1, self.CAP_ROUNDS + 1):
+            _, taken = self._knapsack([0.0 if index in excluded else item['value']
+                                       for index, item in enumerate(self.items)])
+            chosen = self._backtrack(taken, budget_hours)
+            trainings, dropped, refilled = self._assign_trainees(chosen, budget_hours)
+            value = sum(item['expected_ride_days'] for item in trainings)
+            if best is None or value > best[0] + 1e-9:
+                best = (value, trainings, dropped, refilled, round_number)
+            if not dropped:
+                break
+            excluded.update(index_of[id(item)] for item in dropped)
+        _, trainings, dropped, refilled, rounds = best
+        return trainings, dropped, refilled, rounds
+
+    def plan(self, budget_hours):
+        """Best plan for an overall budget up to max_budget_hours
+
+        Without per-engineer caps this only backtracks the shared table; with
+        caps the knapsack is re-solved per budget (see _plan_with_caps) and the
+        uncapped optimum is reported as an upper bound on the capped plan.
+        A budget of zero or less gives an empty plan.
+        """
+        budget_hours = min(budget_hours, self.max_budget_hours)
+        if self.per_engineer_hours is None:
+            trainings, dropped, refilled = self._assign_trainees(self._backtrack(self.taken, budget_hours))
+            rounds = 0
+        else:
+            trainings, dropped, refilled, rounds = self._plan_with_caps(budget_hours)
+
+        return {
+            'budget_hours': budget_hours,
+            'per_engineer_hours': self.per_engineer_hours,
+            'hours_used': round(sum(item['training_hours'] for item in trainings), 2),
+            'expected_ride_days': round(sum(item['expected_ride_days'] for item in trainings), 3),
+            'trainings': trainings,
+            'dropped_for_engineer_caps': [{'team': item['team'], 'qualification': item['qualification'],
+                                           'rank': item['rank']} for item in dropped],
+            'refilled_after_caps': refilled,
+            'cap_rounds': rounds,
+            'uncapped_bound': round(float(self.best[self._budget_slots(budget_hours)]), 3),
+            'coverage': self._evaluate(trainings)
+        }
+
+    def _evaluate(self, trainings):
+        """Real coverage before and after applying a plan (model state restored afterwards)"""
+        before = {team: model.coverage_summary() for team, model in self.models.items()}
+        applied = []
+        try:
+            for item in trainings:
+                model = self.models[item['team']]
+                if item['qualification'] not in model.holds[item['engineer_code']]:
+                    model.apply(item['engineer_code'], item['qualification'])
+                    applied.append(item)
+            after = {team: model.coverage_summary() for team, model in self.models.items()}
+        finally:
+            for item in reversed(applied):
+                self.models[item['team']].remove(item['engineer_code'], item['qualification'])
+
+        return {
+            team: {
+                'ride_days_gained': after[team]['ride_days_covered'] - before[team]['ride_days_covered'],
+                'before': before[team],
+                'after': after[team]
+            }
+            for team in self.models
+        }
+
+    def budget_curve(self, budgets):
+        """Coverage bought at each budget level (one backtrack per level)"""
+        curve = []
+        for budget_hours in budgets:
+            plan = self.plan(budget_hours)
+            curve.append({
+                'budget_hours': plan['budget_hours'],
+                'hours_used': plan['hours_used'],
+                'trainings': len(plan['trainings']),
+                'expected_ride_days': plan['expected_ride_days'],
+                'ride_days_gained': sum(team['ride_days_gained'] for team in plan['coverage'].values())
+            })
+        return curve
+
+    def display_plan(self, plan, top=15):
+        """Print a budget plan summary"""
+        print(f"\n💰 TRAINING PLAN FOR {plan['budget_hours']:g} HOURS")
+        print("=" * 70)
+        print(f"   Trainings: {len(plan['trainings'])}, hours used: {plan['hours_used']:g}")
+        if plan['per_engineer_hours'] is not None:
+            print(f"   Expected ride-days: {plan['expected_ride_days']:.1f} "
+                  f"(at most {plan['uncapped_bound']:.1f} without the {plan['per_engineer_hours']:g}h per-engineer cap)")
+        for team, coverage in plan['coverage'].items():
+            before, after = coverage['before'], coverage['after']
+            print(f"   🏢 Team {team}: +{coverage['ride_days_gained']} ride-days "
+                  f"(daily {before['daily']['coverage_percentage']:.1f}% → {after['daily']['coverage_percentage']:.1f}%, "
+                  f"weekly {before['weekly']['coverage_percentage']:.1f}% → {after['weekly']['coverage_percentage']:.1f}%, "
+                  f"monthly {before['monthly']['coverage_percentage']:.1f}% → {after['monthly']['coverage_percentage']:.1f}%)")
+        for item in plan['trainings'][:top]:
+            print(f"   • {item['engineer_name']:<22} {item['qualification']:<18} "
+                  f"{item['training_hours']:>5.2f}h  ~{item['expected_ride_days']:.1f} ride-days")
+
+    def save_results(self, plan, curve=None, output_manager=None):
+        """Save the plan (and optional budget curve) as JSON to the current output directory"""
+        output_manager = output_manager or StandardOutputManager()
+        output_path, = output_manager.save_side_files({
+            "training_budget_plan.json": {'timestamp': datetime.now().isoformat(), 'plan': plan, 'budget_curve': curve}
+        })
+        print(f"\n💾 Budget plan saved to: {output_path}")
+        return output_path
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+Coverage Gain Training Recommender
+==================================
+
+Ranks (engineer, qualification) training pairs by the coverage they actually
+buy across the full rotation, rather than by fixed per-PPM-type weights.
+
+Key Features:
+- Gain = ride-days newly covered (ride-weeks count 5, ride-months 20)
+- Units advanced towards their requirement break ties (and keep the plan
+  moving on gaps that need two trainings before a day is covered)
+- Lazy-greedy (CELF) priority queue: each step re-evaluates only the top
+  candidates whose cached gain is out of date
+- Candidates a step can make more valuable are re-priced eagerly, so the
+  ranking stays exact despite the two-engineer daily requirements
+- Ranked plan with the coverage each step buys and cumulative coverage
+"""
+
+import heapq
+from datetime import datetime
+
+from .incremental_coverage import IncrementalCoverageModel
+from .problem_context import ProblemContext
+from .standard_output_manager import StandardOutputManager
+
+
+class CoverageGainTrainingRecommender:
+    """Greedy training plan ranked by marginal covered ride-days"""
+
+    def __init__(self, optimizer_results, max_steps=50, max_per_engineer=None, context=None):
+        """
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            max_steps: Maximum trainings in the plan per team
+            max_per_engineer: Optional cap on new qualifications per engineer
+            context: Optional shared ProblemContext (rotas)
+        """
+        self.optimizer = optimizer_results
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+        self.max_steps = max_steps
+        self.max_per_engineer = max_per_engineer
+
+    def recommend(self, engineer_assignments, team):
+        """Build the ranked training plan for one team
+
+        Args:
+            engineer_assignments: {engineer_code: {'name', 'role', 'qualifications'}}
+            team: Team number
+        """
+        model = IncrementalCoverageModel(self.optimizer, team, engineer_assignments, context=self.context)
+        initial = model.coverage_summary()
+
+        heap = []
+        fresh = {}
+        evaluations = 0
+        training_load = {eng_code: 0 for eng_code in engineer_assignments}
+
+        def push(pair, step):
+            nonlocal evaluations
+            ride_days, progress, _ = model.gain(*pair)
+            evaluations += 1
+            fresh[pair] = step
+            heapq.heappush(heap, (-ride_days, -progress, pair[0], pair[1], step))
+
+        candidates = sorted(model.candidate_pairs())
+        for pair in candidates:
+            push(pair, 0)
+
+        plan = []
+        cumulative_days = initial['ride_days_covered']
+        step = 0
+        while heap and len(plan) < self.max_steps:
+            neg_days, neg_progress, eng_code, qual, stamp = heapq.heappop(heap)
+            pair = (eng_code, qual)
+            if fresh.get(pair) != stamp:
+                continue  # superseded by a later evaluation
+            if self.max_per_engineer is not None and training_load[eng_code] >= self.max_per_engineer:
+                del fresh[pair]
+                continue
+            if stamp != step:
+                # Stale upper bound: re-evaluate and let the queue decide again
+                push(pair, step)
+                continue
+            if neg_days == 0 and neg_progress == 0:
+                break
+
+            ride_days, progress, covered = model.gain(eng_code, qual)
+            promoted_units = model.apply(eng_code, qual)
+            del fresh[pair]
+            training_load[eng_code] += 1
+            step += 1
+            cumulative_days += ride_days
+
+            plan.append({
+                'step': step,
+                'engineer_code': eng_code,
+                'engineer_name': engineer_assignments[eng_code].get('name', eng_code),
+                'role': engineer_assignments[eng_code]['role'],
+                'qualification': qual,
+                'ride_id': qual.split('.')[0],
+                'ride_days_gained': ride_days,
+                'ride_periods_covered': dict(covered),
+                'units_progressed': progress,
+                'cumulative_ride_days': cumulative_days,
+                'ride_day_coverage_after': cumulative_days / initial['ride_days_total'] * 100
+                if initial['ride_days_total'] else 100.0
+            })
+
+            # Only these candidates can have gained value; everything else stays lazy
+            for other in model.candidates_on_units(promoted_units):
+                if self.max_per_engineer is None or training_load[other[0]] < self.max_per_engineer:
+                    push(other, step)
+
+        return {
+            'team': team,
+            'initial_coverage': initial,
+            'final_coverage': model.coverage_summary(),
+            'plan': plan,
+            'remaining_gaps': len(model.uncovered_periods()),
+            'search_stats': {
+                'candidate_pairs': len(candidates),
+                'gain_evaluations': evaluations,
+                'full_rescan_evaluations': len(candidates) * (len(plan) + 1)
+            }
+        }
+
+    def recommend_all(self, qualification_matrices, teams=(1, 2)):
+        """Plans for every team present in the matrices"""
+        print("\n🎯 COVERAGE GAIN TRAINING RECOMMENDER")
+        print("=" * 60)
+        print("   Ranking: covered ride-days gained (lazy greedy)")
+
+        results = {
+            'timestamp': datetime.now().isoformat(),
+            'ride_days_per_period': IncrementalCoverageModel.RIDE_DAYS_PER_PERIOD,
+            'teams': {}
+        }
+        for team in teams:
+            if team not in qualification_matrices:
+                continue
+            plan = self.recommend(qualification_matrices[team], team)
+            results['teams'][team] = plan
+            stats = plan['search_stats']
+            print(f"\n🏢 Team {team}: {len(plan['plan'])} trainings, "
+                  f"{plan['initial_coverage']['ride_days_covered']} → {plan['final_coverage']['ride_days_covered']} "
+                  f"of {plan['final_coverage']['ride_days_total']} ride-days covered")
+            print(f"   🔍 {stats['gain_evaluations']} gain evaluations "
+                  f"(full rescans would need {stats['full_rescan_evaluations']})")
+        return results
+
+    def display_results(self, results, top=15):
+        """Print the head of each team's ranked plan"""
+        for team, plan in results['teams'].items():
+            print(f"\n📋 TEAM {team} TRAINING PLAN (top {min(top, len(plan['plan']))}):")
+            for item in plan['plan'][:top]:
+                covered = ', '.join(f"{count} {family}" for family, count in item['ride_periods_covered'].items())
+                print(f"   {item['step']:>3}. {item['engineer_name']:<22} {item['qualification']:<18} "
+                      f"+{item['ride_days_gained']:>4} ride-days ({covered or 'progress only'}) "
+                      f"→ {item['ride_day_coverage_after']:.1f}%")
+
+    def save_results(self, results, output_manager=None):
+        """Save the ranked plans as JSON to the current output directory"""
+        output_manager = output_manager or StandardOutputManager()
+        output_path, = output_manager.save_side_files({"training_coverage_gain_plan.json": results})
+        print(f"\n💾 Training plan saved to: {output_path}")
+        return output_path
@@ -7,13 +7,16 @@ by accounting for:
 - Multiple engineers needed for high-duration daily PPMs
 - Shift pattern coverage requirements  
 - Adequate redundancy for critical maintenance
+
+Engineers, rotas and shift statistics come from a shared ProblemContext; gaps
+reported by the validator are closed with the fewest qualification grants
+(set-cover gap repair).
 """
 
-import json
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
 from itertools import combinations
 import random
 import math
@@ -22,52 +25,48 @@ from datetime import datetime
 # Import the coverage validation framework
 try:
     from .coverage_validator import CoverageValidator
+    from .gap_repair import GapRepairEngine
+    from .problem_context import ProblemContext
 except ImportError:
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
     from coverage_validator import CoverageValidator
+    from gap_repair import GapRepairEngine
+    from problem_context import ProblemContext
 
 
 class CoverageOptimizedDesigner:
     """Create qualification matrices that meet operational coverage requirements"""
     
-    def __init__(self, optimizer_results):
-        """Initialize with PPM and ride data"""
+    def __init__(self, optimizer_results, context=None, seed=42):
+        """Initialize with PPM and ride data
+        
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            context: Optional shared ProblemContext (built here when not given)
+            seed: Random seed for shuffles and tie-breaks
+        """
         self.optimizer = optimizer_results
+        self.context = context if context is not None else ProblemContext(optimizer_results)
         self.engineers = self._load_engineer_data()
-        self.coverage_validator = CoverageValidator(optimizer_results)
+        self.coverage_validator = CoverageValidator(optimizer_results, context=self.context)
+        self.gap_repair = GapRepairEngine(self.context)
         
         # Enhanced analysis for better coverage
         self.ppm_requirements = self._analyze_ppm_requirements()
         self.shift_analysis = self._analyze_shift_patterns()
         
         # Set random seed for deterministic results
-        random.seed(42)
-        np.random.seed(42)
+        self.seed = seed
+        random.seed(seed)
+        np.random.seed(seed)
         
     def _load_engineer_data(self):
-        """Load real engineer data from JSON files"""
-        engineers = {1: {'electrical': [], 'mechanical': []}, 2: {'electrical': [], 'mechanical': []}}
-        
-        # Load Team 1 engineers
-        with open('data/processed/engineers/team1_elec_engineers.json', 'r') as f:
-            team1_elec = json.load(f)
-            engineers[1]['electrical'] = team1_elec['engineers']
-            
-        with open('data/processed/engineers/team1_mech_engineers.json', 'r') as f:
-            team1_mech = json.load(f)
-            engineers[1]['mechanical'] = team1_mech['engineers']
-            
-        # Load Team 2 engineers  
-        with open('data/processed/engineers/team2_elec_engineers.json', 'r') as f:
-            team2_elec = json.load(f)
-            engineers[2]['electrical'] = [eng for eng in team2_elec['engineers'] if eng.get('active', True)]
-            
-        with open('data/processed/engineers/team2_mech_engineers.json', 'r') as f:
-            team2_mech = json.load(f)
-            engineers[2]['mechanical'] = [eng for eng in team2_mech['engineers'] if not eng.get('vacancy', False)]
-            
+        """Engineer data from the problem context (Team 2 without inactive staff and vacancies)"""
+        engineers = self.context.engineer_data()
+        engineers[2]['electrical'] = [eng for eng in engineers[2]['electrical'] if eng.get('active', True)]
+        engineers[2]['mechanical'] = [eng for eng in engineers[2]['mechanical'] if not eng.get('vacancy', False)]
         return engineers
     
     def _analyze_ppm_requirements(self):
@@ -79,8 +78,7 @@ class CoverageOptimizedDesigner:
         
         for team in [1, 2]:
             requirements[team] = {}
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            team_rides = self.context.team_rides[team]
             
             print(f"\n🏢 TEAM {team} PPM ANALYSIS:")
             
@@ -137,35 +135,22 @@ class CoverageOptimizedDesigner:
         for team in [1, 2]:
             shift_analysis[team] = {'electrical': {}, 'mechanical': {}}
             
-            # Load rota data
             for role in ['electrical', 'mechanical']:
-                rota_file = f'data/processed/parsed_rotas/parsed_team{team}_{"elec" if role == "electrical" else "mech"}_rota.json'
-                try:
-                    with open(rota_file, 'r') as f:
-                        rota_data = json.load(f)
-                    
-                    # Analyze early shift availability (critical for daily PPMs)
-                    engineer_early_days = {}
-                    
-                    for week_key, week_data in rota_data.items():
-                        for engineer_id, shifts in week_data.items():
-                            if engineer_id not in engineer_early_days:
-                                engineer_early_days[engineer_id] = 0
-                            
-                            # Count early shifts Monday-Friday
-                            for day_idx in range(5):
-                                if day_idx < len(shifts) and shifts[day_idx] == 'E':
-                                    engineer_early_days[engineer_id] += 1
-                    
-                    shift_analysis[team][role] = engineer_early_days
-                    
-                    # Show top engineers for early shift coverage
-                    sorted_engineers = sorted(engineer_early_days.items(), key=lambda x: x[1], reverse=True)
-                    print(f"   Team {team} {role}: Top early shift engineers: {sorted_engineers[:3]}")
-                    
-                except FileNotFoundError:
+                statistics = self.context.shift_statistics[team][role]
+                if statistics is None:
                     print(f"   ⚠️  Rota file not found for Team {team} {role}")
                     shift_analysis[team][role] = {}
+                    continue
+                
+                # Early shift availability Monday-Friday (critical for daily PPMs)
+                engineer_early_days = {
+                    engineer_id: stats['weekday_early_days'] for engineer_id, stats in statistics.items()
+                }
+                shift_analysis[team][role] = engineer_early_days
+                
+                # Show top engineers for early shift coverage
+                sorted_engineers = sorted(engineer_early_days.items(), key=lambda x: x[1], reverse=True)
+                print(f"   Team {team} {role}: Top early shift engineers: {sorted_engineers[:3]}")
         
         return shift_analysis
     
@@ -411,7 +396,7 @@ class CoverageOptimizedDesigner:
                                 engineer_qualifications.append(ppm['qualification_code'])
             
             # Remove duplicates and assign
-            engineer_qualifications = list(set(engineer_qualifications))
+            engineer_qualifications = sorted(set(engineer_qualifications))
             assignment['qualifications'] = engineer_qualifications
             assigned_qualifications[engineer_role].update(engineer_qualifications)
             
@@ -452,7 +437,7 @@ class CoverageOptimizedDesigner:
                                                  -engineer_assignments[e]['early_shift_days']))
                 
                 # Distribute missing qualifications to engineers with fewest qualifications
-                for qual in missing_quals:
+                for qual in sorted(missing_quals):
                     # Find engineer with fewest qualifications but good early shift availability
                     best_engineer = min(role_engineers, 
                                       key=lambda e: len(engineer_assignments[e]['qualifications']))
@@ -489,12 +474,12 @@ class CoverageOptimizedDesigner:
         # Fix daily gaps by adding more engineers to critical qualifications
         if daily_gaps:
             print(f"      🔧 Fixing {len(daily_gaps)} daily coverage gaps...")
-            improvements_made += self._fix_daily_gaps(engineer_assignments, daily_gaps, team)
+            improvements_made += self._fix_daily_gaps(engineer_assignments, team)
         
         # Fix weekly gaps by ensuring qualifications are assigned
         if weekly_gaps:
             print(f"      🔧 Fixing {len(weekly_gaps)} weekly coverage gaps...")
-            improvements_made += self._fix_weekly_gaps(engineer_assignments, weekly_gaps, team)
+            improvements_made += self._fix_weekly_gaps(engineer_assignments, team)
         
         # Re-validate to show improvement
         if improvements_made > 0:
@@ -511,87 +496,34 @@ class CoverageOptimizedDesigner:
         
         return engineer_assignments
     
-    def _fix_daily_gaps(self, engineer_assignments, daily_gaps, team):
-        """Fix daily coverage gaps by adding more engineers to critical qualifications"""
-        improvements = 0
-        
-        # Group gaps by ride and maintenance type
-        gap_summary = defaultdict(list)
-        for gap in daily_gaps:
-            key = f"{gap['ride_id']}_{gap['maintenance_type']}"
-            gap_summary[key].append(gap)
-        
-        # Fix each gap group
-        for gap_key, gaps in gap_summary.items():
-            ride_id, maintenance_type = gap_key.split('_')
-            role = maintenance_type.lower()
-            
-            # Find engineers of the right role with early shifts who aren't assigned to this ride
-            available_engineers = []
-            for eng_id, assignment in engineer_assignments.items():
-                if (assignment['role'] == role and 
-                    assignment['early_shift_days'] > 0 and
-                    ride_id not in assignment['assigned_rides']):
-                    available_engineers.append(eng_id)
-            
-            # Sort by early shift availability
-            available_engineers.sort(key=lambda e: engineer_assignments[e]['early_shift_days'], reverse=True)
-            
-            # Add the best available engineer to this ride
-            if available_engineers:
-                best_engineer = available_engineers[0]
-                engineer_assignments[best_engineer]['assigned_rides'].append(ride_id)
+    def _fix_daily_gaps(self, engineer_assignments, team):
+        """Fix daily coverage gaps with the fewest qualification grants to Early-shift engineers"""
+        grants = self.gap_repair.repair(engineer_assignments, team, ppm_types=('daily',))
+        
+        for grant in grants:
+            assignment = engineer_assignments[grant['engineer']]
+            for ride_id in grant['rides']:
+                if ride_id in assignment['assigned_rides']:
+                    continue
+                assignment['assigned_rides'].append(ride_id)
                 
                 # Add Type B or C classification
                 ride_type = self.optimizer.rides_info[ride_id]['type']
                 if ride_type == 'B':
-                    engineer_assignments[best_engineer]['type_b_rides'].append(ride_id)
+                    assignment['type_b_rides'].append(ride_id)
                 else:
-                    engineer_assignments[best_engineer]['type_c_rides'].append(ride_id)
-                
-                # Add relevant qualifications for this ride
-                for gap in gaps:
-                    for ppm_code in gap['ppm_codes']:
-                        # Find the qualification for this PPM code
-                        for ppm_type in ['daily', 'weekly', 'monthly']:
-                            if ride_id in self.optimizer.ppms_by_type[ppm_type]:
-                                ppm_data = self.optimizer.ppms_by_type[ppm_type][ride_id]
-                                for ppm in ppm_data['ppms']:
-                                    if (ppm['ppm_code'] == ppm_code and 
-                                        ppm['maintenance_type'] == maintenance_type.upper()):
-                                        if ppm['qualification_code'] not in engineer_assignments[best_engineer]['qualifications']:
-                                            engineer_assignments[best_engineer]['qualifications'].append(ppm['qualification_code'])
-                
-                improvements += 1
-                print(f"         Added {best_engineer} to {ride_id} {maintenance_type}")
+                    assignment['type_c_rides'].append(ride_id)
+                print(f"         Added {grant['engineer']} to {ride_id} {grant['role'].upper()}")
+            print(f"         Added {grant['qualification']} to {grant['engineer']}")
         
-        return improvements
+        return len(grants)
     
-    def _fix_weekly_gaps(self, engineer_assignments, weekly_gaps, team):
-        """Fix weekly coverage gaps by ensuring qualifications are assigned"""
-        improvements = 0
-        
-        for gap in weekly_gaps:
-            qual_code = gap['qualification_code']
-            maintenance_type = gap['maintenance_type']
-            role = maintenance_type.lower()
-            
-            # Find an engineer of the right role to assign this qualification
-            role_engineers = [eng_id for eng_id, assignment in engineer_assignments.items() 
-                            if assignment['role'] == role]
-            
-            if role_engineers:
-                # Sort by early shift availability and current qualification count
-                best_engineer = min(role_engineers, 
-                                  key=lambda e: (len(engineer_assignments[e]['qualifications']), 
-                                               -engineer_assignments[e]['early_shift_days']))
-                
-                if qual_code not in engineer_assignments[best_engineer]['qualifications']:
-                    engineer_assignments[best_engineer]['qualifications'].append(qual_code)
-                    improvements += 1
-                    print(f"         Added {qual_code} to {best_engineer}")
-        
-        return improvements
+    def _fix_weekly_gaps(self, engineer_assignments, team):
+        """Fix weekly coverage gaps with the fewest qualification grants"""
+        grants = self.gap_repair.repair(engineer_assignments, team, ppm_types=('weekly',))
+        for grant in grants:
+            print(f"         Added {grant['qualification']} to {grant['engineer']}")
+        return len(grants)
     
     def _display_assignment_summary(self, engineer_assignments, team):
         """Display detailed assignment summary"""
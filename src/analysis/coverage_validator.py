@@ -41,15 +41,18 @@ class CoverageValidator:
         
         return extended_rota
     
-    def __init__(self, optimizer_results=None):
+    def __init__(self, optimizer_results=None, context=None):
         """
         Initialize coverage validator
         
         Args:
             optimizer_results: Optional object containing PPM data and ride information
                              If None, will load data directly from files
+            context: Optional shared ProblemContext; supplies the PPM catalog and
+                     rotas so nothing is reloaded from files
         """
-        self.optimizer = optimizer_results
+        self.optimizer = optimizer_results if optimizer_results is not None else context
+        self.context = context
         if self.optimizer is None:
             self._load_data_directly()
     
@@ -121,10 +124,16 @@ class CoverageValidator:
             mech_rota_file = f'data/processed/parsed_rotas/parsed_team{team}_mech_rota.json'
             
             try:
-                with open(elec_rota_file, 'r') as f:
-                    elec_rota = json.load(f)
-                with open(mech_rota_file, 'r') as f:
-                    mech_rota = json.load(f)
+                if self.context is not None:
+                    elec_rota = self.context.rota(team, 'electrical')
+                    mech_rota = self.context.rota(team, 'mechanical')
+                    if elec_rota is None or mech_rota is None:
+                        raise FileNotFoundError(f"{elec_rota_file} / {mech_rota_file}")
+                else:
+                    with open(elec_rota_file, 'r') as f:
+                        elec_rota = json.load(f)
+                    with open(mech_rota_file, 'r') as f:
+                        mech_rota = json.load(f)
                 
                 # Extend rotas to 36-week cycle to match MILP optimizer
                 elec_rota = self._extend_rota_to_weeks(elec_rota, 36)
@@ -15,28 +15,37 @@ IMPROVEMENTS:
 - LOAD BALANCING: No engineer overloaded while others underutilized
 """
 
-import json
 import random
 from pathlib import Path
-from collections import defaultdict
 from src.analysis.coverage_validator import CoverageValidator
+from src.analysis.gap_repair import GapRepairEngine
+from src.analysis.problem_context import ProblemContext
 
 
 class EnhancedCoverageDesigner:
     """Next-generation coverage optimizer for maximum coverage and balance"""
     
-    def __init__(self, optimizer):
+    def __init__(self, optimizer, context=None, seed=42):
+        """
+        Args:
+            optimizer: PPMCapacityOptimizer with rides and PPM data
+            context: Optional shared ProblemContext (built here when not given)
+            seed: Random seed for shuffles and tie-breaks
+        """
         self.optimizer = optimizer
+        self.context = context if context is not None else ProblemContext(optimizer)
         self.engineers = {}
         self.shift_analysis = {}
         self.ppm_requirements = {}
-        self.coverage_validator = CoverageValidator()
+        self.coverage_validator = CoverageValidator(optimizer, context=self.context)
+        self.gap_repair = GapRepairEngine(self.context)
         
         print("🚀 ENHANCED COVERAGE DESIGNER - MAXIMUM COVERAGE + BALANCE")
         print("=" * 70)
         
         # Set deterministic seed
-        random.seed(42)
+        self.seed = seed
+        random.seed(seed)
         
         # Load and analyze data
         self._load_engineer_data()
@@ -47,26 +56,12 @@ class EnhancedCoverageDesigner:
         """Load engineer data for both teams"""
         print("\n📊 LOADING ENHANCED ENGINEER DATA...")
         
+        engineers = self.context.engineer_data()
         for team in [1, 2]:
-            engineer_files = {
-                'electrical': f'data/processed/engineers/team{team}_elec_engineers.json',
-                'mechanical': f'data/processed/engineers/team{team}_mech_engineers.json'
-            }
-            
-            self.engineers[team] = {'electrical': [], 'mechanical': []}
-            
-            for role, file_path in engineer_files.items():
-                try:
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                    engineers = data['engineers']  # Extract the engineers list
-                    self.engineers[team][role] = engineers
-                    active_count = len([e for e in engineers if e.get('active', True) and not e.get('vacancy', False)])
-                    print(f"   Team {team} {role}: {active_count} active engineers")
-                except FileNotFoundError:
-                    print(f"   ⚠️  Engineer file not found: {file_path}")
-                except KeyError:
-                    print(f"   ⚠️  Invalid engineer file structure: {file_path}")
+            self.engineers[team] = engineers[team]
+            for role, role_engineers in engineers[team].items():
+                active_count = len([e for e in role_engineers if e.get('active', True) and not e.get('vacancy', False)])
+                print(f"   Team {team} {role}: {active_count} active engineers")
     
     def _analyze_ppm_requirements(self):
         """Analyze PPM requirements with enhanced coverage calculation"""
@@ -75,8 +70,7 @@ class EnhancedCoverageDesigner:
         
         for team in [1, 2]:
             self.ppm_requirements[team] = {}
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            team_rides = self.context.team_rides[team]
             
             daily_critical_count = 0
             total_daily_hours = 0
@@ -121,53 +115,36 @@ class EnhancedCoverageDesigner:
             self.shift_analysis[team] = {'electrical': {}, 'mechanical': {}}
             
             for role in ['electrical', 'mechanical']:
-                rota_file = f'data/processed/parsed_rotas/parsed_team{team}_{"elec" if role == "electrical" else "mech"}_rota.json'
-                try:
-                    with open(rota_file, 'r') as f:
-                        rota_data = json.load(f)
-                    
-                    engineer_shift_analysis = {}
-                    
-                    for week_key, week_data in rota_data.items():
-                        for engineer_id, shifts in week_data.items():
-                            if engineer_id not in engineer_shift_analysis:
-                                engineer_shift_analysis[engineer_id] = {
-                                    'early_days': 0,
-                                    'late_days': 0,
-                                    'off_days': 0,
-                                    'total_days': 0,
-                                    'early_ratio': 0.0
-                                }
-                            
-                            # Analyze all shifts for comprehensive coverage
-                            for day_idx in range(7):  # All days, not just Mon-Fri
-                                if day_idx < len(shifts):
-                                    engineer_shift_analysis[engineer_id]['total_days'] += 1
-                                    if shifts[day_idx] == 'E':
-                                        engineer_shift_analysis[engineer_id]['early_days'] += 1
-                                    elif shifts[day_idx] == 'L':
-                                        engineer_shift_analysis[engineer_id]['late_days'] += 1
-                                    else:
-                                        engineer_shift_analysis[engineer_id]['off_days'] += 1
-                    
-                    # Calculate early shift ratios for prioritization
-                    for engineer_id, analysis in engineer_shift_analysis.items():
-                        if analysis['total_days'] > 0:
-                            analysis['early_ratio'] = analysis['early_days'] / analysis['total_days']
-                    
-                    self.shift_analysis[team][role] = engineer_shift_analysis
-                    
-                    # Show enhanced analysis
-                    top_early = sorted(engineer_shift_analysis.items(), 
-                                     key=lambda x: x[1]['early_ratio'], reverse=True)[:3]
-                    print(f"   Team {team} {role}: Top early shift engineers:")
-                    for eng_id, analysis in top_early:
-                        ratio = analysis['early_ratio'] * 100
-                        print(f"      {eng_id}: {ratio:.1f}% early shifts ({analysis['early_days']} days)")
-                        
-                except FileNotFoundError:
+                statistics = self.context.shift_statistics[team][role]
+                if statistics is None:
                     print(f"   ⚠️  Rota file not found for Team {team} {role}")
                     self.shift_analysis[team][role] = {}
+                    continue
+                
+                # All days, not just Mon-Fri, for comprehensive coverage
+                engineer_shift_analysis = {}
+                for engineer_id, stats in statistics.items():
+                    analysis = {
+                        'early_days': stats['early_days'],
+                        'late_days': stats['late_days'],
+                        'off_days': stats['off_days'],
+                        'total_days': stats['total_days'],
+                        'early_ratio': 0.0
+                    }
+                    # Early shift ratio for prioritization
+                    if analysis['total_days'] > 0:
+                        analysis['early_ratio'] = analysis['early_days'] / analysis['total_days']
+                    engineer_shift_analysis[engineer_id] = analysis
+                
+                self.shift_analysis[team][role] = engineer_shift_analysis
+                
+                # Show enhanced analysis
+                top_early = sorted(engineer_shift_analysis.items(), 
+                                 key=lambda x: x[1]['early_ratio'], reverse=True)[:3]
+                print(f"   Team {team} {role}: Top early shift engineers:")
+                for eng_id, analysis in top_early:
+                    ratio = analysis['early_ratio'] * 100
+                    print(f"      {eng_id}: {ratio:.1f}% early shifts ({analysis['early_days']} days)")
     
     def create_optimized_qualification_matrices(self):
         """Create MAXIMUM COVERAGE + BALANCED qualification matrices"""
@@ -393,7 +370,7 @@ class EnhancedCoverageDesigner:
                                 engineer_qualifications.append(ppm['qualification_code'])
             
             # Remove duplicates and assign
-            engineer_qualifications = list(set(engineer_qualifications))
+            engineer_qualifications = sorted(set(engineer_qualifications))
             assignment['qualifications'] = engineer_qualifications
             assigned_qualifications[engineer_role].update(engineer_qualifications)
             
@@ -431,7 +408,7 @@ class EnhancedCoverageDesigner:
                                 if assignment['role'] == role]
                 
                 # Distribute missing qualifications to engineers with best early ratios but fewest quals
-                for qual in missing_quals:
+                for qual in sorted(missing_quals):
                     best_engineer = min(role_engineers, 
                                       key=lambda e: (len(engineer_assignments[e]['qualifications']), 
                                                    -engineer_assignments[e]['early_ratio']))
@@ -473,10 +450,10 @@ class EnhancedCoverageDesigner:
             weekly_gaps = team_results['weekly']['coverage_gaps']
             
             if daily_gaps:
-                improvements += self._aggressive_daily_gap_fixing(engineer_assignments, daily_gaps, team)
+                improvements += self._aggressive_daily_gap_fixing(engineer_assignments, team)
             
             if weekly_gaps:
-                improvements += self._aggressive_weekly_gap_fixing(engineer_assignments, weekly_gaps, team)
+                improvements += self._aggressive_weekly_gap_fixing(engineer_assignments, team)
             
             print(f"         Applied {improvements} improvements")
             
@@ -486,79 +463,20 @@ class EnhancedCoverageDesigner:
         
         return engineer_assignments
     
-    def _aggressive_daily_gap_fixing(self, engineer_assignments, daily_gaps, team):
-        """Aggressively fix daily coverage gaps"""
-        improvements = 0
-        
-        # Group gaps by qualification to fix systematically
-        gaps_by_qual = defaultdict(list)
-        for gap in daily_gaps:
-            for qual in gap.get('qualification_codes', []):
-                gaps_by_qual[qual].append(gap)
-        
-        for qual_code, gaps in gaps_by_qual.items():
-            # Find the maintenance type for this qualification
-            maintenance_type = None
-            for gap in gaps:
-                if 'maintenance_type' in gap:
-                    maintenance_type = gap['maintenance_type']
-                    break
-            
-            if not maintenance_type:
-                continue
-                
-            role = maintenance_type.lower()
-            
-            # Find engineers of the right role who don't have this qualification
-            available_engineers = []
-            for eng_id, assignment in engineer_assignments.items():
-                if (assignment['role'] == role and 
-                    qual_code not in assignment['qualifications'] and
-                    assignment['early_ratio'] > 0.1):  # Must have some early shifts
-                    available_engineers.append(eng_id)
-            
-            # Add this qualification to multiple engineers for redundancy
-            num_to_add = min(3, len(available_engineers))  # Add to 3 engineers max
-            
-            # Sort by early shift ratio and add qualification
-            available_engineers.sort(key=lambda e: engineer_assignments[e]['early_ratio'], reverse=True)
-            
-            for i in range(num_to_add):
-                if i < len(available_engineers):
-                    eng_id = available_engineers[i]
-                    engineer_assignments[eng_id]['qualifications'].append(qual_code)
-                    improvements += 1
-                    print(f"           Added {qual_code} to {eng_id} (early ratio: {engineer_assignments[eng_id]['early_ratio']*100:.1f}%)")
-        
-        return improvements
+    def _aggressive_daily_gap_fixing(self, engineer_assignments, team):
+        """Fix daily coverage gaps with the fewest grants to Early-shift engineers"""
+        grants = self.gap_repair.repair(engineer_assignments, team, ppm_types=('daily',))
+        for grant in grants:
+            eng_id = grant['engineer']
+            print(f"           Added {grant['qualification']} to {eng_id} (early ratio: {engineer_assignments[eng_id]['early_ratio']*100:.1f}%)")
+        return len(grants)
     
-    def _aggressive_weekly_gap_fixing(self, engineer_assignments, weekly_gaps, team):
-        """Aggressively fix weekly coverage gaps"""
-        improvements = 0
-        
-        for gap in weekly_gaps:
-            qual_code = gap['qualification_code']
-            maintenance_type = gap['maintenance_type']
-            role = maintenance_type.lower()
-            
-            # Find multiple engineers to add this qualification to (for redundancy)
-            role_engineers = [eng_id for eng_id, assignment in engineer_assignments.items() 
-                            if assignment['role'] == role and qual_code not in assignment['qualifications']]
-            
-            if role_engineers:
-                # Sort by early shift ratio and qualification count
-                role_engineers.sort(key=lambda e: (len(engineer_assignments[e]['qualifications']), 
-                                                 -engineer_assignments[e]['early_ratio']))
-                
-                # Add to best 2 engineers for redundancy
-                num_to_add = min(2, len(role_engineers))
-                for i in range(num_to_add):
-                    eng_id = role_engineers[i]
-                    engineer_assignments[eng_id]['qualifications'].append(qual_code)
-                    improvements += 1
-                    print(f"           Added {qual_code} to {eng_id}")
-        
-        return improvements
+    def _aggressive_weekly_gap_fixing(self, engineer_assignments, team):
+        """Fix weekly coverage gaps with the fewest grants to on-shift engineers"""
+        grants = self.gap_repair.repair(engineer_assignments, team, ppm_types=('weekly',))
+        for grant in grants:
+            print(f"           Added {grant['qualification']} to {grant['engineer']}")
+        return len(grants)
     
     def _final_load_balancing(self, engineer_assignments, team):
         """Final load balancing to ensure fair distribution"""
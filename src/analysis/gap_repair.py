@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+
+"""
+Set-Cover Gap Repair
+====================
+
+Closes validator coverage gaps with the fewest qualification grants instead of
+handing the missing qualification to every engineer of the role.
+
+Key Features:
+- Elements are the failing validator cells: (week, day, ride, role) for daily
+  PPMs, (week, qualification, role) for weekly and (month, qualification, role)
+  for monthly PPMs, each with the number of extra qualified engineers it needs
+- Sets are candidate (engineer, qualification) grants: an engineer on shift for
+  a cell who would count towards it once holding the qualification
+- Weighted set multicover: one unit per grant, with a small tie-break towards
+  engineers holding fewer qualifications
+- Lazy-greedy priority queue (stale gains are only re-evaluated when they reach
+  the top of the heap, valid because coverage gains only shrink)
+- Optional exact ILP (PuLP/CBC) when the instance is small; falls back to the
+  greedy cover if the solver is missing or does not return a solution
+- Cells that no on-shift engineer can ever cover are reported, not retried
+"""
+
+import heapq
+import math
+import time
+from collections import defaultdict
+
+import numpy as np
+
+try:
+    import pulp
+    PULP_AVAILABLE = True
+except ImportError:
+    PULP_AVAILABLE = False
+
+WEEKDAY_LABELS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+
+class GapRepairEngine:
+    """Minimum-grant repair of daily / weekly / monthly coverage gaps"""
+
+    # Largest number of candidate grants handed to the exact ILP
+    EXACT_MAX_GRANTS = 300
+    EXACT_TIME_LIMIT = 30
+    # Weight added per qualification already held, so ties favour lighter engineers
+    LOAD_TIE_BREAK = 1e-3
+    # Daily PPMs must fit the 3-hour AM window (same rule as the validator)
+    DAILY_WINDOW_HOURS = 3.0
+    WEEKS_PER_MONTH = 4
+
+    def __init__(self, context, use_exact=True):
+        """
+        Args:
+            context: Shared ProblemContext (rotas, PPM catalog, availability tensor)
+            use_exact: Solve small instances exactly with an ILP when PuLP is installed
+        """
+        self.context = context
+        self.use_exact = use_exact
+        self.last_repair = None
+
+    def failing_cells(self, engineer_assignments, team, ppm_types=('daily', 'weekly')):
+        """Failing validator cells for the current assignments
+
+        Returns a list of {'key', 'role', 'demand', 'candidates', 'rides'} where
+        candidates maps engineer -> qualifications that would make them count.
+        """
+        shifts = self._team_shifts(engineer_assignments, team)
+        if not shifts:
+            return []
+        weeks = min(entry['shifts'].shape[1] for entry in shifts.values())
+
+        cells = []
+        if 'daily' in ppm_types:
+            cells.extend(self._daily_cells(engineer_assignments, team, shifts, weeks))
+        if 'weekly' in ppm_types:
+            cells.extend(self._weekly_cells(engineer_assignments, team, shifts, weeks))
+        if 'monthly' in ppm_types:
+            cells.extend(self._monthly_cells(engineer_assignments, team, shifts, weeks))
+        return cells
+
+    def _team_shifts(self, engineer_assignments, team):
+        """Weekday shift codes [engineer, week, Mon-Fri] of assigned engineers, per role"""
+        shifts = {}
+        for role, availability in self.context.availability[team].items():
+            if availability is None:
+                continue
+            rows = [i for i, eng in enumerate(availability['engineers'])
+                    if eng in engineer_assignments and engineer_assignments[eng]['role'] == role]
+            shifts[role] = {
+                'engineers': [availability['engineers'][i] for i in rows],
+                'shifts': availability['shifts'][rows][:, :, :5]
+            }
+        return shifts
+
+    def _daily_cells(self, engineer_assignments, team, shifts, weeks):
+        """Each (week, weekday, ride, role) needs ceil(hours / 3) qualified Early-shift engineers"""
+        groups = []
+        for ride_id in self.context.team_rides[team]:
+            ride_ppms = self.context.ppms_by_type['daily'].get(ride_id)
+            if not ride_ppms:
+                continue
+            for role in shifts:
+                ppms = [ppm for ppm in ride_ppms['ppms'] if ppm['maintenance_type'].lower() == role]
+                if ppms:
+                    hours = sum(ppm['duration_hours'] for ppm in ppms)
+                    quals = frozenset(ppm['qualification_code'] for ppm in ppms)
+                    groups.append((ride_id, role, math.ceil(hours / self.DAILY_WINDOW_HOURS), quals))
+
+        cells = []
+        for week in range(weeks):
+            for day in range(5):
+                early = {
+                    role: [eng for eng, on_early in zip(entry['engineers'], entry['shifts'][:, week, day] == 'E') if on_early]
+                    for role, entry in shifts.items()
+                }
+                for ride_id, role, needed, quals in groups:
+                    qualified, candidates = 0, {}
+                    for eng in early[role]:
+                        missing = quals.difference(engineer_assignments[eng]['qualifications'])
+                        if len(missing) < len(quals):
+                            qualified += 1
+                        else:
+                            candidates[eng] = tuple(sorted(missing))
+                    if qualified < needed:
+                        cells.append({
+                            'key': ('daily', week + 1, WEEKDAY_LABELS[day], ride_id, role),
+                            'role': role,
+                            'demand': needed - qualified,
+                            'candidates': candidates,
+                            'rides': (ride_id,)
+                        })
+        return cells
+
+    def _weekly_cells(self, engineer_assignments, team, shifts, weeks):
+        """Each (week, qualification, role) needs one holder on an Early or Late weekday shift"""
+        cells = []
+        for week in range(weeks):
+            cells.extend(self._period_cells(engineer_assignments, team, shifts, 'weekly', week + 1, week, week + 1))
+        return cells
+
+    def _monthly_cells(self, engineer_assignments, team, shifts, weeks):
+        """Each (month, qualification, role) needs one holder on shift during its 4-week block"""
+        cells = []
+        for month in range(math.ceil(weeks / self.WEEKS_PER_MONTH)):
+            start = month * self.WEEKS_PER_MONTH
+            end = min(start + self.WEEKS_PER_MONTH, weeks)
+            cells.extend(self._period_cells(engineer_assignments, team, shifts, 'monthly', month + 1, start, end))
+        return cells
+
+    def _period_cells(self, engineer_assignments, team, shifts, ppm_type, period, start, end):
+        """Single-holder cells for weekly / monthly PPMs over weeks [start, end)"""
+        on_shift = {}
+        for role, entry in shifts.items():
+            working = np.isin(entry['shifts'][:, start:end], ('E', 'L')).any(axis=(1, 2))
+            on_shift[role] = [eng for eng, present in zip(entry['engineers'], working) if present]
+
+        rides_by_qual = defaultdict(set)
+        for ride_id in self.context.team_rides[team]:
+            ride_ppms = self.context.ppms_by_type[ppm_type].get(ride_id)
+            for ppm in (ride_ppms['ppms'] if ride_ppms else []):
+                role = ppm['maintenance_type'].lower()
+                if role in shifts:
+                    rides_by_qual[(ppm['qualification_code'], role)].add(ride_id)
+
+        cells = []
+        for (qual, role), rides in sorted(rides_by_qual.items()):
+            holders = [eng for eng in on_shift[role] if qual in engineer_assignments[eng]['qualifications']]
+            if holders:
+                continue
+            cells.append({
+                'key': (ppm_type, period, qual, role),
+                'role': role,
+                'demand': 1,
+                'candidates': {eng: (qual,) for eng in on_shift[role]},
+                'rides': tuple(sorted(rides))
+            })
+        return cells
+
+    def repair(self, engineer_assignments, team, ppm_types=('daily', 'weekly'), apply=True):
+        """Cover every coverable failing cell with a minimum-weight set of grants
+
+        Args:
+            engineer_assignments: {engineer_code: assignment} for one team (modified when apply)
+            team: Team number
+            ppm_types: Which validator tests to repair
+            apply: Append the chosen qualifications to the assignments
+
+        Returns:
+            List of {'engineer', 'qualification', 'role', 'cells', 'rides'} grants
+        """
+        start = time.time()
+        cells = self.failing_cells(engineer_assignments, team, ppm_types)
+        uncoverable = [cell for cell in cells if not cell['candidates']]
+        cells = [cell for cell in cells if cell['candidates']]
+
+        grant_cells = defaultdict(list)
+        for index, cell in enumerate(cells):
+            for eng, quals in cell['candidates'].items():
+                for qual in quals:
+                    grant_cells[(eng, qual)].append(index)
+        weights = {
+            grant: 1.0 + self.LOAD_TIE_BREAK * len(engineer_assignments[grant[0]]['qualifications'])
+            for grant in grant_cells
+        }
+
+        method, chosen, evaluations = 'none', [], 0
+        if cells:
+            if self.use_exact and PULP_AVAILABLE and len(grant_cells) <= self.EXACT_MAX_GRANTS:
+                chosen = self._exact_cover(cells, grant_cells, weights)
+                method = 'exact_ilp'
+            if not chosen:
+                chosen, evaluations = self._lazy_greedy_cover(cells, grant_cells, weights)
+                method = 'lazy_greedy'
+
+        grants = self._describe_grants(chosen, cells, grant_cells, engineer_assignments)
+        if apply:
+            for grant in grants:
+                engineer_assignments[grant['engineer']]['qualifications'].append(grant['qualification'])
+
+        self.last_repair = {
+            'team': team,
+            'ppm_types': list(ppm_types),
+            'failing_cells': len(cells) + len(uncoverable),
+            'uncoverable_cells': [cell['key'] for cell in uncoverable],
+            'demand': sum(min(cell['demand'], len(cell['candidates'])) for cell in cells),
+            'candidate_grants': len(grant_cells),
+            'grants': len(grants),
+            'method': method,
+            'gain_evaluations': evaluations,
+            'wall_time': round(time.time() - start, 4)
+        }
+        print(f"         🧩 Gap repair ({', '.join(ppm_types)}): {len(cells) + len(uncoverable)} failing cells, "
+              f"{len(grant_cells)} candidate grants -> {len(grants)} grants ({method})")
+        if uncoverable:
+            print(f"         ⚠️  {len(uncoverable)} cells have too few engineers on shift to ever be covered")
+        return grants
+
+    def _lazy_greedy_cover(self, cells, grant_cells, weights):
+        """Greedy multicover by gain per weight, re-evaluating stale heap entries lazily"""
+        residual = [min(cell['demand'], len(cell['candidates'])) for cell in cells]
+        counted = [set() for _ in cells]
+
+        def gain(grant):
+            eng = grant[0]
+            return sum(1 for index in grant_cells[grant] if residual[index] > 0 and eng not in counted[index])
+
+        heap = [(-len(indices) / weights[grant], grant) for grant, indices in grant_cells.items()]
+        heapq.heapify(heap)
+
+        chosen, evaluations = [], 0
+        while heap and any(residual):
+            _, grant = heapq.heappop(heap)
+            current = gain(grant)
+            evaluations += 1
+            if current == 0:
+                continue
+            ratio = current / weights[grant]
+            if heap and ratio < -heap[0][0]:
+                heapq.heappush(heap, (-ratio, grant))
+                continue
+            chosen.append(grant)
+            for index in grant_cells[grant]:
+                if residual[index] > 0 and grant[0] not in counted[index]:
+                    counted[index].add(grant[0])
+                    residual[index] -= 1
+        return chosen, evaluations
+
+    def _exact_cover(self, cells, grant_cells, weights):
+        """Minimum-weight multicover ILP; returns [] when no solution is found"""
+        prob = pulp.LpProblem("Gap_Repair_Set_Cover", pulp.LpMinimize)
+        names = {grant: f"grant_{i}" for i, grant in enumerate(sorted(grant_cells))}
+        x = {grant: pulp.LpVariable(name, cat='Binary') for grant, name in names.items()}
+        prob += pulp.lpSum(weights[grant] * x[grant] for grant in x)
+
+        for index, cell in enumerate(cells):
+            counts = []
+            for eng, quals in cell['candidates'].items():
+                # Engineer counts once however many of the cell's qualifications they gain
+                y = pulp.LpVariable(f"counts_{index}_{len(counts)}", lowBound=0, upBound=1)
+                prob.addConstraint(y <= pulp.lpSum(x[(eng, qual)] for qual in quals))
+                counts.append(y)
+            prob.addConstraint(pulp.lpSum(counts) >= min(cell['demand'], len(counts)), f"cell_{index}")
+
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=self.EXACT_TIME_LIMIT))
+        if prob.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            return []
+        return [grant for grant, var in x.items() if var.value() is not None and var.value() > 0.5]
+
+    def _describe_grants(self, chosen, cells, grant_cells, engineer_assignments):
+        """Grant records with the cells and rides each one helps cover"""
+        grants = []
+        for eng, qual in sorted(chosen):
+            indices = grant_cells[(eng, qual)]
+            grants.append({
+                'engineer': eng,
+                'qualification': qual,
+                'role': engineer_assignments[eng]['role'],
+                'cells': len(indices),
+                'rides': sorted({ride for index in indices for ride in cells[index]['rides']})
+            })
+        return grants
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+
+"""
+Incremental Coverage Model
+==========================
+
+Keeps the full-rotation PPM coverage of one team in memory so the effect of
+adding a qualification can be evaluated and applied without re-running the
+coverage validator.
+
+Key Features:
+- Same rules as CoverageValidator: Early Mon-Fri for daily PPMs, AM or PM
+  for weekly PPMs, any Early/Late weekday in a 4-week month for monthly PPMs
+- Coverage units (ride/maintenance type per day, PPM per week or month)
+  grouped into ride-periods: ride-days, ride-weeks and ride-months
+- Covered ride-periods expressed in ride-days so the families compare
+- O(units touched) gain evaluation and updates per (engineer, qualification),
+  with covered counts per family maintained incrementally
+- Reports which candidates a change can make more valuable (lazy-greedy support)
+"""
+
+import math
+from collections import Counter, defaultdict
+
+from .problem_context import ProblemContext
+
+
+class IncrementalCoverageModel:
+    """Full-rotation coverage state for one team with incremental qualification updates"""
+
+    # Working days a covered ride-period stands for (a month is 4 rota weeks)
+    RIDE_DAYS_PER_PERIOD = {'daily': 1, 'weekly': 5, 'monthly': 20}
+
+    ROTATION_WEEKS = 36
+    MONTHS_TESTED = 9
+
+    def __init__(self, optimizer_results, team, engineer_assignments, elec_rota=None, mech_rota=None,
+                 context=None):
+        """Index every coverage unit of the rotation and count the current cover
+
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            team: Team number
+            engineer_assignments: {engineer_code: {'role', 'qualifications', ...}}
+            elec_rota, mech_rota: Rotas extended to the rotation (taken from the context when omitted)
+            context: Optional shared ProblemContext supplying the rotas
+        """
+        self.optimizer = optimizer_results
+        self.team = team
+        self.engineers = {
+            eng_code: {'role': data['role'], 'name': data.get('name', eng_code)}
+            for eng_code, data in engineer_assignments.items()
+        }
+        self.holds = {eng_code: set(data['qualifications']) for eng_code, data in engineer_assignments.items()}
+
+        if elec_rota is None or mech_rota is None:
+            elec_rota, mech_rota = self._context_rotas(context or ProblemContext(optimizer_results), team)
+
+        # Unit arrays: requirement, current cover, period, qualifications and eligible engineers
+        self.unit_need = []
+        self.unit_count = []
+        self.unit_period = []
+        self.unit_quals = []
+        self.unit_available = []
+        self.unit_holders = []
+        self.units_by_qual = defaultdict(list)
+        # Units per (engineer, qualification) the engineer is on shift for, built on first use
+        self._eligible_units = {}
+
+        # Ride-periods: (family, ride_id, week/day/month key) and their unsatisfied unit counts
+        self.periods = []
+        self.period_units = []
+        self.period_unsatisfied = []
+
+        self._index_daily_units(elec_rota, mech_rota)
+        self._index_weekly_units(elec_rota, mech_rota)
+        self._index_monthly_units(elec_rota, mech_rota)
+
+        for unit, quals in enumerate(self.unit_quals):
+            holders = {eng_code for eng_code in self.unit_available[unit] if self.holds[eng_code] & quals}
+            self.unit_holders.append(holders)
+            self.unit_count.append(len(holders))
+        self.period_unsatisfied = [
+            sum(1 for unit in units if not self._satisfied(unit)) for units in self.period_units
+        ]
+        # Covered ride-periods per family, kept current by apply/remove
+        self.family_totals = Counter(key[0] for key in self.periods)
+        self.family_covered = Counter(
+            key[0] for period, key in enumerate(self.periods) if self.period_unsatisfied[period] == 0
+        )
+
+    def _context_rotas(self, context, team):
+        """Rotas extended to the 36-week rotation, as in CoverageValidator"""
+        rotas = []
+        for role in ['electrical', 'mechanical']:
+            rota = context.extended_rota(team, role, self.ROTATION_WEEKS)
+            if rota is None:
+                raise FileNotFoundError(f"Parsed {role} rota for team {team} is missing")
+            rotas.append(rota)
+        return rotas
+
+    def _team_ppms(self, ppm_type):
+        """{ride_id: [ppm, ...]} for this team's rides"""
+        return {
+            ride_id: ppm_data['ppms']
+            for ride_id, ppm_data in self.optimizer.ppms_by_type[ppm_type].items()
+            if self.optimizer.rides_info.get(ride_id, {}).get('team_responsible') == self.team
+        }
+
+    def _on_shift(self, elec_week, mech_week, day_indices, shift_codes):
+        """Team engineers on one of the shift codes on any of the days"""
+        on_shift = set()
+        for week in (elec_week, mech_week):
+            for eng_code, shifts in week.items():
+                if eng_code not in self.engineers:
+                    continue
+                if any(day_idx < len(shifts) and shifts[day_idx] in shift_codes for day_idx in day_indices):
+                    on_shift.add(eng_code)
+        return on_shift
+
+    def _add_period(self, key):
+        self.periods.append(key)
+        self.period_units.append([])
+        return len(self.periods) - 1
+
+    def _add_unit(self, period, need, quals, available, maintenance_type):
+        """Register a unit; only engineers of the PPM's maintenance type are eligible"""
+        role = maintenance_type.lower()
+        unit = len(self.unit_need)
+        self.unit_need.append(need)
+        self.unit_period.append(period)
+        self.unit_quals.append(frozenset(quals))
+        self.unit_available.append(frozenset(eng for eng in available if self.engineers[eng]['role'] == role))
+        self.period_units[period].append(unit)
+        for qual in quals:
+            self.units_by_qual[qual].append(unit)
+
+    def _weeks(self, elec_rota, mech_rota):
+        max_weeks = min(len(mech_rota), self.ROTATION_WEEKS)
+        for week_num in range(1, max_weeks + 1):
+            week_key = f'Week {week_num}'
+            if week_key in mech_rota and week_key in elec_rota:
+                yield week_num, elec_rota[week_key], mech_rota[week_key]
+
+    def _index_daily_units(self, elec_rota, mech_rota):
+        """One unit per ride, maintenance type and weekday: ceil(hours / 3h window) engineers"""
+        team_ppms = self._team_ppms('daily')
+        for week_num, elec_week, mech_week in self._weeks(elec_rota, mech_rota):
+            for day_idx in range(5):
+                early = self._on_shift(elec_week, mech_week, [day_idx], ('E',))
+                for ride_id, ppms in team_ppms.items():
+                    period = self._add_period(('daily', ride_id, f"W{week_num}D{day_idx}"))
+                    groups = defaultdict(list)
+                    for ppm in ppms:
+                        groups[ppm['maintenance_type']].append(ppm)
+                    for maintenance_type, type_ppms in groups.items():
+                        need = math.ceil(sum(ppm['duration_hours'] for ppm in type_ppms) / 3.0)
+                        quals = {ppm['qualification_code'] for ppm in type_ppms}
+                        self._add_unit(period, need, quals, early, maintenance_type)
+
+    def _index_weekly_units(self, elec_rota, mech_rota):
+        """One unit per weekly PPM and week: one engineer on Early or Late Mon-Fri"""
+        team_ppms = self._team_ppms('weekly')
+        for week_num, elec_week, mech_week in self._weeks(elec_rota, mech_rota):
+            day_shift = self._on_shift(elec_week, mech_week, range(5), ('E', 'L'))
+            for ride_id, ppms in team_ppms.items():
+                period = self._add_period(('weekly', ride_id, f"W{week_num}"))
+                for ppm in ppms:
+                    self._add_unit(period, 1, [ppm['qualification_code']], day_shift, ppm['maintenance_type'])
+
+    def _index_monthly_units(self, elec_rota, mech_rota):
+        """One unit per monthly PPM and 4-week month: one engineer on any Early/Late weekday"""
+        team_ppms = self._team_ppms('monthly')
+        weeks = {week_num: (elec_week, mech_week) for week_num, elec_week, mech_week in self._weeks(elec_rota, mech_rota)}
+        max_weeks = min(len(mech_rota), self.ROTATION_WEEKS)
+        for month_num in range(1, self.MONTHS_TESTED + 1):
+            start_week = (month_num - 1) * 4 + 1
+            end_week = min(start_week + 3, max_weeks)
+            available = set()
+            for week_num in range(start_week, end_week + 1):
+                if week_num in weeks:
+                    available |= self._on_shift(*weeks[week_num], range(5), ('E', 'L'))
+            for ride_id, ppms in team_ppms.items():
+                period = self._add_period(('monthly', ride_id, f"M{month_num}"))
+                for ppm in ppms:
+                    self._add_unit(period, 1, [ppm['qualification_code']], available, ppm['maintenance_type'])
+
+    def _satisfied(self, unit):
+        return self.unit_count[unit] >= self.unit_need[unit]
+
+    def eligible_units(self, eng_code, qual):
+        """Units of qual that eng_code is on shift (and the right role) for"""
+        key = (eng_code, qual)
+        units = self._eligible_units.get(key)
+        if units is None:
+            available = self.unit_available
+            units = tuple(unit for unit in self.units_by_qual.get(qual, ()) if eng_code in available[unit])
+            self._eligible_units[key] = units
+        return units
+
+    def candidate_pairs(self):
+        """(engineer, qualification) pairs that would count towards at least one unsatisfied unit"""
+        pairs = set()
+        for unit, available in enumerate(self.unit_available):
+            if self._satisfied(unit):
+                continue
+            for eng_code in available - self.unit_holders[unit]:
+                for qual in self.unit_quals[unit] - self.holds[eng_code]:
+                    pairs.add((eng_code, qual))
+        return pairs
+
+    def gain(self, eng_code, qual):
+        """Coverage bought by training eng_code on qual
+
+        Returns (ride_days, progress, covered) where covered counts the
+        ride-periods per family that become fully covered and progress counts
+        unsatisfied units that gain an engineer.
+        """
+        if qual in self.holds[eng_code]:
+            return 0, 0, Counter()
+        newly_satisfied = Counter()
+        progress = 0
+        for unit in self.eligible_units(eng_code, qual):
+            if self._satisfied(unit) or eng_code in self.unit_holders[unit]:
+                continue
+            progress += 1
+            if self.unit_count[unit] + 1 >= self.unit_need[unit]:
+                newly_satisfied[self.unit_period[unit]] += 1
+
+        covered = Counter(
+            self.periods[period][0] for period, count in newly_satisfied.items()
+            if count == self.period_unsatisfied[period]
+        )
+        ride_days = sum(self.RIDE_DAYS_PER_PERIOD[family] * count for family, count in covered.items())
+        return ride_days, progress, covered
+
+    def apply(self, eng_code, qual):
+        """Add a qualification and update the cover of every unit it touches
+
+        Returns the units whose cover rose but are still unsatisfied, plus the
+        unsatisfied units of periods that moved closer to covered: the only
+        places where another candidate's gain can have increased.
+        """
+        self.holds[eng_code].add(qual)
+        touched_periods = set()
+        promoted_units = set()
+        holders, count, need = self.unit_holders, self.unit_count, self.unit_need
+        for unit in self.eligible_units(eng_code, qual):
+            if eng_code in holders[unit]:
+                continue
+            was_satisfied = count[unit] >= need[unit]
+            holders[unit].add(eng_code)
+            count[unit] += 1
+            if was_satisfied:
+                continue
+            if count[unit] >= need[unit]:
+                period = self.unit_period[unit]
+                self.period_unsatisfied[period] -= 1
+                touched_periods.add(period)
+                if self.period_unsatisfied[period] == 0:
+                    self.family_covered[self.periods[period][0]] += 1
+            else:
+                promoted_units.add(unit)
+
+        for period in touched_periods:
+            if self.period_unsatisfied[period]:
+                promoted_units.update(unit for unit in self.period_units[period] if not self._satisfied(unit))
+        return promoted_units
+
+    def remove(self, eng_code, qual):
+        """Drop a qualification (expiry, leaver) and update the cover it provided"""
+        if qual not in self.holds[eng_code]:
+            return
+        held = self.holds[eng_code]
+        held.discard(qual)
+        holders, count, need = self.unit_holders, self.unit_count, self.unit_need
+        for unit in self.eligible_units(eng_code, qual):
+            if eng_code not in holders[unit] or not held.isdisjoint(self.unit_quals[unit]):
+                continue
+            was_satisfied = count[unit] >= need[unit]
+            holders[unit].discard(eng_code)
+            count[unit] -= 1
+            if was_satisfied and count[unit] < need[unit]:
+                period = self.unit_period[unit]
+                if self.period_unsatisfied[period] == 0:
+                    self.family_covered[self.periods[period][0]] -= 1
+                self.period_unsatisfied[period] += 1
+
+    def candidates_on_units(self, units):
+        """Candidate pairs that count towards any of the given units"""
+        pairs = set()
+        for unit in units:
+            for eng_code in self.unit_available[unit] - self.unit_holders[unit]:
+                for qual in self.unit_quals[unit] - self.holds[eng_code]:
+                    pairs.add((eng_code, qual))
+        return pairs
+
+    def coverage_summary(self):
+        """Covered ride-periods per family and in ride-days"""
+        summary = {}
+        covered_days = total_days = 0
+        for family, days in self.RIDE_DAYS_PER_PERIOD.items():
+            covered = self.family_covered[family]
+            total = self.family_totals[family]
+            summary[family] = {
+                'covered': covered,
+                'total': total,
+                'coverage_percentage': (covered / total * 100) if total else 100.0
+            }
+            covered_days += covered * days
+            total_days += total * days
+        summary['ride_days_covered'] = covered_days
+        summary['ride_days_total'] = total_days
+        return summary
+
+    def uncovered_periods(self, family=None):
+        """Ride-periods with at least one unsatisfied unit"""
+        return [
+            {'family': key[0], 'ride_id': key[1], 'period': key[2], 'unsatisfied_units': self.period_unsatisfied[period]}
+            for period, key in enumerate(self.periods)
+            if self.period_unsatisfied[period] and (family is None or key[0] == family)
+        ]
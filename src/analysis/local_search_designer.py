@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+
+"""
+Local Search Designer
+=====================
+
+Improves ride assignments with simulated annealing or tabu search, so a poor
+structure can be undone instead of only ever adding qualifications on top.
+
+Key Features:
+- Moves: move one of an engineer's rides to another ride of the same type,
+  swap same-type rides between two engineers, add or drop a single qualification
+- Type A/B/C balance rules of the ride clustering MILP kept by construction:
+  every engineer holds the same number of rides of each type and only rides
+  with qualifications for their role
+- Each move scored by an incremental coverage delta (IncrementalCoverageModel)
+  instead of a full validation; rejected moves are undone the same way
+- Objective: covered ride-days minus a per-qualification cost
+- Simulated annealing (geometric cooling) or tabu search (best of sampled
+  moves, tabu tenure on the ride / qualification a move gave up)
+- Starts from a balanced greedy assignment or from given matrices (e.g. MILP)
+- Best state kept and exported in the MILP matrix format
+"""
+
+import math
+import random
+import time
+from collections import Counter, deque
+
+from .coverage_validator import CoverageValidator
+from .incremental_coverage import IncrementalCoverageModel
+from .problem_context import PPM_TYPES, ProblemContext
+
+
+RIDE_TYPES = ('A', 'B', 'C')
+
+
+class LocalSearchDesigner:
+    """Simulated annealing / tabu search over ride and qualification assignments"""
+
+    METHODS = ('annealing', 'tabu')
+    MOVE_WEIGHTS = {'move': 0.35, 'swap': 0.35, 'add': 0.15, 'drop': 0.15}
+
+    # Ride-days a qualification must buy to be worth holding
+    QUALIFICATION_WEIGHT = 0.5
+    # Engineers per ride and role aimed for when sizing the starting assignment
+    TARGET_ENGINEERS_PER_RIDE = 4
+
+    # Annealing temperatures (ride-days), cooled geometrically over the run
+    INITIAL_TEMPERATURE = 5.0
+    FINAL_TEMPERATURE = 0.05
+
+    # Tabu search: moves sampled per step and steps a reversed change stays tabu
+    TABU_SAMPLE = 20
+    TABU_TENURE = 25
+
+    # Infeasible samples allowed per evaluated move before a search gives up
+    MAX_PROPOSALS_PER_MOVE = 20
+
+    def __init__(self, optimizer_results, context=None, method='annealing', iterations=20000, seed=42,
+                 initial_matrices=None, qualification_weight=None):
+        """
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            context: Optional shared ProblemContext (built here when not given)
+            method: 'annealing' or 'tabu'
+            iterations: Moves evaluated per team
+            seed: Random seed for move sampling
+            initial_matrices: Optional {team: {engineer: assignment}} to start from
+            qualification_weight: Override QUALIFICATION_WEIGHT (ride-days per qualification)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown local search method '{method}'. Choose from: {', '.join(self.METHODS)}")
+
+        self.optimizer = optimizer_results
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+        self.method = method
+        self.iterations = iterations
+        self.seed = seed
+        self.initial_matrices = initial_matrices or {}
+        self.qualification_weight = (self.QUALIFICATION_WEIGHT if qualification_weight is None
+                                     else qualification_weight)
+        self.coverage_validator = CoverageValidator(optimizer_results, context=self.context)
+        self.search_stats = {}
+
+        print("🌡️  LOCAL SEARCH DESIGNER INITIALIZED")
+        print(f"   Method: {'simulated annealing' if method == 'annealing' else 'tabu search'}, "
+              f"{iterations} moves per team")
+        print(f"   Objective: covered ride-days - {self.qualification_weight} per qualification")
+
+    def create_optimized_qualification_matrices(self):
+        """Run the local search for each team and return the best matrices"""
+        print("\n🌡️  CREATING LOCAL-SEARCH QUALIFICATION MATRICES")
+        print("=" * 70)
+
+        matrices = {}
+        for team in [1, 2]:
+            print(f"\n🏢 TEAM {team} LOCAL SEARCH:")
+            self._setup_team(team)
+            start = time.time()
+            if self.method == 'annealing':
+                self._anneal()
+            else:
+                self._tabu_search()
+            elapsed = time.time() - start
+            self._restore(self.best_state)
+
+            evaluated = self.stats['evaluated']
+            self.search_stats[team] = {
+                'method': self.method,
+                'iterations': evaluated,
+                'accepted': self.stats['accepted'],
+                'improvements': self.stats['improvements'],
+                'moves_per_second': round(evaluated / elapsed) if elapsed > 0 else None,
+                'elapsed': round(elapsed, 2),
+                'initial_objective': round(self.initial_objective, 2),
+                'best_objective': round(self.best_objective, 2),
+                'type_counts': dict(self.type_counts),
+                'coverage': self.model.coverage_summary()
+            }
+            print(f"   ✅ {evaluated} moves in {elapsed:.1f}s ({self.search_stats[team]['moves_per_second']}/s), "
+                  f"{self.stats['accepted']} accepted")
+            print(f"   📈 Objective {self.initial_objective:.1f} -> {self.best_objective:.1f} "
+                  f"(ride-days {self._ride_days()}, {self.qualification_count} qualifications)")
+            matrices[team] = self._export_team(team)
+
+        return matrices
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+
+    def _setup_team(self, team):
+        """Engineers, viable rides, starting assignment and the incremental coverage model"""
+        self.rng = random.Random(self.seed + team)
+        self.engineer_info = {}
+        for role in ('electrical', 'mechanical'):
+            for eng in self.context.engineers[team][role]:
+                if not eng.get('active', True) or eng.get('vacancy', False):
+                    continue
+                self.engineer_info[eng['employee_code']] = {'role': role, 'data': eng}
+        self.engineer_ids = list(self.engineer_info)
+
+        team_rides = self.context.team_rides[team]
+        self.ride_type = {ride_id: self.optimizer.rides_info[ride_id].get('type', 'C') for ride_id in team_rides}
+        self.ride_role_quals = {
+            ride_id: {
+                role: frozenset().union(*(self.context.ride_qualifications[ride_id][ppm_type][role]
+                                          for ppm_type in PPM_TYPES))
+                for role in ('electrical', 'mechanical')
+            }
+            for ride_id in team_rides
+        }
+        self.viable = {
+            eng_id: {
+                ride_type: [ride_id for ride_id in team_rides
+                            if self.ride_type[ride_id] == ride_type and self.ride_role_quals[ride_id][info['role']]]
+                for ride_type in RIDE_TYPES
+            }
+            for eng_id, info in self.engineer_info.items()
+        }
+        self.role_quals = {
+            role: sorted(frozenset().union(*(quals[role] for quals in self.ride_role_quals.values())))
+            for role in ('electrical', 'mechanical')
+        }
+
+        self.rides, self.extra, self.dropped = self._initial_state(team)
+        self.provide = {eng_id: Counter() for eng_id in self.engineer_ids}
+        for eng_id, rides in self.rides.items():
+            for ride_id in rides:
+                self.provide[eng_id].update(self.ride_role_quals[ride_id][self.engineer_info[eng_id]['role']])
+
+        self.type_counts = Counter(self.ride_type[ride_id] for ride_id in self.rides[self.engineer_ids[0]]) \
+            if self.engineer_ids else Counter()
+        if any(Counter(self.ride_type[r] for r in rides) != self.type_counts for rides in self.rides.values()):
+            print("   ⚠️  Starting assignment has unequal ride types per engineer (kept as given)")
+
+        held = {eng_id: sorted(self._held_set(eng_id)) for eng_id in self.engineer_ids}
+        self.qualification_count = sum(len(quals) for quals in held.values())
+        self.model = IncrementalCoverageModel(
+            self.optimizer, team,
+            {eng_id: {'role': self.engineer_info[eng_id]['role'], 'qualifications': held[eng_id]}
+             for eng_id in self.engineer_ids},
+            elec_rota=self.context.extended_rota(team, 'electrical'),
+            mech_rota=self.context.extended_rota(team, 'mechanical')
+        )
+
+        self.journal = []
+        self.stats = {'evaluated': 0, 'accepted': 0, 'improvements': 0}
+        self.current_objective = self.initial_objective = self._objective()
+        self.best_objective = self.current_objective
+        self.best_state = self._snapshot()
+        print(f"   👥 {len(self.engineer_ids)} engineers, {len(team_rides)} rides, rides per engineer "
+              f"A:{self.type_counts['A']} B:{self.type_counts['B']} C:{self.type_counts['C']}")
+
+    def _initial_state(self, team):
+        """Rides, extra and dropped qualifications per engineer to start the search from"""
+        given = self.initial_matrices.get(team)
+        if given:
+            rides, extra, dropped = {}, {}, {}
+            for eng_id in self.engineer_ids:
+                assignment = given.get(eng_id, {})
+                role = self.engineer_info[eng_id]['role']
+                rides[eng_id] = {ride_id for ride_id in assignment.get('assigned_rides', []) if ride_id in self.ride_type}
+                provided = frozenset().union(*(self.ride_role_quals[ride_id][role] for ride_id in rides[eng_id]))
+                held = set(assignment.get('qualifications', [])) & set(self.role_quals[role])
+                extra[eng_id] = held - provided
+                dropped[eng_id] = set(provided - held)
+            print(f"   🔁 Starting from the given matrices")
+            return rides, extra, dropped
+
+        # Balanced greedy start: the same number of rides of each type for everyone,
+        # each pick going to the viable ride with the fewest engineers of that role
+        rides = {eng_id: set() for eng_id in self.engineer_ids}
+        holders = Counter()
+        for ride_type in RIDE_TYPES:
+            for _ in range(self._rides_per_engineer(ride_type)):
+                for eng_id in self.engineer_ids:
+                    role = self.engineer_info[eng_id]['role']
+                    options = [r for r in self.viable[eng_id][ride_type] if r not in rides[eng_id]]
+                    ride_id = min(options, key=lambda r: (holders[(r, role)], r))
+                    rides[eng_id].add(ride_id)
+                    holders[(ride_id, role)] += 1
+        print(f"   🧱 Starting from a balanced greedy assignment")
+        return rides, {eng_id: set() for eng_id in self.engineer_ids}, {eng_id: set() for eng_id in self.engineer_ids}
+
+    def _rides_per_engineer(self, ride_type):
+        """Rides of a type per engineer: enough for the target redundancy, within every engineer's options"""
+        if not self.engineer_ids:
+            return 0
+        most_possible = min(len(self.viable[eng_id][ride_type]) for eng_id in self.engineer_ids)
+        wanted = 0
+        for role in ('electrical', 'mechanical'):
+            role_engineers = [eng_id for eng_id in self.engineer_ids if self.engineer_info[eng_id]['role'] == role]
+            if role_engineers:
+                role_rides = len(self.viable[role_engineers[0]][ride_type])
+                wanted = max(wanted, math.ceil(role_rides * self.TARGET_ENGINEERS_PER_RIDE / len(role_engineers)))
+        return min(most_possible, wanted)
+
+    def _held(self, eng_id, qual):
+        return (self.provide[eng_id][qual] > 0 and qual not in self.dropped[eng_id]) or qual in self.extra[eng_id]
+
+    def _held_set(self, eng_id):
+        role = self.engineer_info[eng_id]['role']
+        provided = frozenset().union(*(self.ride_role_quals[ride_id][role] for ride_id in self.rides[eng_id]))
+        return (provided - self.dropped[eng_id]) | self.extra[eng_id]
+
+    def _ride_days(self):
+        return sum(self.model.family_covered[family] * days
+                   for family, days in IncrementalCoverageModel.RIDE_DAYS_PER_PERIOD.items())
+
+    def _objective(self):
+        return self._ride_days() - self.qualification_weight * self.qualification_count
+
+    def _snapshot(self):
+        return (
+            {eng_id: set(rides) for eng_id, rides in self.rides.items()},
+            {eng_id: set(quals) for eng_id, quals in self.extra.items()},
+            {eng_id: set(quals) for eng_id, quals in self.dropped.items()}
+        )
+
+    def _restore(self, state):
+        """Return to a snapshot, pushing the qualification changes to the coverage model"""
+        before = {eng_id: self._held_set(eng_id) for eng_id in self.engineer_ids}
+        rides, extra, dropped = state
+        for eng_id in self.engineer_ids:
+            self.rides[eng_id] = set(rides[eng_id])
+            self.extra[eng_id] = set(extra[eng_id])
+            self.dropped[eng_id] = set(dropped[eng_id])
+            role = self.engineer_info[eng_id]['role']
+            self.provide[eng_id] = Counter()
+            for ride_id in self.rides[eng_id]:
+                self.provide[eng_id].update(self.ride_role_quals[ride_id][role])
+            after = self._held_set(eng_id)
+            for qual in before[eng_id] - after:
+                self.model.remove(eng_id, qual)
+            for qual in after - before[eng_id]:
+                self.model.apply(eng_id, qual)
+            self.qualification_count += len(after) - len(before[eng_id])
+        self.current_objective = self._objective()
+
+    # ------------------------------------------------------------------
+    # Moves
+    # ------------------------------------------------------------------
+
+    def _propose(self):
+        """Sample a random feasible move descriptor (None when the sample is infeasible)"""
+        kind = self.rng.choices(list(self.MOVE_WEIGHTS), weights=list(self.MOVE_WEIGHTS.values()))[0]
+        eng_id = self.rng.choice(self.engineer_ids)
+        role = self.engineer_info[eng_id]['role']
+
+        if kind == 'add':
+            qual = self.rng.choice(self.role_quals[role])
+            return None if self._held(eng_id, qual) else ('add', eng_id, qual)
+        if kind == 'drop':
+            held = self.model.holds[eng_id]
+            return ('drop', eng_id, self.rng.choice(sorted(held))) if held else None
+
+        if not self.rides[eng_id]:
+            return None
+        old_ride = self.rng.choice(sorted(self.rides[eng_id]))
+        ride_type = self.ride_type[old_ride]
+        if kind == 'move':
+            options = [r for r in self.viable[eng_id][ride_type] if r not in self.rides[eng_id]]
+            return ('move', eng_id, old_ride, self.rng.choice(options)) if options else None
+
+        other_id = self.rng.choice(self.engineer_ids)
+        if other_id == eng_id or old_ride in self.rides[other_id] \
+                or old_ride not in self.viable[other_id][ride_type]:
+            return None
+        options = [r for r in sorted(self.rides[other_id])
+                   if self.ride_type[r] == ride_type and r not in self.rides[eng_id] and r in self.viable[eng_id][ride_type]]
+        return ('swap', eng_id, old_ride, other_id, self.rng.choice(options)) if options else None
+
+    def _execute(self, move):
+        """Apply a move to the state and the coverage model; returns the touched (engineer, quals)"""
+        touched = []
+        if move[0] in ('add', 'drop'):
+            _, eng_id, qual = move
+            touched.append((eng_id, (qual,)))
+        elif move[0] == 'move':
+            _, eng_id, old_ride, new_ride = move
+            touched.append((eng_id, self._ride_quals(eng_id, old_ride, new_ride)))
+        else:
+            _, eng_id, old_ride, other_id, other_ride = move
+            touched.append((eng_id, self._ride_quals(eng_id, old_ride, other_ride)))
+            touched.append((other_id, self._ride_quals(other_id, other_ride, old_ride)))
+
+        before = [(eng_id, {qual: self._held(eng_id, qual) for qual in quals}) for eng_id, quals in touched]
+        mark = len(self.journal)
+        if move[0] == 'add':
+            if move[2] in self.dropped[move[1]]:
+                self._set_member(self.dropped[move[1]], move[2], False)
+            else:
+                self._set_member(self.extra[move[1]], move[2], True)
+        elif move[0] == 'drop':
+            self._set_member(self.extra[move[1]], move[2], False)
+            if self.provide[move[1]][move[2]] > 0:
+                self._set_member(self.dropped[move[1]], move[2], True)
+        elif move[0] == 'move':
+            self._replace_ride(move[1], move[2], move[3])
+        else:
+            self._replace_ride(move[1], move[2], move[4])
+            self._replace_ride(move[3], move[4], move[2])
+        self._sync(before)
+        return mark, touched
+
+    def _undo(self, mark, touched):
+        """Revert the journal back to mark and push the reverse changes to the model"""
+        before = [(eng_id, {qual: self._held(eng_id, qual) for qual in quals}) for eng_id, quals in touched]
+        while len(self.journal) > mark:
+            self.journal.pop()()
+        self._sync(before)
+
+    def _ride_quals(self, eng_id, *rides):
+        role = self.engineer_info[eng_id]['role']
+        return frozenset().union(*(self.ride_role_quals[ride_id][role] for ride_id in rides))
+
+    def _set_member(self, members, item, present):
+        if present and item not in members:
+            members.add(item)
+            self.journal.append(lambda: members.discard(item))
+        elif not present and item in members:
+            members.discard(item)
+            self.journal.append(lambda: members.add(item))
+
+    def _replace_ride(self, eng_id, old_ride, new_ride):
+        """Swap one ride for another; qualifications dropped on the old ride are forgotten"""
+        role = self.engineer_info[eng_id]['role']
+        self._set_member(self.rides[eng_id], old_ride, False)
+        self._set_member(self.rides[eng_id], new_ride, True)
+        provide = self.provide[eng_id]
+        old_quals, new_quals = self.ride_role_quals[old_ride][role], self.ride_role_quals[new_ride][role]
+        provide.subtract(old_quals)
+        provide.update(new_quals)
+        self.journal.append(lambda: (provide.subtract(new_quals), provide.update(old_quals)))
+        for qual in old_quals:
+            if provide[qual] <= 0:
+                self._set_member(self.dropped[eng_id], qual, False)
+
+    def _sync(self, before):
+        """Push held-qualification flips since before to the coverage model"""
+        for eng_id, held_before in before:
+            for qual, was_held in held_before.items():
+                now_held = self._held(eng_id, qual)
+                if now_held and not was_held:
+                    self.model.apply(eng_id, qual)
+                    self.qualification_count += 1
+                elif was_held and not now_held:
+                    self.model.remove(eng_id, qual)
+                    self.qualification_count -= 1
+
+    def _try(self, move):
+        """Apply a move and return (delta, undo token)"""
+        token = self._execute(move)
+        self.stats['evaluated'] += 1
+        return self._objective() - self.current_objective, token
+
+    def _accept(self, delta):
+        self.journal.clear()
+        self.current_objective += delta
+        self.stats['accepted'] += 1
+        if self.current_objective > self.best_objective + 1e-9:
+            self.best_objective = self.current_objective
+            self.best_state = self._snapshot()
+            self.stats['improvements'] += 1
+
+    # ------------------------------------------------------------------
+    # Search strategies
+    # ------------------------------------------------------------------
+
+    def _anneal(self):
+        """Metropolis acceptance with geometric cooling"""
+        if self.iterations <= 0:
+            return
+        cooling = (self.FINAL_TEMPERATURE / self.INITIAL_TEMPERATURE) ** (1.0 / self.iterations)
+        temperature = self.INITIAL_TEMPERATURE
+        for _ in range(self.MAX_PROPOSALS_PER_MOVE * self.iterations):
+            if self.stats['evaluated'] >= self.iterations:
+                break
+            move = self._propose()
+            if move is None:
+                continue
+            delta, token = self._try(move)
+            if delta >= 0 or self.rng.random() < math.exp(delta / temperature):
+                self._accept(delta)
+            else:
+                self._undo(*token)
+            temperature *= cooling
+
+    def _tabu_search(self):
+        """Best non-tabu move of each sample, with aspiration when it beats the best"""
+        tabu = deque()
+        tabu_set = set()
+        for _ in range(self.MAX_PROPOSALS_PER_MOVE * self.iterations // self.TABU_SAMPLE + 1):
+            if self.stats['evaluated'] >= self.iterations:
+                break
+            best_move, best_delta = None, None
+            for _ in range(self.TABU_SAMPLE):
+                if self.stats['evaluated'] >= self.iterations:
+                    break
+                move = self._propose()
+                if move is None:
+                    continue
+                delta, token = self._try(move)
+                self._undo(*token)
+                aspiration = self.current_objective + delta > self.best_objective + 1e-9
+                if self._tabu_attributes(move)[0] & tabu_set and not aspiration:
+                    continue
+                if best_delta is None or delta > best_delta:
+                    best_move, best_delta = move, delta
+            if best_move is None:
+                continue
+
+            self._execute(best_move)
+            self._accept(best_delta)
+            for attribute in self._tabu_attributes(best_move)[1]:
+                tabu.append(attribute)
+                tabu_set.add(attribute)
+            while len(tabu) > self.TABU_TENURE:
+                tabu_set.discard(tabu.popleft())
+
+    def _tabu_attributes(self, move):
+        """(attributes a move would re-introduce, attributes it gives up)"""
+        if move[0] in ('add', 'drop'):
+            # Adding and dropping the same qualification undo each other
+            return {('qual', move[1], move[2])}, {('qual', move[1], move[2])}
+        if move[0] == 'move':
+            return {('ride', move[1], move[3])}, {('ride', move[1], move[2])}
+        return ({('ride', move[1], move[4]), ('ride', move[3], move[2])},
+                {('ride', move[1], move[2]), ('ride', move[3], move[4])})
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def _export_team(self, team):
+        """Best state in the MILP matrix format"""
+        daily_quals = frozenset().union(*(
+            self.context.ride_qualifications[ride_id]['daily'][role]
+            for ride_id in self.ride_type for role in ('electrical', 'mechanical')
+        ))
+        assignments = {}
+        for eng_id in self.engineer_ids:
+            info = self.engineer_info[eng_id]
+            role = info['role']
+            assigned_rides = sorted(self.rides[eng_id])
+            qualifications = sorted(self._held_set(eng_id))
+            stats = (self.context.shift_statistics[team][role] or {}).get(eng_id)
+            early_ratio = stats['early_days'] / stats['total_days'] if stats and stats['total_days'] else 0.5
+            assignments[eng_id] = {
+                'name': info['data'].get('timeplan_name', f"Engineer {eng_id}"),
+                'role': role,
+                'rota_number': info['data'].get('rota_number', 1),
+                'early_ratio': early_ratio,
+                'critical_early_days': stats['early_days'] if stats else 25,
+                'assigned_rides': assigned_rides,
+                'type_a_rides': [r for r in assigned_rides if self.ride_type[r] == 'A'],
+                'type_b_rides': [r for r in assigned_rides if self.ride_type[r] == 'B'],
+                'type_c_rides': [r for r in assigned_rides if self.ride_type[r] == 'C'],
+                'qualifications': qualifications,
+                'daily_qualifications': [qual for qual in qualifications if qual in daily_quals],
+                'coverage_score': len(qualifications)
+            }
+        return assignments
+
+    def get_search_stats(self):
+        """Per-team search statistics (moves, acceptance, throughput, objective)"""
+        return self.search_stats
+
+    def validate_and_export_results(self, matrices):
+        """Validate results using coverage validator"""
+        print("\n🧪 VALIDATING LOCAL SEARCH RESULTS")
+        print("=" * 70)
+
+        validation_results = self.coverage_validator.validate_assignment_coverage(matrices)
+
+        for team in [1, 2]:
+            if team in validation_results:
+                results = validation_results[team]
+                print(f"\n🏢 TEAM {team} LOCAL SEARCH VALIDATION:")
+                print(f"   Daily Coverage:   {results['daily']['coverage_percentage']:.1f}%")
+                print(f"   Weekly Coverage:  {results['weekly']['coverage_percentage']:.1f}%")
+                print(f"   Monthly Coverage: {results['monthly']['coverage_percentage']:.1f}%")
+
+        return validation_results
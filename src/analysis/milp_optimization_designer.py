@@ -13,14 +13,21 @@ Key Features:
 - Minimizes qualification variance (fairness objective)
 - Handles complex shift patterns and constraints
 - Uses proven mathematical optimization algorithms
+- Large neighbourhood search from the solver incumbent when the time limit is hit
+- Fast mode: LP relaxation, type-balanced dependent rounding and greedy coverage repair
+- Optional sensitivity analysis: binding coverage rows and marginal value per rota line
+- Engineers, rotas and the availability tensor taken from a shared ProblemContext
 - Scalable and extensible
 """
 
-import json
+import copy
+import random
+import time
 import numpy as np
 import pandas as pd
 from pathlib import Path
 from collections import defaultdict, Counter
+from datetime import datetime
 try:
     import pulp
     PULP_AVAILABLE = True
@@ -28,26 +35,96 @@ except ImportError:
     PULP_AVAILABLE = False
 
 from .coverage_validator import CoverageValidator
+from .problem_context import ProblemContext
+from .solver_backends import SolverResult, get_solver_backend, describe_model
+from .milp_sensitivity import MILPSensitivityAnalysis
 
 
 class MILPOptimizationDesigner:
     """Mathematical optimization using Mixed Integer Linear Programming"""
     
-    def __init__(self, optimizer_results):
-        """Initialize with PPM optimization results"""
+    # Rides per engineer compared in the lexicographic symmetry-breaking rows
+    # (weights 2^15..1 keep coefficients well inside solver tolerances)
+    SYMMETRY_PREFIX_RIDES = 16
+    
+    # Lazy coverage: weeks (and months) whose rows seed the first solve, and the
+    # number of cutting rounds before the remaining rows are added in one go
+    # (each round adds every held-back row of the periods with a violation)
+    LAZY_SEED_WEEKS = 1
+    LAZY_MAX_ROUNDS = 40
+    
+    # Large neighbourhood search after a non-optimal solve: default budget as a
+    # fraction of the solver time limit, per sub-MILP limit, stop after this many
+    # consecutive non-improving iterations, and how many engineers or rides each
+    # neighbourhood frees
+    LNS_TIME_FRACTION = 0.2
+    LNS_SUBPROBLEM_TIME_LIMIT = 10
+    LNS_MAX_ITERATIONS = 50
+    LNS_MAX_STALLS = 8
+    LNS_FREE_ENGINEERS = 6
+    LNS_FREE_RIDES = 6
+    
+    # Fast mode: rounding seed and the constraint families repaired after rounding
+    FAST_MODE_SEED = 42
+    FAST_MODE_COVERAGE_FAMILIES = ('Ride_Coverage', 'Daily_Coverage', 'Weekly_Coverage', 'Monthly_Coverage')
+    
+    # Constraint name prefixes reported as families in solve telemetry
+    CONSTRAINT_FAMILIES = [
+        'Max_Rides', 'Min_Rides', 'Role_Block', 'EqualTypeA', 'EqualTypeB', 'EqualTypeC',
+        'Symmetry_Lex', 'Ride_Coverage', 'Daily_Coverage', 'Weekly_Coverage', 'Monthly_Coverage'
+    ]
+    
+    def __init__(self, optimizer_results, solver='cbc', solver_options=None, symmetry_breaking=True,
+                 lazy_coverage=False, fast_mode=False, sensitivity_analysis=False, context=None,
+                 lns_time_budget=None):
+        """Initialize with PPM optimization results
+        
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            solver: MILP backend name ('cbc', 'highs' or 'cpsat')
+            solver_options: Optional backend overrides (time_limit, gap_rel, msg, threads)
+            symmetry_breaking: Add lexicographic ordering rows for interchangeable engineers
+            lazy_coverage: Generate rotation coverage rows lazily (cutting-plane mode)
+            fast_mode: Round the LP relaxation instead of solving the MILP (what-if answers,
+                reported with the LP bound)
+            sensitivity_analysis: After each solve, keep LP duals and reduced costs at the
+                integer solution for marginal-capacity queries (see get_sensitivity)
+            context: Optional shared ProblemContext (built here when not given)
+            lns_time_budget: Seconds of large neighbourhood search after a non-optimal
+                solve (default: LNS_TIME_FRACTION of the solver time limit; 0 disables)
+        """
         self.optimizer = optimizer_results
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+        self.symmetry_breaking = symmetry_breaking
+        self.lazy_coverage = lazy_coverage
+        self.fast_mode = fast_mode
+        self.sensitivity_analysis = sensitivity_analysis
         self.engineers = self._load_engineer_data()
         self.ppm_requirements = self._analyze_ppm_requirements()
         self.shift_analysis = self._analyze_shift_patterns()
-        self.coverage_validator = CoverageValidator()
+        self.coverage_validator = CoverageValidator(optimizer_results, context=self.context)
         
         # Build dynamic qualification to role mapping from actual PPM data
         self.qualification_role_mapping = self._build_qualification_role_mapping()
         
+        # Solver backend: 5 minute limit and 3% optimality gap unless overridden
+        self.solver_results = {}
+        self.solve_telemetry = {}
+        self.sensitivity = {}
+        if PULP_AVAILABLE:
+            backend_options = {'time_limit': 300, 'gap_rel': 0.03, 'msg': True}
+            backend_options.update(solver_options or {})
+            self.solver_backend = get_solver_backend(solver, **backend_options)
+            if lns_time_budget is None:
+                lns_time_budget = (self.solver_backend.time_limit or 300) * self.LNS_TIME_FRACTION
+        self.lns_time_budget = lns_time_budget
+        
         if PULP_AVAILABLE:
             print("🔢 MILP OPTIMIZATION DESIGNER INITIALIZED")
             print("   Approach: Optimal qualification blend with guaranteed coverage")
-            print("   Solver: PuLP with COIN-OR CBC (5min, 3% accuracy)")
+            print(f"   Solver: PuLP with {self.solver_backend.describe()}")
+            if fast_mode:
+                print("   Mode: FAST (LP relaxation + rounding + coverage repair, no optimality proof)")
             print("   Objective: Minimize total qualifications while ensuring fairness")
             print(f"   Qualification mappings: {len(self.qualification_role_mapping)} loaded from PPM data")
         else:
@@ -55,33 +132,15 @@ class MILPOptimizationDesigner:
             print("   Falling back to intelligent balanced assignment")
     
     def _load_engineer_data(self):
-        """Load engineer data organized by team and role"""
-        engineers = {1: {'electrical': [], 'mechanical': []}, 
-                    2: {'electrical': [], 'mechanical': []}}
-        
-        # Load engineer data files
-        for team in [1, 2]:
-            for role in ['elec', 'mech']:
-                role_name = 'electrical' if role == 'elec' else 'mechanical'
-                file_path = f'data/processed/engineers/team{team}_{role}_engineers.json'
-                
-                try:
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                        engineers[team][role_name] = data.get('engineers', [])
-                except FileNotFoundError:
-                    print(f"   ⚠️  Engineer file not found: {file_path}")
-                    engineers[team][role_name] = []
-        
-        return engineers
+        """Engineer data organized by team and role (from the problem context)"""
+        return self.context.engineer_data()
     
     def _analyze_ppm_requirements(self):
         """Analyze PPM requirements and create time window mappings"""
         requirements = {1: {}, 2: {}}
         
         for team in [1, 2]:
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            team_rides = self.context.team_rides[team]
             
             for ride_id in team_rides:
                 requirements[team][ride_id] = {
@@ -143,7 +202,7 @@ class MILPOptimizationDesigner:
     def _analyze_shift_patterns(self):
         """Analyze shift patterns to identify engineer availability"""
         print("📅 ANALYZING SHIFT PATTERNS FOR MILP OPTIMIZATION")
-        print("   🔄 Extending rotas to 36-week cycle (2 mech cycles + 4 elec cycles)")
+        print("   🔄 Rotas extended to 36-week cycle (2 mech cycles + 4 elec cycles)")
         
         shift_analysis = {}
         
@@ -151,55 +210,31 @@ class MILPOptimizationDesigner:
             shift_analysis[team] = {'electrical': {}, 'mechanical': {}}
             
             for role in ['electrical', 'mechanical']:
-                rota_file = f'data/processed/parsed_rotas/parsed_team{team}_{"elec" if role == "electrical" else "mech"}_rota.json'
-                try:
-                    with open(rota_file, 'r') as f:
-                        rota_data = json.load(f)
-                        
-                    # Extend rotas to 36-week cycle for comprehensive coverage testing
-                    if role == 'electrical':
-                        # Electrical: 4 cycles (9 * 4 = 36 weeks)
-                        rota_data = self._extend_rota_to_weeks(rota_data, 36, f"Team {team} electrical")
-                    else:
-                        # Mechanical: 2 cycles (18 * 2 = 36 weeks)  
-                        rota_data = self._extend_rota_to_weeks(rota_data, 36, f"Team {team} mechanical")
-                    
-                    engineer_patterns = {}
-                    
-                    for week_key, week_data in rota_data.items():
-                        for engineer_id, shifts in week_data.items():
-                            if engineer_id not in engineer_patterns:
-                                engineer_patterns[engineer_id] = {
-                                    'early_days': 0,
-                                    'total_weekdays': 0,
-                                    'early_ratio': 0.0,
-                                    'weeks_available': 0
-                                }
-                            
-                            # Count early shifts Monday-Friday (critical for daily PPMs)
-                            early_count = 0
-                            weekday_count = 0
-                            for day_idx in range(min(5, len(shifts))):  # Mon-Fri only
-                                weekday_count += 1
-                                if shifts[day_idx] == 'E':
-                                    early_count += 1
-                            
-                            engineer_patterns[engineer_id]['early_days'] += early_count
-                            engineer_patterns[engineer_id]['total_weekdays'] += weekday_count
-                            engineer_patterns[engineer_id]['weeks_available'] += 1
-                    
-                    # Calculate early shift ratios
-                    for engineer_id, pattern in engineer_patterns.items():
-                        if pattern['total_weekdays'] > 0:
-                            pattern['early_ratio'] = pattern['early_days'] / pattern['total_weekdays']
-                    
-                    shift_analysis[team][role] = engineer_patterns
-                    
-                    print(f"   Team {team} {role}: Analyzed {len(engineer_patterns)} engineers")
-                    
-                except FileNotFoundError:
+                availability = self.context.availability[team][role]
+                if availability is None:
                     print(f"   ⚠️  Rota file not found for Team {team} {role}")
                     shift_analysis[team][role] = {}
+                    continue
+                
+                # Shift codes [engineer, week, day] over the 36-week rotation ('' = not on the rota that week)
+                shifts = availability['shifts']
+                weeks_available = (shifts[:, :, 0] != '').sum(axis=1)
+                weekdays = (shifts[:, :, :5] != '').sum(axis=(1, 2))
+                # Early shifts Monday-Friday (critical for daily PPMs)
+                early_days = (shifts[:, :, :5] == 'E').sum(axis=(1, 2))
+                
+                engineer_patterns = {}
+                for index, engineer_id in enumerate(availability['engineers']):
+                    engineer_patterns[engineer_id] = {
+                        'early_days': int(early_days[index]),
+                        'total_weekdays': int(weekdays[index]),
+                        'early_ratio': early_days[index] / weekdays[index] if weekdays[index] > 0 else 0.0,
+                        'weeks_available': int(weeks_available[index])
+                    }
+                
+                shift_analysis[team][role] = engineer_patterns
+                
+                print(f"   Team {team} {role}: Analyzed {len(engineer_patterns)} engineers over {shifts.shape[1]} weeks")
         
         return shift_analysis
     
@@ -225,260 +260,873 @@ class MILPOptimizationDesigner:
         for team in [1, 2]:
             print(f"\n🏢 TEAM {team} RIDE CLUSTERING MILP:")
             
-            # Get engineers and rides
-            elec_engineers = [eng for eng in self.engineers[team]['electrical'] if eng.get('active', True)]
-            mech_engineers = [eng for eng in self.engineers[team]['mechanical'] if not eng.get('vacancy', False)]
-            all_engineers = elec_engineers + mech_engineers
+            build_start = time.time()
+            if self.fast_mode:
+                # Symmetry rows and lazy rows only help branch and bound
+                model = self._build_ride_clustering_model(team, symmetry_breaking=False, lazy_coverage=False)
+            else:
+                model = self._build_ride_clustering_model(team)
+            build_time = time.time() - build_start
             
-            # Get team rides and their qualification requirements
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            random.seed(42)
+            if self.fast_mode:
+                print(f"   ⚡ Fast mode: rounding the LP relaxation...")
+                result = self._solve_ride_clustering_fast(model)
+            else:
+                # Solve with the configured backend (CBC by default)
+                print(f"   🔍 Solving Ride Clustering MILP with {self.solver_backend.describe()}...")
+                result = self._solve_ride_clustering_model(model)
             
-            ride_qualifications = self._get_ride_qualification_sets(team, team_rides)
+            status = result.status
+            print(f"   📊 Solution Status: {status} ({result.wall_time:.2f}s)")
             
-            print(f"   👥 Engineers: {len(elec_engineers)} electrical, {len(mech_engineers)} mechanical")
-            print(f"   🎢 Team Rides: {len(team_rides)} rides")
-            print(f"   📊 Problem Size: {len(all_engineers)} engineers × {len(team_rides)} rides")
+            if status != 'Optimal' and result.has_solution and not self.fast_mode and self.lns_time_budget > 0:
+                # Budget-limited solve: improve the incumbent rather than discarding it
+                result = self._improve_with_lns(model, result)
             
-            # Create MILP problem for ride clustering
-            prob = pulp.LpProblem(f"Team_{team}_Ride_Clustering_Optimization", pulp.LpMinimize)
+            self.solver_results[team] = result
+            self.solve_telemetry[team] = self._collect_solve_telemetry(model, result, build_time)
             
-            # DECISION VARIABLES: ride_assignment[engineer][ride] = 1 if engineer assigned to ride
-            ride_assignment = {}
-            for eng in all_engineers:
-                eng_id = eng['employee_code']
-                ride_assignment[eng_id] = {}
-                for ride_id in team_rides:
-                    ride_assignment[eng_id][ride_id] = pulp.LpVariable(f"ride_{eng_id}_{ride_id}", cat='Binary')
-            
-            # Fairness variables
-            max_rides = pulp.LpVariable("max_rides", lowBound=0, cat='Integer')
-            min_rides = pulp.LpVariable("min_rides", lowBound=0, cat='Integer')
-            
-            # OBJECTIVE: Ensure adequate redundancy for 18-week rotation coverage
-            total_rides = pulp.lpSum([
-                ride_assignment[eng['employee_code']][ride_id] 
-                for eng in all_engineers 
-                for ride_id in team_rides
+            if self.sensitivity_analysis and result.has_solution and not self.fast_mode:
+                print(f"   📐 Computing duals and reduced costs at the integer solution...")
+                self.sensitivity[team] = MILPSensitivityAnalysis(self, team, model)
+                self.solve_telemetry[team]['sensitivity'] = self.sensitivity[team].to_dict(top=10)
+            
+            if result.has_solution:
+                if status == 'Optimal':
+                    print(f"   ✅ Optimal ride clustering solution found!")
+                else:
+                    print(f"   ✅ Using best incumbent (objective {result.objective:.2f}, "
+                          f"gap {self._format_gap(result.gap)})")
+                matrices[team] = self._extract_ride_clustering_solution(
+                    model['ride_assignment'], model['all_engineers'], model['team_rides'],
+                    model['ride_qualifications'], team
+                )
+            else:
+                if result.message:
+                    print(f"   ⚠️  {result.message}")
+                print(f"   ⚠️  Falling back to heuristic for team {team}")
+                matrices[team] = self._heuristic_assignment(team, model['all_engineers'])
+        
+        return matrices
+    
+    def _build_ride_clustering_model(self, team, symmetry_breaking=None, lazy_coverage=None):
+        """Build the ride clustering MILP for a team without solving it
+        
+        Args:
+            team: Team number
+            symmetry_breaking: Override the designer's symmetry breaking setting
+            lazy_coverage: Override the designer's lazy coverage setting
+        """
+        # Get engineers and rides
+        elec_engineers = [eng for eng in self.engineers[team]['electrical'] if eng.get('active', True)]
+        mech_engineers = [eng for eng in self.engineers[team]['mechanical'] if not eng.get('vacancy', False)]
+        all_engineers = elec_engineers + mech_engineers
+        
+        # Get team rides and their qualification requirements
+        team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
+                     if info.get('team_responsible') == team]
+        
+        ride_qualifications = self._get_ride_qualification_sets(team, team_rides)
+        
+        print(f"   👥 Engineers: {len(elec_engineers)} electrical, {len(mech_engineers)} mechanical")
+        print(f"   🎢 Team Rides: {len(team_rides)} rides")
+        print(f"   📊 Problem Size: {len(all_engineers)} engineers × {len(team_rides)} rides")
+        
+        # Create MILP problem for ride clustering
+        prob = pulp.LpProblem(f"Team_{team}_Ride_Clustering_Optimization", pulp.LpMinimize)
+        
+        # PRESOLVE: drop engineer × ride pairs that can never contribute coverage
+        viable_rides, presolve_stats = self._presolve_ride_assignment(all_engineers, team_rides, ride_qualifications)
+        
+        # DECISION VARIABLES: ride_assignment[engineer][ride] = 1 if engineer assigned to ride
+        # (only viable pairs get a variable; a missing pair is fixed at 0)
+        ride_assignment = {}
+        for eng in all_engineers:
+            eng_id = eng['employee_code']
+            ride_assignment[eng_id] = {}
+            for ride_id in viable_rides[eng_id]:
+                ride_assignment[eng_id][ride_id] = pulp.LpVariable(f"ride_{eng_id}_{ride_id}", cat='Binary')
+        
+        # Fairness variables
+        max_rides = pulp.LpVariable("max_rides", lowBound=0, cat='Integer')
+        min_rides = pulp.LpVariable("min_rides", lowBound=0, cat='Integer')
+        
+        # OBJECTIVE: Ensure adequate redundancy for 18-week rotation coverage
+        total_rides = pulp.lpSum([
+            var
+            for eng in all_engineers 
+            for var in ride_assignment[eng['employee_code']].values()
+        ])
+        
+        # OBJECTIVE: Optimize for 100% coverage across 18-week rotation + fairness
+        # This incorporates the coverage validator logic directly into MILP
+        
+        # Objective: prioritize coverage adequacy, then fairness
+        prob += 10 * (max_rides - min_rides) + 0.01 * total_rides, "Coverage_Driven_Optimization"
+        
+        print(f"   🎯 Objective: Optimize for 100% coverage across 18-week rotation")
+        
+        # CONSTRAINTS
+        constraint_count = 0
+        
+        # 1. Fairness constraints: Track min/max rides per engineer
+        for eng in all_engineers:
+            eng_id = eng['employee_code']
+            engineer_role = eng.get('role', 'Electrical').lower()
+            
+            total_engineer_rides = pulp.lpSum(ride_assignment[eng_id].values())
+            prob += total_engineer_rides <= max_rides, f"Max_Rides_{eng_id}"
+            prob += total_engineer_rides >= min_rides, f"Min_Rides_{eng_id}"
+            
+            # BALANCED BLEND: Ensure reasonable complexity distribution per engineer
+            total_rides = pulp.lpSum(ride_assignment[eng_id].values())
+            
+            # Count rides by type for this engineer
+            type_a_rides_assigned = pulp.lpSum([
+                var
+                for ride_id, var in ride_assignment[eng_id].items()
+                if self.optimizer.rides_info[ride_id]['type'] == 'A'
+            ])
+            type_b_rides_assigned = pulp.lpSum([
+                var
+                for ride_id, var in ride_assignment[eng_id].items()
+                if self.optimizer.rides_info[ride_id]['type'] == 'B'
+            ])
+            type_c_rides_assigned = pulp.lpSum([
+                var
+                for ride_id, var in ride_assignment[eng_id].items()
+                if self.optimizer.rides_info[ride_id]['type'] == 'C'
             ])
             
-            # OBJECTIVE: Optimize for 100% coverage across 18-week rotation + fairness
-            # This incorporates the coverage validator logic directly into MILP
+            # BALANCED PROFILE CONSTRAINTS: Equal type access for all engineers
+            # If any engineer gets a ride type, ALL engineers should get that ride type
+            # This ensures fairness and better coverage through more qualifications
             
-            # Objective: prioritize coverage adequacy, then fairness
-            prob += 10 * (max_rides - min_rides) + 0.01 * total_rides, "Coverage_Driven_Optimization"
+            # Count available ride types for this team
+            team_type_a_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'A'])
+            team_type_b_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'B'])
+            team_type_c_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'C'])
             
-            print(f"   🎯 Objective: Optimize for 100% coverage across 18-week rotation")
+            # Store type assignment variables for global equality constraints (added later)
+            if 'type_assignments' not in locals():
+                # Will be used to enforce equal type distribution across all engineers
+                pass
             
-            # CONSTRAINTS
-            constraint_count = 0
+            # Role constraints: Engineers only get rides that have qualifications for their role
+            # (enforced by presolve - role-blocked pairs have no variable, so no Role_Block rows)
             
-            # 1. Fairness constraints: Track min/max rides per engineer
+            # RELAXED: Daily shift constraint removed to test feasibility  
+            # Coverage validator will test actual shift availability
+            
+            constraint_count += 2
+        
+        # GLOBAL EQUALITY CONSTRAINTS: Equal type distribution for all engineers
+        print(f"      Adding equal type distribution constraints...")
+        prev_constraint_count = constraint_count
+        
+        # Count available ride types for this team
+        team_type_a_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'A'])
+        team_type_b_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'B'])
+        team_type_c_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'C'])
+        
+        # Only add equality constraints for types that exist
+        if team_type_a_count > 0:
+            # All engineers should get the same number of Type A rides
+            type_a_counts = []
             for eng in all_engineers:
                 eng_id = eng['employee_code']
-                engineer_role = eng.get('role', 'Electrical').lower()
-                
-                total_engineer_rides = pulp.lpSum([ride_assignment[eng_id][ride_id] for ride_id in team_rides])
-                prob += total_engineer_rides <= max_rides, f"Max_Rides_{eng_id}"
-                prob += total_engineer_rides >= min_rides, f"Min_Rides_{eng_id}"
-                
-                # BALANCED BLEND: Ensure reasonable complexity distribution per engineer
-                total_rides = pulp.lpSum([ride_assignment[eng_id][ride_id] for ride_id in team_rides])
-                
-                # Count rides by type for this engineer
-                type_a_rides_assigned = pulp.lpSum([
-                    ride_assignment[eng_id][ride_id] 
-                    for ride_id in team_rides 
+                type_a_for_eng = pulp.lpSum([
+                    var
+                    for ride_id, var in ride_assignment[eng_id].items()
                     if self.optimizer.rides_info[ride_id]['type'] == 'A'
                 ])
-                type_b_rides_assigned = pulp.lpSum([
-                    ride_assignment[eng_id][ride_id] 
-                    for ride_id in team_rides 
+                type_a_counts.append(type_a_for_eng)
+            
+            # Set all Type A counts equal to the first engineer's count
+            if len(type_a_counts) > 1:
+                for i in range(1, len(type_a_counts)):
+                    prob += type_a_counts[0] == type_a_counts[i], f"EqualTypeA_{i}"
+                    constraint_count += 1
+        
+        if team_type_b_count > 0:
+            # All engineers should get the same number of Type B rides
+            type_b_counts = []
+            for eng in all_engineers:
+                eng_id = eng['employee_code']
+                type_b_for_eng = pulp.lpSum([
+                    var
+                    for ride_id, var in ride_assignment[eng_id].items()
                     if self.optimizer.rides_info[ride_id]['type'] == 'B'
                 ])
-                type_c_rides_assigned = pulp.lpSum([
-                    ride_assignment[eng_id][ride_id] 
-                    for ride_id in team_rides 
+                type_b_counts.append(type_b_for_eng)
+            
+            # Set all Type B counts equal to the first engineer's count
+            if len(type_b_counts) > 1:
+                for i in range(1, len(type_b_counts)):
+                    prob += type_b_counts[0] == type_b_counts[i], f"EqualTypeB_{i}"
+                    constraint_count += 1
+        
+        if team_type_c_count > 0:
+            # All engineers should get the same number of Type C rides
+            type_c_counts = []
+            for eng in all_engineers:
+                eng_id = eng['employee_code']
+                type_c_for_eng = pulp.lpSum([
+                    var
+                    for ride_id, var in ride_assignment[eng_id].items()
                     if self.optimizer.rides_info[ride_id]['type'] == 'C'
                 ])
-                
-                # BALANCED PROFILE CONSTRAINTS: Equal type access for all engineers
-                # If any engineer gets a ride type, ALL engineers should get that ride type
-                # This ensures fairness and better coverage through more qualifications
-                
-                # Count available ride types for this team
-                team_type_a_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'A'])
-                team_type_b_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'B'])
-                team_type_c_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'C'])
-                
-                # Store type assignment variables for global equality constraints (added later)
-                if 'type_assignments' not in locals():
-                    # Will be used to enforce equal type distribution across all engineers
-                    pass
-                
-                # Role constraints: Engineers only get rides that have qualifications for their role
-                for ride_id in team_rides:
-                    ride_quals = ride_qualifications[ride_id]
-                    
-                    # Check if this ride has any qualifications for this engineer's role
-                    has_role_qualifications = any(
-                        self._qualification_matches_role(qual, engineer_role) 
-                        for qual in ride_quals['all_qualifications']
-                    )
-                    
-                    # Only allow assignment if ride has qualifications for this engineer's role
-                    if not has_role_qualifications:
-                        prob += ride_assignment[eng_id][ride_id] == 0, f"Role_Block_{eng_id}_{ride_id}"
-                        constraint_count += 1
-                    
-                    # RELAXED: Daily shift constraint removed to test feasibility  
-                    # Coverage validator will test actual shift availability
-                
-                constraint_count += 2
+                type_c_counts.append(type_c_for_eng)
             
-            # GLOBAL EQUALITY CONSTRAINTS: Equal type distribution for all engineers
-            print(f"      Adding equal type distribution constraints...")
-            prev_constraint_count = constraint_count
-            
-            # Count available ride types for this team
-            team_type_a_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'A'])
-            team_type_b_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'B'])
-            team_type_c_count = len([r for r in team_rides if self.optimizer.rides_info[r]['type'] == 'C'])
+            # Set all Type C counts equal to the first engineer's count
+            if len(type_c_counts) > 1:
+                for i in range(1, len(type_c_counts)):
+                    prob += type_c_counts[0] == type_c_counts[i], f"EqualTypeC_{i}"
+                    constraint_count += 1
+        
+        print(f"         Equal type distribution: {constraint_count - prev_constraint_count} constraints added")
+        prev_constraint_count = constraint_count
+        
+        # SYMMETRY BREAKING: Order interchangeable engineers lexicographically
+        if self.symmetry_breaking if symmetry_breaking is None else symmetry_breaking:
+            constraint_count += self._add_symmetry_breaking_constraints(
+                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications
+            )
+        
+        # 2. MINIMAL Coverage constraints: Each ride needs at least 1 qualified engineer
+        # Let the MILP discover optimal redundancy rather than hardcoding minimums
+        for ride_id in team_rides:
+            ride_quals = ride_qualifications[ride_id]
+            ride_type = self.optimizer.rides_info[ride_id]['type']
+            has_daily = len(ride_quals['daily_qualifications']) > 0
             
-            # Only add equality constraints for types that exist
-            if team_type_a_count > 0:
-                # All engineers should get the same number of Type A rides
-                type_a_counts = []
-                for eng in all_engineers:
-                    eng_id = eng['employee_code']
-                    type_a_for_eng = pulp.lpSum([
-                        ride_assignment[eng_id][ride_id] 
-                        for ride_id in team_rides 
-                        if self.optimizer.rides_info[ride_id]['type'] == 'A'
-                    ])
-                    type_a_counts.append(type_a_for_eng)
-                
-                # Set all Type A counts equal to the first engineer's count
-                if len(type_a_counts) > 1:
-                    for i in range(1, len(type_a_counts)):
-                        prob += type_a_counts[0] == type_a_counts[i], f"EqualTypeA_{i}"
-                        constraint_count += 1
-            
-            if team_type_b_count > 0:
-                # All engineers should get the same number of Type B rides
-                type_b_counts = []
-                for eng in all_engineers:
-                    eng_id = eng['employee_code']
-                    type_b_for_eng = pulp.lpSum([
-                        ride_assignment[eng_id][ride_id] 
-                        for ride_id in team_rides 
-                        if self.optimizer.rides_info[ride_id]['type'] == 'B'
-                    ])
-                    type_b_counts.append(type_b_for_eng)
+            # Get engineers who can do this ride (by role)
+            available_engineers = []
+            for eng in all_engineers:
+                eng_id = eng['employee_code']
+                engineer_role = eng.get('role', 'Electrical').lower()
                 
-                # Set all Type B counts equal to the first engineer's count
-                if len(type_b_counts) > 1:
-                    for i in range(1, len(type_b_counts)):
-                        prob += type_b_counts[0] == type_b_counts[i], f"EqualTypeB_{i}"
-                        constraint_count += 1
-            
-            if team_type_c_count > 0:
-                # All engineers should get the same number of Type C rides
-                type_c_counts = []
-                for eng in all_engineers:
-                    eng_id = eng['employee_code']
-                    type_c_for_eng = pulp.lpSum([
-                        ride_assignment[eng_id][ride_id] 
-                        for ride_id in team_rides 
-                        if self.optimizer.rides_info[ride_id]['type'] == 'C'
-                    ])
-                    type_c_counts.append(type_c_for_eng)
+                # Check if engineer can handle qualifications for their role in this ride
+                role_qualifications = [qual for qual in ride_quals['all_qualifications'] 
+                                     if self._qualification_matches_role(qual, engineer_role)]
                 
-                # Set all Type C counts equal to the first engineer's count
-                if len(type_c_counts) > 1:
-                    for i in range(1, len(type_c_counts)):
-                        prob += type_c_counts[0] == type_c_counts[i], f"EqualTypeC_{i}"
-                        constraint_count += 1
+                # Only consider if there are qualifications for this engineer's role
+                if role_qualifications:
+                    available_engineers.append(eng_id)
             
-            print(f"         Equal type distribution: {constraint_count - prev_constraint_count} constraints added")
-            prev_constraint_count = constraint_count
-            
-            # 2. MINIMAL Coverage constraints: Each ride needs at least 1 qualified engineer
-            # Let the MILP discover optimal redundancy rather than hardcoding minimums
-            for ride_id in team_rides:
-                ride_quals = ride_qualifications[ride_id]
-                ride_type = self.optimizer.rides_info[ride_id]['type']
-                has_daily = len(ride_quals['daily_qualifications']) > 0
-                
-                # Get engineers who can do this ride (by role)
-                available_engineers = []
-                for eng in all_engineers:
-                    eng_id = eng['employee_code']
-                    engineer_role = eng.get('role', 'Electrical').lower()
-                    
-                    # Check if engineer can handle qualifications for their role in this ride
-                    role_qualifications = [qual for qual in ride_quals['all_qualifications'] 
-                                         if self._qualification_matches_role(qual, engineer_role)]
-                    
-                    # Only consider if there are qualifications for this engineer's role
-                    if role_qualifications:
-                        available_engineers.append(eng_id)
+            if available_engineers:
+                coverage_sum = pulp.lpSum([
+                    ride_assignment[eng_id][ride_id] 
+                    for eng_id in available_engineers
+                ])
+                # MINIMAL: Only require at least 1 qualified engineer per ride
+                # The coverage validator will test if this provides adequate 18-week coverage
+                prob += coverage_sum >= 1, f"Ride_Coverage_{ride_id}"
+                constraint_count += 1
                 
-                if available_engineers:
-                    coverage_sum = pulp.lpSum([
-                        ride_assignment[eng_id][ride_id] 
-                        for eng_id in available_engineers
-                    ])
-                    # MINIMAL: Only require at least 1 qualified engineer per ride
-                    # The coverage validator will test if this provides adequate 18-week coverage
-                    prob += coverage_sum >= 1, f"Ride_Coverage_{ride_id}"
-                    constraint_count += 1
-                    
-                    daily_marker = " (DAILY)" if has_daily else ""
-                    print(f"      {ride_id} (Type {ride_type}{daily_marker}): Needs ≥1 from {len(available_engineers)} available engineers")
-            
-            # 3. 18-WEEK ROTATION COVERAGE CONSTRAINTS
-            # Incorporate coverage validator logic directly into MILP constraints
-            print(f"      Adding 18-week rotation coverage constraints...")
+                daily_marker = " (DAILY)" if has_daily else ""
+                print(f"      {ride_id} (Type {ride_type}{daily_marker}): Needs ≥1 from {len(available_engineers)} available engineers")
+        
+        # 3. 18-WEEK ROTATION COVERAGE CONSTRAINTS
+        # Incorporate coverage validator logic directly into MILP constraints
+        print(f"      Adding 18-week rotation coverage constraints...")
+        lazy_rows = []
+        if self.lazy_coverage if lazy_coverage is None else lazy_coverage:
+            # Cutting-plane mode: start from a seed set, hold the rest back for _solve_ride_clustering_model
+            coverage_rows = self._rotation_coverage_rows(all_engineers, team, team_rides, presolve_stats)
+            seed_rows, lazy_rows = self._split_lazy_seed_rows(coverage_rows)
+            constraint_count += self._add_coverage_rows(prob, ride_assignment, seed_rows)
+            print(f"         Lazy coverage: {len(seed_rows)} seed rows added, {len(lazy_rows)} held back")
+        else:
             constraint_count += self._add_rotation_coverage_constraints(
-                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications
+                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications, presolve_stats
             )
-            
-            print(f"   🔒 Added {constraint_count} constraints")
-            
-            # Solve with CBC
-            print(f"   🔍 Solving Ride Clustering MILP (5min timeout, 3% optimality gap)...")
-            
-            solver = pulp.PULP_CBC_CMD(
-                msg=1,
-                options=[
-                    'sec 300',           # 5 minute time limit
-                    'ratio 0.03',        # 3% optimality gap
-                    'strategy 1',        # More thorough branch-and-bound
-                    'cuts on',           # Enable cutting planes
-                    'heuristics on',     # Enable heuristics
-                    'preprocess on',     # Enable preprocessing
-                    'threads 0'          # Use all cores
-                ]
-            )
-            
-            import random
-            random.seed(42)
-            prob.solve(solver)
-            
-            status = pulp.LpStatus[prob.status]
-            print(f"   📊 Solution Status: {status}")
-            
-            if status == 'Optimal':
-                print(f"   ✅ Optimal ride clustering solution found!")
-                matrices[team] = self._extract_ride_clustering_solution(
-                    ride_assignment, all_engineers, team_rides, ride_qualifications, team
+        
+        print(f"   🔒 Added {constraint_count} constraints")
+        
+        return {
+            'prob': prob,
+            'ride_assignment': ride_assignment,
+            'presolve_stats': presolve_stats,
+            'max_rides': max_rides,
+            'min_rides': min_rides,
+            'all_engineers': all_engineers,
+            'team_rides': team_rides,
+            'ride_qualifications': ride_qualifications,
+            'constraint_count': constraint_count,
+            'lazy_rows': lazy_rows
+        }
+    
+    def _presolve_ride_assignment(self, all_engineers, team_rides, ride_qualifications):
+        """Domain presolve: find the engineer × ride pairs worth a variable
+        
+        A pair whose ride has no qualifications for the engineer's role can never
+        contribute coverage, so it gets no variable instead of a variable plus a
+        Role_Block row.
+        
+        Returns:
+            ({eng_id: [viable ride_ids]}, presolve stats)
+        """
+        viable_rides = {}
+        for eng in all_engineers:
+            engineer_role = eng.get('role', 'Electrical').lower()
+            viable_rides[eng['employee_code']] = [
+                ride_id for ride_id in team_rides
+                if any(self._qualification_matches_role(qual, engineer_role)
+                       for qual in ride_qualifications[ride_id]['all_qualifications'])
+            ]
+        
+        total_pairs = len(all_engineers) * len(team_rides)
+        kept_pairs = sum(len(rides) for rides in viable_rides.values())
+        stats = {
+            'candidate_variables': total_pairs,
+            'variables_pruned': total_pairs - kept_pairs,
+            'role_block_rows_avoided': total_pairs - kept_pairs,
+            'engineers_without_rides': sorted(eng_id for eng_id, rides in viable_rides.items() if not rides)
+        }
+        print(f"   🧹 Presolve: {stats['variables_pruned']} of {total_pairs} assignment variables pruned "
+              f"(role has no qualifications on the ride)")
+        return viable_rides, stats
+    
+    def _never_early_engineers(self, all_engineers, elec_rota, mech_rota):
+        """Engineers never on an Early shift Mon-Fri anywhere in the rota horizon
+        
+        They can never appear in a daily coverage row, so they are left out of
+        the daily row scan entirely.
+        """
+        never_early = []
+        for eng in all_engineers:
+            eng_id = eng['employee_code']
+            rota = elec_rota if eng.get('role', 'Electrical').lower() == 'electrical' else mech_rota
+            if not any(eng_id in week and 'E' in week[eng_id][:5] for week in rota.values()):
+                never_early.append(eng_id)
+        return never_early
+    
+    def _solve_ride_clustering_model(self, model):
+        """Solve a built model, generating held-back coverage rows as cutting planes
+        
+        With lazy coverage the incumbent is checked against every held-back row;
+        each round adds the held-back rows of every week (or month) with a
+        violated row, and the model is re-solved warm from the previous
+        incumbent until no violations remain. The final solution
+        satisfies every coverage row, so it is optimal for the full model.
+        """
+        prob = model['prob']
+        ride_assignment = model['ride_assignment']
+        pending_rows = model.get('lazy_rows', [])
+        
+        result = self.solver_backend.solve(prob)
+        if not pending_rows:
+            return result
+        
+        total_time = result.wall_time
+        rounds = 0
+        rows_added = 0
+        while result.status == 'Optimal' and pending_rows:
+            violated_rows, pending_rows = self._find_violated_coverage_rows(ride_assignment, pending_rows)
+            if not violated_rows:
+                break
+            violated_rows, pending_rows = self._expand_to_violated_periods(violated_rows, pending_rows)
+            
+            rounds += 1
+            if rounds > self.LAZY_MAX_ROUNDS:
+                # Stop cutting and fall back to the full model for a guaranteed finish
+                violated_rows = violated_rows + pending_rows
+                pending_rows = []
+            
+            rows_added += self._add_coverage_rows(prob, ride_assignment, violated_rows)
+            print(f"   ✂️  Lazy round {rounds}: added {len(violated_rows)} coverage rows, re-solving warm...")
+            result = self.solver_backend.solve(prob, warm_start=True)
+            total_time += result.wall_time
+        
+        if pending_rows and result.status != 'Optimal' and result.has_solution:
+            # Stopped on a limit mid-loop: complete the model so the incumbent is judged against every row
+            violated_rows, _ = self._find_violated_coverage_rows(ride_assignment, pending_rows)
+            rows_added += self._add_coverage_rows(prob, ride_assignment, pending_rows)
+            pending_rows = []
+            if violated_rows:
+                result.has_solution = False
+        
+        # Report the cumulative time of all rounds as the solve time
+        result.wall_time = total_time
+        model['lazy_rows'] = pending_rows
+        model['lazy_stats'] = {
+            'rounds': rounds,
+            'rows_added': rows_added,
+            'rows_never_added': len(pending_rows),
+            'final_constraints': len(prob.constraints)
+        }
+        print(f"   ✂️  Lazy coverage finished after {rounds} round(s): {rows_added} rows added, "
+              f"{len(pending_rows)} never needed ({len(prob.constraints)} constraints in final model)")
+        return result
+    
+    def _improve_with_lns(self, model, result):
+        """Large neighbourhood search starting from the solver's incumbent
+        
+        Each iteration frees the assignment variables of a random subset of
+        engineers (or of rides), fixes every other variable at the incumbent and
+        re-solves the small sub-MILP warm from the incumbent. Improvements are
+        kept; the search stops at the wall-clock budget (lns_time_budget), the
+        iteration cap, after LNS_MAX_STALLS consecutive non-improving iterations
+        or once the incumbent is within the gap of the solver's bound.
+        Neighbourhoods grow by one engineer/ride per non-improving iteration.
+        """
+        prob = model['prob']
+        ride_assignment = model['ride_assignment']
+        engineer_ids = list(ride_assignment.keys())
+        rides_by_type = defaultdict(list)
+        for ride_id in model['team_rides']:
+            rides_by_type[self.optimizer.rides_info[ride_id]['type']].append(ride_id)
+        
+        sub_backend = copy.copy(self.solver_backend)
+        sub_backend.msg = False
+        sub_backend.gap_rel = 0
+        
+        print(f"   🔄 LNS: improving incumbent {result.objective:.2f} "
+              f"(bound {self._format_bound(result.best_bound)}) for up to {self.lns_time_budget:g}s...")
+        
+        best_objective = result.objective
+        best_values = {var.name: var.varValue for var in prob.variables()}
+        rng = random.Random(42)
+        start = time.time()
+        iterations = 0
+        improvements = 0
+        stalled = 0  # Consecutive non-improving iterations; widens the neighbourhoods
+        trajectory = []
+        
+        while iterations < self.LNS_MAX_ITERATIONS and stalled < self.LNS_MAX_STALLS:
+            remaining = self.lns_time_budget - (time.time() - start)
+            if remaining <= 0:
+                break
+            gap = self._objective_gap(best_objective, result.best_bound)
+            if gap is not None and gap <= (self.solver_backend.gap_rel or 0):
+                break
+            
+            iterations += 1
+            if iterations % 2:
+                freed = set(rng.sample(engineer_ids, min(self.LNS_FREE_ENGINEERS + stalled, len(engineer_ids))))
+                is_free = lambda eng_id, ride_id: eng_id in freed
+            else:
+                # Rides of one type, since every engineer must hold the same number of each type
+                ride_type = rng.choice(sorted(rides_by_type))
+                candidates = rides_by_type[ride_type]
+                freed = set(rng.sample(candidates, min(self.LNS_FREE_RIDES + stalled, len(candidates))))
+                is_free = lambda eng_id, ride_id: ride_id in freed
+            
+            # Fix everything outside the neighbourhood at the incumbent
+            for eng_id, rides in ride_assignment.items():
+                for ride_id, var in rides.items():
+                    if is_free(eng_id, ride_id):
+                        var.lowBound, var.upBound = 0, 1
+                    else:
+                        var.lowBound = var.upBound = round(best_values[var.name])
+            
+            sub_backend.time_limit = min(self.LNS_SUBPROBLEM_TIME_LIMIT, remaining)
+            sub_result = sub_backend.solve(prob, warm_start=True)
+            
+            if sub_result.has_solution and sub_result.objective < best_objective - 1e-6:
+                best_objective = sub_result.objective
+                best_values = {var.name: var.varValue for var in prob.variables()}
+                improvements += 1
+                stalled = 0
+                trajectory.append({'time': round(result.wall_time + time.time() - start, 4),
+                                   'incumbent': best_objective, 'bound': result.best_bound})
+                print(f"      LNS iteration {iterations}: improved to {best_objective:.2f}")
+            else:
+                stalled += 1
+            
+            # Restore the incumbent (a failed sub-solve may leave partial values)
+            for var in prob.variables():
+                var.varValue = best_values[var.name]
+        
+        # Release the neighbourhood fixings so the model is the original again
+        for rides in ride_assignment.values():
+            for var in rides.values():
+                var.lowBound, var.upBound = 0, 1
+        
+        lns_time = time.time() - start
+        model['lns_stats'] = {
+            'iterations': iterations,
+            'improvements': improvements,
+            'stopped_on_stall': stalled >= self.LNS_MAX_STALLS,
+            'time_budget': self.lns_time_budget,
+            'start_objective': result.objective,
+            'final_objective': best_objective,
+            'time': round(lns_time, 4)
+        }
+        print(f"   🔄 LNS finished: {result.objective:.2f} → {best_objective:.2f} "
+              f"after {iterations} iteration(s) in {lns_time:.1f}s")
+        
+        result.objective = best_objective
+        result.gap = self._objective_gap(best_objective, result.best_bound)
+        result.trajectory = result.trajectory + trajectory
+        result.wall_time += lns_time
+        return result
+    
+    def _objective_gap(self, objective, bound):
+        """Relative gap between an incumbent objective and a lower bound"""
+        if objective is None or bound is None:
+            return None
+        return abs(objective - bound) / max(abs(objective), 1e-10)
+    
+    def _format_gap(self, gap):
+        return f"{gap * 100:.1f}%" if gap is not None else "unknown"
+    
+    def _format_bound(self, bound):
+        return f"{bound:.2f}" if bound is not None else "unknown"
+    
+    def _solve_ride_clustering_fast(self, model):
+        """Fast mode: LP relaxation, type-balanced dependent rounding, greedy coverage repair
+        
+        The LP objective is a lower bound on the MILP optimum, so the reported gap
+        says how far from optimal the rounded answer can be. A rounded answer that
+        satisfies every row is reported like a time-limited incumbent ('Not Solved'
+        with an objective); one that repair could not make feasible is returned
+        without an objective so the caller falls back to the heuristic.
+        """
+        prob = model['prob']
+        start = time.time()
+        
+        lp_result = self.solver_backend.solve_relaxation(prob)
+        lp_time = time.time() - start
+        if lp_result.objective is None:
+            print(f"   ⚠️  LP relaxation {lp_result.status}")
+            return lp_result
+        
+        rng = random.Random(self.FAST_MODE_SEED)
+        lp_values = {
+            (eng_id, ride_id): var.varValue or 0.0
+            for eng_id, rides in model['ride_assignment'].items()
+            for ride_id, var in rides.items()
+        }
+        assignment = self._round_lp_assignment(model, lp_values, rng)
+        repair_stats = self._repair_rounded_coverage(model, assignment, lp_values)
+        
+        # Write the integer solution back so extraction and telemetry see it
+        for (eng_id, ride_id), var in self._assignment_variables(model).items():
+            var.varValue = 1 if (eng_id, ride_id) in assignment else 0
+        ride_counts = Counter(eng_id for eng_id, _ in assignment)
+        totals = [ride_counts[eng_id] for eng_id in model['ride_assignment']]
+        model['max_rides'].varValue = max(totals)
+        model['min_rides'].varValue = min(totals)
+        violated = [name for name, constraint in prob.constraints.items() if not constraint.valid(1e-6)]
+        
+        objective = pulp.value(prob.objective)
+        lp_bound = lp_result.objective
+        gap = self._objective_gap(objective, lp_bound)
+        wall_time = time.time() - start
+        
+        model['fast_stats'] = {
+            'lp_bound': lp_bound,
+            'lp_time': round(lp_time, 4),
+            'rounding_time': round(wall_time - lp_time, 4),
+            'repair_swaps': repair_stats['swaps'],
+            'repair_additions': repair_stats['additions'],
+            'rounded_objective': objective,
+            'violated_constraints': len(violated)
+        }
+        print(f"   ⚡ LP bound {lp_bound:.2f} ({lp_time:.2f}s), rounded objective {objective:.2f} "
+              f"(gap to LP bound {self._format_gap(gap)})")
+        print(f"   🔧 Coverage repair: {repair_stats['swaps']} swaps, {repair_stats['additions']} additions, "
+              f"{len(violated)} constraints still violated")
+        
+        if violated:
+            # An infeasible assignment must not be exported as an incumbent
+            return SolverResult(f"{self.solver_backend.name}-fast", 'Not Solved',
+                                best_bound=lp_bound, wall_time=wall_time,
+                                trajectory=[{'time': round(lp_time, 4), 'incumbent': None, 'bound': lp_bound}],
+                                message=f"{len(violated)} constraints violated after repair")
+        return SolverResult(f"{self.solver_backend.name}-fast", 'Not Solved', objective=objective,
+                            best_bound=lp_bound, gap=gap, wall_time=wall_time,
+                            trajectory=[{'time': round(lp_time, 4), 'incumbent': None, 'bound': lp_bound},
+                                        {'time': round(wall_time, 4), 'incumbent': objective, 'bound': lp_bound}])
+    
+    def _assignment_variables(self, model):
+        """Flat {(eng_id, ride_id): variable} view of the ride assignment variables"""
+        return {
+            (eng_id, ride_id): var
+            for eng_id, rides in model['ride_assignment'].items()
+            for ride_id, var in rides.items()
+        }
+    
+    def _round_lp_assignment(self, model, lp_values, rng):
+        """Dependent rounding that keeps every engineer's Type A/B/C counts equal
+        
+        The EqualType rows give every engineer the same fractional mass per ride
+        type; it is rounded up to a shared count and each engineer then draws
+        exactly that many rides of the type by systematic sampling, with
+        inclusion probabilities proportional to the LP values.
+        """
+        allowed = {eng_id: list(rides) for eng_id, rides in model['ride_assignment'].items()}
+        rides_by_type = defaultdict(list)
+        for ride_id in model['team_rides']:
+            rides_by_type[self.optimizer.rides_info[ride_id]['type']].append(ride_id)
+        
+        assignment = set()
+        for ride_type, type_rides in sorted(rides_by_type.items()):
+            masses = [sum(lp_values.get((eng_id, ride_id), 0.0) for ride_id in type_rides) for eng_id in allowed]
+            type_count = int(np.ceil(np.mean(masses) - 1e-6))
+            
+            for eng_id, eng_rides in allowed.items():
+                candidates = [ride_id for ride_id in type_rides if ride_id in eng_rides]
+                weights = {ride_id: lp_values[(eng_id, ride_id)] for ride_id in candidates}
+                for ride_id in self._systematic_sample(weights, type_count, rng):
+                    assignment.add((eng_id, ride_id))
+        return assignment
+    
+    def _systematic_sample(self, weights, count, rng):
+        """Pick exactly `count` keys with inclusion probability proportional to weight (capped at 1)"""
+        keys = sorted(weights)
+        if count >= len(keys):
+            return keys
+        if count <= 0:
+            return []
+        
+        # Small floor so rides the LP left at zero can still fill the count
+        probabilities = {key: max(weights[key], 0.0) + 1e-3 for key in keys}
+        capped = set()
+        while True:
+            free_mass = sum(probabilities[key] for key in keys if key not in capped)
+            scale = (count - len(capped)) / free_mass
+            newly_capped = {key for key in keys if key not in capped and probabilities[key] * scale >= 1}
+            if not newly_capped:
+                break
+            capped |= newly_capped
+            for key in newly_capped:
+                probabilities[key] = 1.0
+        for key in keys:
+            if key not in capped:
+                probabilities[key] *= scale
+        
+        chosen = []
+        cumulative = 0.0
+        point = rng.random()
+        for key in keys:
+            cumulative += probabilities[key]
+            while point < cumulative - 1e-12 and len(chosen) < count:
+                if not chosen or chosen[-1] != key:
+                    chosen.append(key)
+                point += 1
+        return chosen
+    
+    def _repair_rounded_coverage(self, model, assignment, lp_values):
+        """Greedily repair coverage rows the rounding left short
+        
+        A short row is first fixed by a swap within one engineer's same-type rides
+        that leaves every other coverage row satisfied. If no such swap exists
+        the ride is added and every engineer is topped up with their best ride of
+        that type, so type counts stay equal and coverage only grows.
+        """
+        variable_keys = {var.name: key for key, var in self._assignment_variables(model).items()}
+        allowed = {eng_id: set(rides) for eng_id, rides in model['ride_assignment'].items()}
+        ride_type = {ride_id: self.optimizer.rides_info[ride_id]['type'] for ride_id in model['team_rides']}
+        
+        rows = []
+        rows_by_key = defaultdict(list)
+        for name, constraint in model['prob'].constraints.items():
+            if not name.startswith(self.FAST_MODE_COVERAGE_FAMILIES):
+                continue
+            terms = [(variable_keys[var.name], coef) for var, coef in constraint.items() if coef]
+            for key, coef in terms:
+                rows_by_key[key].append((len(rows), coef))
+            rows.append({'terms': terms, 'required': -constraint.constant})
+        
+        coverage = [sum(coef for key, coef in row['terms'] if key in assignment) for row in rows]
+        
+        def apply(key, sign):
+            for row_index, coef in rows_by_key[key]:
+                coverage[row_index] += sign * coef
+            if sign > 0:
+                assignment.add(key)
+            else:
+                assignment.discard(key)
+        
+        def removable(key):
+            return all(coverage[row_index] - coef >= rows[row_index]['required'] - 1e-9
+                       for row_index, coef in rows_by_key[key])
+        
+        stats = {'swaps': 0, 'additions': 0}
+        for row_index, row in enumerate(rows):
+            while coverage[row_index] < row['required'] - 1e-9:
+                candidates = sorted(
+                    (key for key, _ in row['terms'] if key not in assignment and key[1] in allowed[key[0]]),
+                    key=lambda key: -lp_values[key]
                 )
+                if not candidates:
+                    break
+                
+                swap = None
+                for eng_id, ride_id in candidates:
+                    held = sorted(
+                        ((eng_id, other) for other in allowed[eng_id]
+                         if (eng_id, other) in assignment and ride_type[other] == ride_type[ride_id]),
+                        key=lambda key: lp_values[key]
+                    )
+                    swap = next((((eng_id, ride_id), key) for key in held if removable(key)), None)
+                    if swap:
+                        break
+                
+                if swap:
+                    apply(swap[1], -1)
+                    apply(swap[0], +1)
+                    stats['swaps'] += 1
+                    continue
+                
+                # No harmless swap: add the best candidate and keep type counts equal
+                eng_id, ride_id = candidates[0]
+                apply((eng_id, ride_id), +1)
+                stats['additions'] += 1
+                target = sum(1 for other in allowed[eng_id]
+                             if (eng_id, other) in assignment and ride_type[other] == ride_type[ride_id])
+                for other_eng, other_rides in allowed.items():
+                    same_type = [other for other in other_rides if ride_type[other] == ride_type[ride_id]]
+                    held = sum(1 for other in same_type if (other_eng, other) in assignment)
+                    spare = sorted((other for other in same_type if (other_eng, other) not in assignment),
+                                   key=lambda other: -lp_values[(other_eng, other)])
+                    for other in spare[:max(target - held, 0)]:
+                        apply((other_eng, other), +1)
+                        stats['additions'] += 1
+        return stats
+    
+    def _collect_solve_telemetry(self, model, result, build_time):
+        """Structured record of one ride clustering solve for regression tracking"""
+        return {
+            'backend': result.backend,
+            'status': result.status,
+            'model': describe_model(model['prob'], self.CONSTRAINT_FAMILIES),
+            'build_time': round(build_time, 4),
+            'solve_time': round(result.wall_time, 4),
+            'presolve': result.presolve,
+            'objective': result.objective,
+            'best_bound': result.best_bound,
+            'final_gap': result.gap,
+            'nodes': result.nodes,
+            'trajectory': result.trajectory,
+            'lazy_coverage': model.get('lazy_stats'),
+            'lns': model.get('lns_stats'),
+            'fast_mode': model.get('fast_stats'),
+            'model_presolve': model.get('presolve_stats'),
+            'symmetry_breaking': self.symmetry_breaking
+        }
+    
+    def get_solve_telemetry(self):
+        """Solve telemetry for the last run, keyed by team, ready to be saved as JSON"""
+        if not self.solve_telemetry:
+            return None
+        return {
+            'created_timestamp': datetime.now().isoformat(),
+            'solver': self.solver_backend.name,
+            'time_limit': self.solver_backend.time_limit,
+            'gap_rel': self.solver_backend.gap_rel,
+            'teams': self.solve_telemetry
+        }
+    
+    def get_sensitivity(self, team):
+        """Sensitivity analysis for a team's last solve (None unless sensitivity_analysis is on)"""
+        return self.sensitivity.get(team)
+    
+    def _split_lazy_seed_rows(self, coverage_rows):
+        """Split coverage rows into the seed set (first weeks/month) and the held-back pool
+        
+        Rotas repeat every 9 (electrical) or 18 (mechanical) weeks, so many rows
+        are exact duplicates of an earlier one; only the first copy is kept.
+        """
+        seed_rows = []
+        held_back = []
+        seen = set()
+        for family, rows in coverage_rows.items():
+            for row in rows:
+                row_key = (row['ride_id'], tuple(sorted(row['engineers'])), row['required'])
+                if row_key in seen:
+                    continue
+                seen.add(row_key)
+                
+                period = row['month'] if family == 'monthly' else row['week']
+                if period <= self.LAZY_SEED_WEEKS:
+                    seed_rows.append(row)
+                else:
+                    held_back.append(row)
+        return seed_rows, held_back
+    
+    def _expand_to_violated_periods(self, violated_rows, pending_rows):
+        """Violated rows plus every pending row of the same family and week (or month)
+        
+        A violated week usually has further rows that the next incumbent would
+        violate, so adding the whole period at once saves cutting rounds.
+        """
+        def period(row):
+            return ('monthly', row['month']) if 'month' in row else ('weekly', row['week'])
+        
+        periods = {period(row) for row in violated_rows}
+        added = list(violated_rows)
+        remaining = []
+        for row in pending_rows:
+            (added if period(row) in periods else remaining).append(row)
+        return added, remaining
+    
+    def _find_violated_coverage_rows(self, ride_assignment, rows):
+        """Check the incumbent against coverage rows, returning (violated, satisfied)"""
+        violated = []
+        satisfied = []
+        for row in rows:
+            covered = sum(ride_assignment[eng_id][row['ride_id']].varValue or 0 for eng_id in row['engineers']
+                          if row['ride_id'] in ride_assignment[eng_id])
+            if covered < row['required'] - 1e-6:
+                violated.append(row)
             else:
-                print(f"   ⚠️  Falling back to heuristic for team {team}")
-                matrices[team] = self._heuristic_assignment(team, all_engineers)
+                satisfied.append(row)
+        return violated, satisfied
+    
+    def _detect_equivalence_classes(self, team, all_engineers):
+        """Group engineers who are interchangeable in the ride clustering model
         
-        return matrices
+        Engineers with the same role, rota line and identical shift sequence
+        appear in exactly the same rows of the model, so any permutation of
+        their ride assignments is an equally good solution.
+        
+        Returns:
+            List of (role, [employee codes]) for classes with 2+ members
+        """
+        classes = defaultdict(list)
+        for eng in all_engineers:
+            eng_id = eng['employee_code']
+            engineer_role = eng.get('role', 'Electrical').lower()
+            
+            # Extended rotas cycle the base rota, so comparing base weeks is sufficient
+            shift_pattern = self.context.shift_pattern(team, engineer_role, eng_id)
+            
+            classes[(engineer_role, eng.get('rota_number'), shift_pattern)].append(eng_id)
+        
+        return [(key[0], members) for key, members in classes.items() if len(members) > 1]
+    
+    def _add_symmetry_breaking_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications):
+        """Order each class of interchangeable engineers lexicographically by ride assignment"""
+        equivalence_classes = self._detect_equivalence_classes(team, all_engineers)
+        constraint_count = 0
+        
+        for engineer_role, members in equivalence_classes:
+            # Only rides the class can actually be assigned (others are role-blocked)
+            role_rides = [ride_id for ride_id in team_rides
+                         if any(self._qualification_matches_role(qual, engineer_role)
+                                for qual in ride_qualifications[ride_id]['all_qualifications'])]
+            prefix = role_rides[:self.SYMMETRY_PREFIX_RIDES]
+            if not prefix:
+                continue
+            
+            # Binary-weighted prefix sums compare assignment vectors lexicographically
+            weights = {ride_id: 2 ** (len(prefix) - 1 - i) for i, ride_id in enumerate(prefix)}
+            for leader, follower in zip(members, members[1:]):
+                prob += (
+                    pulp.lpSum(weights[r] * ride_assignment[leader][r] for r in prefix) >=
+                    pulp.lpSum(weights[r] * ride_assignment[follower][r] for r in prefix)
+                ), f"Symmetry_Lex_{leader}_{follower}"
+                constraint_count += 1
+        
+        engineers_in_classes = sum(len(members) for _, members in equivalence_classes)
+        print(f"         Symmetry breaking: {len(equivalence_classes)} interchangeable classes "
+              f"({engineers_in_classes} engineers), {constraint_count} constraints added")
+        return constraint_count
     
     def _intelligent_heuristic_optimization(self):
         """Intelligent heuristic that mimics MILP objectives"""
@@ -665,23 +1313,33 @@ class MILPOptimizationDesigner:
         
         return available
     
-    def _add_rotation_coverage_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications):
+    def _add_rotation_coverage_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications,
+                                           presolve_stats=None):
         """Add 36-week rotation coverage constraints to ensure 100% coverage"""
-        import pulp
-        import json
-        import math
+        coverage_rows = self._rotation_coverage_rows(all_engineers, team, team_rides, presolve_stats)
         
         constraint_count = 0
+        for family in ['daily', 'weekly', 'monthly']:
+            constraint_count += self._add_coverage_rows(prob, ride_assignment, coverage_rows[family])
+        
+        return constraint_count
+    
+    def _rotation_coverage_rows(self, all_engineers, team, team_rides, presolve_stats=None):
+        """Build the 36-week rotation coverage rows as specs, grouped by family
+        
+        Each row is a dict with 'name', 'family', 'week', 'ride_id', 'engineers'
+        and 'required': sum of ride_assignment[eng][ride_id] over engineers >= required.
+        Engineers never on Early Mon-Fri are left out of the daily scan and
+        counted in presolve_stats when given.
+        """
+        coverage_rows = {'daily': [], 'weekly': [], 'monthly': []}
         
         try:
             # Load rota data for this team
-            elec_rota_file = f'data/processed/parsed_rotas/parsed_team{team}_elec_rota.json'
-            mech_rota_file = f'data/processed/parsed_rotas/parsed_team{team}_mech_rota.json'
-            
-            with open(elec_rota_file, 'r') as f:
-                elec_rota = json.load(f)
-            with open(mech_rota_file, 'r') as f:
-                mech_rota = json.load(f)
+            elec_rota = self.context.rota(team, 'electrical')
+            mech_rota = self.context.rota(team, 'mechanical')
+            if elec_rota is None or mech_rota is None:
+                raise FileNotFoundError(f"parsed rotas for team {team}")
                 
             # Extend rotas to 36-week cycle for constraint testing
             elec_rota = self._extend_rota_to_weeks(elec_rota, 36, "Constraint electrical")
@@ -690,35 +1348,51 @@ class MILPOptimizationDesigner:
             print(f"         Extended rota data: {len(elec_rota)} elec weeks, {len(mech_rota)} mech weeks")
             
             # 3a. DAILY PPM COVERAGE CONSTRAINTS (36-week rotation)
-            constraint_count += self._add_daily_coverage_constraints(
-                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications, 
-                elec_rota, mech_rota
+            never_early = self._never_early_engineers(all_engineers, elec_rota, mech_rota)
+            early_engineers = [eng for eng in all_engineers if eng['employee_code'] not in never_early]
+            if presolve_stats is not None:
+                presolve_stats['never_early_engineers'] = len(never_early)
+            print(f"         Presolve: {len(never_early)} engineers never on Early Mon-Fri left out of daily rows")
+            coverage_rows['daily'] = self._daily_coverage_rows(
+                early_engineers, team, team_rides, elec_rota, mech_rota
             )
+            print(f"         Daily coverage constraints: {len(coverage_rows['daily'])}")
             
             # 3b. WEEKLY PPM COVERAGE CONSTRAINTS (36-week rotation)  
-            constraint_count += self._add_weekly_coverage_constraints(
-                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications,
-                elec_rota, mech_rota
+            coverage_rows['weekly'] = self._weekly_coverage_rows(
+                all_engineers, team, team_rides, elec_rota, mech_rota
             )
+            print(f"         Weekly coverage constraints: {len(coverage_rows['weekly'])}")
             
             # 3c. MONTHLY PPM COVERAGE CONSTRAINTS (36-week rotation)
-            constraint_count += self._add_monthly_coverage_constraints(
-                prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications,
-                elec_rota, mech_rota
+            coverage_rows['monthly'] = self._monthly_coverage_rows(
+                all_engineers, team, team_rides, elec_rota, mech_rota
             )
+            months_tested = len(set(row['month'] for row in coverage_rows['monthly']))
+            print(f"         Monthly coverage constraints: {len(coverage_rows['monthly'])} (across {months_tested} months)")
             
         except FileNotFoundError as e:
             print(f"         ⚠️  Warning: Rota files not found for team {team}: {e}")
             print(f"         Skipping rotation coverage constraints")
         
-        return constraint_count
+        return coverage_rows
+    
+    def _add_coverage_rows(self, prob, ride_assignment, rows):
+        """Add coverage row specs to the problem as >= constraints"""
+        for row in rows:
+            coverage_sum = pulp.lpSum([
+                ride_assignment[eng_id][row['ride_id']] 
+                for eng_id in row['engineers']
+                if row['ride_id'] in ride_assignment[eng_id]
+            ])
+            prob += coverage_sum >= row['required'], row['name']
+        return len(rows)
     
-    def _add_daily_coverage_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications, elec_rota, mech_rota):
-        """Add daily PPM coverage constraints for 36-week rotation"""
-        import pulp
+    def _daily_coverage_rows(self, all_engineers, team, team_rides, elec_rota, mech_rota):
+        """Daily PPM coverage rows for 36-week rotation"""
         import math
         
-        constraint_count = 0
+        rows = []
         
         # Get all daily PPMs for this team
         team_daily_ppms = {}
@@ -727,7 +1401,7 @@ class MILPOptimizationDesigner:
                 team_daily_ppms[ride_id] = self.optimizer.ppms_by_type['daily'][ride_id]['ppms']
         
         if not team_daily_ppms:
-            return 0
+            return rows
         
         # Test across 36 weeks (2 mech rotations, 4 elec rotations)
         max_weeks = min(len(mech_rota), 36)
@@ -799,23 +1473,21 @@ class MILPOptimizationDesigner:
                         
                         # Ensure enough qualified engineers are assigned to this ride
                         if available_qualified:
-                            coverage_sum = pulp.lpSum([
-                                ride_assignment[eng_id][ride_id] 
-                                for eng_id in available_qualified
-                            ])
-                            
-                            constraint_name = f"Daily_Coverage_W{week_num}_D{day_idx}_{ride_id}_{maintenance_type}"
-                            prob += coverage_sum >= engineers_needed, constraint_name
-                            constraint_count += 1
-        
-        print(f"         Daily coverage constraints: {constraint_count}")
-        return constraint_count
+                            rows.append({
+                                'name': f"Daily_Coverage_W{week_num}_D{day_idx}_{ride_id}_{maintenance_type}",
+                                'family': 'daily',
+                                'week': week_num,
+                                'day': day_idx,
+                                'ride_id': ride_id,
+                                'engineers': available_qualified,
+                                'required': engineers_needed
+                            })
+        
+        return rows
     
-    def _add_weekly_coverage_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications, elec_rota, mech_rota):
-        """Add weekly PPM coverage constraints for 36-week rotation"""
-        import pulp
-        
-        constraint_count = 0
+    def _weekly_coverage_rows(self, all_engineers, team, team_rides, elec_rota, mech_rota):
+        """Weekly PPM coverage rows for 36-week rotation"""
+        rows = []
         
         # Get all weekly PPMs for this team
         team_weekly_ppms = {}
@@ -824,7 +1496,7 @@ class MILPOptimizationDesigner:
                 team_weekly_ppms[ride_id] = self.optimizer.ppms_by_type['weekly'][ride_id]['ppms']
         
         if not team_weekly_ppms:
-            return 0
+            return rows
         
         # Test across 36 weeks
         max_weeks = min(len(mech_rota), 36)
@@ -891,28 +1563,22 @@ class MILPOptimizationDesigner:
                                 pm_qualified.append(eng_id)
                     
                     # Ensure coverage: AM preferred, PM fallback
+                    # (an engineer on both AM and PM shifts that week counts twice, as before)
                     if am_qualified or pm_qualified:
-                        am_coverage = pulp.lpSum([
-                            ride_assignment[eng_id][ride_id] 
-                            for eng_id in am_qualified
-                        ]) if am_qualified else 0
-                        pm_coverage = pulp.lpSum([
-                            ride_assignment[eng_id][ride_id] 
-                            for eng_id in pm_qualified
-                        ]) if pm_qualified else 0
-                        
-                        constraint_name = f"Weekly_Coverage_W{week_num}_{ride_id}_{ppm['ppm_code']}"
-                        prob += am_coverage + pm_coverage >= 1, constraint_name
-                        constraint_count += 1
-        
-        print(f"         Weekly coverage constraints: {constraint_count}")
-        return constraint_count
+                        rows.append({
+                            'name': f"Weekly_Coverage_W{week_num}_{ride_id}_{ppm['ppm_code']}",
+                            'family': 'weekly',
+                            'week': week_num,
+                            'ride_id': ride_id,
+                            'engineers': am_qualified + pm_qualified,
+                            'required': 1
+                        })
+        
+        return rows
     
-    def _add_monthly_coverage_constraints(self, prob, ride_assignment, all_engineers, team, team_rides, ride_qualifications, elec_rota, mech_rota):
-        """Add monthly PPM coverage constraints for 36-week rotation (match validator logic)"""
-        import pulp
-        
-        constraint_count = 0
+    def _monthly_coverage_rows(self, all_engineers, team, team_rides, elec_rota, mech_rota):
+        """Monthly PPM coverage rows for 36-week rotation (match validator logic)"""
+        rows = []
         
         # Get all monthly PPMs for this team
         team_monthly_ppms = {}
@@ -921,7 +1587,7 @@ class MILPOptimizationDesigner:
                 team_monthly_ppms[ride_id] = self.optimizer.ppms_by_type['monthly'][ride_id]['ppms']
         
         if not team_monthly_ppms:
-            return 0
+            return rows
         
         # Cover ALL 36 weeks: 9 full months  
         max_weeks = min(len(mech_rota), 36)
@@ -983,17 +1649,16 @@ class MILPOptimizationDesigner:
                     
                     # Ensure coverage: at least 1 qualified engineer assigned to ride and available during month
                     if qualified_available:
-                        coverage_sum = pulp.lpSum([
-                            ride_assignment[eng_id][ride_id] 
-                            for eng_id in qualified_available
-                        ])
-                        
-                        constraint_name = f"Monthly_Coverage_M{month_num}_W{month_start_week}-{month_end_week}_{ride_id}_{ppm['ppm_code']}"
-                        prob += coverage_sum >= 1, constraint_name
-                        constraint_count += 1
-        
-        print(f"         Monthly coverage constraints: {constraint_count} (across {months_to_test} months)")
-        return constraint_count
+                        rows.append({
+                            'name': f"Monthly_Coverage_M{month_num}_W{month_start_week}-{month_end_week}_{ride_id}_{ppm['ppm_code']}",
+                            'family': 'monthly',
+                            'month': month_num,
+                            'ride_id': ride_id,
+                            'engineers': qualified_available,
+                            'required': 1
+                        })
+        
+        return rows
     
     def _qualification_matches_role(self, qualification, engineer_role):
         """Check if qualification matches engineer's role using dynamic PPM data mapping"""
@@ -1062,7 +1727,7 @@ class MILPOptimizationDesigner:
             
             # Find which rides this engineer was assigned
             for ride_id in team_rides:
-                if ride_assignment[eng_id][ride_id].varValue == 1:
+                if ride_id in ride_assignment[eng_id] and ride_assignment[eng_id][ride_id].varValue == 1:
                     assigned_rides.append(ride_id)
                     # Add only the qualifications that match this engineer's role
                     ride_quals = ride_qualifications[ride_id]['all_qualifications']
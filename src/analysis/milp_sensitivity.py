@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+"""
+MILP Sensitivity Analysis
+=========================
+
+Answers marginal questions about a solved ride clustering model without
+re-solving it for every question: which coverage constraints are binding,
+what flipping an assignment would cost, and what extra capacity on a rota
+line is worth.
+
+Key Features:
+- LP at the final integer fixing (assignments pinned by equality rows,
+  presolve off, fairness variables free): reduced costs for every
+  assignment and duals for the coverage and fairness rows
+- Binding daily/weekly/monthly constraints ranked by their fixing dual
+- Root LP relaxation duals kept alongside for comparison
+- Estimated marginal value of an extra engineer per role and rota line
+- Full MILP re-solve only to confirm the top candidates
+"""
+
+
+try:
+    import pulp
+    PULP_AVAILABLE = True
+except ImportError:
+    PULP_AVAILABLE = False
+
+
+class MILPSensitivityAnalysis:
+    """Duals, reduced costs and marginal-capacity queries for one solved team model"""
+
+    COVERAGE_FAMILIES = {
+        'Daily_Coverage': 'daily',
+        'Weekly_Coverage': 'weekly',
+        'Monthly_Coverage': 'monthly'
+    }
+
+    FIX_ROW_PREFIX = 'Sensitivity_Fix_'
+
+    def __init__(self, designer, team, model):
+        """Run the sensitivity LPs on a model whose variables hold the integer solution
+
+        Args:
+            designer: MILPOptimizationDesigner that built and solved the model
+            team: Team number
+            model: Model dict from _build_ride_clustering_model, already solved
+        """
+        self.designer = designer
+        self.team = team
+        self.model = model
+        prob = model['prob']
+
+        self.variable_keys = {
+            var.name: (eng_id, ride_id)
+            for eng_id, rides in model['ride_assignment'].items()
+            for ride_id, var in rides.items()
+        }
+        self.engineer_lines = {
+            eng['employee_code']: (eng.get('role', 'Electrical').lower(), eng.get('rota_number'))
+            for eng in model['all_engineers']
+        }
+
+        incumbent = {var.name: var.varValue for var in prob.variables()}
+        self.objective = pulp.value(prob.objective)
+        self.rows = self._coverage_row_slacks()
+
+        try:
+            self.reduced_costs, self.fixing_duals = self._solve_at_integer_fixing()
+            self.shadow_prices = self._solve_relaxation_duals()
+        finally:
+            # The LP solves overwrite variable values; put the integer solution back
+            for var in prob.variables():
+                var.varValue = incumbent[var.name]
+
+        for row in self.rows:
+            row['dual'] = self.fixing_duals.get(row['name'], 0.0)
+            row['relaxation_dual'] = self.shadow_prices.get(row['name'], 0.0)
+
+    def _coverage_row_slacks(self):
+        """Coverage rows with their slack at the integer solution"""
+        rows = []
+        for name, constraint in self.model['prob'].constraints.items():
+            family = next((family for prefix, family in self.COVERAGE_FAMILIES.items()
+                           if name.startswith(prefix)), None)
+            if family is None:
+                continue
+            engineers = [self.variable_keys[var.name][0] for var, coef in constraint.items() if coef]
+            ride_ids = {self.variable_keys[var.name][1] for var, coef in constraint.items() if coef}
+            rows.append({
+                'name': name,
+                'family': family,
+                'ride_id': next(iter(ride_ids)) if len(ride_ids) == 1 else None,
+                'engineers': engineers,
+                'required': -constraint.constant,
+                'slack': round(constraint.value(), 6)
+            })
+        return rows
+
+    def _solve_at_integer_fixing(self):
+        """LP with every assignment pinned at the solution: reduced costs and duals
+
+        Assignments are pinned by explicit equality rows rather than bounds, and
+        the LP is solved with presolve off, so no row is eliminated before it can
+        be priced. max_rides / min_rides stay free (relaxed), so the fairness rows
+        and the coverage rows carry duals for the integer solution. The dual of an
+        assignment's equality row is its reduced cost.
+        """
+        prob = self.model['prob']
+        fix_rows = {}
+        for eng_id, rides in self.model['ride_assignment'].items():
+            for ride_id, var in rides.items():
+                name = f"{self.FIX_ROW_PREFIX}{var.name}"
+                prob += var == round(var.varValue or 0), name
+                fix_rows[name] = (eng_id, ride_id)
+
+        try:
+            self.fixing_result = self.designer.solver_backend.solve_relaxation(prob, presolve=False)
+            reduced_costs = {key: prob.constraints[name].pi or 0.0 for name, key in fix_rows.items()}
+            duals = {name: constraint.pi for name, constraint in prob.constraints.items()
+                     if name not in fix_rows and constraint.pi}
+        finally:
+            for name in fix_rows:
+                del prob.constraints[name]
+        return reduced_costs, duals
+
+    def _solve_relaxation_duals(self):
+        """Shadow prices from the root LP relaxation (not tied to the integer solution)"""
+        prob = self.model['prob']
+        self.lp_result = self.designer.solver_backend.solve_relaxation(prob)
+        return {name: constraint.pi for name, constraint in prob.constraints.items() if constraint.pi}
+
+    def binding_constraints(self, family=None, top=20):
+        """Coverage rows with no slack at the solution, highest fixing dual first
+
+        Args:
+            family: 'daily', 'weekly' or 'monthly' (default: all)
+            top: Number of rows to return (None for all)
+        """
+        binding = [row for row in self.rows
+                   if abs(row['slack']) < 1e-6 and (family is None or row['family'] == family)]
+        # Rows fewer engineers can cover are more fragile when prices tie
+        binding.sort(key=lambda row: (-row['dual'], len(row['engineers']), row['name']))
+        ranked = [{key: value for key, value in row.items() if key != 'engineers'} |
+                  {'coverable_by': len(row['engineers'])} for row in binding]
+        return ranked if top is None else ranked[:top]
+
+    def assignment_reduced_costs(self, engineer=None):
+        """Reduced cost of each assignment at the integer fixing, cheapest flip first
+
+        flip_cost is the first-order objective change of flipping the assignment
+        (the reduced cost, negated for assignments currently held).
+        """
+        ride_assignment = self.model['ride_assignment']
+        costs = []
+        for (eng_id, ride_id), reduced_cost in self.reduced_costs.items():
+            if engineer is not None and eng_id != engineer:
+                continue
+            assigned = (ride_assignment[eng_id][ride_id].varValue or 0) > 0.5
+            costs.append({'engineer': eng_id, 'ride_id': ride_id, 'assigned': assigned,
+                          'reduced_cost': reduced_cost,
+                          'flip_cost': -reduced_cost if assigned else reduced_cost})
+        costs.sort(key=lambda item: (item['flip_cost'], item['engineer'], item['ride_id']))
+        return costs
+
+    def _capacity_rows(self, role, rota_line, ride_id):
+        """Coverage rows an extra engineer on (role, rota line) qualified on ride_id would join
+
+        An extra engineer works the same shifts as the line's current engineers,
+        so they join every row for the ride that one of those engineers is in.
+        """
+        line_engineers = {eng_id for eng_id, line in self.engineer_lines.items() if line == (role, rota_line)}
+        return [row for row in self.rows
+                if row['ride_id'] == ride_id and line_engineers.intersection(row['engineers'])]
+
+    def rota_line_marginal_values(self, top=None):
+        """Estimated objective reduction from one extra engineer per role and rota line
+
+        The estimate prices the engineer's best ride as a new column: the sum of
+        fixing duals of the coverage rows it would join, less its own cost in
+        the objective. Binding rows relieved are reported alongside.
+        """
+        ride_cost = self._assignment_objective_cost()
+        candidates = []
+        for role, rota_line in sorted(set(self.engineer_lines.values()), key=lambda line: (line[0], str(line[1]))):
+            best = None
+            for ride_id in self.model['team_rides']:
+                rows = self._capacity_rows(role, rota_line, ride_id)
+                if not rows:
+                    continue
+                value = sum(row['dual'] for row in rows) - ride_cost
+                relieved = sum(1 for row in rows if abs(row['slack']) < 1e-6)
+                if best is None or (value, relieved) > (best['estimated_value'], best['binding_rows_relieved']):
+                    best = {
+                        'role': role,
+                        'rota_line': rota_line,
+                        'best_ride': ride_id,
+                        'estimated_value': round(value, 6),
+                        'binding_rows_relieved': relieved,
+                        'rows_joined': len(rows)
+                    }
+            if best:
+                candidates.append(best)
+
+        candidates.sort(key=lambda item: (-item['estimated_value'], -item['binding_rows_relieved']))
+        return candidates if top is None else candidates[:top]
+
+    def _assignment_objective_cost(self):
+        """Objective coefficient of a single ride assignment (the total-rides weight)"""
+        objective = self.model['prob'].objective
+        coefficients = [coef for var, coef in objective.items() if var.name in self.variable_keys]
+        return coefficients[0] if coefficients else 0.0
+
+    def confirm_rota_line_capacity(self, role, rota_line, ride_id):
+        """Re-solve the full MILP with an extra engineer on a rota line, qualified on one ride
+
+        The extra engineer is added as capacity (a new column in the ride's
+        coverage rows) without joining the fairness rows.
+        """
+        designer = self.designer
+        model = designer._build_ride_clustering_model(self.team, lazy_coverage=False)
+        prob = model['prob']
+
+        extra = pulp.LpVariable(f"extra_{role}_L{rota_line}_{ride_id}", cat='Binary')
+        line_engineers = {eng_id for eng_id, line in self.engineer_lines.items() if line == (role, rota_line)}
+        rows_joined = 0
+        for name, constraint in prob.constraints.items():
+            if name == f"Ride_Coverage_{ride_id}":
+                constraint.addInPlace(extra)
+                continue
+            if not name.startswith(tuple(self.COVERAGE_FAMILIES)):
+                continue
+            members = [self.variable_keys.get(var.name) for var, coef in constraint.items() if coef]
+            if any(key and key[1] == ride_id and key[0] in line_engineers for key in members):
+                constraint.addInPlace(extra)
+                rows_joined += 1
+        prob.setObjective(prob.objective + self._assignment_objective_cost() * extra)
+
+        result = designer._solve_ride_clustering_model(model)
+        confirmed = {
+            'role': role,
+            'rota_line': rota_line,
+            'ride_id': ride_id,
+            'rows_joined': rows_joined,
+            'status': result.status,
+            'baseline_objective': self.objective,
+            'objective_with_capacity': result.objective,
+            'actual_value': None if result.objective is None else round(self.objective - result.objective, 6)
+        }
+        return confirmed
+
+    def confirm_top_candidates(self, count=3):
+        """Confirm the highest-valued rota line estimates with full re-solves"""
+        confirmed = []
+        for candidate in self.rota_line_marginal_values(top=count):
+            outcome = self.confirm_rota_line_capacity(candidate['role'], candidate['rota_line'],
+                                                      candidate['best_ride'])
+            outcome['estimated_value'] = candidate['estimated_value']
+            confirmed.append(outcome)
+        return confirmed
+
+    def to_dict(self, top=20):
+        """Serializable summary: binding rows per family and rota line estimates"""
+        return {
+            'team': self.team,
+            'objective': self.objective,
+            'fixing_lp_objective': self.fixing_result.objective,
+            'lp_relaxation_bound': self.lp_result.objective,
+            'binding_rows': {
+                family: sum(1 for row in self.rows if row['family'] == family and abs(row['slack']) < 1e-6)
+                for family in self.COVERAGE_FAMILIES.values()
+            },
+            'fixing_duals': {name: dual for name, dual in self.fixing_duals.items()
+                             if not name.startswith(tuple(self.COVERAGE_FAMILIES))},
+            'top_binding_constraints': self.binding_constraints(top=top),
+            'rota_line_marginal_values': self.rota_line_marginal_values()
+        }
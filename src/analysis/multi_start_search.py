@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+
+"""
+Multi-Start Designer Search
+===========================
+
+Runs one of the randomized qualification designers from several random seeds
+and keeps the best matrices, instead of the single solution a fixed seed gives.
+
+Key Features:
+- Balanced, Enhanced, Ultimate and Coverage-optimized designers supported
+- Seeds run in parallel across a process pool; workers inherit the read-only
+  ProblemContext by fork instead of reloading engineers and rotas
+- Every candidate scored with the coverage validator
+- Lexicographic objective, configurable order: mean coverage (higher is better),
+  total qualifications and qualification-count spread (lower is better)
+- Seeds and scores of every start recorded; the winner is re-run from its
+  recorded seed in this process and the run fails if the metrics differ.
+  The re-run shares this process's hash seed, so it cannot catch set-order
+  dependence; the designers sort sets before turning them into lists or
+  shuffling them, which keeps a seed's matrices stable across PYTHONHASHSEED
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from .balanced_coverage_designer import BalancedCoverageDesigner
+from .coverage_optimized_designer import CoverageOptimizedDesigner
+from .enhanced_coverage_designer import EnhancedCoverageDesigner
+from .problem_context import ProblemContext
+from .ultimate_coverage_designer import UltimateCoverageDesigner
+
+
+DESIGNERS = {
+    'balanced': BalancedCoverageDesigner,
+    'enhanced': EnhancedCoverageDesigner,
+    'ultimate': UltimateCoverageDesigner,
+    'coverage': CoverageOptimizedDesigner
+}
+
+# Objective terms: (direction, description); +1 maximizes, -1 minimizes
+OBJECTIVE_TERMS = {
+    'coverage': (1, "mean daily/weekly/monthly coverage %"),
+    'qualifications': (-1, "total qualifications assigned"),
+    'balance': (-1, "std dev of qualifications per engineer")
+}
+DEFAULT_OBJECTIVE = ('coverage', 'qualifications', 'balance')
+
+# Search instance inherited by forked pool workers
+_ACTIVE_SEARCH = None
+
+
+def _run_start_in_worker(seed):
+    """Pool entry point: run one seed with the inherited search"""
+    return _ACTIVE_SEARCH.run_start(seed)
+
+
+class MultiStartSearch:
+    """Best-of-N seeds for a randomized qualification designer"""
+
+    def __init__(self, optimizer_results, designer='ultimate', context=None, objective=DEFAULT_OBJECTIVE,
+                 workers=None):
+        """
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            designer: Designer key (balanced, enhanced, ultimate, coverage)
+            context: Optional shared ProblemContext (built here when not given)
+            objective: Objective terms in priority order
+            workers: Pool size (default: one per seed, capped at the CPU count)
+        """
+        if designer not in DESIGNERS:
+            raise ValueError(f"Unknown designer '{designer}'. Choose from: {', '.join(DESIGNERS)}")
+        unknown = [term for term in objective if term not in OBJECTIVE_TERMS]
+        if unknown:
+            raise ValueError(f"Unknown objective terms {unknown}. Choose from: {', '.join(OBJECTIVE_TERMS)}")
+
+        self.optimizer = optimizer_results
+        self.designer = designer
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+        self.objective = tuple(objective)
+        self.workers = workers
+
+    def run_start(self, seed):
+        """Run the designer once from seed and score the result with the validator"""
+        start = time.time()
+        with contextlib.redirect_stdout(io.StringIO()):
+            designer = DESIGNERS[self.designer](self.optimizer, context=self.context, seed=seed)
+            matrices = designer.create_optimized_qualification_matrices()
+            validation_results = designer.coverage_validator.validate_assignment_coverage(matrices)
+
+        metrics = self.score(matrices, validation_results)
+        return {
+            'seed': seed,
+            'metrics': metrics,
+            'coverage_by_team': {
+                team: {ppm_type: validation_results[team][ppm_type]['coverage_percentage']
+                       for ppm_type in ('daily', 'weekly', 'monthly')}
+                for team in matrices if team in validation_results
+            },
+            'elapsed': round(time.time() - start, 2),
+            'matrices': matrices
+        }
+
+    def score(self, matrices, validation_results):
+        """Objective metrics for one candidate"""
+        coverage = [
+            validation_results[team][ppm_type]['coverage_percentage']
+            for team in matrices if team in validation_results
+            for ppm_type in ('daily', 'weekly', 'monthly')
+        ]
+        spreads = [
+            statistics.pstdev(len(assignment['qualifications']) for assignment in engineers.values())
+            for engineers in matrices.values() if engineers
+        ]
+        return {
+            'coverage': round(sum(coverage) / len(coverage), 4) if coverage else 0.0,
+            'qualifications': sum(len(assignment['qualifications'])
+                                  for engineers in matrices.values() for assignment in engineers.values()),
+            'balance': round(sum(spreads) / len(spreads), 4) if spreads else 0.0
+        }
+
+    def rank_key(self, candidate):
+        """Sort key: better candidates first, ties broken by the lower seed"""
+        metrics = candidate['metrics']
+        return tuple(-OBJECTIVE_TERMS[term][0] * metrics[term] for term in self.objective) + (candidate['seed'],)
+
+    def _pool_size(self, seeds):
+        return max(1, min(self.workers or os.cpu_count() or 1, len(seeds)))
+
+    def run(self, seeds):
+        """Run every seed and return the ranked candidates with the winner first"""
+        global _ACTIVE_SEARCH
+
+        print(f"\n🎲 MULTI-START SEARCH: {self.designer} designer, {len(seeds)} seeds")
+        print(f"   Objective: {' > '.join(self.objective)}")
+
+        workers = self._pool_size(seeds)
+        start = time.time()
+        candidates = []
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            print(f"   🔀 {len(seeds)} starts across {workers} worker processes")
+            _ACTIVE_SEARCH = self
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('fork')) as pool:
+                    for candidate in pool.map(_run_start_in_worker, seeds):
+                        candidates.append(candidate)
+                        self._print_candidate(candidate)
+            finally:
+                _ACTIVE_SEARCH = None
+        else:
+            print(f"   🔁 {len(seeds)} starts in this process")
+            for seed in seeds:
+                candidate = self.run_start(seed)
+                candidates.append(candidate)
+                self._print_candidate(candidate)
+
+        candidates.sort(key=self.rank_key)
+        for rank, candidate in enumerate(candidates, 1):
+            candidate['rank'] = rank
+        best = candidates[0]
+        self.verify_reproducible(best)
+        elapsed = time.time() - start
+        print(f"\n   🏆 Best seed {best['seed']}: coverage {best['metrics']['coverage']:.1f}%, "
+              f"{best['metrics']['qualifications']} qualifications, spread {best['metrics']['balance']:.2f} "
+              f"({elapsed:.1f}s total)")
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'designer': self.designer,
+            'objective': list(self.objective),
+            'seeds': list(seeds),
+            'reproduced': True,
+            'workers': workers,
+            'elapsed': round(elapsed, 2),
+            'best_seed': best['seed'],
+            'best': best,
+            'candidates': [{key: value for key, value in candidate.items() if key != 'matrices'}
+                           for candidate in candidates]
+        }
+
+    def verify_reproducible(self, candidate):
+        """Re-run a candidate's seed in this process; raise if the metrics or matrices differ
+
+        Forked workers and this process share one hash seed, so this catches
+        state leaking between starts, not dependence on PYTHONHASHSEED.
+        """
+        rerun = self.run_start(candidate['seed'])
+        if rerun['metrics'] != candidate['metrics'] or rerun['matrices'] != candidate['matrices']:
+            raise RuntimeError(f"Seed {candidate['seed']} did not reproduce its result: "
+                               f"{candidate['metrics']} on the search run, {rerun['metrics']} on re-run")
+        print(f"   ✅ Seed {candidate['seed']} reproduces the winning matrices")
+        return rerun
+
+    def _print_candidate(self, candidate):
+        metrics = candidate['metrics']
+        print(f"   Seed {candidate['seed']:>6}: coverage {metrics['coverage']:.1f}%, "
+              f"{metrics['qualifications']} qualifications, spread {metrics['balance']:.2f} "
+              f"({candidate['elapsed']:.1f}s)")
+
+    def results_record(self, results):
+        """Seed record and ranking without the winner's matrices (JSON-ready)"""
+        return {key: value for key, value in results.items() if key != 'best'}
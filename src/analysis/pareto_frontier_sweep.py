@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+
+"""
+Pareto Frontier Sweep
+=====================
+
+Traces the trade-off between ride balance (fairness), rotation coverage and
+training effort with an epsilon-constraint sweep over the ride clustering
+model, instead of the single weighted point the MILP designer returns.
+
+Key Features:
+- Minimizes training effort (qualifications not currently held in EngQual.csv)
+- Epsilon constraints on coverage (share of rotation coverage rows met) and
+  fairness (max - min rides per engineer)
+- Duplicate rotation rows (rotas repeat every 9/18 weeks) collapsed and weighted
+- Each fairness level solved as a chain, warm-started from its neighbour
+- Chains solved in parallel across a process pool
+- Frontier table with Pareto-optimal points flagged, saved to outputs/current
+"""
+
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pulp
+    PULP_AVAILABLE = True
+except ImportError:
+    PULP_AVAILABLE = False
+
+from .solver_backends import get_solver_backend
+from .standard_output_manager import StandardOutputManager
+from .training_optimization_designer import TrainingOptimizationDesigner
+
+
+# Sweep instance inherited by forked pool workers
+_ACTIVE_SWEEP = None
+
+
+def _solve_chain_in_worker(task):
+    """Pool entry point: solve one fairness chain with the inherited sweep"""
+    return _ACTIVE_SWEEP._solve_chain(*task)
+
+
+class ParetoFrontierSweep:
+    """Epsilon-constraint sweep over fairness, coverage and training effort"""
+
+    COVERAGE_LEVELS = [1.0, 0.99, 0.98, 0.97, 0.95]
+    FAIRNESS_LEVELS = [0, 1, 2, 3]
+    ROTATION_ROW_PREFIXES = ('Daily_Coverage', 'Weekly_Coverage', 'Monthly_Coverage')
+    EQUAL_TYPE_PREFIXES = ('EqualTypeA', 'EqualTypeB', 'EqualTypeC')
+
+    # Tie-break so rides that need no training are not assigned for free
+    RIDE_WEIGHT = 0.001
+
+    def __init__(self, optimizer_results, coverage_levels=None, fairness_levels=None, solver='cbc',
+                 time_limit=60, gap_rel=0.01, workers=None):
+        """
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            coverage_levels: Minimum share of rotation coverage rows to meet, per point
+            fairness_levels: Maximum spread (max - min rides per engineer), one chain each
+            solver: MILP backend name
+            time_limit: Per-point time limit in seconds
+            gap_rel: Relative optimality gap per point
+            workers: Pool size (default: one per chain, capped at the CPU count)
+        """
+        self.optimizer = optimizer_results
+        self.coverage_levels = sorted(coverage_levels or self.COVERAGE_LEVELS, reverse=True)
+        self.fairness_levels = sorted(fairness_levels if fairness_levels is not None else self.FAIRNESS_LEVELS)
+        self.solver = solver
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
+        self.workers = workers
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.training_designer = TrainingOptimizationDesigner(optimizer_results, solver=solver)
+            self.current_matrices = self.training_designer.load_current_qualification_state()
+        self.milp_designer = self.training_designer.milp_designer
+
+        points = len(self.coverage_levels) * len(self.fairness_levels)
+        print("📈 PARETO FRONTIER SWEEP INITIALIZED")
+        print(f"   Objective: minimize training effort")
+        print(f"   Coverage levels: {', '.join(f'{level:.0%}' for level in self.coverage_levels)}")
+        print(f"   Fairness spreads: {', '.join(str(level) for level in self.fairness_levels)}")
+        print(f"   Points per team: {points} ({len(self.fairness_levels)} warm-started chains)")
+
+    def _build_sweep_model(self, team):
+        """Ride clustering model re-purposed for the sweep
+
+        Rotation coverage rows become soft (a binary slack per collapsed row),
+        the equal-type rows give way to an explicit fairness epsilon row, and
+        the objective becomes training effort.
+        """
+        model = self.milp_designer._build_ride_clustering_model(team, symmetry_breaking=False, lazy_coverage=False)
+        prob = model['prob']
+        ride_assignment = model['ride_assignment']
+
+        for name in [name for name in prob.constraints if name.startswith(self.EQUAL_TYPE_PREFIXES)]:
+            del prob.constraints[name]
+
+        # Collapse identical rotation rows and weight each survivor by its copies
+        kept_rows = {}
+        for name in [name for name in prob.constraints if name.startswith(self.ROTATION_ROW_PREFIXES)]:
+            constraint = prob.constraints[name]
+            row_key = (tuple(sorted((var.name, coef) for var, coef in constraint.items())), constraint.constant)
+            if row_key in kept_rows:
+                kept_rows[row_key]['weight'] += 1
+                del prob.constraints[name]
+            else:
+                kept_rows[row_key] = {'name': name, 'weight': 1}
+
+        uncovered = []
+        for index, row in enumerate(kept_rows.values()):
+            constraint = prob.constraints[row['name']]
+            slack = pulp.LpVariable(f"uncovered_{index}", cat='Binary')
+            constraint.addInPlace(-constraint.constant * slack)
+            uncovered.append((slack, row['weight']))
+        total_rows = sum(weight for _, weight in uncovered)
+
+        team_current = self.current_matrices.get(team, {})
+        engineers = {eng['employee_code']: eng.get('role', 'Electrical') for eng in model['all_engineers']}
+        costs = self.training_designer._ride_training_costs(team_current, engineers, model['team_rides'])
+
+        training_effort = pulp.lpSum(costs[(eng_id, ride_id)] * var
+                                     for eng_id, rides in ride_assignment.items()
+                                     for ride_id, var in rides.items())
+        total_rides = pulp.lpSum(var for rides in ride_assignment.values() for var in rides.values())
+        prob.setObjective(training_effort + self.RIDE_WEIGHT * total_rides)
+
+        prob += pulp.lpSum(weight * slack for slack, weight in uncovered) <= 0, "Epsilon_Coverage"
+        prob += model['max_rides'] - model['min_rides'] <= 0, "Epsilon_Fairness"
+
+        model.update({
+            'uncovered': uncovered,
+            'total_rotation_rows': total_rows,
+            'training_costs': costs
+        })
+        return model
+
+    def _solve_chain(self, team, fairness_limit):
+        """Solve every coverage level for one fairness limit, warm-starting each from the last"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = self._build_sweep_model(team)
+        prob = model['prob']
+        ride_assignment = model['ride_assignment']
+        costs = model['training_costs']
+        backend = get_solver_backend(self.solver, time_limit=self.time_limit, gap_rel=self.gap_rel, msg=False)
+
+        prob.constraints['Epsilon_Fairness'].changeRHS(fairness_limit)
+
+        points = []
+        has_incumbent = False
+        for coverage_level in self.coverage_levels:
+            # Levels descend, so the previous solution stays feasible for this one
+            allowed_uncovered = int((1 - coverage_level) * model['total_rotation_rows'] + 1e-9)
+            prob.constraints['Epsilon_Coverage'].changeRHS(allowed_uncovered)
+
+            result = backend.solve(prob, warm_start=has_incumbent)
+            has_incumbent = has_incumbent or result.has_solution
+
+            point = {
+                'team': team,
+                'fairness_limit': fairness_limit,
+                'coverage_target': coverage_level,
+                'status': result.status,
+                'warm_started': has_incumbent and bool(points),
+                'solve_time': round(result.wall_time, 4),
+                'gap': result.gap
+            }
+            if result.has_solution:
+                assigned = [(eng_id, ride_id) for eng_id, rides in ride_assignment.items()
+                            for ride_id, var in rides.items() if (var.varValue or 0) > 0.5]
+                rides_per_engineer = [sum(1 for var in rides.values() if (var.varValue or 0) > 0.5)
+                                      for rides in ride_assignment.values()]
+                rows_uncovered = sum(weight for slack, weight in model['uncovered'] if (slack.varValue or 0) > 0.5)
+                point.update({
+                    'training_effort': sum(costs[key] for key in assigned),
+                    'coverage': round(1 - rows_uncovered / max(model['total_rotation_rows'], 1), 4),
+                    'rows_uncovered': rows_uncovered,
+                    'fairness_spread': max(rides_per_engineer) - min(rides_per_engineer),
+                    'total_rides': len(assigned)
+                })
+            points.append(point)
+        return points
+
+    def _pool_size(self, tasks):
+        return max(1, min(self.workers or os.cpu_count() or 1, len(tasks)))
+
+    def run(self, teams=(1, 2)):
+        """Run the sweep for each team and return the frontier results"""
+        global _ACTIVE_SWEEP
+
+        print("\n📈 RUNNING PARETO FRONTIER SWEEP")
+        print("=" * 70)
+
+        tasks = [(team, fairness_limit) for team in teams for fairness_limit in self.fairness_levels]
+        workers = self._pool_size(tasks)
+        start = time.time()
+
+        points = []
+        if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            print(f"   🔀 {len(tasks)} chains across {workers} worker processes")
+            _ACTIVE_SWEEP = self
+            try:
+                with ProcessPoolExecutor(max_workers=workers,
+                                         mp_context=multiprocessing.get_context('fork')) as pool:
+                    for chain in pool.map(_solve_chain_in_worker, tasks):
+                        points.extend(chain)
+                        self._print_chain(chain)
+            finally:
+                _ACTIVE_SWEEP = None
+        else:
+            print(f"   🔁 {len(tasks)} chains in this process")
+            for task in tasks:
+                chain = self._solve_chain(*task)
+                points.extend(chain)
+                self._print_chain(chain)
+
+        self._mark_pareto_optimal(points)
+        elapsed = time.time() - start
+        print(f"\n   ⏱️  Sweep finished in {elapsed:.1f}s "
+              f"({sum(1 for p in points if p.get('pareto_optimal'))} Pareto-optimal points)")
+
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'solver': self.solver,
+            'time_limit': self.time_limit,
+            'gap_rel': self.gap_rel,
+            'coverage_levels': self.coverage_levels,
+            'fairness_levels': self.fairness_levels,
+            'workers': workers,
+            'elapsed': round(elapsed, 2),
+            'points': points
+        }
+
+    def _print_chain(self, chain):
+        for point in chain:
+            if 'training_effort' not in point:
+                print(f"   Team {point['team']} spread≤{point['fairness_limit']} "
+                      f"coverage≥{point['coverage_target']:.0%}: {point['status']}")
+                continue
+            print(f"   Team {point['team']} spread≤{point['fairness_limit']} "
+                  f"coverage≥{point['coverage_target']:.0%}: {point['training_effort']} quals to train, "
+                  f"coverage {point['coverage']:.1%}, spread {point['fairness_spread']} "
+                  f"({point['status']}, {point['solve_time']:.1f}s{', warm' if point['warm_started'] else ''})")
+
+    def _mark_pareto_optimal(self, points):
+        """Flag points no other point of the same team beats on all three objectives
+        
+        When several points land on the same objectives only the first is flagged.
+        """
+        def objectives(point):
+            return (point['training_effort'], -point['coverage'], point['fairness_spread'])
+
+        solved = [point for point in points if 'training_effort' in point]
+        for point in points:
+            point['pareto_optimal'] = False
+        flagged = set()
+        for point in solved:
+            mine = objectives(point)
+            dominated = any(
+                other['team'] == point['team']
+                and all(a <= b for a, b in zip(objectives(other), mine))
+                and objectives(other) != mine
+                for other in solved
+            )
+            if not dominated and (point['team'], mine) not in flagged:
+                point['pareto_optimal'] = True
+                flagged.add((point['team'], mine))
+
+    def display_results(self, results):
+        """Print the Pareto-optimal points per team"""
+        print("\n🏁 PARETO FRONTIER")
+        print("=" * 70)
+        for team in sorted(set(point['team'] for point in results['points'])):
+            frontier = sorted((p for p in results['points'] if p['team'] == team and p['pareto_optimal']),
+                              key=lambda p: (p['training_effort'], -p['coverage']))
+            print(f"\n🏢 Team {team}: {len(frontier)} Pareto-optimal points")
+            for point in frontier:
+                print(f"   {point['training_effort']:>4} quals to train | coverage {point['coverage']:.1%} "
+                      f"| spread {point['fairness_spread']}")
+
+    def save_results(self, results, output_manager=None):
+        """Save the frontier table (CSV) and full sweep results (JSON) to the current output directory"""
+        output_manager = output_manager or StandardOutputManager()
+        table_path, json_path = output_manager.save_side_files({
+            "pareto_frontier.csv": pd.DataFrame(results['points']).to_csv(index=False),
+            "pareto_frontier.json": results
+        })
+
+        print(f"\n💾 Frontier table saved to: {table_path}")
+        print(f"💾 Sweep results saved to: {json_path}")
+        return table_path
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+"""
+Problem Context
+===============
+
+Read-only problem data shared by every qualification designer and the
+coverage validator, loaded and derived once per run instead of once per
+designer.
+
+Key Features:
+- Engineers per team and role (engineer JSON files)
+- Parsed base rotas and 36-week extended rotas
+- PPM catalog and ride info (duck-types as optimizer_results for the validator)
+- Ride qualification sets by PPM type and maintenance role
+- Per-engineer shift-pattern statistics (all days, Mon-Fri, per weekday)
+- Availability tensor per team and role: shift codes [engineer, week, day]
+- Immutable: mappings are read-only proxies, arrays are non-writeable, and
+  designers receive copies of anything they may modify
+"""
+
+import json
+from pathlib import Path
+from types import MappingProxyType
+
+import numpy as np
+
+
+ROLES = ('electrical', 'mechanical')
+ROLE_FILE_KEYS = {'electrical': 'elec', 'mechanical': 'mech'}
+PPM_TYPES = ('daily', 'weekly', 'monthly')
+WEEKDAY_NAMES = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday')
+
+
+def _freeze(value):
+    """Read-only view of nested dicts / lists"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Plain mutable copy of a frozen structure"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def extend_rota_to_weeks(rota_data, target_weeks):
+    """Extend rota data by cycling whole rotations to reach target weeks"""
+    original_weeks = len(rota_data)
+    if original_weeks == 0:
+        return {}
+    cycles_needed = target_weeks // original_weeks
+
+    extended_rota = {}
+    for cycle in range(cycles_needed):
+        for week_num in range(1, original_weeks + 1):
+            original_key = f'Week {week_num}'
+            if original_key in rota_data:
+                extended_rota[f'Week {week_num + cycle * original_weeks}'] = dict(rota_data[original_key])
+    return extended_rota
+
+
+class ProblemContext:
+    """Engineers, rotas, PPM catalog and shift statistics, prepared once"""
+
+    # Rotation horizon used by the MILP model and the coverage validator
+    ROTATION_WEEKS = 36
+
+    def __init__(self, optimizer_results, data_dir="data/processed"):
+        """Load and derive all shared problem data
+
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            data_dir: Directory with engineers/ and parsed_rotas/
+        """
+        data_dir = Path(data_dir)
+        self.ppms_by_type = MappingProxyType(
+            {ppm_type: MappingProxyType(dict(optimizer_results.ppms_by_type[ppm_type])) for ppm_type in PPM_TYPES}
+        )
+        self.rides_info = MappingProxyType(dict(optimizer_results.rides_info))
+
+        self.team_rides = MappingProxyType({
+            team: tuple(ride_id for ride_id, info in self.rides_info.items() if info.get('team_responsible') == team)
+            for team in (1, 2)
+        })
+
+        engineers, rotas, self.missing_files = {}, {}, []
+        for team in (1, 2):
+            engineers[team], rotas[team] = {}, {}
+            for role in ROLES:
+                engineers[team][role] = self._load_json(
+                    data_dir / f"engineers/team{team}_{ROLE_FILE_KEYS[role]}_engineers.json", {}
+                ).get('engineers', [])
+                rotas[team][role] = self._load_json(
+                    data_dir / f"parsed_rotas/parsed_team{team}_{ROLE_FILE_KEYS[role]}_rota.json", None
+                )
+        self.engineers = _freeze(engineers)
+        self.rotas = MappingProxyType({
+            team: MappingProxyType({role: _freeze(rota) if rota is not None else None for role, rota in by_role.items()})
+            for team, by_role in rotas.items()
+        })
+
+        self.ride_qualifications = self._build_ride_qualifications()
+        self.availability = self._build_availability()
+        self.shift_statistics = MappingProxyType({
+            team: MappingProxyType({role: self._shift_statistics(rotas[team][role]) for role in ROLES})
+            for team in (1, 2)
+        })
+
+    def _load_json(self, path, default):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            self.missing_files.append(str(path))
+            return default
+
+    def _build_ride_qualifications(self):
+        """{ride: {ppm_type: {role: frozenset(qualification codes)}}}"""
+        ride_qualifications = {}
+        for ride_id in self.rides_info:
+            by_type = {}
+            for ppm_type in PPM_TYPES:
+                quals = {role: set() for role in ROLES}
+                ride_ppms = self.ppms_by_type[ppm_type].get(ride_id)
+                for ppm in (ride_ppms['ppms'] if ride_ppms else []):
+                    role = 'electrical' if ppm['maintenance_type'] == 'ELECTRICAL' else 'mechanical'
+                    quals[role].add(ppm['qualification_code'])
+                by_type[ppm_type] = MappingProxyType({role: frozenset(codes) for role, codes in quals.items()})
+            ride_qualifications[ride_id] = MappingProxyType(by_type)
+        return MappingProxyType(ride_qualifications)
+
+    def _build_availability(self):
+        """Shift-code tensor per team and role over the extended rotation
+
+        Each entry is {'engineers': (codes...), 'shifts': array[engineer, week, day]}
+        with '' where an engineer is absent from a week.
+        """
+        availability = {}
+        for team in (1, 2):
+            availability[team] = {}
+            for role in ROLES:
+                rota = self.extended_rota(team, role)
+                if rota is None:
+                    availability[team][role] = None
+                    continue
+                weeks = sorted(rota, key=lambda key: int(key.split()[-1]))
+                engineer_codes = tuple(dict.fromkeys(eng for week in weeks for eng in rota[week]))
+                shifts = np.full((len(engineer_codes), len(weeks), 7), '', dtype='<U1')
+                index = {eng: i for i, eng in enumerate(engineer_codes)}
+                for w, week in enumerate(weeks):
+                    for eng, week_shifts in rota[week].items():
+                        days = list(week_shifts)[:7]
+                        shifts[index[eng], w, :len(days)] = days
+                shifts.flags.writeable = False
+                availability[team][role] = MappingProxyType({'engineers': engineer_codes, 'shifts': shifts})
+        return MappingProxyType({team: MappingProxyType(by_role) for team, by_role in availability.items()})
+
+    def _shift_statistics(self, rota):
+        """Per-engineer shift counts over the base rota"""
+        if rota is None:
+            return None
+        statistics = {}
+        for week_data in rota.values():
+            for engineer_id, shifts in week_data.items():
+                stats = statistics.setdefault(engineer_id, {
+                    'weeks': 0, 'total_days': 0, 'early_days': 0, 'late_days': 0, 'off_days': 0,
+                    'weekdays': 0, 'weekday_early_days': 0, 'weekday_early': [0] * 5
+                })
+                stats['weeks'] += 1
+                for day_idx, shift in enumerate(shifts[:7]):
+                    stats['total_days'] += 1
+                    if shift == 'E':
+                        stats['early_days'] += 1
+                    elif shift == 'L':
+                        stats['late_days'] += 1
+                    else:
+                        stats['off_days'] += 1
+                    if day_idx < 5:
+                        stats['weekdays'] += 1
+                        if shift == 'E':
+                            stats['weekday_early_days'] += 1
+                            stats['weekday_early'][day_idx] += 1
+        return _freeze(statistics)
+
+    def engineer_data(self):
+        """Mutable copy of {team: {role: [engineer dicts]}} for a designer to own"""
+        return _thaw(self.engineers)
+
+    def rota(self, team, role):
+        """Mutable copy of a parsed base rota (None when the file is missing)"""
+        rota = self.rotas[team][role]
+        return _thaw(rota) if rota is not None else None
+
+    def extended_rota(self, team, role, weeks=None):
+        """Base rota cycled to the rotation horizon (None when the file is missing)"""
+        rota = self.rota(team, role)
+        return extend_rota_to_weeks(rota, weeks or self.ROTATION_WEEKS) if rota is not None else None
+
+    def shift_pattern(self, team, role, engineer_id):
+        """One engineer's shift sequence over the base rota weeks, in week order"""
+        rota = self.rotas[team].get(role) or {}
+        weeks = sorted(rota, key=lambda key: int(key.split()[-1]))
+        return tuple(tuple(rota[week].get(engineer_id, ())) for week in weeks)
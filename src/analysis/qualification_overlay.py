@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+"""
+Qualification Overlay
+=====================
+
+Read-only views that layer recommended training over cached current-state
+qualification matrices, so a training plan can be validated without
+reloading EngQual.csv or copying every engineer profile.
+
+Key Features:
+- Same shape as the plain {team: {engineer_code: profile}} matrices
+  (drop-in for CoverageValidator and the training reports)
+- Untrained engineers are the cached current profiles themselves
+- Trained engineers get a profile view whose derived fields (ride lists,
+  daily qualifications, coverage score) are computed once, on first access
+- The base matrices are never modified, so many plans can share them
+"""
+
+from collections.abc import Mapping
+
+
+class TrainedEngineerProfile(Mapping):
+    """Current engineer profile with new qualifications layered on top"""
+
+    def __init__(self, base_profile, new_qualifications, is_daily_qualification, get_ride_type):
+        """
+        Args:
+            base_profile: Current-state profile (not modified)
+            new_qualifications: Qualifications recommended for this engineer
+            is_daily_qualification: Callable(qual) -> True for daily PPM qualifications
+            get_ride_type: Callable(ride_code) -> 'A', 'B' or 'C'
+        """
+        self._base = base_profile
+        self._new_qualifications = list(new_qualifications)
+        self._is_daily_qualification = is_daily_qualification
+        self._get_ride_type = get_ride_type
+        self._overrides = None
+
+    def _derived(self):
+        """Fields that change with the new qualifications, built on first access"""
+        if self._overrides is None:
+            held = set(self._base['qualifications'])
+            added = []
+            for qual in self._new_qualifications:
+                if qual not in held:
+                    held.add(qual)
+                    added.append(qual)
+
+            qualifications = self._base['qualifications'] + added
+            rides = list(set(qual.split('.')[0] for qual in qualifications))
+            self._overrides = {
+                'qualifications': qualifications,
+                'daily_qualifications': self._base.get('daily_qualifications', []) +
+                                        [qual for qual in added if self._is_daily_qualification(qual)],
+                'assigned_rides': rides,
+                'type_a_rides': [ride for ride in rides if self._get_ride_type(ride) == 'A'],
+                'type_b_rides': [ride for ride in rides if self._get_ride_type(ride) == 'B'],
+                'type_c_rides': [ride for ride in rides if self._get_ride_type(ride) == 'C'],
+                'coverage_score': len(qualifications),
+                'training_applied': True,
+                'new_qualifications': self._new_qualifications
+            }
+        return self._overrides
+
+    def __getitem__(self, key):
+        overrides = self._derived()
+        if key in overrides:
+            return overrides[key]
+        return self._base[key]
+
+    def __iter__(self):
+        yield from self._base
+        for key in self._derived():
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return len(set(self._base) | set(self._derived()))
+
+
+class ProjectedTeamMatrix(Mapping):
+    """One team's engineers: cached current profiles, trained ones wrapped in an overlay"""
+
+    def __init__(self, base_team, training_lookup, is_daily_qualification, get_ride_type):
+        self._base = base_team
+        self._trained = {
+            eng_code: TrainedEngineerProfile(base_team[eng_code], quals, is_daily_qualification, get_ride_type)
+            for eng_code, quals in training_lookup.items()
+            if eng_code in base_team
+        }
+
+    @property
+    def trained_engineers(self):
+        return list(self._trained)
+
+    def __getitem__(self, eng_code):
+        if eng_code in self._trained:
+            return self._trained[eng_code]
+        return self._base[eng_code]
+
+    def __iter__(self):
+        return iter(self._base)
+
+    def __len__(self):
+        return len(self._base)
+
+
+class ProjectedQualificationMatrices(Mapping):
+    """Post-training matrices for every team with recommendations, as an overlay"""
+
+    def __init__(self, base_matrices, training_by_team, is_daily_qualification, get_ride_type):
+        """
+        Args:
+            base_matrices: Cached current-state {team: {engineer_code: profile}}
+            training_by_team: {team: {engineer_code: [qualification, ...]}}
+            is_daily_qualification: Callable(qual, team) -> True for daily PPM qualifications
+            get_ride_type: Callable(ride_code) -> 'A', 'B' or 'C'
+        """
+        self._teams = {}
+        for team, training_lookup in training_by_team.items():
+            if team not in base_matrices:
+                continue
+            self._teams[team] = ProjectedTeamMatrix(
+                base_matrices[team], training_lookup,
+                lambda qual, team=team: is_daily_qualification(qual, team), get_ride_type
+            )
+
+    def __getitem__(self, team):
+        return self._teams[team]
+
+    def __iter__(self):
+        return iter(self._teams)
+
+    def __len__(self):
+        return len(self._teams)
+
+    def to_dict(self):
+        """Materialize plain nested dicts (for JSON export)"""
+        return {
+            team: {eng_code: dict(profile) for eng_code, profile in team_matrix.items()}
+            for team, team_matrix in self._teams.items()
+        }
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+
+"""
+Run Index
+=========
+
+Embedded SQLite index of optimization runs, one row per saved run, so
+listing, filtering and trend queries are indexed lookups instead of scans
+over archive directories.
+
+Key Features:
+- Updated transactionally by StandardOutputManager on every save
+- Optimization name, timestamp, input-data hash, runtime and solver stats
+- Per-team daily/weekly/monthly coverage, status and risk level, plus the
+  minimum across teams for "any team below X%" filters
+- Links each run to its archive directory once it has been archived
+- Filters (e.g. all MILP runs with daily coverage < 100%), trends of any
+  coverage column over time and per-optimization summaries
+- Standard library only (sqlite3)
+"""
+
+import contextlib
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+
+PPM_TYPES = ('daily', 'weekly', 'monthly')
+TEAMS = (1, 2)
+
+COVERAGE_COLUMNS = tuple(f"team_{team}_{ppm_type}_coverage" for team in TEAMS for ppm_type in PPM_TYPES)
+MIN_COVERAGE_COLUMNS = tuple(f"min_{ppm_type}_coverage" for ppm_type in PPM_TYPES)
+TREND_COLUMNS = COVERAGE_COLUMNS + MIN_COVERAGE_COLUMNS + (
+    'runtime_seconds', 'total_qualifications', 'solve_time', 'objective', 'max_gap'
+)
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    optimization_name TEXT NOT NULL,
+    created_timestamp TEXT NOT NULL,
+    archive_directory TEXT,
+    input_hash TEXT,
+    runtime_seconds REAL,
+    teams_included TEXT,
+    total_engineers INTEGER,
+    total_qualifications INTEGER,
+    {', '.join(f'{column} REAL' for column in COVERAGE_COLUMNS)},
+    {', '.join(f'{column} REAL' for column in MIN_COVERAGE_COLUMNS)},
+    team_1_status TEXT,
+    team_2_status TEXT,
+    team_1_risk_level TEXT,
+    team_2_risk_level TEXT,
+    solver TEXT,
+    solver_status TEXT,
+    solve_time REAL,
+    objective REAL,
+    max_gap REAL,
+    UNIQUE (optimization_name, created_timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_name_time ON runs (optimization_name, created_timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_time ON runs (created_timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_min_daily ON runs (min_daily_coverage);
+CREATE INDEX IF NOT EXISTS idx_runs_input_hash ON runs (input_hash);
+CREATE INDEX IF NOT EXISTS idx_runs_archive ON runs (archive_directory);
+"""
+
+
+def input_data_hash(data_dir="data"):
+    """SHA-256 over the raw and processed input files (paths and contents)"""
+    data_path = Path(data_dir)
+    digest = hashlib.sha256()
+    files = sorted(path for sub in ('raw', 'processed') for path in (data_path / sub).rglob('*') if path.is_file())
+    if not files:
+        return None
+    for path in files:
+        digest.update(path.relative_to(data_path).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _team_entry(results, team):
+    """Per-team entry of results keyed by int (in memory) or str (loaded from JSON)"""
+    if not results:
+        return None
+    return results.get(team, results.get(str(team)))
+
+
+class RunIndex:
+    """SQLite index of saved optimization runs"""
+
+    def __init__(self, db_path="outputs/run_index.sqlite"):
+        self.db_path = Path(db_path)
+        self.created = not self.db_path.exists()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """Connection whose block is one transaction (committed, or rolled back on error)"""
+        connection = sqlite3.connect(self.db_path)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def build_row(self, qualification_matrices, metadata, validation_results=None, solver_telemetry=None,
+                  input_hash=None, runtime_seconds=None, archive_directory=None):
+        """Column values for one run"""
+        row = {
+            'optimization_name': metadata.get('optimization_name', 'unknown'),
+            'created_timestamp': metadata.get('created_timestamp', 'unknown'),
+            'archive_directory': archive_directory,
+            'input_hash': input_hash,
+            'runtime_seconds': runtime_seconds,
+            'teams_included': json.dumps(metadata.get('teams_included', [])),
+            'total_engineers': sum(len(engineers) for engineers in (qualification_matrices or {}).values()),
+            'total_qualifications': sum(len(assignment.get('qualifications', []))
+                                        for engineers in (qualification_matrices or {}).values()
+                                        for assignment in engineers.values())
+        }
+
+        for team in TEAMS:
+            team_results = _team_entry(validation_results, team)
+            for ppm_type in PPM_TYPES:
+                row[f"team_{team}_{ppm_type}_coverage"] = (
+                    team_results[ppm_type].get('coverage_percentage') if team_results else None
+                )
+            row[f"team_{team}_status"] = team_results.get('overall_status') if team_results else None
+            row[f"team_{team}_risk_level"] = (
+                team_results.get('risk_analysis', {}).get('overall_risk') if team_results else None
+            )
+        for ppm_type in PPM_TYPES:
+            values = [row[f"team_{team}_{ppm_type}_coverage"] for team in TEAMS
+                      if row[f"team_{team}_{ppm_type}_coverage"] is not None]
+            row[f"min_{ppm_type}_coverage"] = min(values) if values else None
+
+        team_telemetry = list((solver_telemetry or {}).get('teams', {}).values())
+        row['solver'] = (solver_telemetry or {}).get('solver')
+        row['solver_status'] = ','.join(sorted({str(t.get('status')) for t in team_telemetry})) or None
+        row['solve_time'] = sum(t.get('solve_time') or 0 for t in team_telemetry) if team_telemetry else None
+        objectives = [t.get('objective') for t in team_telemetry if t.get('objective') is not None]
+        row['objective'] = sum(objectives) if objectives else None
+        gaps = [t.get('final_gap') for t in team_telemetry if t.get('final_gap') is not None]
+        row['max_gap'] = max(gaps) if gaps else None
+        return row
+
+    def record_run(self, row):
+        """Insert or replace one run (keyed by optimization name and timestamp) in a transaction"""
+        columns = list(row)
+        updates = ', '.join(f"{column} = COALESCE(excluded.{column}, {column})" for column in columns)
+        with self._connect() as connection:
+            cursor = connection.execute(
+                f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT (optimization_name, created_timestamp) DO UPDATE SET {updates}",
+                [row[column] for column in columns]
+            )
+            return cursor.lastrowid
+
+    def mark_archived(self, optimization_name, created_timestamp, archive_directory):
+        """Link a run to its archive directory; False when the run is not indexed"""
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE runs SET archive_directory = ? WHERE optimization_name = ? AND created_timestamp = ?",
+                (archive_directory, optimization_name, created_timestamp)
+            )
+            return cursor.rowcount > 0
+
+    def query(self, optimization_name=None, name_prefix=None, below=None, since=None, until=None,
+              input_hash=None, archived=None, limit=None):
+        """Runs matching every given filter, newest first
+
+        Args:
+            optimization_name: Exact optimization name
+            name_prefix: Optimization name prefix (e.g. 'milp')
+            below: {ppm_type: percent} - some team's coverage strictly below percent
+            since / until: ISO timestamp bounds (inclusive)
+            input_hash: Only runs on this input data
+            archived: True / False to keep only archived / unarchived runs
+            limit: Maximum number of rows
+        """
+        clauses, params = [], []
+        if optimization_name is not None:
+            clauses.append("optimization_name = ?")
+            params.append(optimization_name)
+        if name_prefix is not None:
+            clauses.append("optimization_name >= ? AND optimization_name < ?")
+            params.extend([name_prefix, name_prefix + '\uffff'])
+        for ppm_type, percent in (below or {}).items():
+            if ppm_type not in PPM_TYPES:
+                raise ValueError(f"Unknown PPM type '{ppm_type}'. Choose from: {', '.join(PPM_TYPES)}")
+            clauses.append(f"min_{ppm_type}_coverage < ?")
+            params.append(percent)
+        if since is not None:
+            clauses.append("created_timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_timestamp <= ?")
+            params.append(until)
+        if input_hash is not None:
+            clauses.append("input_hash = ?")
+            params.append(input_hash)
+        if archived is not None:
+            clauses.append("archive_directory IS NOT NULL" if archived else "archive_directory IS NULL")
+
+        sql = "SELECT * FROM runs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._connect() as connection:
+            return [dict(row) for row in connection.execute(sql, params)]
+
+    def trend(self, column='min_daily_coverage', optimization_name=None):
+        """(timestamp, optimization name, value) for one column, oldest first"""
+        if column not in TREND_COLUMNS:
+            raise ValueError(f"Unknown trend column '{column}'. Choose from: {', '.join(TREND_COLUMNS)}")
+        sql = f"SELECT created_timestamp, optimization_name, {column} FROM runs WHERE {column} IS NOT NULL"
+        params = []
+        if optimization_name is not None:
+            sql += " AND optimization_name = ?"
+            params.append(optimization_name)
+        sql += " ORDER BY created_timestamp"
+        with self._connect() as connection:
+            return [tuple(row) for row in connection.execute(sql, params)]
+
+    def summary_by_optimization(self):
+        """Run count, latest run and coverage averages per optimization name"""
+        sql = (
+            "SELECT optimization_name, COUNT(*) AS runs, MAX(created_timestamp) AS latest, "
+            + ", ".join(f"ROUND(AVG({column}), 2) AS avg_{column}" for column in MIN_COVERAGE_COLUMNS)
+            + ", ROUND(AVG(total_qualifications), 1) AS avg_total_qualifications, "
+              "ROUND(AVG(runtime_seconds), 2) AS avg_runtime_seconds "
+              "FROM runs GROUP BY optimization_name ORDER BY latest DESC"
+        )
+        with self._connect() as connection:
+            return [dict(row) for row in connection.execute(sql)]
+
+    def archived_runs(self):
+        """Archived runs in the StandardOutputManager.list_archive format, newest first"""
+        return [
+            {
+                'directory': row['archive_directory'],
+                'optimization_name': row['optimization_name'],
+                'timestamp': row['created_timestamp'],
+                'teams': json.loads(row['teams_included'] or '[]')
+            }
+            for row in self.query(archived=True)
+        ]
@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+
+"""
+Pluggable MILP Solver Backends
+==============================
+
+This module decouples the PuLP models built by the optimization designers from
+the solver that runs them, so the same ride clustering and training-gap models
+can be solved with COIN-OR CBC, HiGHS or OR-Tools CP-SAT.
+
+Key Features:
+- Common solve() interface returning a SolverResult with status, objective,
+  best bound, gap, node count and wall time
+- Incumbent/bound trajectory over time (parsed from CBC logs, HiGHS callbacks
+  and CP-SAT solution callbacks)
+- Presolve reductions and model size statistics for solve telemetry
+- CBC remains the default and keeps the existing command-line options
+- HiGHS (highspy) and CP-SAT (ortools) are optional and detected at import time
+"""
+
+import math
+import os
+import re
+import tempfile
+import time
+
+# OR-Tools bundles its own HiGHS build. With some wheel combinations the two
+# HiGHS libraries clash and whichever loads second fails to import; that backend
+# then simply reports itself unavailable. OR-Tools is loaded before pulp (which
+# imports highspy), so entry points wanting CP-SAT should import this module first.
+try:
+    from ortools.sat.python import cp_model
+    ORTOOLS_AVAILABLE = True
+except ImportError:
+    ORTOOLS_AVAILABLE = False
+
+try:
+    import pulp
+    PULP_AVAILABLE = True
+except ImportError:
+    PULP_AVAILABLE = False
+
+try:
+    import highspy
+    HIGHS_AVAILABLE = True
+except ImportError:
+    HIGHS_AVAILABLE = False
+
+
+# Tuning options historically passed to CBC by the ride clustering MILP
+DEFAULT_CBC_OPTIONS = [
+    'strategy 1',        # More thorough branch-and-bound
+    'cuts on',           # Enable cutting planes
+    'heuristics on',     # Enable heuristics
+    'preprocess on',     # Enable preprocessing
+    'threads 0'          # Use all cores
+]
+
+
+class SolverResult:
+    """Outcome of a single solver run on a PuLP model"""
+
+    def __init__(self, backend, status, objective=None, best_bound=None, gap=None,
+                 wall_time=0.0, nodes=None, trajectory=None, message=None, log_text=None,
+                 presolve=None):
+        self.backend = backend
+        self.status = status              # pulp.LpStatus string ('Optimal', 'Not Solved', ...)
+        self.objective = objective
+        self.best_bound = best_bound
+        self.gap = gap
+        self.wall_time = wall_time
+        self.nodes = nodes
+        self.trajectory = trajectory or []  # [{'time', 'incumbent', 'bound'}]
+        self.message = message
+        self.log_text = log_text            # Raw solver log, when the backend produces one
+        self.presolve = presolve            # Rows/columns/nonzeros before and after presolve
+        self.has_solution = objective is not None
+
+    def to_dict(self):
+        """Serializable summary of the run"""
+        return {
+            'backend': self.backend,
+            'status': self.status,
+            'objective': self.objective,
+            'best_bound': self.best_bound,
+            'gap': self.gap,
+            'wall_time': round(self.wall_time, 4),
+            'nodes': self.nodes,
+            'trajectory': self.trajectory,
+            'presolve': self.presolve,
+            'message': self.message
+        }
+
+
+def describe_model(prob, family_prefixes=()):
+    """Size statistics for a PuLP model: variables, constraints per family and nonzeros
+    
+    Constraints are grouped by the first matching name prefix in family_prefixes;
+    anything else is counted under 'other'.
+    """
+    variables = prob.variables()
+    constraints_by_family = {prefix: 0 for prefix in family_prefixes}
+    nonzeros = 0
+    for name, constraint in prob.constraints.items():
+        nonzeros += sum(1 for coefficient in constraint.values() if coefficient != 0)
+        family = next((prefix for prefix in family_prefixes if name.startswith(prefix)), 'other')
+        constraints_by_family[family] = constraints_by_family.get(family, 0) + 1
+
+    return {
+        'variables': len(variables),
+        'binary_variables': sum(1 for var in variables if var.cat == pulp.LpInteger
+                                and var.lowBound == 0 and var.upBound == 1),
+        'integer_variables': sum(1 for var in variables if var.cat == pulp.LpInteger),
+        'constraints': len(prob.constraints),
+        'constraints_by_family': {family: count for family, count in constraints_by_family.items() if count},
+        'nonzeros': nonzeros
+    }
+
+
+def _presolve_summary(original, presolved, **details):
+    """Presolve reduction summary from (rows, columns, nonzeros) before and after"""
+    if original is None or presolved is None:
+        return None
+    summary = {
+        'original': dict(zip(('rows', 'columns', 'nonzeros'), original)),
+        'presolved': dict(zip(('rows', 'columns', 'nonzeros'), presolved)),
+        'rows_removed': original[0] - presolved[0],
+        'columns_removed': original[1] - presolved[1],
+        'nonzeros_removed': original[2] - presolved[2]
+    }
+    summary.update(details)
+    return summary
+
+
+def _relative_gap(objective, bound):
+    """Relative optimality gap in the same convention CBC reports"""
+    if objective is None or bound is None:
+        return None
+    denominator = max(abs(objective), 1e-10)
+    return abs(objective - bound) / denominator
+
+
+def _limit_aware_status(status, sol_status, gap, gap_rel):
+    """Report a stop on a time or node limit as 'Not Solved' rather than 'Optimal'
+    
+    PuLP marks CBC and HiGHS runs that stop on a limit with an incumbent as
+    'Optimal' with an integer-feasible solution; only keep 'Optimal' when the
+    incumbent is within the requested gap.
+    """
+    if status == 'Optimal' and sol_status == pulp.LpSolutionIntegerFeasible:
+        if gap_rel is None or gap is None or gap > gap_rel + 1e-9:
+            return 'Not Solved'
+    return status
+
+
+class SolverBackend:
+    """Base class for solver backends"""
+
+    name = 'base'
+
+    def __init__(self, time_limit=None, gap_rel=None, msg=True, threads=None):
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
+        self.msg = msg
+        self.threads = threads
+
+    @classmethod
+    def available(cls):
+        """True if the backend can run in this environment"""
+        return False
+
+    def solve(self, prob, warm_start=False):
+        """Solve a PuLP problem in place (variable values are written back)"""
+        raise NotImplementedError
+
+    def solve_relaxation(self, prob, presolve=True):
+        """Solve the LP relaxation of a PuLP problem in place (integrality dropped)
+        
+        Uses CBC's LP solver unless the backend overrides it; backends without an
+        LP solver of their own (CP-SAT) fall back to this. presolve=False keeps
+        every row in the solved LP, so each one reports its own dual.
+        """
+        return self._solve_relaxation_with(prob, pulp.PULP_CBC_CMD(msg=False, mip=False, timeLimit=self.time_limit,
+                                                                    presolve=None if presolve else False))
+
+    def _solve_relaxation_with(self, prob, solver):
+        """Run an LP solve and report its objective as both value and bound"""
+        start = time.time()
+        prob.solve(solver)
+        wall_time = time.time() - start
+        status = pulp.LpStatus[prob.status]
+        objective = pulp.value(prob.objective) if status == 'Optimal' else None
+        return SolverResult(f"{self.name}-lp", status, objective=objective, best_bound=objective,
+                            gap=0.0 if objective is not None else None, wall_time=wall_time)
+
+    def describe(self):
+        """Short description for progress output"""
+        limits = []
+        if self.time_limit is not None:
+            limits.append(f"{self.time_limit:g}s")
+        if self.gap_rel is not None:
+            limits.append(f"{self.gap_rel * 100:g}% gap")
+        return f"{self.name.upper()} ({', '.join(limits)})" if limits else self.name.upper()
+
+
+class CBCBackend(SolverBackend):
+    """COIN-OR CBC through pulp.PULP_CBC_CMD, with log parsing for telemetry"""
+
+    name = 'cbc'
+
+    _INCUMBENT_RE = re.compile(r'Integer solution of (-?[\d.eE+-]+) found.*?\(([\d.]+) seconds\)')
+    _PROGRESS_RE = re.compile(r'After (\d+) nodes, \d+ on tree, (-?[\d.eE+-]+) best solution, '
+                              r'best possible (-?[\d.eE+-]+) \(([\d.]+) seconds\)')
+    _CONTINUOUS_RE = re.compile(r'Continuous objective value is (-?[\d.eE+-]+) - ([\d.]+) seconds')
+    _ORIGINAL_SIZE_RE = re.compile(r'Problem \S+ has (\d+) rows, (\d+) columns and (\d+) elements')
+    _PRESOLVED_SIZE_RE = re.compile(r'Cgl0004I processed model has (\d+) rows, (\d+) columns .*? and (\d+) elements')
+    _FIXED_RE = re.compile(r'Cgl0002I (\d+) variables fixed')
+    _TIGHTENED_RE = re.compile(r'Cgl0003I (\d+) fixed, (\d+) tightened bounds, (\d+) strengthened rows')
+    _NODES_RE = re.compile(r'Enumerated nodes:\s+(\d+)')
+    _LOWER_BOUND_RE = re.compile(r'Lower bound:\s+(-?[\d.eE+-]+)')
+
+    def __init__(self, time_limit=None, gap_rel=None, msg=True, threads=None, options=None):
+        super().__init__(time_limit=time_limit, gap_rel=gap_rel, msg=msg, threads=threads)
+        self.options = list(DEFAULT_CBC_OPTIONS if options is None else options)
+
+    @classmethod
+    def available(cls):
+        return PULP_AVAILABLE and pulp.PULP_CBC_CMD().available()
+
+    def solve(self, prob, warm_start=False):
+        log_fd, log_path = tempfile.mkstemp(suffix='.log', prefix='cbc_')
+        os.close(log_fd)
+
+        solver = pulp.PULP_CBC_CMD(
+            msg=False,
+            timeLimit=self.time_limit,
+            gapRel=self.gap_rel,
+            threads=self.threads,
+            warmStart=warm_start,
+            logPath=log_path,
+            options=self.options
+        )
+
+        start = time.time()
+        try:
+            prob.solve(solver)
+            wall_time = time.time() - start
+            with open(log_path, 'r') as f:
+                log_text = f.read()
+        finally:
+            if os.path.exists(log_path):
+                os.remove(log_path)
+
+        if self.msg:
+            print(log_text)
+
+        return self._build_result(prob, log_text, wall_time)
+
+    def _build_result(self, prob, log_text, wall_time):
+        """Turn a finished PuLP solve and its CBC log into a SolverResult"""
+        status = pulp.LpStatus[prob.status]
+        has_solution = prob.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+        objective = pulp.value(prob.objective) if has_solution else None
+
+        trajectory = []
+        best_bound = None
+        for line in log_text.splitlines():
+            match = self._CONTINUOUS_RE.search(line)
+            if match:
+                # Root LP relaxation gives the first bound
+                best_bound = float(match.group(1))
+                trajectory.append({'time': float(match.group(2)), 'incumbent': None, 'bound': best_bound})
+                continue
+            match = self._PROGRESS_RE.search(line)
+            if match:
+                best_bound = float(match.group(3))
+                trajectory.append({'time': float(match.group(4)),
+                                   'incumbent': float(match.group(2)),
+                                   'bound': best_bound})
+                continue
+            match = self._INCUMBENT_RE.search(line)
+            if match:
+                trajectory.append({'time': float(match.group(2)),
+                                   'incumbent': float(match.group(1)),
+                                   'bound': best_bound})
+
+        match = self._LOWER_BOUND_RE.search(log_text)
+        if match:
+            best_bound = float(match.group(1))
+        elif status == 'Optimal' and objective is not None:
+            best_bound = objective
+
+        nodes = None
+        match = self._NODES_RE.search(log_text)
+        if match:
+            nodes = int(match.group(1))
+
+        gap = _relative_gap(objective, best_bound)
+        if objective is not None:
+            trajectory.append({'time': round(wall_time, 4), 'incumbent': objective, 'bound': best_bound})
+        status = _limit_aware_status(status, prob.sol_status, gap, self.gap_rel)
+
+        return SolverResult(self.name, status, objective=objective, best_bound=best_bound, gap=gap,
+                            wall_time=wall_time, nodes=nodes, trajectory=trajectory, log_text=log_text,
+                            presolve=self._parse_presolve(log_text))
+
+    def _parse_presolve(self, log_text):
+        """Presolve reductions reported by CBC's preprocessing (Cgl) messages"""
+        original = self._ORIGINAL_SIZE_RE.search(log_text)
+        presolved = self._PRESOLVED_SIZE_RE.search(log_text)
+        if not original:
+            return None
+        original_size = tuple(int(value) for value in original.groups())
+        # No Cgl0004I line means preprocessing left the model unchanged
+        presolved_size = tuple(int(value) for value in presolved.groups()) if presolved else original_size
+
+        fixed = self._FIXED_RE.search(log_text)
+        tightened = self._TIGHTENED_RE.search(log_text)
+        return _presolve_summary(
+            original_size, presolved_size,
+            variables_fixed=int(fixed.group(1)) if fixed else 0,
+            bounds_tightened=int(tightened.group(2)) if tightened else 0,
+            rows_strengthened=int(tightened.group(3)) if tightened else 0
+        )
+
+
+class HiGHSBackend(SolverBackend):
+    """HiGHS through pulp.HiGHS (highspy), with MIP callbacks for the trajectory"""
+
+    name = 'highs'
+
+    _ORIGINAL_SIZE_RE = re.compile(r'has (\d+) rows; (\d+) cols; (\d+) nonzeros')
+    _REDUCTIONS_RE = re.compile(r'Presolve reductions: rows (\d+)\(-\d+\); columns (\d+)\(-\d+\); '
+                                r'nonzeros (\d+)\(-\d+\)')
+
+    @classmethod
+    def available(cls):
+        return PULP_AVAILABLE and HIGHS_AVAILABLE
+
+    def solve_relaxation(self, prob, presolve=True):
+        options = {} if presolve else {'presolve': 'off'}
+        return self._solve_relaxation_with(prob, pulp.HiGHS(msg=False, mip=False, timeLimit=self.time_limit,
+                                                            **options))
+
+    def solve(self, prob, warm_start=False):
+        trajectory = []
+        log_lines = []
+        start = time.time()
+        callback_types = highspy.cb.HighsCallbackType
+
+        def record_progress(callback_type, message, data_out, data_in, user_data):
+            if callback_type == callback_types.kCallbackLogging:
+                log_lines.append(message)
+                return
+            primal = data_out.mip_primal_bound
+            dual = data_out.mip_dual_bound
+            trajectory.append({
+                'time': round(data_out.running_time, 4),
+                'incumbent': primal if abs(primal) < 1e30 else None,
+                'bound': dual if abs(dual) < 1e30 else None
+            })
+
+        # Logging stays on so the callback sees presolve messages; console output follows msg
+        solver = pulp.HiGHS(
+            msg=True,
+            log_to_console=bool(self.msg),
+            timeLimit=self.time_limit,
+            gapRel=self.gap_rel,
+            threads=self.threads,
+            callbackTuple=(record_progress, None),
+            callbacksToActivate=[callback_types.kCallbackMipImprovingSolution,
+                                 callback_types.kCallbackMipLogging,
+                                 callback_types.kCallbackLogging]
+        )
+        prob.solve(solver)
+        wall_time = time.time() - start
+
+        status = pulp.LpStatus[prob.status]
+        has_solution = prob.sol_status in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible)
+        objective = pulp.value(prob.objective) if has_solution else None
+
+        info = prob.solverModel.getInfo()
+        best_bound = info.mip_dual_bound if abs(info.mip_dual_bound) < 1e30 else objective
+        nodes = int(info.mip_node_count) if info.mip_node_count >= 0 else None
+        if objective is not None:
+            trajectory.append({'time': round(wall_time, 4), 'incumbent': objective, 'bound': best_bound})
+
+        gap = _relative_gap(objective, best_bound)
+        status = _limit_aware_status(status, prob.sol_status, gap, self.gap_rel)
+
+        log_text = ''.join(log_lines)
+        presolve = None
+        original = self._ORIGINAL_SIZE_RE.search(log_text)
+        if original:
+            reductions = self._REDUCTIONS_RE.search(log_text)
+            original_size = tuple(int(value) for value in original.groups())
+            presolve = _presolve_summary(
+                original_size,
+                tuple(int(value) for value in reductions.groups()) if reductions else original_size
+            )
+
+        return SolverResult(self.name, status, objective=objective, best_bound=best_bound,
+                            gap=gap, wall_time=wall_time, nodes=nodes, trajectory=trajectory,
+                            log_text=log_text, presolve=presolve)
+
+
+class CPSATBackend(SolverBackend):
+    """OR-Tools CP-SAT via a direct translation of the PuLP model
+
+    CP-SAT only works with integer data, so every row and the objective are
+    scaled by the smallest power of ten that makes their coefficients integral.
+    Continuous variables are not supported.
+    """
+
+    name = 'cpsat'
+
+    MAX_SCALE_DIGITS = 6
+    DEFAULT_INTEGER_BOUND = 10 ** 6
+
+    @classmethod
+    def available(cls):
+        return PULP_AVAILABLE and ORTOOLS_AVAILABLE
+
+    def _scale_to_integers(self, coefficients):
+        """Smallest power-of-ten multiplier that makes all coefficients integral"""
+        for digits in range(self.MAX_SCALE_DIGITS + 1):
+            scale = 10 ** digits
+            if all(abs(c * scale - round(c * scale)) < 1e-9 for c in coefficients):
+                return scale
+        raise ValueError(f"CP-SAT backend cannot represent coefficients {coefficients[:5]}... as integers")
+
+    def _translate(self, prob):
+        """Translate a PuLP LpProblem into a CP-SAT model"""
+        model = cp_model.CpModel()
+        variables = {}
+
+        for var in prob.variables():
+            if var.cat == pulp.LpContinuous:
+                raise ValueError(f"CP-SAT backend does not support continuous variable {var.name}")
+            low = int(math.ceil(var.lowBound)) if var.lowBound is not None else -self.DEFAULT_INTEGER_BOUND
+            high = int(math.floor(var.upBound)) if var.upBound is not None else self.DEFAULT_INTEGER_BOUND
+            variables[var.name] = model.NewIntVar(low, high, var.name)
+
+        for name, constraint in prob.constraints.items():
+            items = [(var, coef) for var, coef in constraint.items() if coef != 0]
+            if not items:
+                continue
+            rhs = -constraint.constant
+            scale = self._scale_to_integers([coef for _, coef in items] + [rhs])
+            expr = sum(int(round(coef * scale)) * variables[var.name] for var, coef in items)
+            bound = int(round(rhs * scale))
+            if constraint.sense == pulp.LpConstraintEQ:
+                model.Add(expr == bound)
+            elif constraint.sense == pulp.LpConstraintLE:
+                model.Add(expr <= bound)
+            else:
+                model.Add(expr >= bound)
+
+        objective_scale = 1
+        objective_constant = 0.0
+        if prob.objective is not None:
+            items = [(var, coef) for var, coef in prob.objective.items() if coef != 0]
+            objective_constant = prob.objective.constant
+            if items:
+                objective_scale = self._scale_to_integers([coef for _, coef in items])
+                expr = sum(int(round(coef * objective_scale)) * variables[var.name] for var, coef in items)
+                if prob.sense == pulp.LpMaximize:
+                    model.Maximize(expr)
+                else:
+                    model.Minimize(expr)
+
+        return model, variables, objective_scale, objective_constant
+
+    def solve(self, prob, warm_start=False):
+        start = time.time()
+        model, variables, objective_scale, objective_constant = self._translate(prob)
+
+        if warm_start:
+            for var in prob.variables():
+                if var.varValue is not None:
+                    model.AddHint(variables[var.name], int(round(var.varValue)))
+
+        solver = cp_model.CpSolver()
+        if self.time_limit is not None:
+            solver.parameters.max_time_in_seconds = float(self.time_limit)
+        if self.gap_rel is not None:
+            solver.parameters.relative_gap_limit = float(self.gap_rel)
+        solver.parameters.num_workers = self.threads or 8
+        solver.parameters.log_search_progress = bool(self.msg)
+
+        trajectory = []
+
+        class TrajectoryCallback(cp_model.CpSolverSolutionCallback):
+            def on_solution_callback(self):
+                trajectory.append({
+                    'time': round(self.WallTime(), 4),
+                    'incumbent': self.ObjectiveValue() / objective_scale + objective_constant,
+                    'bound': self.BestObjectiveBound() / objective_scale + objective_constant
+                })
+
+        cp_status = solver.Solve(model, TrajectoryCallback())
+        wall_time = time.time() - start
+
+        status_map = {
+            cp_model.OPTIMAL: ('Optimal', pulp.LpStatusOptimal, pulp.LpSolutionOptimal),
+            cp_model.FEASIBLE: ('Optimal', pulp.LpStatusOptimal, pulp.LpSolutionIntegerFeasible),
+            cp_model.INFEASIBLE: ('Infeasible', pulp.LpStatusInfeasible, pulp.LpSolutionInfeasible),
+            cp_model.MODEL_INVALID: ('Undefined', pulp.LpStatusUndefined, pulp.LpSolutionNoSolutionFound),
+        }
+        status, prob.status, prob.sol_status = status_map.get(
+            cp_status, ('Not Solved', pulp.LpStatusNotSolved, pulp.LpSolutionNoSolutionFound)
+        )
+        if cp_status == cp_model.FEASIBLE:
+            # Same convention as the CBC and HiGHS backends: 'Optimal' only inside the gap tolerance
+            gap = _relative_gap(solver.ObjectiveValue(), solver.BestObjectiveBound())
+            if self.gap_rel is None or gap is None or gap > self.gap_rel:
+                status = 'Not Solved'
+                prob.status = pulp.LpStatusNotSolved
+
+        objective = best_bound = None
+        if cp_status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            for var in prob.variables():
+                var.varValue = solver.Value(variables[var.name])
+            objective = pulp.value(prob.objective)
+            best_bound = solver.BestObjectiveBound() / objective_scale + objective_constant
+            trajectory.append({'time': round(wall_time, 4), 'incumbent': objective, 'bound': best_bound})
+
+        return SolverResult(self.name, status, objective=objective, best_bound=best_bound,
+                            gap=_relative_gap(objective, best_bound), wall_time=wall_time,
+                            nodes=int(solver.NumBranches()), trajectory=trajectory)
+
+
+SOLVER_BACKENDS = {
+    'cbc': CBCBackend,
+    'highs': HiGHSBackend,
+    'cpsat': CPSATBackend,
+}
+
+
+def available_backends():
+    """Names of the backends that can run in this environment"""
+    return [name for name, backend in SOLVER_BACKENDS.items() if backend.available()]
+
+
+def get_solver_backend(name='cbc', **options):
+    """Create a solver backend by name ('cbc', 'highs' or 'cpsat')"""
+    key = (name or 'cbc').lower()
+    if key not in SOLVER_BACKENDS:
+        raise ValueError(f"Unknown solver backend '{name}'. Choose from: {', '.join(SOLVER_BACKENDS)}")
+
+    backend_class = SOLVER_BACKENDS[key]
+    if not backend_class.available():
+        raise ValueError(f"Solver backend '{name}' is not available - available: {', '.join(available_backends())}")
+
+    if key != 'cbc':
+        options.pop('options', None)
+    return backend_class(**options)
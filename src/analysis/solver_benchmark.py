@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+
+"""
+Solver Benchmark
+================
+
+Runs the same ride clustering and training-gap MILP models through every
+available solver backend and records how each one performs, so the fastest
+solver can be chosen per model type.
+
+Key Features:
+- Identical models per backend (rebuilt fresh for every run)
+- Time to optimal, time to first incumbent and gap-over-time trajectory
+- Peak memory per run, including the CBC subprocess
+- Each run isolated in a forked process so peak memory is not shared
+- Fastest backend recommendation per model type
+- Ride clustering timed with and without symmetry breaking
+"""
+
+import contextlib
+import io
+import multiprocessing
+import sys
+from datetime import datetime
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+from .solver_backends import available_backends, get_solver_backend
+from .standard_output_manager import StandardOutputManager
+from .training_optimization_designer import TrainingOptimizationDesigner
+
+
+def _max_rss_mb(who):
+    """Peak resident set size in MB for RUSAGE_SELF or RUSAGE_CHILDREN"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    max_rss = resource.getrusage(who).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+class SolverBenchmark:
+    """Head-to-head comparison of MILP solver backends on the production models"""
+
+    MODEL_TYPES = ['ride_clustering', 'ride_clustering_no_symmetry', 'training_gap']
+
+    def __init__(self, optimizer_results, backends=None, time_limit=300, gap_rel=0.03):
+        """
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            backends: Backend names to compare (default: all available)
+            time_limit: Per-run time limit in seconds
+            gap_rel: Relative optimality gap at which a run counts as optimal
+        """
+        self.optimizer = optimizer_results
+        self.backends = backends or available_backends()
+        self.time_limit = time_limit
+        self.gap_rel = gap_rel
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.training_designer = TrainingOptimizationDesigner(optimizer_results)
+            self.current_matrices = self.training_designer.load_current_qualification_state()
+        self.milp_designer = self.training_designer.milp_designer
+
+        print("⏱️  SOLVER BENCHMARK INITIALIZED")
+        print(f"   Backends: {', '.join(self.backends)}")
+        print(f"   Models: {', '.join(self.MODEL_TYPES)}")
+        print(f"   Limits: {time_limit}s, {gap_rel * 100:g}% gap")
+
+    def _model_instances(self, model_type):
+        """Instances (one per team) of a model type that have something to solve"""
+        instances = []
+        for team in [1, 2]:
+            if model_type == 'training_gap':
+                if team not in self.current_matrices:
+                    continue
+                with contextlib.redirect_stdout(io.StringIO()):
+                    gaps = self.training_designer._analyze_current_coverage_gaps(self.current_matrices[team], team)
+                if not gaps['missing_qualifications']:
+                    continue
+            instances.append(team)
+        return instances
+
+    def _build_model(self, model_type, team):
+        """Build a fresh PuLP problem for one model instance"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            if model_type == 'ride_clustering':
+                return self.milp_designer._build_ride_clustering_model(team, symmetry_breaking=True)['prob']
+            if model_type == 'ride_clustering_no_symmetry':
+                return self.milp_designer._build_ride_clustering_model(team, symmetry_breaking=False)['prob']
+
+            team_current = self.current_matrices[team]
+            gaps = self.training_designer._analyze_current_coverage_gaps(team_current, team)
+            return self.training_designer._build_training_gap_model(team_current, gaps, team)['prob']
+
+    def _run_case(self, model_type, team, backend_name):
+        """Build and solve one instance with one backend, measuring memory around the solve"""
+        prob = self._build_model(model_type, team)
+        backend = get_solver_backend(backend_name, time_limit=self.time_limit,
+                                     gap_rel=self.gap_rel, msg=False)
+
+        baseline_rss = _max_rss_mb(resource.RUSAGE_SELF) if RESOURCE_AVAILABLE else None
+        result = backend.solve(prob)
+        peak_rss = _max_rss_mb(resource.RUSAGE_SELF) if RESOURCE_AVAILABLE else None
+        solver_process_rss = _max_rss_mb(resource.RUSAGE_CHILDREN) if RESOURCE_AVAILABLE else None
+
+        gap_over_time = []
+        for point in result.trajectory:
+            gap = None
+            if point['incumbent'] is not None and point['bound'] is not None:
+                gap = abs(point['incumbent'] - point['bound']) / max(abs(point['incumbent']), 1e-10)
+            gap_over_time.append({'time': point['time'], 'incumbent': point['incumbent'],
+                                  'bound': point['bound'], 'gap': gap})
+
+        optimal = result.status == 'Optimal' and result.gap is not None and result.gap <= self.gap_rel
+        in_process_mb = None
+        if peak_rss is not None:
+            in_process_mb = max(peak_rss - baseline_rss, 0.0)
+
+        return {
+            'model_type': model_type,
+            'team': team,
+            'backend': backend_name,
+            'variables': len(prob.variables()),
+            'constraints': len(prob.constraints),
+            'status': result.status,
+            'objective': result.objective,
+            'best_bound': result.best_bound,
+            'final_gap': result.gap,
+            'nodes': result.nodes,
+            'wall_time': round(result.wall_time, 4),
+            'time_to_optimal': round(result.wall_time, 4) if optimal else None,
+            'time_to_first_incumbent': gap_over_time[0]['time'] if gap_over_time else None,
+            'gap_over_time': gap_over_time,
+            'peak_rss_mb': peak_rss,
+            'solve_memory_mb': max(in_process_mb or 0.0, solver_process_rss or 0.0) if RESOURCE_AVAILABLE else None,
+            'solver_process_peak_rss_mb': solver_process_rss
+        }
+
+    def _run_case_in_child(self, model_type, team, backend_name, connection):
+        """Child-process entry point: run a case and send the outcome back"""
+        try:
+            connection.send(self._run_case(model_type, team, backend_name))
+        except Exception as e:
+            connection.send({'model_type': model_type, 'team': team, 'backend': backend_name,
+                             'status': 'Error', 'error': str(e)})
+        finally:
+            connection.close()
+
+    def _run_isolated(self, model_type, team, backend_name):
+        """Run a case in a forked process so every run starts from the same memory baseline"""
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            return self._run_case(model_type, team, backend_name)
+
+        context = multiprocessing.get_context('fork')
+        parent_connection, child_connection = context.Pipe(duplex=False)
+        process = context.Process(target=self._run_case_in_child,
+                                  args=(model_type, team, backend_name, child_connection))
+        process.start()
+        child_connection.close()
+        try:
+            outcome = parent_connection.recv()
+        except EOFError:
+            outcome = {'model_type': model_type, 'team': team, 'backend': backend_name,
+                       'status': 'Error', 'error': f'benchmark process exited with code {process.exitcode}'}
+        process.join()
+        return outcome
+
+    def run(self, model_types=None):
+        """Run every model instance through every backend"""
+        print("\n⏱️  RUNNING SOLVER BENCHMARK")
+        print("=" * 70)
+
+        runs = []
+        for model_type in model_types or self.MODEL_TYPES:
+            instances = self._model_instances(model_type)
+            print(f"\n📐 {model_type}: {len(instances)} instance(s)")
+
+            for team in instances:
+                for backend_name in self.backends:
+                    outcome = self._run_isolated(model_type, team, backend_name)
+                    runs.append(outcome)
+
+                    if outcome['status'] == 'Error':
+                        print(f"   ❌ Team {team} {backend_name}: {outcome['error']}")
+                        continue
+                    memory = f", {outcome['solve_memory_mb']:.0f} MB" if outcome['solve_memory_mb'] is not None else ""
+                    print(f"   Team {team} {backend_name:>6}: {outcome['status']} in {outcome['wall_time']:.2f}s "
+                          f"(obj {outcome['objective']}, nodes {outcome['nodes']}{memory})")
+
+        results = {
+            'timestamp': datetime.now().isoformat(),
+            'backends': self.backends,
+            'time_limit': self.time_limit,
+            'gap_rel': self.gap_rel,
+            'runs': runs,
+            'summary': self._summarize(runs)
+        }
+        results['fastest_by_model'] = {
+            model_type: summary['fastest_backend']
+            for model_type, summary in results['summary'].items()
+        }
+        return results
+
+    def _summarize(self, runs):
+        """Aggregate runs per model type and backend and pick the fastest backend"""
+        summary = {}
+        for run in runs:
+            model_summary = summary.setdefault(run['model_type'], {'backends': {}, 'fastest_backend': None})
+            backend_summary = model_summary['backends'].setdefault(run['backend'], {
+                'runs': 0, 'optimal_runs': 0, 'total_time_to_optimal': 0.0,
+                'max_solve_memory_mb': None, 'failed': False
+            })
+            backend_summary['runs'] += 1
+            if run.get('time_to_optimal') is not None:
+                backend_summary['optimal_runs'] += 1
+                backend_summary['total_time_to_optimal'] += run['time_to_optimal']
+            else:
+                backend_summary['failed'] = True
+            if run.get('solve_memory_mb') is not None:
+                backend_summary['max_solve_memory_mb'] = max(backend_summary['max_solve_memory_mb'] or 0.0,
+                                                             run['solve_memory_mb'])
+
+        # Fastest = solved every instance to optimality in the least total time
+        for model_summary in summary.values():
+            candidates = [(data['total_time_to_optimal'], name)
+                          for name, data in model_summary['backends'].items() if not data['failed']]
+            if candidates:
+                model_summary['fastest_backend'] = min(candidates)[1]
+        return summary
+
+    def display_results(self, results):
+        """Print the per-model comparison table"""
+        print("\n🏁 SOLVER BENCHMARK SUMMARY")
+        print("=" * 70)
+        for model_type, model_summary in results['summary'].items():
+            print(f"\n📐 {model_type}:")
+            for name, data in model_summary['backends'].items():
+                total = f"{data['total_time_to_optimal']:.2f}s" if not data['failed'] else "did not reach optimal"
+                memory = f", peak {data['max_solve_memory_mb']:.0f} MB" if data['max_solve_memory_mb'] is not None else ""
+                print(f"   {name:>6}: {data['optimal_runs']}/{data['runs']} optimal, {total}{memory}")
+            fastest = model_summary['fastest_backend']
+            print(f"   🏆 Fastest: {fastest if fastest else 'none reached optimal'}")
+
+    def save_results(self, results, output_manager=None):
+        """Save benchmark results as JSON to the current output directory"""
+        output_manager = output_manager or StandardOutputManager()
+        output_path, = output_manager.save_side_files({"solver_benchmark.json": results})
+        print(f"\n💾 Benchmark results saved to: {output_path}")
+        return output_path
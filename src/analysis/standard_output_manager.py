@@ -10,33 +10,92 @@ All optimization models should use this manager to:
 1. Write qualification matrices to standard locations
 2. Include metadata about which optimization was used
 3. Archive previous results for comparison
+
+Archives are content-addressed: each archived file is stored once as a
+compressed blob named by the SHA-256 of its content (zstd when zstandard is
+installed, gzip otherwise), and each archived run is a small manifest that
+maps file names to blobs. Identical matrices and validation files saved by
+repeated runs share one blob. Archives written as plain file copies by older
+versions are still listed and restored.
+
+Every save is also recorded in an SQLite run index (outputs/run_index.sqlite)
+used for listing, filtering and trend queries without scanning the archive.
+
+Saves are safe to run concurrently: each run writes its files (atomically)
+into its own staging directory, then, under an exclusive run lock, the
+staging directory replaces current/ by rename. Files in current/ that belong
+to no run (side reports from other tools) are hard-linked into the new
+directory first. Readers take a shared lock, so they never see a half-swapped
+or mixed set of files.
 """
 
+import gzip
+import hashlib
 import json
+import os
 import shutil
+import uuid
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from .atomic_output import RunLock, atomic_write_bytes, atomic_write_json, atomic_write_text, link_or_copy
+from .run_index import RunIndex, input_data_hash
+from .validation_store import ValidationStore
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
 
 class StandardOutputManager:
     """Manages standardized output for all optimization approaches"""
     
+    # Files in current/ that are archived and restored
+    ARCHIVED_FILES = [
+        "team_1_qualification_matrix.json",
+        "team_2_qualification_matrix.json",
+        "metadata.json",
+        "validation_results.json",
+        "validation_gaps.npz",
+        "solver_telemetry.json"
+    ]
+    MANIFEST_FILE = "manifest.json"
+    MANIFEST_FORMAT = "content-addressed-v1"
+    BLOB_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+    
     def __init__(self, base_dir="outputs"):
         self.base_dir = Path(base_dir)
         self.current_dir = self.base_dir / "current"
         self.archive_dir = self.base_dir / "archive"
+        self.objects_dir = self.archive_dir / "objects"
+        self.index_path = self.base_dir / "run_index.sqlite"
+        self.staging_root = self.base_dir / ".staging"
+        self.run_lock = RunLock(self.base_dir / ".current.lock")
+        self._run_index = None
         
         # Create required directories
         self.current_dir.mkdir(parents=True, exist_ok=True)
         # Note: archive_dir is only created when actually needed for archiving
     
+    def create_staging_dir(self) -> Path:
+        """New private directory for one run's files (promoted to current on save)"""
+        staging_dir = self.staging_root / f"run_{os.getpid()}_{uuid.uuid4().hex[:12]}"
+        staging_dir.mkdir(parents=True)
+        return staging_dir
+    
     def save_optimization_results(self, 
                                 qualification_matrices: Dict[int, Dict],
                                 optimization_name: str,
                                 optimization_config: Optional[Dict] = None,
                                 validation_results: Optional[Dict] = None,
-                                archive_previous: bool = False):
+                                archive_previous: bool = False,
+                                solver_telemetry: Optional[Dict] = None,
+                                runtime_seconds: Optional[float] = None,
+                                extra_files: Optional[Dict[str, Any]] = None,
+                                staging_dir: Optional[Path] = None):
         """
         Save optimization results to standard location
         
@@ -46,80 +105,219 @@ class StandardOutputManager:
             optimization_config: Optional configuration used for this optimization
             validation_results: Optional validation results if already computed
             archive_previous: Whether to archive previous results (default: False)
+            solver_telemetry: Optional MILP solve telemetry (model size, presolve, trajectory)
+            runtime_seconds: Optional wall time of the optimization, recorded in the run index
+            extra_files: Optional {filename: data} saved with the run (dicts/lists as
+                JSON, str as text, bytes as-is)
+            staging_dir: Optional directory from create_staging_dir() that already
+                holds files of this run (e.g. CSV exports)
         """
         print(f"\n💾 SAVING RESULTS TO STANDARD LOCATION")
         print(f"   Optimization: {optimization_name}")
         
-        # Archive current results if they exist and archiving is requested
-        if archive_previous:
-            self._archive_current_results(optimization_name)
-        elif (self.current_dir / "metadata.json").exists():
-            print(f"   🔄 Overwriting previous results (no archiving)")
+        # Write everything into this run's staging directory (no lock needed)
+        staging_dir = Path(staging_dir) if staging_dir is not None else self.create_staging_dir()
         
         # Save qualification matrices
         for team in [1, 2]:
             if team in qualification_matrices:
-                matrix_file = self.current_dir / f"team_{team}_qualification_matrix.json"
-                with open(matrix_file, 'w') as f:
-                    json.dump(qualification_matrices[team], f, indent=2)
-                print(f"   📄 Saved: {matrix_file}")
+                atomic_write_json(staging_dir / f"team_{team}_qualification_matrix.json", qualification_matrices[team])
+        
+        # Save validation results if provided (summary JSON + columnar gap table)
+        if validation_results:
+            ValidationStore(staging_dir).save(validation_results)
         
-        # Save metadata
+        # Save solver telemetry if provided (MILP approaches)
+        if solver_telemetry:
+            atomic_write_json(staging_dir / "solver_telemetry.json", solver_telemetry, default=str)
+        
+        for filename, data in (extra_files or {}).items():
+            self._write_extra_file(staging_dir / filename, data)
+        
+        # Save metadata last: it lists every file of the run
+        input_hash = input_data_hash()
         metadata = {
             "optimization_name": optimization_name,
             "created_timestamp": datetime.now().isoformat(),
+            "input_data_hash": input_hash,
+            "runtime_seconds": runtime_seconds,
             "optimization_config": optimization_config or {},
             "teams_included": list(qualification_matrices.keys()),
             "total_engineers": {
                 team: len(engineers) 
                 for team, engineers in qualification_matrices.items()
-            }
+            },
+            "run_files": sorted({path.name for path in staging_dir.iterdir()} | {"metadata.json"})
         }
+        atomic_write_json(staging_dir / "metadata.json", metadata)
         
-        metadata_file = self.current_dir / "metadata.json"
-        with open(metadata_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
-        print(f"   📄 Saved: {metadata_file}")
-        
-        # Save validation results if provided
-        if validation_results:
-            validation_file = self.current_dir / "validation_results.json"
-            with open(validation_file, 'w') as f:
-                json.dump(validation_results, f, indent=2)
-            print(f"   📄 Saved: {validation_file}")
+        with self.run_lock():
+            # Archive current results if they exist and archiving is requested
+            if archive_previous:
+                self._archive_current_results(optimization_name)
+            elif (self.current_dir / "metadata.json").exists():
+                print(f"   🔄 Overwriting previous results (no archiving)")
+            
+            carried = self._promote_staging_dir(staging_dir)
+            for filename in metadata["run_files"]:
+                print(f"   📄 Saved: {self.current_dir / filename}")
+            if carried:
+                print(f"   🔗 Kept {carried} files from other tools in {self.current_dir}")
+            
+            # Index the run (one transaction per save)
+            self.run_index.record_run(self.run_index.build_row(
+                qualification_matrices, metadata, validation_results, solver_telemetry,
+                input_hash=input_hash, runtime_seconds=runtime_seconds
+            ))
+            print(f"   🗂️  Indexed run in: {self.index_path}")
         
         print(f"   ✅ Standard output saved to: {self.current_dir}")
     
+    def save_side_files(self, files: Dict[str, Any]) -> list:
+        """Write report files from other tools into current/ (atomically, under the run lock)
+        
+        Holding the lock keeps a concurrent save from retiring current/ while the
+        files are written; side files are not in any run's run_files, so later
+        saves carry them over.
+        
+        Args:
+            files: {filename: data}; bytes and str are written as-is, anything else as JSON
+        """
+        paths = []
+        with self.run_lock():
+            self.current_dir.mkdir(parents=True, exist_ok=True)
+            for filename, data in files.items():
+                path = self.current_dir / filename
+                self._write_extra_file(path, data)
+                paths.append(path)
+        return paths
+    
+    def _write_extra_file(self, path: Path, data: Any):
+        if isinstance(data, bytes):
+            atomic_write_bytes(path, data)
+        elif isinstance(data, str):
+            atomic_write_text(path, data)
+        else:
+            atomic_write_json(path, data, default=str)
+    
+    def _run_owned_files(self) -> set:
+        """Files in current/ that belong to the current run (replaced as a set)"""
+        metadata_file = self.current_dir / "metadata.json"
+        try:
+            with open(metadata_file, 'r') as f:
+                run_files = json.load(f).get('run_files')
+        except (FileNotFoundError, ValueError):
+            run_files = None
+        # Results saved before run_files was recorded own the standard files only
+        return set(run_files or self.ARCHIVED_FILES)
+    
+    def _promote_staging_dir(self, staging_dir: Path) -> int:
+        """Swap staging_dir in as current/ (caller holds the run lock); returns files carried over"""
+        carried = 0
+        retired_dir = None
+        if self.current_dir.exists():
+            owned = self._run_owned_files()
+            for path in self.current_dir.iterdir():
+                target = staging_dir / path.name
+                if path.name in owned or target.exists():
+                    continue
+                if path.is_dir():
+                    shutil.copytree(path, target, copy_function=link_or_copy)
+                else:
+                    link_or_copy(path, target)
+                carried += 1
+            retired_dir = staging_dir.with_name(staging_dir.name + "_replaced")
+            self.current_dir.rename(retired_dir)
+        staging_dir.rename(self.current_dir)
+        if retired_dir is not None:
+            shutil.rmtree(retired_dir, ignore_errors=True)
+        return carried
+    
+    @property
+    def run_index(self) -> RunIndex:
+        """SQLite run index, backfilled from existing results when first created"""
+        if self._run_index is None:
+            self._run_index = RunIndex(self.index_path)
+            if self._run_index.created:
+                self.reindex_runs()
+        return self._run_index
+    
+    def reindex_runs(self) -> int:
+        """Index the current run and every archived run (manifest or legacy copy)"""
+        indexed = 0
+        current_metadata = self.load_current_metadata()
+        if current_metadata:
+            self.run_index.record_run(self.run_index.build_row(
+                self.load_current_matrices(), current_metadata,
+                self.load_current_validation(), self.load_current_solver_telemetry(),
+                input_hash=current_metadata.get('input_data_hash'),
+                runtime_seconds=current_metadata.get('runtime_seconds')
+            ))
+            indexed += 1
+        
+        for archive in self._scan_archive():
+            directory = archive['directory']
+            metadata = self.load_archived_file(directory, "metadata.json") or {
+                'optimization_name': archive['optimization_name'],
+                'created_timestamp': archive['timestamp'],
+                'teams_included': archive['teams']
+            }
+            matrices = {}
+            for team in [1, 2]:
+                matrix = self.load_archived_file(directory, f"team_{team}_qualification_matrix.json")
+                if matrix is not None:
+                    matrices[team] = matrix
+            self.run_index.record_run(self.run_index.build_row(
+                matrices, metadata,
+                self.load_archived_file(directory, "validation_results.json"),
+                self.load_archived_file(directory, "solver_telemetry.json"),
+                input_hash=metadata.get('input_data_hash'),
+                runtime_seconds=metadata.get('runtime_seconds'),
+                archive_directory=directory
+            ))
+            indexed += 1
+        if indexed:
+            print(f"   🗂️  Indexed {indexed} runs")
+        return indexed
+    
     def load_current_matrices(self) -> Optional[Dict[int, Dict]]:
-        """Load the current qualification matrices"""
+        """Load the current qualification matrices (both teams from the same run)"""
         matrices = {}
         
-        for team in [1, 2]:
-            matrix_file = self.current_dir / f"team_{team}_qualification_matrix.json"
-            if matrix_file.exists():
-                with open(matrix_file, 'r') as f:
-                    matrices[team] = json.load(f)
+        with self.run_lock(shared=True):
+            for team in [1, 2]:
+                matrix_file = self.current_dir / f"team_{team}_qualification_matrix.json"
+                if matrix_file.exists():
+                    with open(matrix_file, 'r') as f:
+                        matrices[team] = json.load(f)
         
         return matrices if matrices else None
     
     def load_current_metadata(self) -> Optional[Dict]:
         """Load metadata about current results"""
         metadata_file = self.current_dir / "metadata.json"
-        if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                return json.load(f)
+        with self.run_lock(shared=True):
+            if metadata_file.exists():
+                with open(metadata_file, 'r') as f:
+                    return json.load(f)
         return None
     
     def load_current_validation(self) -> Optional[Dict]:
-        """Load current validation results if available"""
-        validation_file = self.current_dir / "validation_results.json"
-        if validation_file.exists():
-            with open(validation_file, 'r') as f:
-                return json.load(f)
+        """Load current validation results if available (gap lists decoded on first access)"""
+        with self.run_lock(shared=True):
+            return ValidationStore(self.current_dir).load()
+    
+    def load_current_solver_telemetry(self) -> Optional[Dict]:
+        """Load MILP solve telemetry for the current results if available"""
+        telemetry_file = self.current_dir / "solver_telemetry.json"
+        with self.run_lock(shared=True):
+            if telemetry_file.exists():
+                with open(telemetry_file, 'r') as f:
+                    return json.load(f)
         return None
     
     def _archive_current_results(self, new_optimization_name: str):
-        """Archive current results before overwriting"""
+        """Archive current results before overwriting (as a manifest of content-addressed blobs)"""
         # Check if current results exist
         if not (self.current_dir / "metadata.json").exists():
             return  # Nothing to archive
@@ -134,6 +332,7 @@ class StandardOutputManager:
                 old_optimization_name = 'unknown'
                 timestamp = 'unknown_time'
         except:
+            current_metadata = None
             old_optimization_name = 'unknown'
             timestamp = 'unknown_time'
         
@@ -142,51 +341,164 @@ class StandardOutputManager:
         archive_subdir = self.archive_dir / f"{old_optimization_name}_{timestamp.replace(':', '-')}"
         archive_subdir.mkdir(parents=True, exist_ok=True)
         
-        # Copy current files to archive
-        files_to_archive = [
-            "team_1_qualification_matrix.json",
-            "team_2_qualification_matrix.json", 
-            "metadata.json",
-            "validation_results.json"
-        ]
-        
-        archived_count = 0
-        for filename in files_to_archive:
+        # Store each current file as a blob and record it in the run manifest
+        files = {}
+        new_blobs = 0
+        for filename in sorted(self._run_owned_files() | set(self.ARCHIVED_FILES)):
             source_file = self.current_dir / filename
             if source_file.exists():
-                target_file = archive_subdir / filename
-                shutil.copy2(source_file, target_file)
-                archived_count += 1
+                entry, created = self._store_blob(source_file.read_bytes())
+                files[filename] = entry
+                new_blobs += created
+        
+        if not files:
+            return
+        
+        manifest = {
+            "format": self.MANIFEST_FORMAT,
+            "archived_timestamp": datetime.now().isoformat(),
+            "archived_before": new_optimization_name,
+            "optimization_name": old_optimization_name,
+            "created_timestamp": timestamp,
+            "teams_included": (current_metadata or {}).get('teams_included', []),
+            "files": files
+        }
+        atomic_write_json(archive_subdir / self.MANIFEST_FILE, manifest)
+        
+        # Link the run to its archive; runs saved before the index existed are indexed now
+        if not self.run_index.mark_archived(old_optimization_name, timestamp, archive_subdir.name):
+            self.run_index.record_run(self.run_index.build_row(
+                self.load_current_matrices(), current_metadata or {
+                    'optimization_name': old_optimization_name, 'created_timestamp': timestamp
+                },
+                self.load_current_validation(), self.load_current_solver_telemetry(),
+                input_hash=(current_metadata or {}).get('input_data_hash'),
+                runtime_seconds=(current_metadata or {}).get('runtime_seconds'),
+                archive_directory=archive_subdir.name
+            ))
         
-        if archived_count > 0:
-            print(f"   📦 Archived {archived_count} files from '{old_optimization_name}' to: {archive_subdir}")
+        print(f"   📦 Archived {len(files)} files from '{old_optimization_name}' to: {archive_subdir} "
+              f"({new_blobs} new blobs, {len(files) - new_blobs} already stored)")
+    
+    def _blob_path(self, digest: str, codec: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{self.BLOB_SUFFIXES[codec]}"
+    
+    def _store_blob(self, data: bytes):
+        """Store data once under its SHA-256; returns (manifest entry, whether a new blob was written)"""
+        digest = hashlib.sha256(data).hexdigest()
+        
+        # Reuse a blob stored earlier with either codec
+        for codec in self.BLOB_SUFFIXES:
+            blob_path = self._blob_path(digest, codec)
+            if blob_path.exists():
+                return self._blob_entry(digest, codec, data, blob_path), False
+        
+        codec = 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        if codec == 'zstd':
+            compressed = zstandard.ZstdCompressor(level=10).compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        
+        blob_path = self._blob_path(digest, codec)
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write_bytes(blob_path, compressed)
+        return self._blob_entry(digest, codec, data, blob_path), True
+    
+    def _blob_entry(self, digest: str, codec: str, data: bytes, blob_path: Path) -> Dict[str, Any]:
+        return {
+            "sha256": digest,
+            "codec": codec,
+            "size": len(data),
+            "blob": blob_path.relative_to(self.archive_dir).as_posix()
+        }
+    
+    def _read_blob(self, entry: Dict[str, Any]) -> bytes:
+        """Decompress a manifest entry's blob and check its content hash"""
+        compressed = (self.archive_dir / entry['blob']).read_bytes()
+        if entry['codec'] == 'zstd':
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError(f"zstandard is required to read archived blob {entry['blob']}")
+            data = zstandard.ZstdDecompressor().decompress(compressed, max_output_size=entry['size'])
+        else:
+            data = gzip.decompress(compressed)
+        
+        if hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ValueError(f"Archived blob {entry['blob']} does not match its SHA-256")
+        return data
+    
+    def _load_manifest(self, archive_path: Path) -> Optional[Dict]:
+        manifest_file = archive_path / self.MANIFEST_FILE
+        if manifest_file.exists():
+            with open(manifest_file, 'r') as f:
+                return json.load(f)
+        return None
+    
+    def load_archived_file(self, archive_directory: str, filename: str) -> Optional[Dict]:
+        """Load one JSON file from an archived run (manifest or legacy copy)
+        
+        validation_results.json is returned as stored: the full results for
+        legacy runs, the summary with gap-table layouts for columnar runs.
+        """
+        archive_path = self.archive_dir / archive_directory
+        manifest = self._load_manifest(archive_path)
+        if manifest is not None:
+            entry = manifest['files'].get(filename)
+            return json.loads(self._read_blob(entry)) if entry else None
+        
+        legacy_file = archive_path / filename
+        if legacy_file.exists():
+            with open(legacy_file, 'r') as f:
+                return json.load(f)
+        return None
     
     def list_archive(self) -> list:
-        """List all archived optimization results"""
+        """List all archived optimization results (from the run index)"""
+        if not self.archive_dir.exists():
+            return []
+        return self.run_index.archived_runs()
+    
+    def _scan_archive(self) -> list:
+        """List archived runs by reading every archive directory"""
         if not self.archive_dir.exists():
             return []
         
         archives = []
         for subdir in self.archive_dir.iterdir():
-            if subdir.is_dir():
-                metadata_file = subdir / "metadata.json"
-                if metadata_file.exists():
-                    try:
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        archives.append({
-                            'directory': subdir.name,
-                            'optimization_name': metadata.get('optimization_name', 'unknown'),
-                            'timestamp': metadata.get('created_timestamp', 'unknown'),
-                            'teams': metadata.get('teams_included', [])
-                        })
-                    except:
-                        archives.append({
-                            'directory': subdir.name,
-                            'optimization_name': 'unknown',
-                            'timestamp': 'unknown',
-                            'teams': []
-                        })
+            if not subdir.is_dir() or subdir == self.objects_dir:
+                continue
+            
+            try:
+                manifest = self._load_manifest(subdir)
+            except:
+                manifest = None
+            if manifest is not None:
+                archives.append({
+                    'directory': subdir.name,
+                    'optimization_name': manifest.get('optimization_name', 'unknown'),
+                    'timestamp': manifest.get('created_timestamp', 'unknown'),
+                    'teams': manifest.get('teams_included', [])
+                })
+                continue
+            
+            # Legacy archive: plain copies of the current files
+            metadata_file = subdir / "metadata.json"
+            if metadata_file.exists():
+                try:
+                    with open(metadata_file, 'r') as f:
+                        metadata = json.load(f)
+                    archives.append({
+                        'directory': subdir.name,
+                        'optimization_name': metadata.get('optimization_name', 'unknown'),
+                        'timestamp': metadata.get('created_timestamp', 'unknown'),
+                        'teams': metadata.get('teams_included', [])
+                    })
+                except:
+                    archives.append({
+                        'directory': subdir.name,
+                        'optimization_name': 'unknown',
+                        'timestamp': 'unknown',
+                        'teams': []
+                    })
         
         return sorted(archives, key=lambda x: x['timestamp'], reverse=True)
     
@@ -196,28 +508,32 @@ class StandardOutputManager:
         if not archive_path.exists():
             raise FileNotFoundError(f"Archive directory not found: {archive_path}")
         
-        # Archive current results first
-        current_metadata = self.load_current_metadata()
-        if current_metadata:
-            self._archive_current_results("before_restore")
-        
-        # Copy archived files to current
-        files_to_restore = [
-            "team_1_qualification_matrix.json",
-            "team_2_qualification_matrix.json",
-            "metadata.json",
-            "validation_results.json"
-        ]
-        
-        restored_count = 0
-        for filename in files_to_restore:
-            source_file = archive_path / filename
-            if source_file.exists():
-                target_file = self.current_dir / filename
-                shutil.copy2(source_file, target_file)
-                restored_count += 1
+        # Read the archived files before archiving current results, which may
+        # write to the same run directory when both share a timestamp
+        manifest = self._load_manifest(archive_path)
+        restored_files = {}
+        if manifest is not None:
+            for filename, entry in manifest['files'].items():
+                restored_files[filename] = self._read_blob(entry)
+        else:
+            for filename in self.ARCHIVED_FILES:
+                if (archive_path / filename).exists():
+                    restored_files[filename] = (archive_path / filename).read_bytes()
+        
+        # Stage the restored run; files the archived run did not have are not
+        # carried over from the run it replaces
+        staging_dir = self.create_staging_dir()
+        for filename, data in restored_files.items():
+            atomic_write_bytes(staging_dir / filename, data)
+        
+        with self.run_lock():
+            # Archive current results first
+            current_metadata = self.load_current_metadata()
+            if current_metadata:
+                self._archive_current_results("before_restore")
+            self._promote_staging_dir(staging_dir)
         
-        print(f"   🔄 Restored {restored_count} files from archive: {archive_directory}")
+        print(f"   🔄 Restored {len(restored_files)} files from archive: {archive_directory}")
     
     def get_standard_paths(self) -> Dict[str, Path]:
         """Get the standard file paths for current optimization"""
@@ -226,8 +542,12 @@ class StandardOutputManager:
             'team_2_matrix': self.current_dir / "team_2_qualification_matrix.json",
             'metadata': self.current_dir / "metadata.json",
             'validation': self.current_dir / "validation_results.json",
+            'validation_gaps': self.current_dir / "validation_gaps.npz",
+            'solver_telemetry': self.current_dir / "solver_telemetry.json",
             'current_dir': self.current_dir,
-            'archive_dir': self.archive_dir
+            'archive_dir': self.archive_dir,
+            'archive_objects_dir': self.objects_dir,
+            'run_index': self.index_path
         }
 
 
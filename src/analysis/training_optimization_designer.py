@@ -13,10 +13,19 @@ Key Features:
 - Compares against optimal MILP-generated matrices
 - Identifies critical skill gaps
 - Optimizes training assignments for maximum coverage impact
+- Integrated ride assignment + training cost model (one solve per team)
+- Training-gap candidates pruned by PPM maintenance role and by shifts in the slots each gap fails
+- Column generation mode for site-wide training-gap models
 - Provides cost-benefit analysis of training recommendations
+- Training impact validated on a copy-on-write overlay of the cached current state
+- Detailed report kept as columnar tables; CSVs (and optional Parquet) written in one pass
 """
 
+import contextlib
+import io
 import json
+import math
+import time
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -30,22 +39,56 @@ except ImportError:
 
 from .milp_optimization_designer import MILPOptimizationDesigner
 from .coverage_validator import CoverageValidator
+from .solver_backends import get_solver_backend
+from .qualification_overlay import ProjectedQualificationMatrices
+from .training_report_tables import TrainingReportTables
 
 
 class TrainingOptimizationDesigner:
     """Training optimization using current vs optimal state analysis"""
     
-    def __init__(self, optimizer_results):
-        """Initialize with PPM optimization results"""
+    # Integrated model: objective weight per qualification to train (one ride assignment weighs 0.01)
+    TRAINING_COST_WEIGHT = 0.01
+    
+    # Training-gap model: new qualifications per engineer
+    MAX_TRAINING_PER_ENGINEER = 8
+    
+    # Column generation: LP pricing rounds before the integer solve, the penalty on
+    # uncovered qualifications that keeps every restricted master feasible, and how
+    # many negative reduced cost columns each qualification may add per round
+    COLUMN_GENERATION_MAX_ROUNDS = 50
+    COLUMN_GENERATION_PENALTY = 1000
+    COLUMN_GENERATION_COLUMNS_PER_QUAL = 3
+    
+    def __init__(self, optimizer_results, solver='cbc', column_generation=False, context=None):
+        """Initialize with PPM optimization results and MILP backend name
+        
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            solver: MILP backend name ('cbc', 'highs' or 'cpsat')
+            column_generation: Price training candidates into the training-gap model
+                instead of creating every candidate up front (large sites)
+            context: Optional shared ProblemContext for the MILP designer and validator
+        """
         self.optimizer = optimizer_results
-        self.milp_designer = MILPOptimizationDesigner(optimizer_results)
-        self.coverage_validator = CoverageValidator()
+        self.column_generation = column_generation
+        self.milp_designer = MILPOptimizationDesigner(optimizer_results, solver=solver, context=context)
+        # Training-gap MILP runs quietly with plain CBC settings
+        self.solver_backend = get_solver_backend(solver, msg=False, options=[]) if PULP_AVAILABLE else None
+        self.coverage_validator = CoverageValidator(context=self.milp_designer.context)
         self.current_date = datetime.now()
+        # Last current state loaded from EngQual.csv, reused for training projections
+        self.current_state = None
+        # Last detailed report and its columnar tables, reused by the CSV export
+        self.detailed_report = None
+        self.report_tables = None
         
         print("🎓 TRAINING OPTIMIZATION DESIGNER INITIALIZED")
         print("   Approach: Current state vs optimal training analysis")
         print("   Goal: Maximize coverage improvement with minimal training effort")
         print("   Data: EngQual.csv current qualifications vs MILP optimal state")
+        if column_generation:
+            print("   Training gaps: column generation (candidates priced in by reduced cost)")
     
     def load_current_qualification_state(self):
         """Load current engineer qualifications from EngQual.csv"""
@@ -118,6 +161,7 @@ class TrainingOptimizationDesigner:
                 
                 print(f"   🏢 Team {team}: {len(current_matrices[team])} engineers with qualifications")
             
+            self.current_state = current_matrices
             return current_matrices
             
         except FileNotFoundError:
@@ -163,10 +207,19 @@ class TrainingOptimizationDesigner:
             
         return formatted_matrices
     
-    def optimize_training_assignments(self, current_matrices):
-        """Generate ride assignments and complete qualification requirements from current state"""
+    def optimize_training_assignments(self, current_matrices, integrated=False):
+        """Generate ride assignments and complete qualification requirements from current state
+        
+        Args:
+            current_matrices: Current qualification state by team
+            integrated: Choose rides with training cost in the objective (one solve per team)
+                instead of solving ride clustering first and costing the gaps afterwards
+        """
         print("\n🧠 OPTIMIZING TRAINING ASSIGNMENTS FROM CURRENT STATE")
-        print("Approach: Assign rides to engineers, then determine ALL required qualifications")
+        if integrated:
+            print("Approach: Assign rides with training cost from current qualifications in the objective")
+        else:
+            print("Approach: Assign rides to engineers, then determine ALL required qualifications")
         print("=" * 70)
         
         training_recommendations = {}
@@ -178,7 +231,10 @@ class TrainingOptimizationDesigner:
             print(f"\n🏢 TEAM {team} RIDE ASSIGNMENT & QUALIFICATION ANALYSIS:")
             
             # Step 1: Use MILP designer to get optimal ride assignments
-            optimal_ride_assignments = self._get_milp_ride_assignments(team)
+            if integrated:
+                optimal_ride_assignments = self._get_integrated_ride_assignments(current_matrices[team], team)
+            else:
+                optimal_ride_assignments = self._get_milp_ride_assignments(team)
             
             # Step 2: For each engineer, determine what qualifications they need for their assigned rides
             qualification_requirements = self._determine_qualification_requirements(
@@ -223,6 +279,101 @@ class TrainingOptimizationDesigner:
         print(f"      ✅ Got ride assignments for {len(ride_assignments)} engineers")
         return ride_assignments
     
+    def _get_integrated_ride_assignments(self, team_current, team):
+        """Ride assignments from one MILP that also prices training against current qualifications"""
+        print(f"   🎯 Solving integrated ride + training model for Team {team}...")
+        
+        model = self._build_integrated_model(team_current, team)
+        result = self.milp_designer._solve_ride_clustering_model(model)
+        
+        if not result.has_solution:
+            print(f"      ⚠️  Integrated model {result.status}, falling back to two-stage assignment")
+            return self._get_milp_ride_assignments(team)
+        
+        team_matrix = self.milp_designer._extract_ride_clustering_solution(
+            model['ride_assignment'], model['all_engineers'], model['team_rides'],
+            model['ride_qualifications'], team
+        )
+        
+        ride_assignments = {}
+        for eng_code, eng_data in team_matrix.items():
+            ride_assignments[eng_code] = {
+                'name': eng_data['name'],
+                'role': eng_data['role'],
+                'assigned_rides': eng_data['assigned_rides'],
+                'type_a_rides': eng_data['type_a_rides'],
+                'type_b_rides': eng_data['type_b_rides'],
+                'type_c_rides': eng_data['type_c_rides']
+            }
+        
+        planned_effort = sum(model['training_costs'][(eng_code, ride_code)]
+                             for eng_code, assignment in ride_assignments.items()
+                             for ride_code in assignment['assigned_rides']
+                             if (eng_code, ride_code) in model['training_costs'])
+        print(f"      ✅ {result.status} in {result.wall_time:.2f}s: "
+              f"{len(ride_assignments)} engineers, {planned_effort} qualifications to train")
+        return ride_assignments
+    
+    def _build_integrated_model(self, team_current, team):
+        """Ride clustering MILP with the training cost of each assignment added to the objective
+        
+        Coverage and fairness constraints are unchanged. Symmetry breaking is
+        off because engineers with different current qualifications are no
+        longer interchangeable.
+        """
+        model = self.milp_designer._build_ride_clustering_model(team, symmetry_breaking=False)
+        
+        engineers = {eng['employee_code']: eng.get('role', 'Electrical') for eng in model['all_engineers']}
+        costs = self._ride_training_costs(team_current, engineers, model['team_rides'])
+        training_effort = pulp.lpSum(
+            costs[(eng_code, ride_code)] * var
+            for eng_code, rides in model['ride_assignment'].items()
+            for ride_code, var in rides.items()
+        )
+        model['prob'].setObjective(model['prob'].objective + self.TRAINING_COST_WEIGHT * training_effort)
+        model['training_costs'] = costs
+        return model
+    
+    def compare_training_approaches(self, current_matrices):
+        """Benchmark the integrated model against the two-stage approach
+        
+        Runs both approaches on the same current state and compares wall-clock
+        runtime and the total training effort each one recommends.
+        """
+        print("\n⏱️  COMPARING TWO-STAGE AND INTEGRATED TRAINING MODELS")
+        print("=" * 70)
+        
+        comparison = {'timestamp': datetime.now().isoformat(), 'approaches': {}}
+        for name, integrated in [('two_stage', False), ('integrated', True)]:
+            start = time.time()
+            with contextlib.redirect_stdout(io.StringIO()):
+                recommendations = self.optimize_training_assignments(current_matrices, integrated=integrated)
+            runtime = time.time() - start
+            
+            teams = {
+                team: {
+                    'training_effort': recs['total_training_effort'],
+                    'vacancy_training_effort': recs['vacancy_training_effort'],
+                    'engineers_training': len(recs['optimized_assignments'])
+                }
+                for team, recs in recommendations.items()
+            }
+            comparison['approaches'][name] = {
+                'runtime': round(runtime, 2),
+                'total_training_effort': sum(team['training_effort'] for team in teams.values()),
+                'teams': teams
+            }
+            print(f"   {name:>10}: {runtime:.1f}s, "
+                  f"{comparison['approaches'][name]['total_training_effort']} qualifications to train")
+        
+        two_stage = comparison['approaches']['two_stage']
+        integrated = comparison['approaches']['integrated']
+        comparison['training_effort_saved'] = two_stage['total_training_effort'] - integrated['total_training_effort']
+        comparison['runtime_speedup'] = round(two_stage['runtime'] / max(integrated['runtime'], 1e-9), 2)
+        print(f"   📚 Training effort saved: {comparison['training_effort_saved']} qualifications")
+        print(f"   ⚡ Runtime speedup: {comparison['runtime_speedup']}x")
+        return comparison
+    
     def _determine_qualification_requirements(self, ride_assignments, team):
         """Determine ALL qualifications needed for each engineer's assigned rides"""
         print(f"   📋 Determining qualification requirements for assigned rides...")
@@ -234,27 +385,7 @@ class TrainingOptimizationDesigner:
             
             # For each assigned ride, get ALL required qualifications
             for ride_code in assignment['assigned_rides']:
-                # Get daily qualifications for this ride
-                if ride_code in self.optimizer.ppms_by_type['daily']:
-                    for ppm in self.optimizer.ppms_by_type['daily'][ride_code]['ppms']:
-                        # Check if this qualification matches the engineer's role
-                        qual_role = self._get_qualification_role(ppm['qualification_code'])
-                        if qual_role == 'any' or assignment['role'] == qual_role:
-                            required_quals.add(ppm['qualification_code'])
-                
-                # Get weekly qualifications for this ride
-                if ride_code in self.optimizer.ppms_by_type['weekly']:
-                    for ppm in self.optimizer.ppms_by_type['weekly'][ride_code]['ppms']:
-                        qual_role = self._get_qualification_role(ppm['qualification_code'])
-                        if qual_role == 'any' or assignment['role'] == qual_role:
-                            required_quals.add(ppm['qualification_code'])
-                
-                # Get monthly qualifications for this ride
-                if ride_code in self.optimizer.ppms_by_type['monthly']:
-                    for ppm in self.optimizer.ppms_by_type['monthly'][ride_code]['ppms']:
-                        qual_role = self._get_qualification_role(ppm['qualification_code'])
-                        if qual_role == 'any' or assignment['role'] == qual_role:
-                            required_quals.add(ppm['qualification_code'])
+                required_quals |= self._ride_role_qualifications(ride_code, assignment['role'])
             
             qualification_requirements[eng_code] = {
                 'name': assignment['name'],
@@ -267,6 +398,38 @@ class TrainingOptimizationDesigner:
         print(f"      ✅ Determined qualification requirements for {len(qualification_requirements)} engineers")
         return qualification_requirements
     
+    def _ride_role_qualifications(self, ride_code, role):
+        """Daily, weekly and monthly PPM qualifications an engineer of this role needs for a ride"""
+        required_quals = set()
+        for frequency in ['daily', 'weekly', 'monthly']:
+            if ride_code not in self.optimizer.ppms_by_type[frequency]:
+                continue
+            for ppm in self.optimizer.ppms_by_type[frequency][ride_code]['ppms']:
+                # Check if this qualification matches the engineer's role
+                qual_role = self._get_qualification_role(ppm['qualification_code'])
+                if qual_role == 'any' or role == qual_role:
+                    required_quals.add(ppm['qualification_code'])
+        return required_quals
+    
+    def _ride_training_costs(self, team_current, engineers, rides):
+        """Training effort for each engineer × ride pair: required qualifications not currently held
+        
+        Args:
+            team_current: Current qualification state for the team (from EngQual.csv)
+            engineers: {employee_code: role} for the engineers to cost
+            rides: Ride codes to cost
+        
+        Returns:
+            {(employee_code, ride_code): number of qualifications to train}
+        """
+        costs = {}
+        for eng_code, role in engineers.items():
+            role = role.lower()
+            current_quals = set(team_current[eng_code]['qualifications']) if eng_code in team_current else set()
+            for ride_code in rides:
+                costs[(eng_code, ride_code)] = len(self._ride_role_qualifications(ride_code, role) - current_quals)
+        return costs
+    
     def _compare_current_vs_required(self, current_team, qualification_requirements, team):
         """Compare current qualifications vs required qualifications"""
         print(f"   🔍 Comparing current vs required qualifications...")
@@ -435,6 +598,10 @@ class TrainingOptimizationDesigner:
             
             detailed_report[team] = team_report
         
+        self.detailed_report = detailed_report
+        self.report_tables = TrainingReportTables.from_recommendations(
+            self, training_recommendations, current_matrices
+        )
         return detailed_report
     
     def _generate_engineer_detailed_report(self, eng_code, current_profile, recommendation, team):
@@ -664,228 +831,41 @@ class TrainingOptimizationDesigner:
         
         print()
         
-    def export_detailed_report_to_csv(self, detailed_report, output_dir="outputs/current"):
-        """Export detailed training report to CSV files for easy analysis"""
-        import csv
-        import os
-        from pathlib import Path
+    def export_detailed_report_to_csv(self, detailed_report, output_dir="outputs/current", parquet=False):
+        """Export detailed training report to CSV files for easy analysis
+        
+        The four CSVs are written from the report's columnar tables (built with
+        the report, or flattened once for a report loaded from elsewhere).
         
+        Args:
+            detailed_report: Report from generate_detailed_training_report
+            output_dir: Output directory
+            parquet: Also write the engineer / ride / qualification tables as
+                Parquet for memory-mapped loading (requires pyarrow)
+        """
         print(f"\n📊 EXPORTING DETAILED TRAINING REPORT TO CSV")
         print("=" * 60)
         
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Create comprehensive engineer summary CSV
-        summary_file = output_path / "training_summary_by_engineer.csv"
-        print(f"   📄 Creating engineer summary: {summary_file}")
+        if detailed_report is self.detailed_report and self.report_tables is not None:
+            tables = self.report_tables
+        else:
+            tables = TrainingReportTables.from_detailed_report(detailed_report)
         
-        with open(summary_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header row
-            writer.writerow([
-                'Team', 'Engineer_Code', 'Engineer_Name', 'Role', 'Status',
-                'Current_Total_Quals', 'Current_Daily_Quals', 'Training_Effort',
-                'Daily_Impact', 'Weekly_Impact', 'Monthly_Impact', 'Priority_Score',
-                'Assigned_Rides', 'Rides_Count', 'Type_A_Rides', 'Type_B_Rides', 'Type_C_Rides'
-            ])
-            
-            # Data rows
-            for team, team_data in detailed_report.items():
-                for eng_code, eng_data in team_data['engineers'].items():
-                    if eng_data['needs_training']:
-                        # Count ride types
-                        type_a_rides = [r for r in eng_data['assigned_rides'] 
-                                      if eng_data['ride_breakdown'][r]['ride_type'] == 'A']
-                        type_b_rides = [r for r in eng_data['assigned_rides'] 
-                                      if eng_data['ride_breakdown'][r]['ride_type'] == 'B']
-                        type_c_rides = [r for r in eng_data['assigned_rides'] 
-                                      if eng_data['ride_breakdown'][r]['ride_type'] == 'C']
-                        
-                        writer.writerow([
-                            team,
-                            eng_data['engineer_code'],
-                            eng_data['engineer_name'],
-                            eng_data['role'].title(),
-                            'VACANT' if eng_data['is_vacancy'] else 'CURRENT',
-                            eng_data['current_total_qualifications'],
-                            eng_data['current_daily_qualifications'],
-                            eng_data['training_effort'],
-                            eng_data['daily_impact'],
-                            eng_data['weekly_impact'],
-                            eng_data['monthly_impact'],
-                            eng_data['training_priority_score'],
-                            ', '.join(eng_data['assigned_rides']),
-                            len(eng_data['assigned_rides']),
-                            ', '.join(type_a_rides),
-                            ', '.join(type_b_rides),
-                            ', '.join(type_c_rides)
-                        ])
-        
-        # Create detailed ride-by-ride breakdown CSV
-        rides_file = output_path / "training_breakdown_by_ride.csv"
-        print(f"   📄 Creating ride breakdown: {rides_file}")
-        
-        with open(rides_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header row
-            writer.writerow([
-                'Team', 'Engineer_Code', 'Engineer_Name', 'Role', 'Status',
-                'Ride_Code', 'Ride_Type', 'Current_Quals', 'Additional_Needed',
-                'Final_Quals', 'Daily_Current', 'Daily_Needed', 'Weekly_Current',
-                'Weekly_Needed', 'Monthly_Current', 'Monthly_Needed'
-            ])
-            
-            # Data rows
-            for team, team_data in detailed_report.items():
-                for eng_code, eng_data in team_data['engineers'].items():
-                    if eng_data['needs_training']:
-                        for ride_code, ride_data in eng_data['ride_breakdown'].items():
-                            if ride_data['recommended_count'] > 0:
-                                writer.writerow([
-                                    team,
-                                    eng_data['engineer_code'],
-                                    eng_data['engineer_name'],
-                                    eng_data['role'].title(),
-                                    'VACANT' if eng_data['is_vacancy'] else 'CURRENT',
-                                    ride_code,
-                                    ride_data['ride_type'],
-                                    ride_data['current_count'],
-                                    ride_data['recommended_count'],
-                                    ride_data['final_count'],
-                                    len(ride_data['daily_qualifications']['current']),
-                                    len(ride_data['daily_qualifications']['recommended']),
-                                    len(ride_data['weekly_qualifications']['current']),
-                                    len(ride_data['weekly_qualifications']['recommended']),
-                                    len(ride_data['monthly_qualifications']['current']),
-                                    len(ride_data['monthly_qualifications']['recommended'])
-                                ])
-        
-        # Create specific qualifications needed CSV
-        quals_file = output_path / "specific_qualifications_needed.csv"
-        print(f"   📄 Creating specific qualifications: {quals_file}")
-        
-        with open(quals_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header row
-            writer.writerow([
-                'Team', 'Engineer_Code', 'Engineer_Name', 'Role', 'Status',
-                'Ride_Code', 'Ride_Type', 'Qualification_Code', 'PPM_Type',
-                'Priority_Level'
-            ])
-            
-            # Data rows
-            for team, team_data in detailed_report.items():
-                for eng_code, eng_data in team_data['engineers'].items():
-                    if eng_data['needs_training']:
-                        for ride_code, ride_data in eng_data['ride_breakdown'].items():
-                            # Daily qualifications (highest priority)
-                            for qual in ride_data['daily_qualifications']['recommended']:
-                                writer.writerow([
-                                    team, eng_data['engineer_code'], eng_data['engineer_name'],
-                                    eng_data['role'].title(), 'VACANT' if eng_data['is_vacancy'] else 'CURRENT',
-                                    ride_code, ride_data['ride_type'], qual, 'Daily', 'HIGH'
-                                ])
-                            
-                            # Weekly qualifications (medium priority)
-                            for qual in ride_data['weekly_qualifications']['recommended']:
-                                writer.writerow([
-                                    team, eng_data['engineer_code'], eng_data['engineer_name'],
-                                    eng_data['role'].title(), 'VACANT' if eng_data['is_vacancy'] else 'CURRENT',
-                                    ride_code, ride_data['ride_type'], qual, 'Weekly', 'MEDIUM'
-                                ])
-                            
-                            # Monthly qualifications (lower priority)
-                            for qual in ride_data['monthly_qualifications']['recommended']:
-                                writer.writerow([
-                                    team, eng_data['engineer_code'], eng_data['engineer_name'],
-                                    eng_data['role'].title(), 'VACANT' if eng_data['is_vacancy'] else 'CURRENT',
-                                    ride_code, ride_data['ride_type'], qual, 'Monthly', 'LOW'
-                                ])
-        
-        # Create priority ranking CSV
-        priority_file = output_path / "training_priority_ranking.csv"
-        print(f"   📄 Creating priority ranking: {priority_file}")
-        
-        with open(priority_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
-            # Header row
-            writer.writerow([
-                'Overall_Rank', 'Team', 'Engineer_Code', 'Engineer_Name', 'Role', 'Status',
-                'Priority_Score', 'Training_Effort', 'Daily_Impact', 'Weekly_Impact', 'Monthly_Impact',
-                'Top_Ride_1', 'Top_Ride_1_Type', 'Top_Ride_1_Training', 'Top_Ride_1_Daily',
-                'Top_Ride_2', 'Top_Ride_2_Type', 'Top_Ride_2_Training', 'Top_Ride_2_Daily',
-                'Top_Ride_3', 'Top_Ride_3_Type', 'Top_Ride_3_Training', 'Top_Ride_3_Daily'
-            ])
-            
-            # Collect all engineers and sort by priority
-            all_engineers = []
-            for team, team_data in detailed_report.items():
-                for priority_item in team_data['priority_training']:
-                    eng_data = team_data['engineers'][priority_item['engineer_code']]
-                    all_engineers.append({
-                        'team': team,
-                        'priority_data': priority_item,
-                        'eng_data': eng_data
-                    })
-            
-            # Sort by priority score
-            all_engineers.sort(key=lambda x: x['priority_data']['priority_score'], reverse=True)
-            
-            # Write data
-            for rank, engineer in enumerate(all_engineers, 1):
-                priority_data = engineer['priority_data']
-                eng_data = engineer['eng_data']
-                
-                # Get top 3 rides
-                top_rides = priority_data['top_rides_needing_training'][:3]
-                
-                row = [
-                    rank,
-                    engineer['team'],
-                    priority_data['engineer_code'],
-                    priority_data['engineer_name'],
-                    eng_data['role'].title(),
-                    'VACANT' if priority_data['is_vacancy'] else 'CURRENT',
-                    priority_data['priority_score'],
-                    priority_data['training_effort'],
-                    priority_data['daily_impact'],
-                    eng_data['weekly_impact'],
-                    eng_data['monthly_impact']
-                ]
-                
-                # Add top 3 rides data
-                for i in range(3):
-                    if i < len(top_rides):
-                        ride = top_rides[i]
-                        row.extend([
-                            ride['ride_code'],
-                            ride['ride_type'],
-                            ride['training_needed'],
-                            ride['daily_training']
-                        ])
-                    else:
-                        row.extend(['', '', '', ''])
-                
-                writer.writerow(row)
+        files = tables.export_csv(output_path)
+        if parquet:
+            files['parquet_files'] = tables.export_parquet(output_path)
         
         print(f"   ✅ CSV export completed!")
         print(f"   📁 Files saved to: {output_path}")
-        print(f"   📊 Summary: {summary_file.name}")
-        print(f"   🎢 Ride breakdown: {rides_file.name}")
-        print(f"   📋 Specific qualifications: {quals_file.name}")
-        print(f"   🎯 Priority ranking: {priority_file.name}")
+        print(f"   📊 Summary: {Path(files['summary_file']).name}")
+        print(f"   🎢 Ride breakdown: {Path(files['rides_file']).name}")
+        print(f"   📋 Specific qualifications: {Path(files['qualifications_file']).name}")
+        print(f"   🎯 Priority ranking: {Path(files['priority_file']).name}")
         
-        return {
-            'summary_file': str(summary_file),
-            'rides_file': str(rides_file),
-            'qualifications_file': str(quals_file),
-            'priority_file': str(priority_file)
-        }
+        return files
     
     def validate_training_impact(self, training_recommendations):
         """Validate the impact of proposed training on coverage"""
@@ -1054,59 +1034,16 @@ class TrainingOptimizationDesigner:
         if not coverage_gaps['missing_qualifications']:
             return {'optimized_assignments': [], 'total_training_effort': 0, 'method': 'MILP'}
         
-        # Create MILP problem
-        prob = pulp.LpProblem(f"Team_{team}_Coverage_Gap_Training", pulp.LpMinimize)
-        
-        # Decision variables: train[engineer][qualification] = 1 if we train this engineer on this qual
-        train_vars = {}
-        total_training_effort = 0
-        
-        # Only consider engineers who could potentially learn the missing qualifications
-        for eng_code, eng_data in team_current.items():
-            train_vars[eng_code] = {}
-            for qual in coverage_gaps['missing_qualifications']:
-                # Check if this engineer's role matches the qualification
-                qual_role = self._get_qualification_role(qual)
-                if qual_role == 'any' or eng_data['role'] == qual_role:
-                    var_name = f"train_{eng_code}_{qual.replace('.', '_')}"
-                    train_vars[eng_code][qual] = pulp.LpVariable(var_name, cat='Binary')
-                    total_training_effort += train_vars[eng_code][qual]
-        
-        # Objective: Minimize total training effort
-        prob += total_training_effort, "Minimize_Training_Effort"
-        
-        # Constraints: Ensure each missing qualification is covered by at least one engineer
-        for qual in coverage_gaps['missing_qualifications']:
-            engineers_who_can_learn = []
-            for eng_code in train_vars:
-                if qual in train_vars[eng_code]:
-                    engineers_who_can_learn.append(eng_code)
-            
-            if engineers_who_can_learn:
-                coverage_sum = pulp.lpSum([
-                    train_vars[eng_code][qual] 
-                    for eng_code in engineers_who_can_learn
-                ])
-                
-                # Prioritize daily qualifications (require at least 1 person)
-                min_coverage = 2 if qual in coverage_gaps['daily_gaps'] else 1
-                prob += coverage_sum >= min_coverage, f"Coverage_{qual.replace('.', '_')}"
-        
-        # Constraint: Limit training load per engineer
-        for eng_code in train_vars:
-            if train_vars[eng_code]:
-                total_quals_for_eng = pulp.lpSum([
-                    train_vars[eng_code][qual] 
-                    for qual in train_vars[eng_code]
-                ])
-                prob += total_quals_for_eng <= 8, f"Max_Training_{eng_code}"  # Max 8 new quals per engineer
-        
-        # Solve
-        prob.solve(pulp.PULP_CBC_CMD(msg=0))
+        if self.column_generation:
+            model, result = self._solve_training_gap_by_column_generation(team_current, coverage_gaps, team)
+        else:
+            model = self._build_training_gap_model(team_current, coverage_gaps, team)
+            result = self.solver_backend.solve(model['prob'])
+        train_vars = model['train_vars']
         
         # Extract solution
         optimized_assignments = []
-        if pulp.LpStatus[prob.status] == 'Optimal':
+        if result.status == 'Optimal':
             for eng_code in train_vars:
                 recommended_quals = []
                 for qual in train_vars[eng_code]:
@@ -1140,9 +1077,283 @@ class TrainingOptimizationDesigner:
             'optimized_assignments': optimized_assignments,
             'total_training_effort': sum(a['training_effort'] for a in optimized_assignments),
             'coverage_improvement': len(coverage_gaps['missing_qualifications']),
+            'candidate_stats': model['candidate_stats'],
+            'column_generation': model.get('column_generation'),
             'method': 'MILP'
         }
     
+    def _qualification_maintenance_roles(self):
+        """Role for each PPM qualification, taken from the PPM maintenance type"""
+        roles = {}
+        for ppms_by_ride in self.optimizer.ppms_by_type.values():
+            for ppm_data in ppms_by_ride.values():
+                for ppm in ppm_data['ppms']:
+                    role = 'electrical' if ppm['maintenance_type'] == 'ELECTRICAL' else 'mechanical'
+                    roles[ppm['qualification_code']] = role
+        return roles
+    
+    def _gap_failing_slots(self, team_current, coverage_gaps, team):
+        """Weekday slots where each gap currently fails, and who is on shift in them
+        
+        Mirrors the coverage validator on the shared availability tensor: a daily
+        gap fails on the days its ride's daily PPM group (same maintenance role)
+        has fewer Early-shift holders than the 3-hour window needs; a weekly or
+        monthly gap fails in the weeks where nobody holding it works an Early or
+        Late weekday. Returns {qual: (availability, on_shift[engineer, week, day],
+        failing[week, day])}, or None when a rota is missing, in which case no
+        shift filter is applied.
+        """
+        availability = self.milp_designer.context.availability[team]
+        if any(availability[role] is None for role in ('electrical', 'mechanical')):
+            return None
+        daily_gaps = set(coverage_gaps['daily_gaps'])
+        weekly_gaps = set(coverage_gaps['weekly_gaps'])
+        
+        slots = {}
+        for qual in coverage_gaps['missing_qualifications']:
+            ppm_type = 'daily' if qual in daily_gaps else 'weekly' if qual in weekly_gaps else 'monthly'
+            ride_ppms = self.optimizer.ppms_by_type[ppm_type].get(qual.split('.')[0], {'ppms': []})['ppms']
+            qual_ppms = [ppm for ppm in ride_ppms if ppm['qualification_code'] == qual]
+            if not qual_ppms:
+                continue
+            maintenance_type = qual_ppms[0]['maintenance_type']
+            role = 'electrical' if maintenance_type == 'ELECTRICAL' else 'mechanical'
+            role_availability = availability[role]
+            weekday_shifts = role_availability['shifts'][:, :, :5]
+            
+            if ppm_type == 'daily':
+                group = [ppm for ppm in ride_ppms if ppm['maintenance_type'] == maintenance_type]
+                group_quals = {ppm['qualification_code'] for ppm in group}
+                engineers_needed = math.ceil(sum(ppm['duration_hours'] for ppm in group) / 3.0)
+                on_shift = weekday_shifts == 'E'
+            else:
+                group_quals = {qual}
+                engineers_needed = 1
+                on_shift = np.isin(weekday_shifts, ['E', 'L'])
+            
+            holders = np.array([
+                eng_code in team_current and bool(group_quals.intersection(team_current[eng_code]['qualifications']))
+                for eng_code in role_availability['engineers']
+            ], dtype=bool)
+            holders_on_shift = (on_shift & holders[:, None, None]).sum(axis=0)
+            if ppm_type == 'daily':
+                failing = holders_on_shift < engineers_needed
+            else:
+                failing = np.repeat((holders_on_shift.sum(axis=1) < engineers_needed)[:, None], 5, axis=1)
+            slots[qual] = (role_availability, on_shift, failing)
+        return slots
+    
+    def _training_candidates(self, team_current, coverage_gaps, team):
+        """Engineer/qualification pairs whose training could close a gap
+        
+        A pair is kept only when the engineer's role matches the PPM maintenance
+        type and the engineer is on shift in at least one slot where the gap
+        currently fails.
+        """
+        qualification_roles = self._qualification_maintenance_roles()
+        failing_slots = self._gap_failing_slots(team_current, coverage_gaps, team)
+        
+        candidates = {}
+        role_pruned = 0
+        shift_pruned = 0
+        for eng_code, eng_data in team_current.items():
+            candidates[eng_code] = []
+            for qual in coverage_gaps['missing_qualifications']:
+                qual_role = qualification_roles.get(qual) or self._get_qualification_role(qual)
+                if qual_role != 'any' and eng_data['role'] != qual_role:
+                    role_pruned += 1
+                    continue
+                if failing_slots is not None and qual in failing_slots:
+                    role_availability, on_shift, failing = failing_slots[qual]
+                    engineers = role_availability['engineers']
+                    if eng_code not in engineers or not (on_shift[engineers.index(eng_code)] & failing).any():
+                        shift_pruned += 1
+                        continue
+                candidates[eng_code].append(qual)
+        
+        candidate_pairs = len(team_current) * len(coverage_gaps['missing_qualifications'])
+        covered_quals = {qual for quals in candidates.values() for qual in quals}
+        stats = {
+            'candidate_pairs': candidate_pairs,
+            'role_pruned': role_pruned,
+            'shift_pruned': shift_pruned,
+            'kept_pairs': candidate_pairs - role_pruned - shift_pruned,
+            'qualifications_without_candidates': sorted(set(coverage_gaps['missing_qualifications']) - covered_quals),
+            'shift_filter_applied': failing_slots is not None,
+            'failing_slots': {qual: int(failing.sum()) for qual, (_, _, failing) in sorted((failing_slots or {}).items())}
+        }
+        print(f"      🧹 Candidates: {stats['kept_pairs']} of {candidate_pairs} engineer/qualification pairs kept "
+              f"({role_pruned} wrong role, {shift_pruned} never on shift where the gap fails)")
+        return candidates, stats
+    
+    def _gap_coverage_requirements(self, coverage_gaps, candidates):
+        """Engineers to train per coverable gap: 2 for daily PPMs, 1 otherwise
+        
+        Capped at the number of candidates, since pruned engineers could never
+        close the gap anyway.
+        """
+        candidate_counts = Counter(qual for quals in candidates.values() for qual in quals)
+        return {
+            qual: min(2 if qual in coverage_gaps['daily_gaps'] else 1, candidate_counts[qual])
+            for qual in coverage_gaps['missing_qualifications']
+            if candidate_counts[qual]
+        }
+    
+    def _build_training_gap_model(self, team_current, coverage_gaps, team):
+        """Build the training-gap MILP without solving it"""
+        candidates, candidate_stats = self._training_candidates(team_current, coverage_gaps, team)
+        requirements = self._gap_coverage_requirements(coverage_gaps, candidates)
+        
+        # Create MILP problem
+        prob = pulp.LpProblem(f"Team_{team}_Coverage_Gap_Training", pulp.LpMinimize)
+        
+        # Decision variables: train[engineer][qualification] = 1 if we train this engineer on this qual
+        train_vars = {}
+        total_training_effort = 0
+        
+        # Only engineers whose training could close the gap get a variable
+        for eng_code, quals in candidates.items():
+            train_vars[eng_code] = {}
+            for qual in quals:
+                var_name = f"train_{eng_code}_{qual.replace('.', '_')}"
+                train_vars[eng_code][qual] = pulp.LpVariable(var_name, cat='Binary')
+                total_training_effort += train_vars[eng_code][qual]
+        
+        # Objective: Minimize total training effort
+        prob += total_training_effort, "Minimize_Training_Effort"
+        
+        # Constraints: Ensure each missing qualification is covered (daily PPMs by two engineers)
+        for qual, min_coverage in requirements.items():
+            coverage_sum = pulp.lpSum([
+                train_vars[eng_code][qual]
+                for eng_code in train_vars
+                if qual in train_vars[eng_code]
+            ])
+            prob += coverage_sum >= min_coverage, f"Coverage_{qual.replace('.', '_')}"
+        
+        # Constraint: Limit training load per engineer
+        for eng_code in train_vars:
+            if train_vars[eng_code]:
+                total_quals_for_eng = pulp.lpSum([
+                    train_vars[eng_code][qual] 
+                    for qual in train_vars[eng_code]
+                ])
+                prob += total_quals_for_eng <= self.MAX_TRAINING_PER_ENGINEER, f"Max_Training_{eng_code}"
+        
+        return {'prob': prob, 'train_vars': train_vars, 'candidate_stats': candidate_stats}
+    
+    def _solve_training_gap_by_column_generation(self, team_current, coverage_gaps, team):
+        """Solve the training-gap MILP, adding candidates only when their reduced cost is negative
+        
+        The restricted master starts from a small seed of candidates, with a
+        penalised 'uncovered' variable per qualification so it is always feasible.
+        Each round solves the LP relaxation and prices the remaining candidates
+        with its duals (1 - coverage dual - training-load dual); the integer
+        solve then runs over the generated columns only (price and branch).
+        Qualifications still uncovered get all their candidates before a final
+        re-solve.
+        """
+        candidates, candidate_stats = self._training_candidates(team_current, coverage_gaps, team)
+        requirements = self._gap_coverage_requirements(coverage_gaps, candidates)
+        candidates_by_qual = defaultdict(list)
+        for eng_code, quals in candidates.items():
+            for qual in quals:
+                candidates_by_qual[qual].append(eng_code)
+        
+        prob = pulp.LpProblem(f"Team_{team}_Coverage_Gap_Training", pulp.LpMinimize)
+        train_vars = {eng_code: {} for eng_code in candidates}
+        coverage_names = {qual: f"Coverage_{qual.replace('.', '_')}" for qual in requirements}
+        uncovered = {
+            qual: pulp.LpVariable(f"uncovered_{qual.replace('.', '_')}", lowBound=0)
+            for qual in requirements
+        }
+        prob += pulp.lpSum(self.COLUMN_GENERATION_PENALTY * var for var in uncovered.values()), \
+            "Minimize_Training_Effort"
+        for qual, min_coverage in requirements.items():
+            prob += uncovered[qual] >= min_coverage, coverage_names[qual]
+        
+        def add_column(eng_code, qual):
+            var = pulp.LpVariable(f"train_{eng_code}_{qual.replace('.', '_')}", cat='Binary')
+            train_vars[eng_code][qual] = var
+            prob.objective.addInPlace(var)
+            prob.constraints[coverage_names[qual]].addInPlace(var)
+            load_name = f"Max_Training_{eng_code}"
+            if load_name in prob.constraints:
+                prob.constraints[load_name].addInPlace(var)
+            else:
+                prob.addConstraint(var <= self.MAX_TRAINING_PER_ENGINEER, load_name)
+        
+        # Seed: the required number of candidates per qualification, spreading the load
+        seed_load = Counter()
+        for qual, min_coverage in requirements.items():
+            for eng_code in sorted(candidates_by_qual[qual], key=lambda code: (seed_load[code], code))[:min_coverage]:
+                add_column(eng_code, qual)
+                seed_load[eng_code] += 1
+        seed_columns = sum(seed_load.values())
+        
+        rounds = 0
+        lp_bound = None
+        for rounds in range(1, self.COLUMN_GENERATION_MAX_ROUNDS + 1):
+            lp_result = self.solver_backend.solve_relaxation(prob)
+            lp_bound = lp_result.objective
+            
+            new_columns = []
+            for qual, eng_codes in candidates_by_qual.items():
+                coverage_dual = prob.constraints[coverage_names[qual]].pi or 0.0
+                if coverage_dual <= 1 + 1e-9:
+                    continue  # load duals are <= 0, so no candidate can price out
+                priced = []
+                for eng_code in eng_codes:
+                    if qual in train_vars[eng_code]:
+                        continue
+                    load_row = prob.constraints.get(f"Max_Training_{eng_code}")
+                    load_dual = (load_row.pi or 0.0) if load_row is not None else 0.0
+                    reduced_cost = 1 - coverage_dual - load_dual
+                    if reduced_cost < -1e-9:
+                        priced.append((reduced_cost, eng_code))
+                priced.sort()
+                new_columns.extend((eng_code, qual) for _, eng_code in priced[:self.COLUMN_GENERATION_COLUMNS_PER_QUAL])
+            
+            if not new_columns:
+                break
+            for eng_code, qual in new_columns:
+                add_column(eng_code, qual)
+        
+        result = self.solver_backend.solve(prob)
+        
+        # Integer solve over the generated columns left gaps: open up every candidate for them
+        still_uncovered = [qual for qual, var in uncovered.items() if (var.varValue or 0) > 1e-6]
+        completion_columns = 0
+        if result.has_solution and still_uncovered:
+            for qual in still_uncovered:
+                for eng_code in candidates_by_qual[qual]:
+                    if qual not in train_vars[eng_code]:
+                        add_column(eng_code, qual)
+                        completion_columns += 1
+            result = self.solver_backend.solve(prob)
+            still_uncovered = [qual for qual, var in uncovered.items() if (var.varValue or 0) > 1e-6]
+        
+        if result.has_solution and still_uncovered:
+            # The full model is infeasible too; report it the same way
+            result.status = 'Infeasible'
+        
+        generated_columns = sum(len(quals) for quals in train_vars.values())
+        column_stats = {
+            'pricing_rounds': rounds,
+            'seed_columns': seed_columns,
+            'generated_columns': generated_columns,
+            'candidate_columns': candidate_stats['kept_pairs'],
+            'completion_columns': completion_columns,
+            'lp_bound': lp_bound,
+            'uncovered_qualifications': still_uncovered
+        }
+        print(f"      🧮 Column generation: {generated_columns} of {candidate_stats['kept_pairs']} candidates "
+              f"generated in {rounds} pricing rounds (LP bound {lp_bound})")
+        
+        model = {'prob': prob, 'train_vars': train_vars, 'candidate_stats': candidate_stats,
+                 'column_generation': column_stats}
+        return model, result
+    
     def _optimize_training_heuristically_for_gaps(self, team_current, coverage_gaps, team):
         """Use heuristic optimization for coverage gaps"""
         print(f"   🧠 Using heuristic optimization for Team {team} coverage gaps...")
@@ -1217,73 +1428,36 @@ class TrainingOptimizationDesigner:
             return 'any'  # Could be learned by either role
 
     def _apply_training_to_current_state(self, training_recommendations):
-        """Apply training recommendations to current state to create projected matrices"""
-        print("   🔮 Simulating post-training qualification state...")
+        """Layer training recommendations over the current state to project post-training matrices
         
-        # Load current state
-        current_matrices = self.load_current_qualification_state()
+        The current state is loaded once and cached; the projection is a
+        read-only overlay, so only the trained engineers' profiles are rebuilt.
+        """
+        print("   🔮 Simulating post-training qualification state...")
         
-        # Apply training recommendations to create projected state
-        projected_matrices = {}
+        current_matrices = self.current_state
+        if current_matrices is None:
+            current_matrices = self.load_current_qualification_state()
         
+        # Training assignments per team: {engineer_code: [qualification, ...]}
+        training_by_team = {}
         for team in [1, 2]:
             if team not in current_matrices or team not in training_recommendations:
                 continue
-                
-            projected_matrices[team] = {}
-            team_current = current_matrices[team]
-            team_recommendations = training_recommendations[team]
-            
-            # Create lookup for training assignments
-            training_lookup = {}
-            for assignment in team_recommendations.get('optimized_assignments', []):
-                eng_code = assignment['engineer_code']
-                training_lookup[eng_code] = assignment['recommended_qualifications']
-            
-            # For each engineer in current state, apply training if recommended
-            for eng_code, current_profile in team_current.items():
-                # Start with current profile
-                projected_profile = current_profile.copy()
-                projected_profile['qualifications'] = current_profile['qualifications'].copy()
-                projected_profile['daily_qualifications'] = current_profile['daily_qualifications'].copy()
-                
-                # Add training qualifications if engineer has training recommendations
-                if eng_code in training_lookup:
-                    new_quals = training_lookup[eng_code]
-                    
-                    # Add new qualifications (avoid duplicates)
-                    for qual in new_quals:
-                        if qual not in projected_profile['qualifications']:
-                            projected_profile['qualifications'].append(qual)
-                            
-                            # Check if it's a daily qualification
-                            if self._is_daily_qualification(qual, team):
-                                projected_profile['daily_qualifications'].append(qual)
-                    
-                    # Recalculate ride assignments from updated qualifications
-                    updated_rides = list(set([q.split('.')[0] for q in projected_profile['qualifications']]))
-                    projected_profile['assigned_rides'] = updated_rides
-                    
-                    # Recategorize by ride type
-                    projected_profile['type_a_rides'] = [r for r in updated_rides if self._get_ride_type(r) == 'A']
-                    projected_profile['type_b_rides'] = [r for r in updated_rides if self._get_ride_type(r) == 'B']
-                    projected_profile['type_c_rides'] = [r for r in updated_rides if self._get_ride_type(r) == 'C']
-                    
-                    # Update coverage score
-                    projected_profile['coverage_score'] = len(projected_profile['qualifications'])
-                    
-                    # Mark as trained
-                    projected_profile['training_applied'] = True
-                    projected_profile['new_qualifications'] = new_quals
-                
-                projected_matrices[team][eng_code] = projected_profile
-            
-            trained_count = len([eng for eng in projected_matrices[team].values() if eng.get('training_applied', False)])
+            training_by_team[team] = {
+                assignment['engineer_code']: assignment['recommended_qualifications']
+                for assignment in training_recommendations[team].get('optimized_assignments', [])
+            }
+        
+        projected_matrices = ProjectedQualificationMatrices(
+            current_matrices, training_by_team, self._is_daily_qualification, self._get_ride_type
+        )
+        for team in projected_matrices:
+            trained_count = len(projected_matrices[team].trained_engineers)
             print(f"      Team {team}: Applied training to {trained_count} engineers")
         
         return projected_matrices
 
-
 def main():
     """Run training optimization"""
     print("Training Optimization Designer")
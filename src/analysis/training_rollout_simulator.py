@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+
+"""
+Training Rollout Simulator
+==========================
+
+Walks a training schedule forward month by month and records how daily,
+weekly and monthly PPM coverage grows, instead of only projecting the state
+once all training is done.
+
+Key Features:
+- Schedule entries: team, engineer, qualification and the month it completes
+- Phased schedules over the strategy's 18-month horizon (months 1-6, 7-12, 13-18)
+- Each month's batch applied incrementally: only the coverage units a new
+  qualification touches are updated
+- Coverage curve per team and for both teams combined
+- Many candidate orderings compared on the same indexed rotation
+"""
+
+import csv
+import io
+import math
+import random
+from datetime import datetime
+
+from .incremental_coverage import IncrementalCoverageModel
+from .problem_context import ProblemContext
+from .standard_output_manager import StandardOutputManager
+
+
+class TrainingRolloutSimulator:
+    """Month-by-month coverage curve for a training schedule"""
+
+    FAMILIES = ['daily', 'weekly', 'monthly']
+
+    # Strategy phases (TRAINING_OPTIMIZATION_STRATEGY.md)
+    PHASES = [
+        {'name': 'Foundation Building', 'months': (1, 6)},
+        {'name': 'Competency Distribution', 'months': (7, 12)},
+        {'name': 'Optimization and Refinement', 'months': (13, 18)}
+    ]
+
+    def __init__(self, optimizer_results, current_matrices, months=18, teams=(1, 2), context=None):
+        """Index the rotation coverage of the current state once per team
+
+        Args:
+            optimizer_results: PPMCapacityOptimizer with rides and PPM data
+            current_matrices: Current-state {team: {engineer_code: profile}}
+            months: Simulation horizon in months (at least 1)
+            teams: Teams to simulate
+            context: Optional shared ProblemContext (rotas)
+        """
+        if months < 1:
+            raise ValueError(f"Simulation horizon must be at least 1 month, got {months}")
+        self.optimizer = optimizer_results
+        self.months = months
+        self.context = context if context is not None else ProblemContext(optimizer_results)
+        self.models = {
+            team: IncrementalCoverageModel(optimizer_results, team, current_matrices[team], context=self.context)
+            for team in teams if team in current_matrices
+        }
+
+    def phased_schedule(self, trainings):
+        """Spread an ordered list of trainings evenly over the horizon
+
+        Args:
+            trainings: Ordered (team, engineer_code, qualification) tuples, most urgent first
+        """
+        per_month = max(1, math.ceil(len(trainings) / self.months))
+        return [
+            {'team': team, 'engineer_code': eng_code, 'qualification': qual, 'month': index // per_month + 1}
+            for index, (team, eng_code, qual) in enumerate(trainings)
+        ]
+
+    def schedule_from_recommendations(self, training_recommendations):
+        """Phased schedule from gap-training recommendations, daily PPM qualifications first"""
+        daily_quals = {
+            qual for ppm_data in self.optimizer.ppms_by_type['daily'].values() for qual in
+            (ppm['qualification_code'] for ppm in ppm_data['ppms'])
+        }
+        trainings = []
+        for team, recommendations in training_recommendations.items():
+            for assignment in recommendations.get('optimized_assignments', []):
+                for qual in assignment['recommended_qualifications']:
+                    trainings.append((team, assignment['engineer_code'], qual))
+        trainings.sort(key=lambda training: training[2] not in daily_quals)
+        return self.phased_schedule(trainings)
+
+    def schedule_from_plan(self, plan_results):
+        """Phased schedule from CoverageGainTrainingRecommender plans, teams interleaved by rank"""
+        ranked = sorted(
+            (item['step'], team, item['engineer_code'], item['qualification'])
+            for team, team_plan in plan_results['teams'].items()
+            for item in team_plan['plan']
+        )
+        return self.phased_schedule([training[1:] for training in ranked])
+
+    def _snapshot(self, month):
+        """Coverage of every team and both teams combined at the end of a month"""
+        point = {'month': month, 'teams': {}}
+        combined = {family: {'covered': 0, 'total': 0} for family in self.FAMILIES}
+        combined_days = [0, 0]
+        for team, model in self.models.items():
+            summary = model.coverage_summary()
+            point['teams'][team] = summary
+            for family in self.FAMILIES:
+                combined[family]['covered'] += summary[family]['covered']
+                combined[family]['total'] += summary[family]['total']
+            combined_days[0] += summary['ride_days_covered']
+            combined_days[1] += summary['ride_days_total']
+
+        for family, counts in combined.items():
+            counts['coverage_percentage'] = (counts['covered'] / counts['total'] * 100) if counts['total'] else 100.0
+        combined['ride_days_covered'], combined['ride_days_total'] = combined_days
+        combined['ride_day_coverage'] = (combined_days[0] / combined_days[1] * 100) if combined_days[1] else 100.0
+        point['combined'] = combined
+        return point
+
+    def simulate(self, schedule):
+        """Apply the schedule month by month and return the coverage curve
+
+        Entries for unknown engineers, entries scheduled before month 1 or after
+        the horizon and qualifications already held when their month comes are not applied;
+        they are reported in skipped_entries with a skip_reason. The indexed
+        current state is restored afterwards, so schedules can be simulated
+        back to back.
+        """
+        batches = {}
+        skipped = []
+        for entry in schedule:
+            model = self.models.get(entry['team'])
+            if model is None or entry['engineer_code'] not in model.holds:
+                skipped.append({**entry, 'skip_reason': 'unknown_engineer'})
+                continue
+            if entry['month'] < 1:
+                skipped.append({**entry, 'skip_reason': 'invalid_month'})
+                continue
+            if entry['month'] > self.months:
+                skipped.append({**entry, 'skip_reason': 'after_horizon'})
+                continue
+            batches.setdefault(entry['month'], []).append(entry)
+
+        curve = [self._snapshot(0)]
+        applied = []
+        try:
+            for month in range(1, self.months + 1):
+                completed = 0
+                for entry in batches.get(month, []):
+                    model = self.models[entry['team']]
+                    if entry['qualification'] in model.holds[entry['engineer_code']]:
+                        skipped.append({**entry, 'skip_reason': 'already_held'})
+                        continue
+                    model.apply(entry['engineer_code'], entry['qualification'])
+                    applied.append(entry)
+                    completed += 1
+                point = self._snapshot(month)
+                point['trainings_completed'] = completed
+                curve.append(point)
+        finally:
+            for entry in reversed(applied):
+                self.models[entry['team']].remove(entry['engineer_code'], entry['qualification'])
+
+        return {
+            'months': self.months,
+            'trainings_scheduled': len(schedule),
+            'trainings_applied': len(applied),
+            'skipped_entries': skipped,
+            'curve': curve,
+            'mean_ride_day_coverage': sum(point['combined']['ride_day_coverage'] for point in curve[1:]) / self.months,
+            'phases': self._phase_summary(curve)
+        }
+
+    def _phase_summary(self, curve):
+        """Combined coverage at the end of each strategy phase within the horizon"""
+        phases = []
+        for phase in self.PHASES:
+            end_month = phase['months'][1]
+            if end_month > self.months:
+                continue
+            combined = curve[end_month]['combined']
+            phases.append({
+                'name': phase['name'],
+                'months': f"{phase['months'][0]}-{end_month}",
+                **{f"{family}_coverage": combined[family]['coverage_percentage'] for family in self.FAMILIES}
+            })
+        return phases
+
+    def compare_orderings(self, trainings, orderings=20, seed=42):
+        """Simulate the given order plus random reorderings and rank them
+
+        Orderings are ranked by mean combined ride-day coverage over the
+        horizon, so earlier coverage gains score higher.
+        """
+        rng = random.Random(seed)
+        candidates = [('given', list(trainings)), ('reversed', list(reversed(trainings)))]
+        for index in range(orderings):
+            shuffled = list(trainings)
+            rng.shuffle(shuffled)
+            candidates.append((f"shuffle_{index + 1}", shuffled))
+
+        ranked = []
+        for name, ordering in candidates:
+            result = self.simulate(self.phased_schedule(ordering))
+            ranked.append({
+                'ordering': name,
+                'mean_ride_day_coverage': result['mean_ride_day_coverage'],
+                'final_ride_day_coverage': result['curve'][-1]['combined']['ride_day_coverage'],
+                'phases': result['phases']
+            })
+        ranked.sort(key=lambda item: -item['mean_ride_day_coverage'])
+        return ranked
+
+    def display_curve(self, result):
+        """Print the combined coverage curve"""
+        print("\n📈 TRAINING ROLLOUT COVERAGE CURVE (both teams)")
+        print("=" * 70)
+        print(f"   {'Month':>5} {'Trained':>8} {'Daily':>8} {'Weekly':>8} {'Monthly':>8} {'Ride-days':>10}")
+        for point in result['curve']:
+            combined = point['combined']
+            print(f"   {point['month']:>5} {point.get('trainings_completed', 0):>8} "
+                  f"{combined['daily']['coverage_percentage']:>7.1f}% {combined['weekly']['coverage_percentage']:>7.1f}% "
+                  f"{combined['monthly']['coverage_percentage']:>7.1f}% {combined['ride_day_coverage']:>9.1f}%")
+        for phase in result['phases']:
+            print(f"   📌 {phase['name']} (months {phase['months']}): daily {phase['daily_coverage']:.1f}%, "
+                  f"weekly {phase['weekly_coverage']:.1f}%, monthly {phase['monthly_coverage']:.1f}%")
+
+    def save_results(self, result, ranked_orderings=None, output_manager=None):
+        """Save the curve as CSV (one row per month and team) and the full result as JSON"""
+        output_manager = output_manager or StandardOutputManager()
+
+        with io.StringIO(newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['month', 'team', 'daily_coverage', 'weekly_coverage', 'monthly_coverage',
+                             'ride_days_covered', 'ride_days_total'])
+            for point in result['curve']:
+                rows = list(point['teams'].items()) + [('combined', point['combined'])]
+                for team, summary in rows:
+                    writer.writerow([point['month'], team] +
+                                    [round(summary[family]['coverage_percentage'], 2) for family in self.FAMILIES] +
+                                    [summary['ride_days_covered'], summary['ride_days_total']])
+            curve_csv = f.getvalue()
+
+        csv_path, json_path = output_manager.save_side_files({
+            "training_rollout_curve.csv": curve_csv,
+            "training_rollout_simulation.json": {'timestamp': datetime.now().isoformat(), 'simulation': result,
+                                                 'orderings': ranked_orderings}
+        })
+
+        print(f"\n💾 Rollout curve saved to: {csv_path}")
+        print(f"💾 Rollout simulation saved to: {json_path}")
+        return csv_path, json_path
@@ -11,33 +11,43 @@ ULTIMATE FEATURES:
 - 100% DAILY COVERAGE TARGET: Will not stop until 100% daily coverage achieved
 - REAL-TIME VALIDATION: Uses validator feedback to guide assignments in real-time
 - ULTRA-AGGRESSIVE REDUNDANCY: 8-12 engineers per daily PPM (not 6-8)
-- GAP-DRIVEN OPTIMIZATION: Immediately fixes every gap as it's discovered
+- GAP-DRIVEN OPTIMIZATION: Closes every gap found with the fewest qualification grants (set cover)
 - PERFECT SHIFT MATCHING: Ensures qualified engineers work when PPMs need to be done
 - ITERATIVE PERFECTION: Up to 10 optimization passes until 100% achieved
 """
 
-import json
 import random
 from pathlib import Path
 from collections import defaultdict
 from src.analysis.coverage_validator import CoverageValidator
+from src.analysis.gap_repair import GapRepairEngine
+from src.analysis.problem_context import ProblemContext, WEEKDAY_NAMES
 
 
 class UltimateCoverageDesigner:
     """Ultimate coverage optimizer targeting 100% daily coverage"""
     
-    def __init__(self, optimizer):
+    def __init__(self, optimizer, context=None, seed=42):
+        """
+        Args:
+            optimizer: PPMCapacityOptimizer with rides and PPM data
+            context: Optional shared ProblemContext (built here when not given)
+            seed: Random seed for shuffles and tie-breaks
+        """
         self.optimizer = optimizer
+        self.context = context if context is not None else ProblemContext(optimizer)
         self.engineers = {}
         self.shift_analysis = {}
         self.ppm_requirements = {}
-        self.coverage_validator = CoverageValidator()
+        self.coverage_validator = CoverageValidator(optimizer, context=self.context)
+        self.gap_repair = GapRepairEngine(self.context)
         
         print("🔥 ULTIMATE COVERAGE DESIGNER - 100% DAILY COVERAGE TARGET")
         print("=" * 80)
         
         # Set deterministic seed
-        random.seed(42)
+        self.seed = seed
+        random.seed(seed)
         
         # Load and analyze data
         self._load_engineer_data()
@@ -48,26 +58,12 @@ class UltimateCoverageDesigner:
         """Load engineer data for both teams"""
         print("\n📊 LOADING ULTIMATE ENGINEER DATA...")
         
+        engineers = self.context.engineer_data()
         for team in [1, 2]:
-            engineer_files = {
-                'electrical': f'data/processed/engineers/team{team}_elec_engineers.json',
-                'mechanical': f'data/processed/engineers/team{team}_mech_engineers.json'
-            }
-            
-            self.engineers[team] = {'electrical': [], 'mechanical': []}
-            
-            for role, file_path in engineer_files.items():
-                try:
-                    with open(file_path, 'r') as f:
-                        data = json.load(f)
-                    engineers = data['engineers']  # Extract the engineers list
-                    self.engineers[team][role] = engineers
-                    active_count = len([e for e in engineers if e.get('active', True) and not e.get('vacancy', False)])
-                    print(f"   Team {team} {role}: {active_count} active engineers")
-                except FileNotFoundError:
-                    print(f"   ⚠️  Engineer file not found: {file_path}")
-                except KeyError:
-                    print(f"   ⚠️  Invalid engineer file structure: {file_path}")
+            self.engineers[team] = engineers[team]
+            for role, role_engineers in engineers[team].items():
+                active_count = len([e for e in role_engineers if e.get('active', True) and not e.get('vacancy', False)])
+                print(f"   Team {team} {role}: {active_count} active engineers")
     
     def _analyze_ppm_requirements(self):
         """Analyze PPM requirements for ultimate coverage"""
@@ -76,8 +72,7 @@ class UltimateCoverageDesigner:
         
         for team in [1, 2]:
             self.ppm_requirements[team] = {}
-            team_rides = [rid for rid, info in self.optimizer.rides_info.items() 
-                         if info.get('team_responsible') == team]
+            team_rides = self.context.team_rides[team]
             
             daily_critical_count = 0
             total_daily_hours = 0
@@ -122,75 +117,40 @@ class UltimateCoverageDesigner:
             self.shift_analysis[team] = {'electrical': {}, 'mechanical': {}}
             
             for role in ['electrical', 'mechanical']:
-                rota_file = f'data/processed/parsed_rotas/parsed_team{team}_{"elec" if role == "electrical" else "mech"}_rota.json'
-                try:
-                    with open(rota_file, 'r') as f:
-                        rota_data = json.load(f)
-                    
-                    engineer_shift_analysis = {}
-                    
-                    for week_key, week_data in rota_data.items():
-                        for engineer_id, shifts in week_data.items():
-                            if engineer_id not in engineer_shift_analysis:
-                                engineer_shift_analysis[engineer_id] = {
-                                    'early_days': 0,
-                                    'late_days': 0,
-                                    'off_days': 0,
-                                    'monday_early': 0,
-                                    'tuesday_early': 0,
-                                    'wednesday_early': 0,
-                                    'thursday_early': 0,
-                                    'friday_early': 0,
-                                    'total_days': 0,
-                                    'early_ratio': 0.0,
-                                    'critical_early_days': 0  # Mon-Fri early shifts
-                                }
-                            
-                            # Analyze detailed shift patterns
-                            for day_idx in range(7):
-                                if day_idx < len(shifts):
-                                    engineer_shift_analysis[engineer_id]['total_days'] += 1
-                                    if shifts[day_idx] == 'E':
-                                        engineer_shift_analysis[engineer_id]['early_days'] += 1
-                                        
-                                        # Track specific weekdays (critical for daily PPMs)
-                                        if day_idx < 5:  # Mon-Fri
-                                            engineer_shift_analysis[engineer_id]['critical_early_days'] += 1
-                                            if day_idx == 0:
-                                                engineer_shift_analysis[engineer_id]['monday_early'] += 1
-                                            elif day_idx == 1:
-                                                engineer_shift_analysis[engineer_id]['tuesday_early'] += 1
-                                            elif day_idx == 2:
-                                                engineer_shift_analysis[engineer_id]['wednesday_early'] += 1
-                                            elif day_idx == 3:
-                                                engineer_shift_analysis[engineer_id]['thursday_early'] += 1
-                                            elif day_idx == 4:
-                                                engineer_shift_analysis[engineer_id]['friday_early'] += 1
-                                    elif shifts[day_idx] == 'L':
-                                        engineer_shift_analysis[engineer_id]['late_days'] += 1
-                                    else:
-                                        engineer_shift_analysis[engineer_id]['off_days'] += 1
-                    
-                    # Calculate early shift ratios and critical coverage
-                    for engineer_id, analysis in engineer_shift_analysis.items():
-                        if analysis['total_days'] > 0:
-                            analysis['early_ratio'] = analysis['early_days'] / analysis['total_days']
-                            analysis['critical_early_ratio'] = analysis['critical_early_days'] / (analysis['total_days'] * 5/7)  # Mon-Fri ratio
-                    
-                    self.shift_analysis[team][role] = engineer_shift_analysis
-                    
-                    # Show ultimate analysis
-                    top_critical = sorted(engineer_shift_analysis.items(), 
-                                        key=lambda x: x[1]['critical_early_ratio'], reverse=True)[:3]
-                    print(f"   Team {team} {role}: Top Mon-Fri early shift engineers:")
-                    for eng_id, analysis in top_critical:
-                        ratio = analysis['critical_early_ratio'] * 100
-                        critical_days = analysis['critical_early_days']
-                        print(f"      {eng_id}: {ratio:.1f}% Mon-Fri early ({critical_days} critical early days)")
-                        
-                except FileNotFoundError:
+                statistics = self.context.shift_statistics[team][role]
+                if statistics is None:
                     print(f"   ⚠️  Rota file not found for Team {team} {role}")
                     self.shift_analysis[team][role] = {}
+                    continue
+                
+                # Detailed shift patterns; Mon-Fri early shifts are critical for daily PPMs
+                engineer_shift_analysis = {}
+                for engineer_id, stats in statistics.items():
+                    analysis = {
+                        'early_days': stats['early_days'],
+                        'late_days': stats['late_days'],
+                        'off_days': stats['off_days'],
+                        **{f'{day}_early': count for day, count in zip(WEEKDAY_NAMES, stats['weekday_early'])},
+                        'total_days': stats['total_days'],
+                        'early_ratio': 0.0,
+                        'critical_early_days': stats['weekday_early_days']
+                    }
+                    # Early shift ratios and critical coverage
+                    if analysis['total_days'] > 0:
+                        analysis['early_ratio'] = analysis['early_days'] / analysis['total_days']
+                        analysis['critical_early_ratio'] = analysis['critical_early_days'] / (analysis['total_days'] * 5/7)  # Mon-Fri ratio
+                    engineer_shift_analysis[engineer_id] = analysis
+                
+                self.shift_analysis[team][role] = engineer_shift_analysis
+                
+                # Show ultimate analysis
+                top_critical = sorted(engineer_shift_analysis.items(), 
+                                    key=lambda x: x[1]['critical_early_ratio'], reverse=True)[:3]
+                print(f"   Team {team} {role}: Top Mon-Fri early shift engineers:")
+                for eng_id, analysis in top_critical:
+                    ratio = analysis['critical_early_ratio'] * 100
+                    critical_days = analysis['critical_early_days']
+                    print(f"      {eng_id}: {ratio:.1f}% Mon-Fri early ({critical_days} critical early days)")
     
     def create_optimized_qualification_matrices(self):
         """Create ULTIMATE qualification matrices targeting 100% daily coverage"""
@@ -395,7 +355,7 @@ class UltimateCoverageDesigner:
             engineer_role = assignment['role']
             
             # Assign ALL qualifications of this role to this engineer
-            assignment['qualifications'] = list(all_qualifications[engineer_role])
+            assignment['qualifications'] = sorted(all_qualifications[engineer_role])
             
             # Also track daily qualifications
             assignment['daily_qualifications'] = []
@@ -442,46 +402,23 @@ class UltimateCoverageDesigner:
             daily_gaps = team_results['daily']['coverage_gaps']
             weekly_gaps = team_results['weekly']['coverage_gaps']
             
-            if daily_gaps:
-                print(f"         🔧 ULTIMATE gap fixing: {len(daily_gaps)} daily gaps")
-                self._ultimate_gap_elimination(engineer_assignments, daily_gaps, team)
-            
-            if weekly_gaps:
-                print(f"         🔧 ULTIMATE gap fixing: {len(weekly_gaps)} weekly gaps")
-                self._ultimate_gap_elimination(engineer_assignments, weekly_gaps, team)
-            
             if not daily_gaps and not weekly_gaps:
                 print(f"         🎯 No gaps found - 100% coverage achieved!")
                 break
+            
+            print(f"         🔧 ULTIMATE gap fixing: {len(daily_gaps)} daily gaps, {len(weekly_gaps)} weekly gaps")
+            if not self._ultimate_gap_elimination(engineer_assignments, team):
+                print(f"         No grant can close the remaining gaps")
+                break
         
         return engineer_assignments
     
-    def _ultimate_gap_elimination(self, engineer_assignments, gaps, team):
-        """Ultimate gap elimination - add qualifications to ALL engineers"""
-        for gap in gaps:
-            if 'qualification_code' in gap:
-                qual_code = gap['qualification_code']
-                maintenance_type = gap.get('maintenance_type', '')
-                role = maintenance_type.lower()
-                
-                # Add this qualification to ALL engineers of the right role
-                for eng_id, assignment in engineer_assignments.items():
-                    if assignment['role'] == role:
-                        if qual_code not in assignment['qualifications']:
-                            assignment['qualifications'].append(qual_code)
-                            print(f"           Added {qual_code} to {eng_id}")
-            
-            elif 'qualification_codes' in gap:
-                for qual_code in gap['qualification_codes']:
-                    maintenance_type = gap.get('maintenance_type', '')
-                    role = maintenance_type.lower()
-                    
-                    # Add this qualification to ALL engineers of the right role
-                    for eng_id, assignment in engineer_assignments.items():
-                        if assignment['role'] == role:
-                            if qual_code not in assignment['qualifications']:
-                                assignment['qualifications'].append(qual_code)
-                                print(f"           Added {qual_code} to {eng_id}")
+    def _ultimate_gap_elimination(self, engineer_assignments, team):
+        """Ultimate gap elimination - fewest qualification grants covering every failing cell"""
+        grants = self.gap_repair.repair(engineer_assignments, team, ppm_types=('daily', 'weekly'))
+        for grant in grants:
+            print(f"           Added {grant['qualification']} to {grant['engineer']} ({grant['cells']} gap cells)")
+        return grants
     
     def _display_ultimate_summary(self, engineer_assignments, team):
         """Display ultimate assignment summary"""
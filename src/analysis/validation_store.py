@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+
+"""
+Validation Results Store
+========================
+
+Compact on-disk format for coverage validation results: a small summary JSON
+(coverage percentages, counts, risk analysis) plus a columnar gap table in a
+compressed .npz archive, so large gap lists are neither pretty-printed nor
+decoded unless they are actually read.
+
+Key Features:
+- Summary JSON keeps every scalar and short list of the validator output
+- Failed days / weeks and coverage gaps stored column by column: strings
+  (rides, qualifications, PPM codes, days) as integer codes into one shared
+  vocabulary, lists as flattened codes plus offsets, None values as masks
+- Failed days and weeks reference their gaps by offset into the coverage gap
+  table instead of repeating them
+- Lazy loading: gap lists report their length from the summary and decode
+  the .npz only when indexed or iterated
+- Legacy validation_results.json files (full JSON) still load unchanged
+"""
+
+import io
+import json
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from .atomic_output import atomic_write_bytes, atomic_write_json
+
+
+# Validator lists moved into the gap table, per PPM type
+GAP_TABLES = {
+    'daily': ('coverage_gaps', 'failed_days'),
+    'weekly': ('coverage_gaps', 'failed_weeks'),
+    'monthly': ('coverage_gaps',)
+}
+TABLES_KEY = "_gap_tables"
+
+
+class _StringCodes:
+    """Shared string vocabulary: string -> integer code"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.codes)
+        return self.codes[value]
+
+    def array(self):
+        return np.array(list(self.codes), dtype=str) if self.codes else np.array([], dtype='<U1')
+
+
+def _column_kind(values):
+    """Storage kind for one column's non-None values"""
+    present = [value for value in values if value is not None]
+    if not present:
+        return 'null'
+    if all(isinstance(value, bool) for value in present):
+        return 'bool'
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return 'int'
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return 'float'
+    if all(isinstance(value, str) for value in present):
+        return 'str'
+    if all(isinstance(value, list) and all(isinstance(item, str) for item in value) for value in present):
+        return 'str_list'
+    return 'json'
+
+
+def _encode_records(records, prefix, arrays, strings, nested_offsets=None):
+    """Write one list of dicts as columns under prefix; returns the column layout"""
+    keys = list(dict.fromkeys(key for record in records for key in record))
+    columns = {}
+    for key in keys:
+        if key == 'gaps' and nested_offsets is not None:
+            arrays[f"{prefix}/gaps"] = np.array(nested_offsets, dtype=np.int64)
+            columns[key] = {'kind': 'gap_offsets'}
+            continue
+
+        values = [record.get(key) for record in records]
+        kind = _column_kind(values)
+        layout = {'kind': kind}
+        if any(key not in record for record in records):
+            arrays[f"{prefix}/{key}/missing"] = np.array([key not in record for record in records])
+            layout['missing'] = True
+        if kind != 'null' and any(value is None for value in values):
+            arrays[f"{prefix}/{key}/null"] = np.array([value is None for value in values])
+            layout['nullable'] = True
+
+        if kind == 'bool':
+            arrays[f"{prefix}/{key}"] = np.array([bool(value) for value in values])
+        elif kind == 'int':
+            arrays[f"{prefix}/{key}"] = np.array([value if value is not None else 0 for value in values],
+                                                 dtype=np.int64)
+        elif kind == 'float':
+            arrays[f"{prefix}/{key}"] = np.array([value if value is not None else 0.0 for value in values],
+                                                 dtype=np.float64)
+            is_int = [isinstance(value, int) for value in values]
+            if any(is_int):
+                arrays[f"{prefix}/{key}/is_int"] = np.array(is_int)
+                layout['mixed_int'] = True
+        elif kind == 'str':
+            arrays[f"{prefix}/{key}"] = np.array(
+                [strings.code(value) if value is not None else -1 for value in values], dtype=np.int32
+            )
+        elif kind == 'str_list':
+            lengths = [len(value) if value is not None else 0 for value in values]
+            arrays[f"{prefix}/{key}/offsets"] = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+            arrays[f"{prefix}/{key}"] = np.array(
+                [strings.code(item) for value in values if value is not None for item in value], dtype=np.int32
+            )
+        elif kind == 'json':
+            arrays[f"{prefix}/{key}"] = np.array(
+                [strings.code(json.dumps(value)) for value in values], dtype=np.int32
+            )
+        columns[key] = layout
+    return {'rows': len(records), 'columns': columns}
+
+
+def _decode_records(layout, prefix, npz, strings, gap_records=None):
+    """Rebuild a list of dicts from its columns"""
+    rows = layout['rows']
+    decoded = {}
+    for key, column in layout['columns'].items():
+        kind = column['kind']
+        if kind == 'gap_offsets':
+            offsets = npz[f"{prefix}/gaps"].tolist()
+            decoded[key] = [gap_records[offsets[i]:offsets[i + 1]] for i in range(rows)]
+            continue
+        if kind == 'null':
+            values = [None] * rows
+        elif kind in ('bool', 'int', 'float'):
+            values = npz[f"{prefix}/{key}"].tolist()
+            if column.get('mixed_int'):
+                is_int = npz[f"{prefix}/{key}/is_int"].tolist()
+                values = [int(value) if flag else value for value, flag in zip(values, is_int)]
+        elif kind == 'str':
+            values = [strings[code] if code >= 0 else None for code in npz[f"{prefix}/{key}"].tolist()]
+        elif kind == 'str_list':
+            offsets = npz[f"{prefix}/{key}/offsets"].tolist()
+            flat = [strings[code] for code in npz[f"{prefix}/{key}"].tolist()]
+            values = [flat[offsets[i]:offsets[i + 1]] for i in range(rows)]
+        else:
+            values = [json.loads(strings[code]) for code in npz[f"{prefix}/{key}"].tolist()]
+
+        if column.get('nullable'):
+            values = [None if null else value for value, null in zip(values, npz[f"{prefix}/{key}/null"].tolist())]
+        if column.get('missing'):
+            missing = npz[f"{prefix}/{key}/missing"].tolist()
+        else:
+            missing = None
+        decoded[key] = (values, missing)
+
+    records = [{} for _ in range(rows)]
+    for key, column in layout['columns'].items():
+        if column['kind'] == 'gap_offsets':
+            for record, gaps in zip(records, decoded[key]):
+                record[key] = gaps
+            continue
+        values, missing = decoded[key]
+        for i, record in enumerate(records):
+            if missing is None or not missing[i]:
+                record[key] = values[i]
+    return records
+
+
+class _GapTableReader:
+    """Holds the compressed .npz bytes and decodes each table on first use"""
+
+    def __init__(self, gaps_path):
+        self.gaps_path = Path(gaps_path)
+        # Read now (no file handle kept) so a later swap of the results directory
+        # cannot pull the data away; only decoding is deferred
+        self._data = self.gaps_path.read_bytes() if self.gaps_path.exists() else None
+        self._npz = None
+        self._strings = None
+        self._cache = {}
+
+    def records(self, team, ppm_type, table, layouts):
+        cache_key = (team, ppm_type, table)
+        if cache_key not in self._cache:
+            if self._npz is None:
+                if self._data is None:
+                    raise FileNotFoundError(f"Validation gap table not found: {self.gaps_path}")
+                with np.load(io.BytesIO(self._data), allow_pickle=False) as npz:
+                    self._npz = {name: npz[name] for name in npz.files}
+                self._data = None
+                self._strings = self._npz['strings'].tolist()
+            gap_records = None
+            if table != 'coverage_gaps':
+                gap_records = self.records(team, ppm_type, 'coverage_gaps', layouts)
+            self._cache[cache_key] = _decode_records(
+                layouts[table], f"{team}/{ppm_type}/{table}", self._npz, self._strings, gap_records
+            )
+        return self._cache[cache_key]
+
+
+class LazyGapList(Sequence):
+    """Read-only gap list whose length is known without decoding the gap table"""
+
+    def __init__(self, reader, team, ppm_type, table, layouts):
+        self._reader = reader
+        self._key = (team, ppm_type, table)
+        self._layouts = layouts
+        self._length = layouts[table]['rows']
+
+    def _records(self):
+        return self._reader.records(*self._key, self._layouts)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self._records()[index]
+
+    def __iter__(self):
+        return iter(self._records())
+
+    def __eq__(self, other):
+        return list(self) == list(other) if isinstance(other, (list, Sequence)) else NotImplemented
+
+    def __repr__(self):
+        return f"LazyGapList({'/'.join(map(str, self._key))}, {self._length} rows)"
+
+
+def _gaps_are_concatenated(parent_rows, gaps):
+    """True when the failed days / weeks list their gaps in coverage gap order"""
+    flat = [gap for row in parent_rows for gap in row.get('gaps', [])]
+    return len(flat) == len(gaps) and all(a == b for a, b in zip(flat, gaps))
+
+
+def encode_validation_results(validation_results):
+    """(summary dict, {array name: array}) for validator output keyed by team"""
+    strings = _StringCodes()
+    arrays = {}
+    summary = {}
+    tables = {}
+
+    for team, team_results in validation_results.items():
+        team_key = str(team)
+        summary[team_key] = {key: value for key, value in team_results.items() if key not in GAP_TABLES}
+        for ppm_type, table_names in GAP_TABLES.items():
+            if ppm_type not in team_results:
+                continue
+            results = dict(team_results[ppm_type])
+            gaps = list(results.get('coverage_gaps', []))
+            parents = {name: list(results.get(name, [])) for name in table_names[1:] if name in results}
+
+            if not all(_gaps_are_concatenated(rows, gaps) for rows in parents.values()):
+                # Unexpected layout: keep this PPM type as plain JSON
+                summary[team_key][ppm_type] = {key: (list(value) if isinstance(value, Sequence) and
+                                                     not isinstance(value, str) else value)
+                                               for key, value in results.items()}
+                continue
+
+            layouts = {}
+            if 'coverage_gaps' in results:
+                layouts['coverage_gaps'] = _encode_records(gaps, f"{team_key}/{ppm_type}/coverage_gaps",
+                                                           arrays, strings)
+            for name, rows in parents.items():
+                offsets = [0]
+                for row in rows:
+                    offsets.append(offsets[-1] + len(row.get('gaps', [])))
+                layouts[name] = _encode_records(rows, f"{team_key}/{ppm_type}/{name}", arrays, strings,
+                                                nested_offsets=offsets)
+            for name in layouts:
+                results.pop(name)
+            summary[team_key][ppm_type] = results
+            tables.setdefault(team_key, {})[ppm_type] = layouts
+
+    arrays['strings'] = strings.array()
+    summary[TABLES_KEY] = tables
+    return summary, arrays
+
+
+class ValidationStore:
+    """Reads and writes validation results as summary JSON + columnar gap table"""
+
+    SUMMARY_FILE = "validation_results.json"
+    GAPS_FILE = "validation_gaps.npz"
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.summary_path = self.directory / self.SUMMARY_FILE
+        self.gaps_path = self.directory / self.GAPS_FILE
+
+    def save(self, validation_results):
+        """Write the compressed gap table, then the summary JSON (each atomically)"""
+        summary, arrays = encode_validation_results(validation_results)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **arrays)
+        atomic_write_bytes(self.gaps_path, buffer.getvalue())
+        atomic_write_json(self.summary_path, summary)
+        return self.summary_path, self.gaps_path
+
+    def load_summary(self):
+        """Summary JSON as stored (gap tables described, not decoded); None when missing"""
+        if not self.summary_path.exists():
+            return None
+        with open(self.summary_path, 'r') as f:
+            return json.load(f)
+
+    def load(self):
+        """Validation results with gap lists decoded lazily on first access
+
+        Files from before the columnar format (full JSON) are returned as-is.
+        """
+        summary = self.load_summary()
+        if summary is None:
+            return None
+        tables = summary.pop(TABLES_KEY, None)
+        if not tables:
+            return summary
+
+        reader = _GapTableReader(self.gaps_path)
+        for team_key, by_type in tables.items():
+            for ppm_type, layouts in by_type.items():
+                for name in layouts:
+                    summary[team_key][ppm_type][name] = LazyGapList(reader, team_key, ppm_type, name, layouts)
+        return summary
+
+
+def materialize(validation_results):
+    """Plain lists and dicts (e.g. for json.dump) from lazily loaded results"""
+    if isinstance(validation_results, dict):
+        return {key: materialize(value) for key, value in validation_results.items()}
+    if isinstance(validation_results, LazyGapList):
+        return [materialize(record) for record in validation_results]
+    if isinstance(validation_results, list):
+        return [materialize(item) for item in validation_results]
+    return validation_results
@@ -6,13 +6,56 @@ Validate Current Qualification Matrices
 
 This script validates the current qualification matrices using the
 standardized output approach. Much simpler and more maintainable!
+
+Usage:
+    python3 validate_qualifications.py             # re-validate and save
+    python3 validate_qualifications.py --summary   # print the saved results only
 """
 
+import argparse
+
 from src.analysis.coverage_validator import CoverageValidator
 from src.analysis.standard_output_manager import StandardOutputManager
 import json
 from pathlib import Path
 
+def print_validation_summary(validation_results):
+    """Per-team coverage summary (gap lists are only counted, never decoded)"""
+    print(f"\n📊 VALIDATION RESULTS SUMMARY:")
+    print("=" * 50)
+    
+    for team in [1, 2]:
+        result = validation_results.get(team, validation_results.get(str(team)))
+        if result:
+            print(f"\n🏢 TEAM {team}:")
+            print(f"   Daily PPMs:    {result['daily']['coverage_percentage']:.1f}% coverage")
+            print(f"   Weekly PPMs:   {result['weekly']['coverage_percentage']:.1f}% coverage")
+            print(f"   Monthly PPMs:  {result['monthly']['coverage_percentage']:.1f}% coverage")
+            print(f"   Status:        {result['overall_status']}")
+            print(f"   Risk Level:    {result['risk_analysis']['overall_risk']}")
+            
+            if result['daily']['failed_days']:
+                print(f"   ⚠️  Daily Gaps: {len(result['daily']['failed_days'])} out of {result['daily']['total_days_tested']} days")
+            
+            if result['weekly']['coverage_gaps']:
+                print(f"   ⚠️  Weekly Gaps: {len(result['weekly']['coverage_gaps'])} qualifications")
+
+
+def show_saved_summary():
+    """Print the saved validation results without re-running the validator"""
+    output_manager = StandardOutputManager()
+    validation_results = output_manager.load_current_validation()
+    if not validation_results:
+        print("\n❌ No saved validation results found!")
+        print("   Run: python3 validate_qualifications.py")
+        return
+    
+    metadata = output_manager.load_current_metadata()
+    if metadata:
+        print(f"\n📋 SAVED RESULTS: {metadata['optimization_name']} ({metadata['created_timestamp'][:16]})")
+    print_validation_summary(validation_results)
+
+
 def main():
     print("🧪 VALIDATE CURRENT QUALIFICATION MATRICES")
     print("=" * 60)
@@ -56,24 +99,7 @@ def main():
     )
     
     # Display results summary
-    print(f"\n📊 VALIDATION RESULTS SUMMARY:")
-    print("=" * 50)
-    
-    for team in [1, 2]:
-        if team in validation_results:
-            result = validation_results[team]
-            print(f"\n🏢 TEAM {team}:")
-            print(f"   Daily PPMs:    {result['daily']['coverage_percentage']:.1f}% coverage")
-            print(f"   Weekly PPMs:   {result['weekly']['coverage_percentage']:.1f}% coverage")
-            print(f"   Monthly PPMs:  {result['monthly']['coverage_percentage']:.1f}% coverage")
-            print(f"   Status:        {result['overall_status']}")
-            print(f"   Risk Level:    {result['risk_analysis']['overall_risk']}")
-            
-            if result['daily']['failed_days']:
-                print(f"   ⚠️  Daily Gaps: {len(result['daily']['failed_days'])} out of {result['daily']['total_days_tested']} days")
-            
-            if result['weekly']['coverage_gaps']:
-                print(f"   ⚠️  Weekly Gaps: {len(result['weekly']['coverage_gaps'])} qualifications")
+    print_validation_summary(validation_results)
     
     print(f"\n✅ Validation complete!")
     print(f"📄 Results saved to: {output_manager.current_dir}/validation_results.json")
@@ -93,5 +119,13 @@ def show_archive_status():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Validate the current qualification matrices")
+    parser.add_argument('--summary', action='store_true',
+                        help="Print the saved validation summary instead of re-validating")
+    args = parser.parse_args()
+    
+    if args.summary:
+        show_saved_summary()
+    else:
+        main()
     show_archive_status() 
\ No newline at end of file